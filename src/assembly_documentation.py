@@ -1,5 +1,11 @@
-from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from hashlib import sha256
+from json import dumps, loads
 from pathlib import Path
+from typing import Optional
+
 from bender_config import BenderConfig
 from filament_bracket import FilamentBracket
 from filament_wheel import FilamentWheel
@@ -19,7 +25,10 @@ from build123d import (
     Cylinder,
     Cone,
 )
-from ocp_vscode import Camera, show, save_screenshot
+from config_snapshot import snapshot
+from gltf_export import GlbSettings, export_glb
+from offscreen_renderer import RenderSettings, render, write_png
+from source_graph import source_digest as _source_digest
 
 
 class wall_assembly:
@@ -211,7 +220,18 @@ class wall_assembly:
 
 class BracketAssembly:
     bender_config: BenderConfig
-    _filament_bracket: FilamentBracket = FilamentBracket()
+
+    @cached_property
+    def _filament_bracket(self) -> FilamentBracket:
+        """
+        the compiled filament bracket shown in the assembly, built the
+        first time an assembly step needs it
+        """
+        filament_bracket = FilamentBracket(
+            self._config.filament_bracket_config(0)
+        )
+        filament_bracket.compile()
+        return filament_bracket
 
     def _step_one_assembly(self) -> Compound:
         """"""
@@ -338,42 +358,229 @@ class BracketAssembly:
             self._config = BenderConfig()
         else:
             self._config = config
-        self._filament_bracket = FilamentBracket(
-            self._config.filament_bracket_config(0)
-        )
-        self._filament_bracket.compile()
 
 
-if __name__ == "__main__":
-    config_path = Path(__file__).parent / "../build-configs/reference.conf"
-    bender_config = BenderConfig(config_path)
-    output_directory = Path(__file__).parent / "../docs/assets"
+@dataclass(frozen=True)
+class DocumentationView:
+    """
+    a single assembly documentation image
+    -------
+    arguments:
+        - file_name: the name of the image in the output directory
+        - assembly: the key of the assembly class in ASSEMBLIES
+        - step: the name of the assembly method building the pictured step
+    """
+
+    file_name: str
+    assembly: str
+    step: str
+
+
+ASSEMBLIES = {"walls": wall_assembly, "brackets": BracketAssembly}
+
+DOCUMENTATION_VIEWS = [
+    DocumentationView(
+        "step-001-internal-walls.png", "walls", "step_one_assembly"
+    ),
+    DocumentationView(
+        "step-002-external-walls.png", "walls", "step_two_assembly"
+    ),
+    DocumentationView(
+        "step-003-wall-assembly.png", "walls", "complete_assembly"
+    ),
+    DocumentationView(
+        "step-001-wheel-bearing.png", "brackets", "_step_one_assembly"
+    ),
+    DocumentationView(
+        "step-002-slide-top.png", "brackets", "_step_two_assembly"
+    ),
+    DocumentationView(
+        "step-003-bracket-complete.png", "brackets", "complete_assembly"
+    ),
+]
+
+# records the cache key each image was rendered with; it describes this
+# checkout's renders, so it is ignored by git rather than committed
+RENDER_MANIFEST = ".render-manifest.json"
+
+
+def view_cache_key(
+    bender_config: BenderConfig,
+    view: DocumentationView,
+    settings: RenderSettings,
+    source_digest: Optional[str] = None,
+) -> str:
+    """
+    a key identifying everything an image depends on; an image is only
+    re-rendered when its key changes
+    -------
+    arguments:
+        - bender_config: the configuration the assemblies are built from
+        - view: the documentation view
+        - settings: the render settings
+        - source_digest: the digest of this module and every module it
+            imports, computed if not set
+    """
+    return sha256(
+        repr(
+            (
+                snapshot(bender_config),
+                view,
+                settings,
+                source_digest or _source_digest([Path(__file__).stem]),
+            )
+        ).encode()
+    ).hexdigest()
+
+
+def render_view(
+    bender_config: BenderConfig,
+    view: DocumentationView,
+    settings: RenderSettings,
+    path: Path,
+):
+    """
+    builds the assembly step for a view and renders it to a png
+    -------
+    arguments:
+        - bender_config: the configuration to build the assembly from
+        - view: the documentation view
+        - settings: the render settings
+        - path: the image file to write
+    """
+    assembly = ASSEMBLIES[view.assembly](bender_config)
+    write_png(render(getattr(assembly, view.step)(), settings), path)
+
+
+def _render_task(task: tuple) -> str:
+    render_view(*task)
+    return task[1].file_name
+
+
+def render_documentation(
+    bender_config: BenderConfig,
+    output_directory: Path,
+    views: list[DocumentationView] = DOCUMENTATION_VIEWS,
+    settings: RenderSettings = RenderSettings(),
+    jobs: Optional[int] = None,
+) -> list[str]:
+    """
+    renders the documentation images headlessly, skipping any image whose
+    configuration, view, settings and source code are unchanged since it
+    was last rendered; returns the names of the images rendered
+    -------
+    arguments:
+        - bender_config: the configuration to build the assemblies from
+        - output_directory: the directory to write the images to
+        - views: the views to render
+        - settings: the render settings
+        - jobs: the number of views to render in parallel, one process per
+            view if not set, 1 renders in the current process
+    """
+    output_directory = Path(output_directory)
     output_directory.mkdir(parents=True, exist_ok=True)
-    walls = wall_assembly(bender_config)
-    show(walls.step_one_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-001-internal-walls.png")
+    manifest_path = output_directory / RENDER_MANIFEST
+    manifest = (
+        loads(manifest_path.read_text()) if manifest_path.exists() else {}
     )
+    # the assemblies are built here, so only this module's imports count
+    source_digest = _source_digest([Path(__file__).stem])
+    keys = {
+        view.file_name: view_cache_key(
+            bender_config, view, settings, source_digest
+        )
+        for view in views
+    }
+    stale = [
+        view
+        for view in views
+        if manifest.get(view.file_name) != keys[view.file_name]
+        or not (output_directory / view.file_name).exists()
+    ]
+    tasks = [
+        (bender_config, view, settings, output_directory / view.file_name)
+        for view in stale
+    ]
+
+    rendered = []
+    if jobs == 1 or len(tasks) <= 1:
+        completed = map(_render_task, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs or len(tasks))
+        completed = executor.map(_render_task, tasks)
+    try:
+        for file_name in completed:
+            rendered.append(file_name)
+            manifest[file_name] = keys[file_name]
+            manifest_path.write_text(dumps(manifest, indent=2, sort_keys=True))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return rendered
+
+
+# the glb model written for the complete assembly of each ASSEMBLIES entry
+ASSEMBLY_MODELS = {
+    "wall-assembly.glb": "walls",
+    "bracket-assembly.glb": "brackets",
+}
 
-    show(walls.step_two_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-002-external-walls.png")
-    )
 
-    show(walls.complete_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-003-wall-assembly.png")
+def export_models(
+    bender_config: BenderConfig,
+    output_directory: Path,
+    settings: GlbSettings = GlbSettings(),
+) -> list[str]:
+    """
+    writes the complete assemblies as glb models for the web documentation,
+    returning the names of the models written
+    -------
+    arguments:
+        - bender_config: the configuration to build the assemblies from
+        - output_directory: the directory to write the models to
+        - settings: the levels of detail
+    """
+    output_directory = Path(output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+    for file_name, assembly in ASSEMBLY_MODELS.items():
+        export_glb(
+            ASSEMBLIES[assembly](bender_config).complete_assembly(),
+            output_directory / file_name,
+            settings,
+        )
+    return list(ASSEMBLY_MODELS)
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(
+        description="Render the assembly documentation images"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="the number of images to render in parallel",
     )
-    brackets = BracketAssembly(bender_config)
-    show(brackets._step_one_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-001-wheel-bearing.png")
+    parser.add_argument(
+        "--models",
+        action="store_true",
+        help="also export the complete assemblies as glb models",
     )
-    show(brackets._step_two_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-002-external-walls.png")
+    args = parser.parse_args()
+
+    config_path = Path(__file__).parent / "../build-configs/release.conf"
+    bender_config = BenderConfig(config_path)
+    output_directory = Path(__file__).parent / "../docs/assets"
+    rendered = render_documentation(
+        bender_config, output_directory, jobs=args.jobs
     )
-    show(brackets.complete_assembly(), reset_camera=Camera.RESET)
-    save_screenshot(
-        filename=str(Path(output_directory) / "step-003-bracket-complete.png")
+    print(
+        f"rendered {len(rendered)} of {len(DOCUMENTATION_VIEWS)} "
+        "documentation images"
     )
+    if args.models:
+        exported = export_models(bender_config, output_directory / "models")
+        print(f"exported {len(exported)} assembly models")
@@ -3,7 +3,7 @@ module for all of the configuration required to build a filament bank
 """
 
 import yaml
-from dataclasses import dataclass, field, fields
+from dataclasses import MISSING, dataclass, field, fields
 from typing import Optional, List
 from enum import Enum, Flag, auto
 from math import sqrt
@@ -13,6 +13,7 @@ from fb_library import Point
 
 from fb_library import distance_to_circle_edge, circular_intersection
 
+from derived_property import MemoizedConfig, derived_property
 from filament_wheel_config import WheelConfig
 from guidewall_config import GuidewallConfig
 from hanging_bracket_config import HangingBracketConfig, HangingBracketStyle
@@ -29,7 +30,7 @@ from filament_bracket_config import (
 
 
 @dataclass
-class BenderConfig:
+class BenderConfig(MemoizedConfig):
     """
     A dataclass for configuration values for our filament bank
     """
@@ -81,7 +82,7 @@ class BenderConfig:
     m4_nut_depth: float = 5
     m4_shaft_radius: float = 2.1
 
-    @property
+    @derived_property
     def frame_clip_point(self) -> Point:
         """
         the x/y coordinates at which the center of the frame clip is positioned
@@ -94,7 +95,7 @@ class BenderConfig:
             self.minimum_structural_thickness * 2,
         )
 
-    @property
+    @derived_property
     def lock_pin_point(self) -> Point:
         mid_radius = (
             self.frame_bracket_exterior_radius
@@ -119,7 +120,7 @@ class BenderConfig:
             self.frame_bracket_exterior_radius, (0, y_value), 0
         )
 
-    @property
+    @derived_property
     def sidewall_section_depth(self) -> float:
         """
         returns the length of the sidewall based on the overall chamber
@@ -132,7 +133,7 @@ class BenderConfig:
             - (self.frame_bracket_exterior_radius - self.wheel.radius)
         ) / 2
 
-    @property
+    @derived_property
     def frame_clip_inset(self) -> float:
         """
         the amount that the frame clip extends into
@@ -140,7 +141,7 @@ class BenderConfig:
         """
         return self.wall_thickness / 3
 
-    @property
+    @derived_property
     def frame_clip_rail_width(self) -> float:
         """
         the radius of the diamond that helps lock in
@@ -148,7 +149,7 @@ class BenderConfig:
         """
         return self.frame_clip_inset / sqrt(2) * 2
 
-    @property
+    @derived_property
     def frame_clip_width(self) -> float:
         """
         the overall width of the clip that locks the
@@ -160,14 +161,14 @@ class BenderConfig:
             + self.wall_thickness * 2 / 3
         )
 
-    @property
+    @derived_property
     def frame_base_depth(self) -> float:
         """
         the appropriate height for the bottom frame
         """
         return self.frame_tongue_depth + self.minimum_structural_thickness
 
-    @property
+    @derived_property
     def sidewall_straight_depth(self) -> float:
         """
         the length of the straight portion of the sidewall
@@ -178,14 +179,14 @@ class BenderConfig:
             - self.frame_base_depth
         )
 
-    @property
+    @derived_property
     def frame_connector_depth(self) -> float:
         """
         the depth of the connector frame
         """
         return self.frame_tongue_depth * 2 + self.minimum_thickness
 
-    @property
+    @derived_property
     def frame_bracket_exterior_radius(self) -> float:
         """
         the correct exterior radius for the cylinder of the frame bracket
@@ -196,21 +197,21 @@ class BenderConfig:
             )
         )
 
-    @property
+    @derived_property
     def frame_bracket_exterior_diameter(self) -> float:
         """
         the correct exterior diameter for the cylinder of the frame bracket
         """
         return self.frame_bracket_exterior_radius * 2
 
-    @property
+    @derived_property
     def frame_bracket_spacing(self) -> Point:
         """
         returns the distance between the sidewalls of the frame
         """
         return self.bracket_depth + self.wall_thickness + self.tolerance * 2
 
-    @property
+    @derived_property
     def frame_click_sphere_point(self) -> Point:
         """
         the x / y coordinates for the snap fit points
@@ -221,7 +222,7 @@ class BenderConfig:
             self.fillet_radius + self.frame_click_sphere_radius,
         )
 
-    @property
+    @derived_property
     def top_frame_interior_width(self) -> float:
         """
         the overall interior width of the top frame
@@ -230,7 +231,7 @@ class BenderConfig:
             self.frame_bracket_spacing * self.filament_count
         ) - self.wall_thickness
 
-    @property
+    @derived_property
     def frame_exterior_length(self) -> float:
         """
         the overall interior length of the top frame
@@ -244,18 +245,18 @@ class BenderConfig:
             length += self.frame_hanger_offset * 2
         return length
 
-    @property
+    @derived_property
     def click_fit_distance(self) -> float:
         return self.frame_bracket_spacing * (self.filament_count - 1)
 
-    @property
+    @derived_property
     def frame_hanger_offset(self) -> float:
         """
         the offset to adjust for a wall bracket if enabled
         """
         return self.minimum_structural_thickness / 2
 
-    @property
+    @derived_property
     def frame_exterior_width(self) -> float:
         """
         the overall interior width of the top frame
@@ -264,7 +265,7 @@ class BenderConfig:
             (self.minimum_structural_thickness + self.wall_thickness) * 2
         )
 
-    @property
+    @derived_property
     def default_connector(self) -> ConnectorConfig:
         """
         returns the default connector
@@ -275,7 +276,7 @@ class BenderConfig:
                 return connector
         return self.connectors[default_index]
 
-    @property
+    @derived_property
     def sidewall_width(self) -> float:
         """
         returns the appropriate width for the sidewalls
@@ -292,14 +293,14 @@ class BenderConfig:
             * 2
         )
 
-    @property
+    @derived_property
     def bearing_shelf_height(self) -> float:
         """
         returns the appropriate height for the bearing shelf
         """
         return (self.bracket_depth - self.wheel.bearing.depth) / 2
 
-    @property
+    @derived_property
     def bracket_width(self) -> float:
         """
         returns the width of the bracket
@@ -312,7 +313,7 @@ class BenderConfig:
             + self.fillet_radius * 2,
         )
 
-    @property
+    @derived_property
     def wheel_support_height(self) -> float:
         """
         returns the appropriate height for the bearing shelf
@@ -323,14 +324,14 @@ class BenderConfig:
             - self.wheel.lateral_tolerance
         ) / 2
 
-    @property
+    @derived_property
     def chamber_cut_length(self) -> float:
         """
         the length to cut for each chamber in the frames
         """
         return self.sidewall_width - self.wall_thickness * 2
 
-    @property
+    @derived_property
     def bracket_height(self) -> float:
         """
         returns the height of the bracket
@@ -342,7 +343,7 @@ class BenderConfig:
             + self.minimum_structural_thickness * 2,
         )
 
-    @property
+    @derived_property
     def bracket_depth(self) -> float:
         """
         returns the depth of the bracket
@@ -357,7 +358,7 @@ class BenderConfig:
             + self.minimum_thickness * 2,
         )
 
-    @property
+    @derived_property
     def fillet_radius(self) -> float:
         """
         returns the fillet radis for bracket parts
@@ -544,9 +545,12 @@ class BenderConfig:
                 ) from e
         else:
             for field in fields(self):
-                setattr(
-                    self, field.name, kwargs.get(field.name, field.default)
+                default = (
+                    field.default
+                    if field.default is not MISSING
+                    else field.default_factory()
                 )
+                setattr(self, field.name, kwargs.get(field.name, default))
             default_connector = ConnectorConfig()
             self.connectors = [default_connector]
             self.wheel = WheelConfig()
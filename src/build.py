@@ -1,37 +1,72 @@
-""" Build and export all parts required for assebly for each configuration file in the build-configs directory """
+"""
+builds and exports every part required for assembly of one or more
+BenderConfigs
 
-from argparse import ArgumentParser
-from importlib.machinery import SourceFileLoader
-from importlib.util import module_from_spec, spec_from_loader
-from pathlib import Path
-from time import time
-from copy import deepcopy
-
-from bender_config import BenderConfig, LockStyle
-from frame_config import FrameConfig, FrameStyle
-from hanging_bracket import HangingBracket
-from filament_bracket import FilamentBracket
-from filament_wheel import FilamentWheel
-from frame_top import TopFrame
-from frame_connector import ConnectorFrame
-from frame_bottom import BottomFrame
-from hanging_bracket_config import HangingBracketStyle
-from lock_pin import LockPin
-from sidewall import Sidewall
-from guidewall import Guidewall
-from filament_bracket_config import ChannelPairDirection
-from hanging_bracket import HangingBracket
+`build()` (or a `Builder`, which keeps its cost model, part cache and
+build stage snapshots warm between builds) runs the build plans of the
+configurations and returns a BuildResult, without changing the working
+directory or printing anything unless asked to. Run as a script,
+build.py builds the configuration files in the build-configs directory.
+
+usage: python build.py --config release
+"""
 
-import socket
 import re
+import socket
+from argparse import ArgumentParser
 from contextlib import closing
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from time import time
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+
+from assembly_documentation import render_documentation
+from bender_config import BenderConfig
+from build_events import BuildEvent, BuildProgress, EventWriter, ProgressView
+from build_journal import BUILD_JOURNAL, BuildJournal
+from build_plan import build_plan, select_jobs, target_names
+from build_scheduler import (
+    BUILD_HISTORY,
+    CostModel,
+    FinishedJob,
+    build_task,
+    longest_first,
+    makespan_bound,
+    run_isolated,
+    run_jobs,
+)
+from config_constraints import check_config, validate_config
+from config_snapshot import snapshot
+from part_cache import PART_CACHE, DirectoryStore, HttpStore, PartCache
+from print_estimate import (
+    KitEstimate,
+    PartEstimate,
+    estimate_plan,
+    hours,
+    kit_estimate,
+    write_estimates,
+)
+from printability import (
+    PrintabilityReport,
+    analyze_files,
+    read_report,
+    read_stl,
+    write_report,
+)
+from shape_transport import ShapeStore
+from shared_jobs import pool_jobs, share_outputs
 
-from sidewall_config import WallStyle
-from os import chdir
+# from ocp_vscode.standalone import Viewer
 
-chdir(Path(__file__).parent)
+SOURCE_FOLDER = Path(__file__).parent
+BUILD_CONFIGS = SOURCE_FOLDER / "../build-configs"
 
-# from ocp_vscode.standalone import Viewer
+# the published documentation images are rendered from the configuration
+# building into this stl folder, or the first configuration built
+DOCUMENTATION_CONFIG = "release"
 
 
 def ocp_responding() -> bool:
@@ -40,15 +75,6 @@ def ocp_responding() -> bool:
     return ocp_open
 
 
-def nice_direction_name(direction: ChannelPairDirection) -> str:
-    if direction == ChannelPairDirection.LEAN_REVERSE:
-        return "reverse-path-angle"
-    elif direction == ChannelPairDirection.STRAIGHT:
-        return "straight-path-angle"
-    else:
-        return "forward-path-angle"
-
-
 def leading_tabs(input_string: str) -> str:
     # Use a regular expression to match leading tabs
     match = re.match(r"^\t*", input_string)
@@ -57,449 +83,657 @@ def leading_tabs(input_string: str) -> str:
     return ""
 
 
-def dash_prefix(input_string: str) -> str:
-    if input_string[0] == "-":
-        return input_string
-    return f"-{input_string}"
-
-
 def headline(text: str) -> str:
     tabs = leading_tabs(text)
     return f"{tabs}{'-'*len(text)}\n{text}\n{tabs}{'-'*len(text)}"
 
 
-def partomate_alt_solid_sidewalls(bender_config: BenderConfig):
-    sidewall = Sidewall(bender_config.sidewall_config)
-
-    sidewall._config.wall_style = WallStyle.SOLID
-    sidewall._config.stl_folder = str(
-        (Path(sidewall._config.stl_folder) / "alt-wall-styles")
-    )
-    sidewall._config.file_prefix = "alt-"
-    sidewall._config.file_suffix = f"{sidewall._config.file_suffix}-solid"
-    sidewall.partomate()
-
-
-def partomate_alt_hex_sidewalls(bender_config: BenderConfig):
-    sidewall = Sidewall(bender_config.sidewall_config)
-
-    sidewall._config.wall_style = WallStyle.SOLID
-    sidewall._config.stl_folder = str(
-        (Path(sidewall._config.stl_folder) / "alt-wall-styles")
-    )
-    sidewall._config.file_prefix = "alt-"
-    sidewall._config.file_suffix = f"{sidewall._config.file_suffix}-open-hex"
-    sidewall.partomate()
-
-
-def partomate_alt_non_dry_sidewalls(bender_config: BenderConfig):
-    sidewall = Sidewall(bender_config.sidewall_config)
-
-    sidewall._config.wall_style = WallStyle.HEX
-    sidewall._config.stl_folder = str(
-        (Path(sidewall._config.stl_folder) / "alt-wall-styles")
-    )
-    sidewall._config.file_prefix = "alt-"
-    sidewall._config.file_suffix = f"{sidewall._config.file_suffix}-open-hex"
-    sidewall._config.block_inner_wall_generation = True
-    sidewall.partomate()
-
-
-def partomate_alt_dry_sidewalls(bender_config: BenderConfig):
-    sidewall = Sidewall(bender_config.sidewall_config)
-
-    sidewall._config.wall_style = WallStyle.DRYBOX
-    sidewall._config.stl_folder = str(
-        (Path(sidewall._config.stl_folder) / "alt-wall-styles")
-    )
-    sidewall._config.file_prefix = "alt-"
-    sidewall._config.file_suffix = f"{sidewall._config.file_suffix}-drybox"
-    sidewall._config.block_inner_wall_generation = True
-    sidewall.partomate()
-
-
-def partomate_alt_guidewall(
-    bender_config: BenderConfig,
-    wall_style: WallStyle,
-    override_filament_count=None,
-):
-    guidewall = Guidewall(bender_config.guidewall_config)
-
-    guidewall._config.wall_style = wall_style
-    if override_filament_count is not None:
-        guidewall._config.section_count = override_filament_count
-        guidewall._config.stl_folder = str(
-            (
-                Path(guidewall._config.stl_folder)
-                / f"alt-{override_filament_count}-filament-parts"
-            )
+def stl_folder_path(bender_config: BenderConfig) -> Path:
+    """
+    a configuration's stl_folder, which the part generators resolve
+    relative to their own folder rather than the working directory
+    -------
+    arguments:
+        - bender_config: the configuration
+    """
+    return (SOURCE_FOLDER / bender_config.stl_folder).resolve()
+
+
+@dataclass
+class ConfigResult:
+    """
+    the build of a single configuration
+    -------
+    arguments:
+        - config: the configuration built
+        - stl_files: every stl built, read from the part cache or kept
+            from a resumed build
+        - failures: the traceback of every job which failed, by
+            description
+        - printability: the printability of every stl in stl_files
+        - estimates: the print estimate of every exported stl in the
+            configuration's build plan
+        - kit: the print estimate of a complete kit
+    """
+
+    config: BenderConfig
+    stl_files: list[Path] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)
+    printability: list[PrintabilityReport] = field(default_factory=list)
+    estimates: list[PartEstimate] = field(default_factory=list)
+    kit: Optional[KitEstimate] = None
+
+
+@dataclass
+class BuildResult:
+    """
+    the outcome of a build
+    -------
+    arguments:
+        - configs: the result of each configuration, by the name of its
+            stl_folder
+        - finished: every job built, with its duration and peak memory
+        - cached: the number of jobs read from the part cache
+        - shared: the number of jobs copied from an identical job of
+            another configuration
+        - seconds: how long the build took
+    """
+
+    configs: dict[str, ConfigResult]
+    finished: list[FinishedJob]
+    cached: int
+    shared: int
+    seconds: float
+
+    @property
+    def failures(self) -> dict[str, dict[str, str]]:
+        """the tracebacks of the failed jobs of each configuration"""
+        return {
+            name: result.failures
+            for name, result in self.configs.items()
+            if result.failures
+        }
+
+    def meshes(self) -> dict[Path, np.ndarray]:
+        """
+        the (n, 3, 3) triangles of every stl built, by path, read back
+        from the stl files: parts are built in worker processes (or read
+        from the cache), so a build returns files rather than compiled
+        build123d parts; use BuildJob.build to compile one in process
+        """
+        return {
+            path: read_stl(path)
+            for result in self.configs.values()
+            for path in result.stl_files
+        }
+
+
+class Builder:
+    """
+    builds BenderConfigs; a long lived Builder reuses its cost model, its
+    part cache and the build stages snapshotted in its process
+    -------
+    arguments:
+        - history_path: the durations of previous builds, used to
+            schedule the longest parts first; None keeps them in memory
+        - cache_folder: the local part cache, None to build every part
+        - cache_size: the size of the local part cache (MiB)
+        - remote_cache: the url of a shared part cache server, read
+            through the local cache
+        - log: called with each line of progress; None builds silently
+        - events: called with a BuildEvent as each job is queued,
+            started, finished, failed or read from the cache (see
+            build_events.py)
+    """
+
+    def __init__(
+        self,
+        history_path: Optional[Path] = None,
+        cache_folder: Optional[Path] = None,
+        cache_size: float = 2048,
+        remote_cache: Optional[str] = None,
+        log: Optional[Callable[[str], None]] = None,
+        events: Optional[Callable[[BuildEvent], None]] = None,
+    ):
+        self.log = log or (lambda text: None)
+        self.history_path = history_path and Path(history_path)
+        self.cost_model = (
+            CostModel.load(self.history_path)
+            if self.history_path
+            else CostModel()
         )
-        guidewall._config.file_suffix = f"-{override_filament_count}-filament"
-    guidewall._config.file_prefix = "alt-"
-    guidewall._config.stl_folder = str(
-        (Path(guidewall._config.stl_folder) / "alt-wall-styles")
-    )
-    guidewall._config.file_suffix = (
-        f"{guidewall._config.file_suffix}-{wall_style.name.lower()}"
-    )
-    guidewall.partomate()
-
-
-def build_wheel(bender_config: BenderConfig):
-    wheel = FilamentWheel(
-        bender_config.wheel, stl_folder=bender_config.stl_folder
-    )
-    wheel.partomate()
-    wheel._config.bearing.print_in_place = (
-        not wheel._config.bearing.print_in_place
-    )
-    description = (
-        "print-in-place-bearing"
-        if wheel._config.bearing.print_in_place
-        else "empty-bearing"
-    )
-    wheel._config.stl_folder = str(
-        (Path(wheel._config.stl_folder) / f"alt-wheel-{description}")
-    )
-    wheel._config.file_prefix = "alt-"
-    wheel._config.file_suffix = f"-{description}"
-    wheel.partomate()
-
-
-start_time = time()
-
-if not ocp_responding():
-    print("OCP_VSCODE port not open, exiting")
-    exit()
-    # need to work out how to get ocp_vscode standalone running on the gitlab runner
-    # cfg = {}
-    # cfg["host"] = '127.0.0.1'
-    # cfg["port"] = 3939
-    # Viewer(cfg).start()
-
-
-parser = ArgumentParser(description="Build part stls")
-parser.add_argument(
-    "--config",
-    type=str,
-    help="The configuration file to run.",
-    default="release",
-)
-args = parser.parse_args()
-
-build_configs_dir = (Path(__file__).parent / "../build-configs").resolve()
-# Get the list of configuration files
-conf_files = [
-    conf_file.resolve() for conf_file in build_configs_dir.glob("*.conf")
-]
-
-# Filter the configuration files based on the provided stem
-if args.config:
-    conf_files = [
-        conf_file
-        for conf_file in conf_files
-        if (
-            (conf_file.name.lower() == args.config.lower())
-            | (conf_file.name.lower() == f"{args.config.lower()}.conf")
+        self.part_cache = None
+        if cache_folder is not None:
+            self.part_cache = PartCache(
+                DirectoryStore(cache_folder, int(cache_size * 2**20)),
+                (
+                    HttpStore(remote_cache, log=self.log)
+                    if remote_cache
+                    else None
+                ),
+            )
+        self.events = events or (lambda event: None)
+
+    def build(
+        self,
+        config: Union[BenderConfig, Iterable[BenderConfig]],
+        targets: Optional[list[str]] = None,
+        out: Optional[Path] = None,
+        jobs: int = 1,
+        max_jobs_per_worker: Optional[int] = None,
+        memory_limit: Optional[float] = None,
+        resume: bool = False,
+        glb: bool = False,
+        documentation: bool = False,
+    ) -> BuildResult:
+        """
+        builds the parts of one or more configurations together, building
+        parts shared between them once
+        -------
+        arguments:
+            - config: the configuration, or configurations, to build
+            - targets: only build the parts matching these patterns (see
+                build_plan.select_jobs), None to build every part
+            - out: the folder to write the stls to instead of the
+                configuration's stl_folder; only for a single configuration
+            - jobs: the number of parts to build at once in separate
+                processes
+            - max_jobs_per_worker: replace each worker process after it
+                has built this many parts
+            - memory_limit: replace a worker process once it uses more
+                than this many MiB
+            - resume: skip the parts an interrupted build already finished
+            - glb: also export a glb model beside each stl
+            - documentation: also render the assembly documentation images,
+                once, from the release configuration if it is built
+        """
+        start_time = time()
+        progress = BuildProgress(self.events, jobs)
+        configs = (
+            [config] if isinstance(config, BenderConfig) else list(config)
         )
-    ]
-
-
-def build_hanger_set(
-    bender_config: BenderConfig, override_filament_count=None
-):
-    hanger_bender_config = deepcopy(bender_config)
-    if override_filament_count is not None:
-        hanger_bender_config.filament_count = override_filament_count
-    hanging_bracket_config = hanger_bender_config.hanging_bracket_config
+        if out is not None:
+            if len(configs) != 1:
+                raise ValueError("out is only valid for one configuration")
+            # the caller's configuration is left unchanged
+            configs = [snapshot(configs[0]).thaw()]
+            configs[0].stl_folder = str(Path(out).resolve())
+        results = {}
+        for bender_config in configs:
+            check_config(bender_config)
+            if bender_config.stl_folder == "NONE":
+                continue
+            name = stl_folder_path(bender_config).name
+            if name in results:
+                raise ValueError(f"two configurations build into {name}")
+            results[name] = ConfigResult(bender_config)
+
+        # the journal of each configuration, and the configurations each
+        # job which hasn't been built belongs to
+        journals = {}
+        job_configs = {}
+        # the targets which no configuration's parts match
+        unmatched_targets = set(targets or [])
+        for name, result in results.items():
+            bender_config = result.config
+            # a targeted build keeps the journal entries of the parts it
+            # skips
+            journals[name] = BuildJournal(
+                stl_folder_path(bender_config) / BUILD_JOURNAL,
+                resume or bool(targets),
+            )
+            plan = build_plan(bender_config)
+            if targets:
+                plan, unmatched = select_jobs(
+                    plan, targets, bender_config.stl_folder
+                )
+                unmatched_targets.intersection_update(unmatched)
+            for job in plan:
+                if resume and journals[name].completed(job):
+                    result.stl_files.extend(job.output_files())
+                else:
+                    job_configs.setdefault(job, []).append(name)
+            if resume:
+                self.log(
+                    f"\t\t resuming {name}, "
+                    f"{len(result.stl_files)} stls already built"
+                )
+        if unmatched_targets:
+            raise ValueError(
+                "no part matches target "
+                f"{', '.join(sorted(unmatched_targets))}"
+            )
 
-    if override_filament_count is not None:
-        hanging_bracket_config.stl_folder = str(
-            Path(bender_config.stl_folder)
-            / f"alt-{override_filament_count}-filament-parts"
-        )
-        hanging_bracket_config.file_prefix = "alt-"
-        hanging_bracket_config.file_suffix = (
-            f"-{override_filament_count}-filament"
+        self.log(headline(f"Generating parts for {', '.join(results)}"))
+        # parts with identical geometry in several configurations are
+        # built once and copied to the others' stl folders
+        pooled_jobs = pool_jobs(job_configs)
+
+        def record_job(job, outputs, error=None):
+            """
+            records a built (or failed) job in the journal of every
+            configuration building its geometry, copying its files to
+            their stl folders
+            """
+            for shared_job in pooled_jobs[job]:
+                if error is None:
+                    outputs = share_outputs(job, shared_job, glb)
+                for name in job_configs[shared_job]:
+                    journals[name].record(shared_job, outputs, error)
+                    if error is None:
+                        results[name].stl_files.extend(outputs)
+
+        # parts built before, here or by any machine sharing the remote
+        # cache
+        scheduled = []
+        for job in pooled_jobs:
+            cached = None
+            if self.part_cache:
+                cached = self.part_cache.fetch(job, glb)
+            if cached is None:
+                scheduled.append(job)
+            else:
+                record_job(job, cached)
+                progress.cached(job, cached)
+        if self.part_cache:
+            self.log(
+                f"\t\t {len(pooled_jobs) - len(scheduled)} parts cached"
+            )
+        predictions = [self.cost_model.predict(job) for job in scheduled]
+        for job, predicted in zip(scheduled, predictions):
+            progress.queued(job, predicted)
+        self.log(
+            headline(
+                f"\t scheduling {len(scheduled)} jobs on {jobs} workers, "
+                f"about {longest_first(predictions, jobs)[1]:.0f} seconds "
+                f"(at least {makespan_bound(predictions, jobs):.0f}), "
+                f"{len(job_configs) - len(pooled_jobs)} shared between "
+                "configurations"
+            )
         )
 
-    HangingBracket(hanging_bracket_config).partomate()
-
-    if bender_config.skip_alt_file_generation:
-        return
-
-    tool_config = deepcopy(hanging_bracket_config)
-    tool_config.bracket_style = HangingBracketStyle.SURFACE_TOOL
-    tool_config.stl_folder = str((Path(tool_config.stl_folder) / "tools"))
-    HangingBracket(tool_config).partomate()
-
-    if hanging_bracket_config.bracket_style == HangingBracketStyle.WALL_MOUNT:
-        surface_config = deepcopy(hanging_bracket_config)
-        surface_config.bracket_style = HangingBracketStyle.SURFACE_MOUNT
-        surface_config.stl_folder = str(
-            (Path(hanging_bracket_config.stl_folder) / "alt-frame-hangers")
-        )
-        surface_config.file_prefix = "alt-"
-        surface_config.heatsink_desk_nut = False
-        surface_config.file_suffix = (
-            f"{hanging_bracket_config.file_suffix}-surface-mount-m4-nut"
+        # workers share the build stages they snapshot through shared
+        # memory; a build in this process reuses its snapshots directly
+        in_process = (
+            jobs == 1 and max_jobs_per_worker is None and memory_limit is None
         )
-        HangingBracket(surface_config).partomate()
-        surface_config.heatsink_desk_nut = True
-        surface_config.file_suffix = (
-            f"{hanging_bracket_config.file_suffix}-surface-mount-m4-heatsink"
+        shape_store = None if in_process else ShapeStore.temporary()
+        task = partial(
+            build_task,
+            glb=glb,
+            shapes=str(shape_store.path) if shape_store else None,
         )
-        HangingBracket(surface_config).partomate()
-    else:
-        wall_config = deepcopy(hanging_bracket_config)
-        wall_config.bracket_style = HangingBracketStyle.WALL_MOUNT
-        wall_config.stl_folder = str(
-            (Path(hanging_bracket_config.stl_folder) / "alt-frame-hangers")
-        )
-        wall_config.file_prefix = "alt-"
-        wall_config.file_suffix = (
-            f"{hanging_bracket_config.file_suffix}-wall-mount"
-        )
-        HangingBracket(wall_config).partomate()
-
-        surface_config = deepcopy(hanging_bracket_config)
-        surface_config.heatsink_desk_nut = not surface_config.heatsink_desk_nut
-        surface_config.stl_folder = str(
-            (Path(hanging_bracket_config.stl_folder) / "alt-frame-hangers")
+        try:
+            finished_jobs, failed_jobs = [], []
+            for finished in run_jobs(
+                scheduled,
+                task,
+                self.cost_model,
+                jobs,
+                max_jobs_per_worker,
+                memory_limit,
+                progress.started,
+            ):
+                progress.finished(finished)
+                job = finished.job
+                if finished.error is not None:
+                    self.log(f"\t\t {job.group} {job.description} failed")
+                    failed_jobs.append(job)
+                    continue
+                self.log(
+                    f"\t\t generated {job.group} {job.description} "
+                    f"in {finished.seconds:.2f} seconds, "
+                    f"peak memory {finished.peak_memory:.0f} MiB"
+                )
+                finished_jobs.append(finished)
+                if self.part_cache:
+                    self.part_cache.store(job, glb)
+                record_job(job, finished.result)
+                self._save_history()
+
+            # a failure may only have been caused by the jobs it shared a
+            # worker with, so each failed job is retried once in a process of
+            # its own
+            for job in failed_jobs:
+                self.log(
+                    f"\t\t retrying {job.group} {job.description} on its own"
+                )
+                progress.started(job, None, attempt=2)
+                finished = run_isolated(job, task)
+                progress.finished(finished, attempt=2)
+                finished_jobs.append(finished)
+                record_job(job, finished.result or [], finished.error)
+                if finished.error is None:
+                    if self.part_cache:
+                        self.part_cache.store(job, glb)
+                    self.cost_model.record(job, finished.seconds)
+                    self._save_history()
+        finally:
+            if shape_store:
+                shape_store.close()
+        progress.complete()
+
+        self.log(
+            headline(f"parts built in {(time() - start_time):.2f} seconds")
         )
-        surface_config.file_prefix = "alt-"
-        surface_config.file_suffix = f"{hanging_bracket_config.file_suffix}-surface-mount-{"-m4-nut"
-            if surface_config.heatsink_desk_nut
-            else "-m4-heatsink"}"
-
-        HangingBracket(surface_config).partomate()
-
-
-def build_hangers(bender_config):
-    print(headline(f"\t generating hangers"))
-    print(f"\t\t generating default hanger")
-    build_hanger_set(bender_config)
 
-    if bender_config.skip_alt_file_generation:
-        return
-
-    for count in bender_config.alternate_filament_counts:
-        print(
-            f"\t\t generating hanger for {count} filament{"s" if count > 1 else ""}"
+        for name, result in results.items():
+            self._check(name, result, journals[name], bool(targets))
+        if documentation and results:
+            self._document(
+                results.get(DOCUMENTATION_CONFIG)
+                or next(iter(results.values()))
+            )
+        return BuildResult(
+            configs=results,
+            finished=finished_jobs,
+            cached=len(pooled_jobs) - len(scheduled),
+            shared=len(job_configs) - len(pooled_jobs),
+            seconds=time() - start_time,
         )
 
-        build_hanger_set(bender_config, override_filament_count=count)
-
-
-def build_alt_style_frame_set(
-    frame_config: FrameConfig, frame_style=FrameStyle
-):
-    alt_frame_config = deepcopy(frame_config)
-    alt_frame_config.frame_style = frame_style
-    alt_frame_config.stl_folder = str(
-        (Path(alt_frame_config.stl_folder) / "alt-frame-styles")
-    )
-    alt_frame_config.file_prefix = "alt-"
-    alt_frame_config.file_suffix = (
-        f"{alt_frame_config.file_suffix}-{frame_style.name.lower()}"
-    )
-    if (FrameStyle.HANGING in frame_style) != (
-        FrameStyle.HANGING in frame_config.frame_style
+    def _save_history(self):
+        """writes the job durations to the history file, if there is one"""
+        if self.history_path:
+            self.cost_model.save(self.history_path)
+
+    def _check(
+        self,
+        name: str,
+        result: ConfigResult,
+        journal: BuildJournal,
+        targeted: bool = False,
     ):
-        TopFrame(alt_frame_config).partomate()
-        ConnectorFrame(alt_frame_config).partomate()
-    BottomFrame(alt_frame_config).partomate()
-
-    if frame_style != FrameStyle.HANGING:
-        dryflip_frame_config = deepcopy(alt_frame_config)
-        dryflip_frame_config.drybox = not dryflip_frame_config.drybox
-        dryflip_frame_config.file_suffix = f"{dryflip_frame_config.file_suffix}-{"not-" if not dryflip_frame_config.drybox else ""}drybox"
-        BottomFrame(dryflip_frame_config).partomate()
-
-
-def build_frame_set(bender_config: BenderConfig, override_filament_count=None):
-    original_filament_count = bender_config.filament_count
-
-    if override_filament_count is not None:
-        bender_config.filament_count = override_filament_count
-    frame_config = bender_config.frame_config
-
-    lockpin_config = bender_config.lock_pin_config
-    count_name_str = ""
-    if override_filament_count is not None:
-        count_name_str = f"{override_filament_count}-filament"
-
-        frame_config.stl_folder = str(
-            (Path(frame_config.stl_folder) / f"alt-{count_name_str}-parts")
-        )
-        frame_config.file_prefix = "alt-"
-        frame_config.file_suffix = f"-{count_name_str}"
-        lockpin_config.stl_folder = str(
-            (Path(lockpin_config.stl_folder) / f"alt-{count_name_str}-parts")
-        )
-        lockpin_config.file_prefix = "alt-"
-        lockpin_config.file_suffix = f"-{count_name_str}"
-
-    TopFrame(frame_config).partomate()
-    ConnectorFrame(frame_config).partomate()
-    BottomFrame(frame_config).partomate()
-    LockPin(lockpin_config).partomate()
-
-    if not bender_config.skip_alt_file_generation:
-        if FrameStyle.HANGING in frame_config.frame_style:
-            build_alt_style_frame_set(frame_config, FrameStyle.STANDING)
-        if frame_config.frame_style == FrameStyle.STANDING:
-            build_alt_style_frame_set(frame_config, FrameStyle.HANGING)
-        if frame_config.frame_style != FrameStyle.HYBRID:
-            build_alt_style_frame_set(frame_config, FrameStyle.HYBRID)
-    bender_config.filament_count = original_filament_count
-    return
-
-
-def build_frames(bender_config: BenderConfig):
-    print(headline(f"\t generating frames"))
-    print(f"\t\t generating default frame")
-    build_frame_set(bender_config)
-    for count in bender_config.alternate_filament_counts:
-        print(
-            f"\t\t generating frame for {count} filament{"s" if count > 1 else ""}"
-        )
-        build_frame_set(bender_config, override_filament_count=count)
-
-
-def build_brackets(bender_config: BenderConfig):
-    print(f"\t generating filament brackets")
-    for direction_index, direction in enumerate(ChannelPairDirection):
-        if (
-            direction != bender_config.bracket_direction
-            and bender_config.skip_alt_file_generation
-        ):
-            continue
-        print(f"\t generating brackets for {direction.name}")
-        for connector_index, connector in enumerate(bender_config.connectors):
-            print(f"\t\t generating bracket with {connector.name}")
-            bracket = FilamentBracket(
-                bender_config.filament_bracket_config(connector_index)
-            )
-            bracket._config.channel_pair_direction = direction
-            if direction != bender_config.bracket_direction:
-                bracket._config.stl_folder = str(
-                    Path(bracket._config.stl_folder)
-                    / f"alt-brackets-{nice_direction_name(direction)}"
-                )
-                bracket._config.file_prefix = "alt-"
-                bracket._config.file_suffix = f"{bracket._config.file_suffix}-{nice_direction_name(direction)}"
-                bracket._config.block_pin_generation = True
-            if connector_index > 0:
-                bracket._config.block_pin_generation = True
-                bracket._config.stl_folder = str(
-                    Path(bracket._config.stl_folder)
-                    / f"alt-brackets-{nice_direction_name(direction)}-alternate-connectors"
-                )
-                bracket._config.file_prefix = "alt-"
-                bracket._config.file_suffix = f"{bracket._config.file_suffix}{dash_prefix(connector.file_suffix)}"
-            bracket.partomate()
-
-
-def build_guidewall_set(
-    bender_config: BenderConfig, override_filament_count=None
-):
-    guidewall_config = bender_config.guidewall_config
-    if override_filament_count is not None:
-        guidewall_config.section_count = override_filament_count
-
-    if override_filament_count is not None:
-        guidewall_config.stl_folder = str(
-            (
-                Path(guidewall_config.stl_folder)
-                / f"alt-{override_filament_count}-filament-parts"
+        """
+        checks the printability of a configuration's stls and estimates
+        their print, writing the reports to its stl_folder; a targeted
+        build only checks the stls it built and updates their entries in
+        the printability report, keeping those of the others
+        """
+        bender_config = result.config
+        folder = stl_folder_path(bender_config)
+        result.failures = journal.failures()
+        self.log(headline(f"Checking parts for {name}"))
+
+        self.log(headline(f"\t checking printability"))
+        result.printability = analyze_files(result.stl_files)
+        for report in result.printability:
+            for problem in report.problems:
+                self.log(f"\t\t {report.name}: {problem}")
+        reports = result.printability
+        if targeted:
+            built = {report.name for report in reports}
+            reports = sorted(
+                [
+                    report
+                    for report in read_report(folder / "printability.json")
+                    if report.name not in built
+                ]
+                + reports,
+                key=lambda report: report.name,
             )
+        write_report(reports, folder / "printability.json")
+        self.log(
+            f"\t\t {len(result.printability)} stls, "
+            f"{sum(report.weight for report in result.printability):.0f} "
+            "g solid"
         )
-        guidewall_config.file_prefix = "alt-"
-        guidewall_config.file_suffix = f"-{override_filament_count}-filament"
-    guidewall = Guidewall(guidewall_config)
-    guidewall.partomate()
-
-    if bender_config.skip_alt_file_generation:
-        return
 
-    if bender_config.wall_style != WallStyle.DRYBOX:
-        partomate_alt_guidewall(
-            bender_config, WallStyle.DRYBOX, override_filament_count
+        self.log(headline(f"\t estimating print time"))
+        result.estimates, _ = estimate_plan(bender_config)
+        result.kit = kit_estimate(result.estimates)
+        write_estimates(
+            result.estimates, result.kit, folder / "print-estimate.json"
         )
-    if bender_config.wall_style != WallStyle.SOLID:
-        partomate_alt_guidewall(
-            bender_config, WallStyle.SOLID, override_filament_count
+        self.log(
+            f"\t\t kit of {result.kit.parts} parts, "
+            f"{result.kit.weight:.0f} g, "
+            f"{hours(result.kit.print_time)} to print"
         )
-    if bender_config.wall_style != WallStyle.HEX:
-        partomate_alt_guidewall(
-            bender_config, WallStyle.HEX, override_filament_count
-        )
-
-
-def build_walls(bender_config: BenderConfig):
-    print(f"\t generating walls")
-    sidewall = Sidewall(bender_config.sidewall_config)
-    sidewall.partomate()
-    build_guidewall_set(bender_config)
-
-    if bender_config.skip_alt_file_generation:
-        return
 
-    if sidewall._config.wall_style == WallStyle.SOLID:
-        sidewall._config.wall_style = WallStyle.HEX
-        sidewall._config.stl_folder = str(
-            (Path(sidewall._config.stl_folder) / "alt-wall-styles")
+    def _document(self, result: ConfigResult):
+        """
+        renders the documentation images from a configuration; every
+        configuration renders to the same docs/assets, so only one does
+        """
+        name = stl_folder_path(result.config).name
+        self.log(headline(f"Rendering documentation images from {name}"))
+        rendered = render_documentation(
+            result.config, SOURCE_FOLDER / "../docs/assets"
         )
-        sidewall._config.file_suffix = f"{sidewall._config.file_suffix}-hex"
-        sidewall.partomate()
-    elif sidewall._config.wall_style == WallStyle.HEX:
-        print(f"\t\t generating alternate solid sidewalls")
-        partomate_alt_solid_sidewalls(bender_config)
-    elif (
-        sidewall._config.wall_style == WallStyle.DRYBOX
-        and sidewall._config.wall_style != WallStyle.SOLID
-    ):
-        print(f"\t\t generating alternate hex sidewalls")
-        partomate_alt_non_dry_sidewalls(bender_config)
-    if sidewall._config.wall_style != WallStyle.HEX:
-        print(f"\t\t generating alternate drybox sidewalls")
-        partomate_alt_dry_sidewalls(bender_config)
-
-    for count in bender_config.alternate_filament_counts:
-        print(
-            f"\t\t generating guidewalls for {count} filament{"s" if count > 1 else ""}"
-        )
-
-        build_guidewall_set(bender_config, override_filament_count=count)
-
-
-if not conf_files:
-    print("No matching configuration file found")
-    exit()
-
-# Run the script for the matching configuration file(s)
-for conf_file in conf_files:
-    bender_config = BenderConfig(conf_file)
-    if bender_config.stl_folder == "NONE":
-        continue
-    print(headline(f"Generating parts for {conf_file.name}"))
+        self.log(f"\t\t rendered {len(rendered)} changed images")
+
+
+def build(
+    config: Union[BenderConfig, Iterable[BenderConfig]],
+    targets: Optional[list[str]] = None,
+    out: Optional[Path] = None,
+    jobs: int = 1,
+    **options,
+) -> BuildResult:
+    """
+    builds the parts of one or more configurations with a new Builder;
+    keep a Builder to reuse its state between builds
+    -------
+    arguments:
+        - config: the configuration, or configurations, to build
+        - targets: only build the parts matching these patterns
+        - out: the folder to write the stls to instead of the
+            configuration's stl_folder
+        - jobs: the number of parts to build at once
+        - **options: the other arguments of Builder.build
+    """
+    return Builder().build(config, targets, out, jobs, **options)
+
+
+def main():
+    start_time = time()
+
+    if not ocp_responding():
+        print("OCP_VSCODE port not open, exiting")
+        exit()
+        # need to work out how to get ocp_vscode standalone running on the gitlab runner
+        # cfg = {}
+        # cfg["host"] = '127.0.0.1'
+        # cfg["port"] = 3939
+        # Viewer(cfg).start()
+
+    parser = ArgumentParser(description="Build part stls")
+    parser.add_argument(
+        "--config",
+        type=str,
+        action="append",
+        help="The configuration file to run; repeat it to build several "
+        "configurations together, or pass all to build every configuration.",
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        action="append",
+        help="Only build the parts matching this pattern, such as "
+        "'brackets/*lean-forward*' or frame-top; repeat it to build several.",
+    )
+    parser.add_argument(
+        "--list-targets",
+        action="store_true",
+        help="List the names each part can be selected by with --target.",
+    )
+    parser.add_argument(
+        "--filament-count",
+        type=int,
+        default=None,
+        help="Override the filament count of the configuration.",
+    )
+    parser.add_argument(
+        "--documentation",
+        action="store_true",
+        help=(
+            "Also render the assembly documentation images, once, from "
+            "the release configuration if it is built."
+        ),
+    )
+    parser.add_argument(
+        "--glb",
+        action="store_true",
+        help=(
+            "Also export a glb model beside each stl, for viewing in a "
+            "browser."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of parts to build at once in separate processes.",
+    )
+    parser.add_argument(
+        "--max-jobs-per-worker",
+        type=int,
+        default=None,
+        help="Replace each worker process after it has built this many parts.",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=None,
+        help="Replace a worker process once it uses more than this many MiB.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Build every part rather than reusing previously built parts.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=2048,
+        help=(
+            "Evict the least recently used cached parts beyond this many "
+            "MiB."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache",
+        type=str,
+        default=None,
+        help="The url of a shared part cache server to read and write parts.",
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        default=None,
+        help="Write a JSON line for each job queued, started, finished, "
+        "failed or cached to this file, or to tcp://host:port.",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show what each worker is building, and the time left.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the parts an interrupted build already finished.",
+    )
+    args = parser.parse_args()
 
-    iteration_start_time = time()
-    build_brackets(bender_config)
-    build_wheel(bender_config)
-    build_walls(bender_config)
-    build_frames(bender_config)
-    build_hangers(bender_config)
+    # Get the list of configuration files
+    conf_files = [
+        conf_file.resolve()
+        for conf_file in sorted(BUILD_CONFIGS.glob("*.conf"))
+    ]
 
-    print(
-        headline(
-            f"{conf_file.stem} configuration built in {(time() - iteration_start_time):.2f} seconds"
-        )
+    # Filter the configuration files based on the provided stems
+    config_names = [name.lower() for name in args.config or ["release"]]
+    if "all" not in config_names:
+        conf_files = [
+            conf_file
+            for conf_file in conf_files
+            if (
+                (conf_file.name.lower() in config_names)
+                | (conf_file.stem.lower() in config_names)
+            )
+        ]
+
+    if not conf_files:
+        print("No matching configuration file found")
+        exit()
+
+    bender_configs = {
+        conf_file: BenderConfig(conf_file) for conf_file in conf_files
+    }
+    if args.filament_count is not None:
+        for bender_config in bender_configs.values():
+            bender_config.filament_count = args.filament_count
+
+    if args.list_targets:
+        for conf_file, bender_config in bender_configs.items():
+            print(headline(f"Targets in {conf_file.name}"))
+            for job in build_plan(bender_config):
+                names = target_names(job, bender_config.stl_folder)
+                stems = [
+                    Path(path).stem
+                    for path in job.relative_output_files(
+                        bender_config.stl_folder
+                    )
+                ]
+                print(f"\t{job.group}/{names[0]}: {', '.join(stems)}")
+        exit()
+
+    # check every configuration before any geometry is generated
+    invalid_configuration = False
+    for conf_file, bender_config in bender_configs.items():
+        violations = validate_config(bender_config)
+        if violations:
+            invalid_configuration = True
+            print(headline(f"{conf_file.name} failed validation"))
+            for violation in violations:
+                print(f"\t{violation}")
+    if invalid_configuration:
+        exit(1)
+
+    listeners = []
+    log = print
+    if args.events:
+        listeners.append(EventWriter(args.events))
+    if args.progress:
+        progress_view = ProgressView().refresh()
+        listeners.append(progress_view)
+        log = progress_view.write
+    builder = Builder(
+        history_path=SOURCE_FOLDER / BUILD_HISTORY,
+        cache_folder=None if args.no_cache else SOURCE_FOLDER / PART_CACHE,
+        cache_size=args.cache_size,
+        remote_cache=args.remote_cache,
+        log=log,
+        events=lambda event: [listener(event) for listener in listeners],
     )
-
-    # TODO --need to get documentation generation sorted
-    # loader = SourceFileLoader("__main__", "assembly_documentation.py")
-    # loader.exec_module(module_from_spec(spec_from_loader(loader.name, loader)))
-print()
-print(headline(f"Build Complete in {(time() - start_time):.2f} seconds"))
+    try:
+        result = builder.build(
+            bender_configs.values(),
+            args.target,
+            jobs=args.jobs,
+            max_jobs_per_worker=args.max_jobs_per_worker,
+            memory_limit=args.memory_limit,
+            resume=args.resume,
+            glb=args.glb,
+            documentation=args.documentation,
+        )
+    except ValueError as error:
+        print(error)
+        exit(1)
+    finally:
+        for listener in listeners:
+            listener.close()
+    print()
+    for name, failures in result.failures.items():
+        for description, failure in failures.items():
+            print(headline(f"{name}: {description} failed"))
+            print(failure)
+    print(headline(f"Build Complete in {(time() - start_time):.2f} seconds"))
+    if result.failures:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
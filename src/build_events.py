@@ -0,0 +1,511 @@
+"""
+a structured stream of build progress events, and a live view of it
+
+a Builder given an `events` callable calls it with a BuildEvent as each
+job is queued, started, finished, failed or read from the part cache, and
+once more when the build is complete. Every event carries the wall clock
+time, the seconds since the build started, the job's group and
+description, the worker running it, its duration (predicted until it
+finishes), the size of every file it wrote and the estimated seconds
+until the build is finished, so CI can chart throughput and spot a job
+running far past its prediction.
+
+`EventWriter` writes the events as JSON lines to a file, or to a tcp
+socket given as tcp://host:port, and `ProgressView` draws a live view of
+every worker from the same events:
+
+    python build.py --events build-events.jsonl
+    python build_events.py build-events.jsonl
+    python build_events.py --listen 8766 &
+    python build.py --events tcp://127.0.0.1:8766
+"""
+
+import socket
+import sys
+from dataclasses import asdict, dataclass, field
+from json import dumps, loads
+from pathlib import Path
+from threading import Event, Lock, Thread
+from time import sleep, time
+from typing import Callable, Optional, TextIO
+
+from build_scheduler import FinishedJob, longest_first
+
+# the kinds of event, in the order a job sees them
+QUEUED = "queued"
+STARTED = "started"
+FINISHED = "finished"
+FAILED = "failed"
+CACHED = "cached"
+# the last event of every build
+COMPLETE = "complete"
+
+
+@dataclass
+class BuildEvent:
+    """
+    something which happened to a job during a build
+    -------
+    arguments:
+        - event: queued, started, finished, failed, cached or complete
+        - time: the wall clock time of the event (seconds since the epoch)
+        - elapsed: the seconds since the build started
+        - group: the job's group, empty for the complete event
+        - description: the job's description, empty for the complete event
+        - worker: the worker running the job, None when it runs in a
+            process of its own (a retried job) or isn't running
+        - seconds: how long the job took once finished or failed, its
+            predicted duration before that
+        - outputs: the size in bytes of every file the job wrote, by path
+        - eta: the estimated seconds until every job is finished
+        - attempt: 1, or 2 for a failed job's retry
+        - error: the traceback of a failed job
+    """
+
+    event: str
+    time: float
+    elapsed: float
+    group: str = ""
+    description: str = ""
+    worker: Optional[int] = None
+    seconds: Optional[float] = None
+    outputs: dict[str, int] = field(default_factory=dict)
+    eta: Optional[float] = None
+    attempt: int = 1
+    error: Optional[str] = None
+
+    def to_json(self) -> str:
+        """the event as a single line of JSON"""
+        return dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, line: str) -> "BuildEvent":
+        """
+        reads an event written by to_json
+        -------
+        arguments:
+            - line: the JSON
+        """
+        return cls(**loads(line))
+
+    @property
+    def name(self) -> str:
+        """the job's group and description"""
+        return f"{self.group} {self.description}".strip()
+
+
+def output_sizes(paths: list[Path]) -> dict[str, int]:
+    """the size of each of a job's files which exists, by path"""
+    return {
+        str(path): Path(path).stat().st_size
+        for path in paths
+        if Path(path).exists()
+    }
+
+
+class BuildProgress:
+    """
+    turns what happens to a build's jobs into BuildEvents, estimating how
+    long the rest of the build will take from the predicted durations of
+    the jobs not yet finished
+    -------
+    arguments:
+        - emit: called with each event
+        - workers: the number of jobs built at once
+    """
+
+    def __init__(self, emit: Callable[[BuildEvent], None], workers: int):
+        self.emit = emit
+        self.workers = workers
+        self.start_time = time()
+        # the predicted duration of each job not yet finished, and the
+        # time each running job started
+        self._predicted = {}
+        self._started = {}
+
+    def eta(self) -> float:
+        """the estimated seconds until every job is finished"""
+        now = time()
+        remaining = [
+            max(seconds - (now - self._started[job]), 0)
+            if job in self._started
+            else seconds
+            for job, seconds in self._predicted.items()
+        ]
+        return longest_first(remaining, self.workers)[1]
+
+    def _emit(self, event: str, job=None, **values):
+        now = time()
+        if job is not None:
+            values.update(group=job.group, description=job.description)
+        self.emit(
+            BuildEvent(
+                event,
+                now,
+                now - self.start_time,
+                eta=self.eta(),
+                **values,
+            )
+        )
+
+    def queued(self, job, predicted: float):
+        """
+        a job was scheduled
+        -------
+        arguments:
+            - job: the job
+            - predicted: its predicted duration in seconds
+        """
+        self._predicted[job] = predicted
+        self._emit(QUEUED, job, seconds=predicted)
+
+    def cached(self, job, outputs: list[Path]):
+        """
+        a job's files were read from the part cache
+        -------
+        arguments:
+            - job: the job
+            - outputs: the files written
+        """
+        self._emit(CACHED, job, seconds=0.0, outputs=output_sizes(outputs))
+
+    def started(self, job, worker: Optional[int], attempt: int = 1):
+        """
+        a worker started a job
+        -------
+        arguments:
+            - job: the job
+            - worker: the worker's number, None for a process of its own
+            - attempt: 1, or 2 for a failed job's retry
+        """
+        self._started[job] = time()
+        self._emit(
+            STARTED,
+            job,
+            worker=worker,
+            seconds=self._predicted.get(job),
+            attempt=attempt,
+        )
+
+    def finished(self, finished: FinishedJob, attempt: int = 1):
+        """
+        a job finished, or failed
+        -------
+        arguments:
+            - finished: the job and its outcome
+            - attempt: 1, or 2 for a failed job's retry
+        """
+        job = finished.job
+        self._started.pop(job, None)
+        if finished.error is None or attempt > 1:
+            self._predicted.pop(job, None)
+        if finished.error is None:
+            self._emit(
+                FINISHED,
+                job,
+                worker=finished.worker,
+                seconds=finished.seconds,
+                outputs=output_sizes(finished.result or []),
+                attempt=attempt,
+            )
+        else:
+            self._emit(
+                FAILED,
+                job,
+                worker=finished.worker,
+                seconds=finished.seconds,
+                attempt=attempt,
+                error=finished.error,
+            )
+
+    def complete(self):
+        """every job has finished"""
+        self._predicted.clear()
+        self._started.clear()
+        self._emit(COMPLETE, seconds=time() - self.start_time)
+
+
+class EventWriter:
+    """
+    writes events as JSON lines to a file, replacing any earlier build's
+    events, or to a tcp socket; a socket which closes stops the writing
+    rather than the build
+    -------
+    arguments:
+        - target: the file, or tcp://host:port
+    """
+
+    def __init__(self, target: str):
+        self.target = str(target)
+        self.available = True
+        self._socket = None
+        if self.target.startswith("tcp://"):
+            host, port = self.target[len("tcp://") :].rsplit(":", 1)
+            self._socket = socket.create_connection((host, int(port)))
+            self._file = self._socket.makefile("w", encoding="utf-8")
+        else:
+            self._file = open(self.target, "w", encoding="utf-8")
+
+    def __call__(self, event: BuildEvent):
+        if not self.available:
+            return
+        try:
+            self._file.write(f"{event.to_json()}\n")
+            # flushed line by line so a dashboard tailing the stream (or a
+            # killed build) loses nothing
+            self._file.flush()
+        except OSError:
+            self.available = False
+
+    def close(self):
+        """closes the file or socket"""
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        if self._socket is not None:
+            self._socket.close()
+
+    def __enter__(self) -> "EventWriter":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def duration(seconds: float) -> str:
+    """a short duration, such as 45s, 5m20s or 1h02m"""
+    seconds = max(round(seconds), 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class ProgressView:
+    """
+    a live view of a build: the job each worker is running and for how
+    long against its prediction, the jobs finished, cached and failed,
+    and the estimated time left. On a terminal it is redrawn in place
+    (see refresh); otherwise a line is written as each job ends.
+    -------
+    arguments:
+        - stream: where to draw the view
+        - width: the widest line drawn
+    """
+
+    def __init__(self, stream: TextIO = sys.stdout, width: int = 79):
+        self.stream = stream
+        self.width = width
+        self.live = stream.isatty()
+        self.counts = {
+            kind: 0 for kind in (QUEUED, FINISHED, FAILED, CACHED)
+        }
+        # worker -> its started event
+        self.running = {}
+        self.last: Optional[BuildEvent] = None
+        self._drawn = 0
+        self._lock = Lock()
+        self._stop = Event()
+
+    def __call__(self, event: BuildEvent):
+        with self._lock:
+            self.update(event)
+            if self.live:
+                self._draw()
+                if event.event == COMPLETE:
+                    # the final summary stays above whatever follows it
+                    self._drawn = 0
+                    self._stop.set()
+            elif event.event in (FINISHED, FAILED, COMPLETE):
+                self.stream.write(f"{self.summary()}\n")
+                self.stream.flush()
+
+    def write(self, text: str):
+        """
+        writes a line of text above the view
+        -------
+        arguments:
+            - text: the text
+        """
+        with self._lock:
+            self._clear()
+            self.stream.write(f"{text}\n")
+            if self.live and self.running:
+                self._draw()
+            self.stream.flush()
+
+    def update(self, event: BuildEvent):
+        """
+        applies an event to the view without drawing it
+        -------
+        arguments:
+            - event: the event
+        """
+        self.last = event
+        if event.event in self.counts:
+            self.counts[event.event] += 1
+        if event.event == STARTED:
+            self.running[event.worker] = event
+        elif event.event in (FINISHED, FAILED):
+            started = self.running.get(event.worker)
+            if started is not None and started.name == event.name:
+                del self.running[event.worker]
+        elif event.event == COMPLETE:
+            self.running.clear()
+
+    def summary(self) -> str:
+        """the counts of jobs and the estimated time left"""
+        event = self.last
+        done = self.counts[FINISHED] + self.counts[CACHED]
+        total = self.counts[QUEUED] + self.counts[CACHED]
+        text = (
+            f"{done}/{total} parts, {self.counts[CACHED]} cached, "
+            f"{self.counts[FAILED]} failed"
+        )
+        if event is None:
+            return text
+        if event.event == COMPLETE:
+            return f"{text}, complete in {duration(event.elapsed)}"
+        text = f"{text}, {duration(event.elapsed)} elapsed"
+        if event.event in (FINISHED, FAILED) and not self.live:
+            text = f"{text}, {event.event} {event.name}"
+        if event.eta is None:
+            return text
+        eta = max(event.eta - (time() - event.time), 0)
+        return f"{text}, about {duration(eta)} left"
+
+    def lines(self) -> list[str]:
+        """the lines of the view"""
+        now = time()
+        lines = [self.summary()]
+        for worker in sorted(self.running, key=lambda w: (w is None, w)):
+            event = self.running[worker]
+            label = "retry" if worker is None else f"worker {worker}"
+            timing = duration(now - event.time)
+            if event.seconds is not None:
+                timing = f"{timing} of ~{duration(event.seconds)}"
+            name = event.name[: self.width - len(label) - len(timing) - 6]
+            lines.append(f"  {label:<9} {name}  {timing}")
+        return [line[: self.width] for line in lines]
+
+    def _clear(self):
+        # move up over the view drawn last and clear it
+        if self._drawn:
+            self.stream.write(f"\x1b[{self._drawn}F\x1b[J")
+            self._drawn = 0
+
+    def _draw(self):
+        lines = self.lines()
+        self._clear()
+        self.stream.write("".join(f"{line}\n" for line in lines))
+        self.stream.flush()
+        self._drawn = len(lines)
+
+    def refresh(self, interval: float = 1.0) -> "ProgressView":
+        """
+        redraws the view every interval seconds, so the running times
+        advance between events, until closed; a no-op off a terminal
+        -------
+        arguments:
+            - interval: the seconds between redraws
+        """
+        if self.live:
+
+            def redraw():
+                while not self._stop.wait(interval):
+                    with self._lock:
+                        self._draw()
+
+            self._thread = Thread(target=redraw, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """stops redrawing"""
+        self._stop.set()
+
+    def __enter__(self) -> "ProgressView":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def follow(path: Path, view: ProgressView, interval: float = 0.5):
+    """
+    shows the events appended to a file until the build is complete
+    -------
+    arguments:
+        - path: the JSON lines file
+        - view: the view to show them in
+        - interval: the seconds between checks for new events
+    """
+    while not Path(path).exists():
+        sleep(interval)
+    with open(path, encoding="utf-8") as events:
+        # a partly written line is read again once it is complete
+        buffered = ""
+        while True:
+            line = events.readline()
+            if not line.endswith("\n"):
+                buffered += line
+                sleep(interval)
+                continue
+            event = BuildEvent.from_json(buffered + line)
+            buffered = ""
+            view(event)
+            if event.event == COMPLETE:
+                return
+
+
+def listen(port: int, view: ProgressView, host: str = "127.0.0.1"):
+    """
+    shows the events of a build writing to tcp://host:port until the
+    build is complete
+    -------
+    arguments:
+        - port: the port to listen on
+        - view: the view to show them in
+        - host: the address to listen on
+    """
+    with socket.create_server((host, port)) as server:
+        connection, _ = server.accept()
+        with connection, connection.makefile(encoding="utf-8") as events:
+            for line in events:
+                event = BuildEvent.from_json(line)
+                view(event)
+                if event.event == COMPLETE:
+                    return
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Show the progress of a build")
+    parser.add_argument(
+        "events",
+        type=Path,
+        nargs="?",
+        help="the JSON lines file a build writes with --events",
+    )
+    parser.add_argument(
+        "--listen",
+        type=int,
+        default=None,
+        help="receive the events on this port, from a build run with "
+        "--events tcp://127.0.0.1:PORT",
+    )
+    args = parser.parse_args()
+    if (args.events is None) == (args.listen is None):
+        parser.error("give either an events file or --listen")
+
+    with ProgressView().refresh() as progress_view:
+        try:
+            if args.listen is not None:
+                listen(args.listen, progress_view)
+            else:
+                follow(args.events, progress_view)
+        except KeyboardInterrupt:
+            pass
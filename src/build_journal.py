@@ -0,0 +1,125 @@
+"""
+a crash-safe record of the build jobs which have finished
+
+each finished job is appended to the journal as a single line of json
+holding the job's configuration fingerprint and the sha256 of every file
+it exported, flushed to disk before the next job is recorded. A build
+killed partway through (by an exception, running out of memory or a CI
+timeout) loses at most the line being written, which is ignored when the
+journal is read back, so `build.py --resume` can skip every job whose
+configuration is unchanged and whose files are still exactly as they
+were exported.
+"""
+
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
+from os import fsync, replace
+from pathlib import Path
+from typing import Optional
+
+from build_plan import BuildJob
+
+# the journal file, kept in each configuration's stl_folder
+BUILD_JOURNAL = ".build-journal.jsonl"
+
+
+def job_fingerprint(job: BuildJob) -> str:
+    """
+    a digest of everything a job's outputs depend on: the part class and
+    every value of its configuration
+    -------
+    arguments:
+        - job: the build job
+    """
+    return sha256(
+        repr(
+            (job.part_class.__module__, job.part_class.__name__, job.config)
+        ).encode()
+    ).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """the sha256 of a file's contents"""
+    return sha256(Path(path).read_bytes()).hexdigest()
+
+
+class BuildJournal:
+    """
+    the journal of a configuration's build
+    -------
+    arguments:
+        - path: the journal file
+        - resume: keep the jobs recorded by a previous build; otherwise
+            the journal is started afresh
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = {}
+        if resume and self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = loads(line)
+                except JSONDecodeError:
+                    # the last line of a build killed while writing it
+                    continue
+                self.entries[entry["fingerprint"]] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # rewriting the surviving entries also drops any torn line
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(
+            "".join(f"{dumps(entry)}\n" for entry in self.entries.values())
+        )
+        replace(temporary, self.path)
+
+    def completed(self, job: BuildJob) -> bool:
+        """
+        whether a job was finished by a previous build and every file it
+        exported is unchanged
+        -------
+        arguments:
+            - job: the build job
+        """
+        entry = self.entries.get(job_fingerprint(job))
+        if entry is None or entry.get("error") is not None:
+            return False
+        return all(
+            Path(path).exists() and file_digest(path) == digest
+            for path, digest in entry["outputs"].items()
+        )
+
+    def record(
+        self,
+        job: BuildJob,
+        outputs: list[Path],
+        error: Optional[str] = None,
+    ):
+        """
+        appends a finished (or failed) job to the journal and flushes it
+        to disk
+        -------
+        arguments:
+            - job: the build job
+            - outputs: the files the job exported
+            - error: the traceback of the job's failure, None if it
+                succeeded
+        """
+        entry = {
+            "fingerprint": job_fingerprint(job),
+            "description": job.description,
+            "outputs": {str(path): file_digest(path) for path in outputs},
+            "error": error,
+        }
+        self.entries[entry["fingerprint"]] = entry
+        with self.path.open("a") as journal:
+            journal.write(f"{dumps(entry)}\n")
+            journal.flush()
+            fsync(journal.fileno())
+
+    def failures(self) -> dict[str, str]:
+        """the traceback of every failed job, by description"""
+        return {
+            entry["description"]: entry["error"]
+            for entry in self.entries.values()
+            if entry["error"] is not None
+        }
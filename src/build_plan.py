@@ -0,0 +1,650 @@
+"""
+enumerates every part build required for a BenderConfig
+
+the build plan is a flat list of BuildJobs, each holding its own part
+configuration, so the outputs of a build can be listed (and compared)
+without generating any geometry.
+"""
+
+import inspect
+import re
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from os.path import relpath
+from pathlib import Path
+from typing import Callable, Optional
+
+from partomatic import Partomatic
+
+from bender_config import BenderConfig
+from config_snapshot import ConfigSnapshot, snapshot
+from filament_bracket import FilamentBracket
+from filament_bracket_config import ChannelPairDirection, LockStyle
+from filament_wheel import FilamentWheel
+from frame_bottom import BottomFrame
+from frame_config import FrameConfig, FrameStyle
+from frame_connector import ConnectorFrame
+from frame_top import TopFrame
+from guidewall import Guidewall
+from hanging_bracket import HangingBracket
+from hanging_bracket_config import HangingBracketStyle
+from lock_pin import LockPin
+from reproducible_stl import make_reproducible
+from sidewall import Sidewall
+from sidewall_config import WallStyle
+
+
+def nice_direction_name(direction: ChannelPairDirection) -> str:
+    if direction == ChannelPairDirection.LEAN_REVERSE:
+        return "reverse-path-angle"
+    elif direction == ChannelPairDirection.STRAIGHT:
+        return "straight-path-angle"
+    else:
+        return "forward-path-angle"
+
+
+def dash_prefix(input_string: str) -> str:
+    if input_string[0] == "-":
+        return input_string
+    return f"-{input_string}"
+
+
+def _hanging_bracket_names(config) -> list[str]:
+    if config.bracket_style == HangingBracketStyle.SURFACE_TOOL:
+        return ["surface-mount-alignment-tool"]
+    if config.bracket_style == HangingBracketStyle.SURFACE_MOUNT:
+        return ["frame-surface-mount-bracket"]
+    return ["frame-wall-bracket"]
+
+
+# the base file names each part class exports for a configuration;
+# these mirror the AutomatablePart names in each compile() method, which
+# test_build_plan checks for every class
+STL_FILE_NAMES: dict[type, Callable[[ConfigSnapshot], list[str]]] = {
+    FilamentBracket: lambda config: [
+        "filament-bracket-bottom",
+        "filament-bracket-top",
+    ]
+    + (
+        ["filament-bracket-clip"]
+        if LockStyle.CLIP in config.frame_lock_style
+        and not config.block_pin_generation
+        else []
+    ),
+    FilamentWheel: lambda config: ["filament-bracket-wheel"],
+    Sidewall: lambda config: ["wall-side-reinforced"]
+    + ([] if config.block_inner_wall_generation else ["wall-side"]),
+    Guidewall: lambda config: ["wall-guide"],
+    TopFrame: lambda config: ["frame-top"],
+    ConnectorFrame: lambda config: ["frame-connector"],
+    BottomFrame: lambda config: ["frame-bottom"],
+    LockPin: lambda config: ["lock-pin"],
+    HangingBracket: _hanging_bracket_names,
+}
+
+
+@dataclass(frozen=True)
+class BuildJob:
+    """
+    a single Partomatic build within a build plan
+    -------
+    arguments:
+        - group: the build step the job belongs to
+            (brackets, wheel, walls, frames or hangers)
+        - description: a human readable description of the job
+        - part_class: the Partomatic descendant to build
+        - config: a snapshot of the configuration to build it with;
+            jobs are hashable and can be used as cache keys
+    """
+
+    group: str
+    description: str
+    part_class: type
+    config: ConfigSnapshot
+
+    @property
+    def stl_file_names(self) -> list[str]:
+        """the complete file names of every stl the job exports"""
+        return [
+            f"{self.config.file_prefix}{name}{self.config.file_suffix}.stl"
+            for name in STL_FILE_NAMES[self.part_class](self.config)
+        ]
+
+    def output_files(self) -> list[Path]:
+        """
+        the paths of every stl the job exports, resolved the same
+        way Partomatic.complete_stl_file_path resolves them
+        """
+        if self.config.stl_folder == "NONE":
+            return []
+        stl_path = Path(self.config.stl_folder)
+        if not stl_path.is_absolute():
+            stl_path = Path(inspect.getfile(self.part_class)).parent / stl_path
+        return [stl_path / name for name in self.stl_file_names]
+
+    def relative_output_files(self, stl_folder: str) -> list[str]:
+        """
+        the exported stl paths relative to a configuration's stl_folder
+        -------
+        arguments:
+            - stl_folder: the stl_folder of the BenderConfig
+        """
+        folder = relpath(self.config.stl_folder, stl_folder)
+        return [
+            str(Path(folder) / name).replace("\\", "/")
+            for name in self.stl_file_names
+        ]
+
+    def build(self) -> Partomatic:
+        """
+        compiles the part, exports its stls (rewritten so identical
+        geometry always gives identical files) and returns the part
+        """
+        part = self.part_class(self.config.thaw())
+        part.partomate()
+        for path in self.output_files():
+            make_reproducible(path)
+        return part
+
+
+def _in_folder(config: ConfigSnapshot, folder: str) -> str:
+    return str(Path(config.stl_folder) / folder)
+
+
+def bracket_jobs(bender_config: BenderConfig) -> list[BuildJob]:
+    jobs = []
+    for direction in ChannelPairDirection:
+        if (
+            direction != bender_config.bracket_direction
+            and bender_config.skip_alt_file_generation
+        ):
+            continue
+        for connector_index, connector in enumerate(bender_config.connectors):
+            config = snapshot(
+                bender_config.filament_bracket_config(connector_index)
+            ).evolve(channel_pair_direction=direction)
+            if direction != bender_config.bracket_direction:
+                config = config.evolve(
+                    stl_folder=_in_folder(
+                        config,
+                        f"alt-brackets-{nice_direction_name(direction)}",
+                    ),
+                    file_prefix="alt-",
+                    file_suffix=f"{config.file_suffix}-{nice_direction_name(direction)}",
+                    block_pin_generation=True,
+                )
+            if connector_index > 0:
+                config = config.evolve(
+                    block_pin_generation=True,
+                    stl_folder=_in_folder(
+                        config,
+                        f"alt-brackets-{nice_direction_name(direction)}-alternate-connectors",
+                    ),
+                    file_prefix="alt-",
+                    file_suffix=f"{config.file_suffix}{dash_prefix(connector.file_suffix)}",
+                )
+            jobs.append(
+                BuildJob(
+                    "brackets",
+                    f"bracket for {direction.name} with {connector.name}",
+                    FilamentBracket,
+                    config,
+                )
+            )
+    return jobs
+
+
+def wheel_jobs(bender_config: BenderConfig) -> list[BuildJob]:
+    config = snapshot(bender_config.wheel).evolve(
+        stl_folder=bender_config.stl_folder
+    )
+    jobs = [BuildJob("wheel", "wheel", FilamentWheel, config)]
+
+    print_in_place = not config.bearing.print_in_place
+    description = (
+        "print-in-place-bearing" if print_in_place else "empty-bearing"
+    )
+    alt_config = config.evolve(
+        bearing=config.bearing.evolve(print_in_place=print_in_place),
+        stl_folder=_in_folder(config, f"alt-wheel-{description}"),
+        file_prefix="alt-",
+        file_suffix=f"-{description}",
+    )
+    jobs.append(
+        BuildJob(
+            "wheel", f"wheel with {description}", FilamentWheel, alt_config
+        )
+    )
+    return jobs
+
+
+def _alt_sidewall_job(
+    sidewall_config: ConfigSnapshot,
+    wall_style: WallStyle,
+    suffix: str,
+    block_inner_wall_generation: bool,
+) -> BuildJob:
+    config = sidewall_config.evolve(
+        wall_style=wall_style,
+        stl_folder=_in_folder(sidewall_config, "alt-wall-styles"),
+        file_prefix="alt-",
+        file_suffix=f"{sidewall_config.file_suffix}{suffix}",
+        block_inner_wall_generation=block_inner_wall_generation,
+    )
+    return BuildJob(
+        "walls",
+        f"alternate {wall_style.name.lower()} sidewalls",
+        Sidewall,
+        config,
+    )
+
+
+def _alt_guidewall_job(
+    guidewall_config: ConfigSnapshot,
+    wall_style: WallStyle,
+    override_filament_count: Optional[int] = None,
+) -> BuildJob:
+    config = guidewall_config.evolve(wall_style=wall_style)
+    if override_filament_count is not None:
+        config = config.evolve(
+            section_count=override_filament_count,
+            stl_folder=_in_folder(
+                config, f"alt-{override_filament_count}-filament-parts"
+            ),
+            file_suffix=f"-{override_filament_count}-filament",
+        )
+    config = config.evolve(
+        file_prefix="alt-",
+        stl_folder=_in_folder(config, "alt-wall-styles"),
+        file_suffix=f"{config.file_suffix}-{wall_style.name.lower()}",
+    )
+    return BuildJob(
+        "walls",
+        f"alternate {wall_style.name.lower()} guidewall",
+        Guidewall,
+        config,
+    )
+
+
+def guidewall_set_jobs(
+    bender_config: BenderConfig, override_filament_count=None
+) -> list[BuildJob]:
+    base_config = snapshot(bender_config.guidewall_config)
+    config = base_config
+    if override_filament_count is not None:
+        config = config.evolve(
+            section_count=override_filament_count,
+            stl_folder=_in_folder(
+                config, f"alt-{override_filament_count}-filament-parts"
+            ),
+            file_prefix="alt-",
+            file_suffix=f"-{override_filament_count}-filament",
+        )
+    jobs = [
+        BuildJob(
+            "walls",
+            (
+                "guidewall"
+                if override_filament_count is None
+                else f"guidewall for {override_filament_count} filaments"
+            ),
+            Guidewall,
+            config,
+        )
+    ]
+
+    if bender_config.skip_alt_file_generation:
+        return jobs
+
+    for wall_style in (WallStyle.DRYBOX, WallStyle.SOLID, WallStyle.HEX):
+        if bender_config.wall_style != wall_style:
+            jobs.append(
+                _alt_guidewall_job(
+                    base_config, wall_style, override_filament_count
+                )
+            )
+    return jobs
+
+
+def wall_jobs(bender_config: BenderConfig) -> list[BuildJob]:
+    sidewall_config = snapshot(bender_config.sidewall_config)
+    jobs = [BuildJob("walls", "sidewalls", Sidewall, sidewall_config)]
+    jobs.extend(guidewall_set_jobs(bender_config))
+
+    if bender_config.skip_alt_file_generation:
+        return jobs
+
+    if sidewall_config.wall_style == WallStyle.SOLID:
+        hex_config = sidewall_config.evolve(
+            wall_style=WallStyle.HEX,
+            stl_folder=_in_folder(sidewall_config, "alt-wall-styles"),
+            file_suffix=f"{sidewall_config.file_suffix}-hex",
+        )
+        jobs.append(
+            BuildJob("walls", "alternate hex sidewalls", Sidewall, hex_config)
+        )
+    elif sidewall_config.wall_style == WallStyle.HEX:
+        jobs.append(
+            _alt_sidewall_job(
+                sidewall_config, WallStyle.SOLID, "-solid", False
+            )
+        )
+    elif sidewall_config.wall_style == WallStyle.DRYBOX:
+        jobs.append(
+            _alt_sidewall_job(
+                sidewall_config, WallStyle.HEX, "-open-hex", True
+            )
+        )
+        jobs.append(
+            _alt_sidewall_job(
+                sidewall_config, WallStyle.DRYBOX, "-drybox", True
+            )
+        )
+
+    for count in bender_config.alternate_filament_counts:
+        jobs.extend(
+            guidewall_set_jobs(bender_config, override_filament_count=count)
+        )
+    return jobs
+
+
+def alt_style_frame_set_jobs(
+    frame_config: ConfigSnapshot, frame_style: FrameStyle
+) -> list[BuildJob]:
+    alt_frame_config = frame_config.evolve(
+        frame_style=frame_style,
+        stl_folder=_in_folder(frame_config, "alt-frame-styles"),
+        file_prefix="alt-",
+        file_suffix=f"{frame_config.file_suffix}-{frame_style.name.lower()}",
+    )
+    description = f"{frame_style.name.lower()} frame"
+    jobs = []
+    if (FrameStyle.HANGING in frame_style) != (
+        FrameStyle.HANGING in frame_config.frame_style
+    ):
+        jobs.append(
+            BuildJob(
+                "frames", f"{description} top", TopFrame, alt_frame_config
+            )
+        )
+        jobs.append(
+            BuildJob(
+                "frames",
+                f"{description} connector",
+                ConnectorFrame,
+                alt_frame_config,
+            )
+        )
+    jobs.append(
+        BuildJob(
+            "frames", f"{description} bottom", BottomFrame, alt_frame_config
+        )
+    )
+
+    if frame_style != FrameStyle.HANGING:
+        drybox = not alt_frame_config.drybox
+        dryflip_frame_config = alt_frame_config.evolve(
+            drybox=drybox,
+            file_suffix=f"{alt_frame_config.file_suffix}-{"not-" if not drybox else ""}drybox",
+        )
+        jobs.append(
+            BuildJob(
+                "frames",
+                f"{description} bottom with alternate drybox",
+                BottomFrame,
+                dryflip_frame_config,
+            )
+        )
+    return jobs
+
+
+def _with_filament_count(
+    bender_config: BenderConfig, filament_count: Optional[int]
+) -> BenderConfig:
+    """
+    an independent copy of the configuration for an alternate
+    filament count (or the configuration itself if there is none)
+    """
+    if filament_count is None:
+        return bender_config
+    return snapshot(bender_config).evolve(filament_count=filament_count).thaw()
+
+
+def frame_set_jobs(
+    bender_config: BenderConfig, override_filament_count=None
+) -> list[BuildJob]:
+    count_config = _with_filament_count(bender_config, override_filament_count)
+    frame_config = snapshot(count_config.frame_config)
+    lockpin_config = snapshot(count_config.lock_pin_config)
+
+    description = "frame"
+    if override_filament_count is not None:
+        count_name_str = f"{override_filament_count}-filament"
+        description = f"frame for {override_filament_count} filaments"
+        frame_config = frame_config.evolve(
+            stl_folder=_in_folder(frame_config, f"alt-{count_name_str}-parts"),
+            file_prefix="alt-",
+            file_suffix=f"-{count_name_str}",
+        )
+        lockpin_config = lockpin_config.evolve(
+            stl_folder=_in_folder(
+                lockpin_config, f"alt-{count_name_str}-parts"
+            ),
+            file_prefix="alt-",
+            file_suffix=f"-{count_name_str}",
+        )
+
+    jobs = [
+        BuildJob("frames", f"{description} top", TopFrame, frame_config),
+        BuildJob(
+            "frames", f"{description} connector", ConnectorFrame, frame_config
+        ),
+        BuildJob("frames", f"{description} bottom", BottomFrame, frame_config),
+        BuildJob("frames", f"{description} lock pin", LockPin, lockpin_config),
+    ]
+
+    if not bender_config.skip_alt_file_generation:
+        if FrameStyle.HANGING in frame_config.frame_style:
+            jobs.extend(
+                alt_style_frame_set_jobs(frame_config, FrameStyle.STANDING)
+            )
+        if frame_config.frame_style == FrameStyle.STANDING:
+            jobs.extend(
+                alt_style_frame_set_jobs(frame_config, FrameStyle.HANGING)
+            )
+        if frame_config.frame_style != FrameStyle.HYBRID:
+            jobs.extend(
+                alt_style_frame_set_jobs(frame_config, FrameStyle.HYBRID)
+            )
+    return jobs
+
+
+def frame_jobs(bender_config: BenderConfig) -> list[BuildJob]:
+    jobs = frame_set_jobs(bender_config)
+    for count in bender_config.alternate_filament_counts:
+        jobs.extend(
+            frame_set_jobs(bender_config, override_filament_count=count)
+        )
+    return jobs
+
+
+def hanger_set_jobs(
+    bender_config: BenderConfig, override_filament_count=None
+) -> list[BuildJob]:
+    count_config = _with_filament_count(bender_config, override_filament_count)
+    hanging_bracket_config = snapshot(count_config.hanging_bracket_config)
+
+    description = "hanger"
+    if override_filament_count is not None:
+        description = f"hanger for {override_filament_count} filaments"
+        hanging_bracket_config = hanging_bracket_config.evolve(
+            stl_folder=str(
+                Path(bender_config.stl_folder)
+                / f"alt-{override_filament_count}-filament-parts"
+            ),
+            file_prefix="alt-",
+            file_suffix=f"-{override_filament_count}-filament",
+        )
+
+    jobs = [
+        BuildJob(
+            "hangers", description, HangingBracket, hanging_bracket_config
+        )
+    ]
+
+    if bender_config.skip_alt_file_generation:
+        return jobs
+
+    tool_config = hanging_bracket_config.evolve(
+        bracket_style=HangingBracketStyle.SURFACE_TOOL,
+        stl_folder=_in_folder(hanging_bracket_config, "tools"),
+    )
+    jobs.append(
+        BuildJob(
+            "hangers",
+            f"{description} alignment tool",
+            HangingBracket,
+            tool_config,
+        )
+    )
+
+    hanger_folder = _in_folder(hanging_bracket_config, "alt-frame-hangers")
+    if hanging_bracket_config.bracket_style == HangingBracketStyle.WALL_MOUNT:
+        for heatsink_desk_nut, suffix in (
+            (False, "-surface-mount-m4-nut"),
+            (True, "-surface-mount-m4-heatsink"),
+        ):
+            surface_config = hanging_bracket_config.evolve(
+                bracket_style=HangingBracketStyle.SURFACE_MOUNT,
+                stl_folder=hanger_folder,
+                file_prefix="alt-",
+                heatsink_desk_nut=heatsink_desk_nut,
+                file_suffix=f"{hanging_bracket_config.file_suffix}{suffix}",
+            )
+            jobs.append(
+                BuildJob(
+                    "hangers",
+                    f"{description}{suffix.replace('-', ' ')}",
+                    HangingBracket,
+                    surface_config,
+                )
+            )
+    else:
+        wall_config = hanging_bracket_config.evolve(
+            bracket_style=HangingBracketStyle.WALL_MOUNT,
+            stl_folder=hanger_folder,
+            file_prefix="alt-",
+            file_suffix=f"{hanging_bracket_config.file_suffix}-wall-mount",
+        )
+        jobs.append(
+            BuildJob(
+                "hangers",
+                f"{description} wall mount",
+                HangingBracket,
+                wall_config,
+            )
+        )
+
+        heatsink_desk_nut = not hanging_bracket_config.heatsink_desk_nut
+        surface_config = hanging_bracket_config.evolve(
+            heatsink_desk_nut=heatsink_desk_nut,
+            stl_folder=hanger_folder,
+            file_prefix="alt-",
+            file_suffix=f"{hanging_bracket_config.file_suffix}-surface-mount-{"-m4-nut"
+                if heatsink_desk_nut
+                else "-m4-heatsink"}",
+        )
+        jobs.append(
+            BuildJob(
+                "hangers",
+                f"{description} surface mount",
+                HangingBracket,
+                surface_config,
+            )
+        )
+    return jobs
+
+
+def hanger_jobs(bender_config: BenderConfig) -> list[BuildJob]:
+    jobs = hanger_set_jobs(bender_config)
+
+    if bender_config.skip_alt_file_generation:
+        return jobs
+
+    for count in bender_config.alternate_filament_counts:
+        jobs.extend(
+            hanger_set_jobs(bender_config, override_filament_count=count)
+        )
+    return jobs
+
+
+def build_plan(bender_config: BenderConfig) -> list[BuildJob]:
+    """
+    every job required to build the parts for a configuration,
+    in the order build.py generates them
+    -------
+    arguments:
+        - bender_config: the configuration to plan
+    """
+    return (
+        bracket_jobs(bender_config)
+        + wheel_jobs(bender_config)
+        + wall_jobs(bender_config)
+        + frame_jobs(bender_config)
+        + hanger_jobs(bender_config)
+    )
+
+
+def target_names(job: BuildJob, stl_folder: str) -> list[str]:
+    """
+    the names a build target can select a job by: its description (in
+    lower case, with dashes between words), the file name and the path
+    relative to the configuration's stl_folder of each stl it exports
+    (without the .stl), each also prefixed by the job's group and a slash
+    -------
+    arguments:
+        - job: the build job
+        - stl_folder: the stl_folder of the BenderConfig
+    """
+    names = [re.sub("[^a-z0-9.]+", "-", job.description.lower()).strip("-")]
+    for path in job.relative_output_files(stl_folder):
+        names.extend((Path(path).stem, path.removesuffix(".stl")))
+    names = list(dict.fromkeys(names))
+    return names + [f"{job.group}/{name}" for name in names]
+
+
+def select_jobs(
+    jobs: list[BuildJob], targets: list[str], stl_folder: str
+) -> tuple[list[BuildJob], list[str]]:
+    """
+    the jobs matching any of a list of targets, and the targets which
+    match no job. Targets are shell style patterns (such as
+    'brackets/*lean-forward*' or 'frame-top') matched against each job's
+    target_names, ignoring case
+    -------
+    arguments:
+        - jobs: the build plan
+        - targets: the target patterns
+        - stl_folder: the stl_folder of the BenderConfig
+    """
+    patterns = {target: target.lower() for target in targets}
+    selected, matched = [], set()
+    for job in jobs:
+        names = target_names(job, stl_folder)
+        matches = {
+            target
+            for target, pattern in patterns.items()
+            if any(fnmatchcase(name, pattern) for name in names)
+        }
+        if matches:
+            selected.append(job)
+            matched.update(matches)
+    return selected, [target for target in targets if target not in matched]
+
+
+if __name__ == "__main__":
+    config_path = Path(__file__).parent / "../build-configs/release.conf"
+    bender_config = BenderConfig(config_path)
+    for job in build_plan(bender_config):
+        for output in job.relative_output_files(bender_config.stl_folder):
+            print(f"{job.group:<10}{output}")
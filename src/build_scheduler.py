@@ -0,0 +1,554 @@
+"""
+runs build jobs across worker processes, longest job first
+
+a build's makespan is set by whichever worker finishes last, so an
+expensive TopFrame or threaded FilamentBracket started at the end of a
+build leaves every other worker idle. Each job's duration is predicted by
+a CostModel: a ridge regression, per part class, of the logarithm of the
+durations recorded in previous builds against the job's numeric
+configuration values, so it learns that a 12 section Guidewall takes
+longer than a 5 section one. Whenever a worker is free it is given the
+longest remaining job, and every finished job refines the model before
+the next one is chosen.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from json import dumps, loads
+from math import exp, log
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from multiprocessing.connection import wait as connection_wait
+from os import replace
+from pathlib import Path
+from sys import platform
+from time import perf_counter
+from traceback import format_exc
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+
+from build_plan import BuildJob
+from build_stages import share_stages
+from config_snapshot import ConfigSnapshot
+from gltf_export import export_part_glbs
+from shape_transport import ShapeStore
+
+# the file the recorded durations are kept in
+BUILD_HISTORY = ".build-history.json"
+# the most recent durations kept for each part class
+HISTORY_LIMIT = 200
+# the ridge penalty on standardized features; larger values keep
+# predictions closer to the part class's typical duration
+RIDGE = 0.1
+# predictions stay within this factor of the durations recorded for a
+# part class, so a new configuration can't extrapolate wildly
+EXTRAPOLATION = 4.0
+# rough durations (seconds) for part classes which have never been built
+DEFAULT_SECONDS = {
+    "TopFrame": 900,
+    "BottomFrame": 600,
+    "ConnectorFrame": 300,
+    "FilamentBracket": 120,
+    "Guidewall": 60,
+    "Sidewall": 60,
+    "HangingBracket": 30,
+    "FilamentWheel": 5,
+    "LockPin": 5,
+}
+FALLBACK_SECONDS = 60
+
+
+def config_features(config: ConfigSnapshot, prefix: str = "") -> dict:
+    """
+    the numeric values of a configuration, flattened into a dictionary
+    keyed by their dotted paths; enums become one-hot values and strings
+    are ignored
+    -------
+    arguments:
+        - config: the configuration snapshot
+        - prefix: the path of the configuration within its parent
+    """
+    features = {}
+    values = list(config.items())
+    while values:
+        name, value = values.pop(0)
+        key = f"{prefix}{name}"
+        if isinstance(value, ConfigSnapshot):
+            features.update(config_features(value, f"{key}."))
+        elif isinstance(value, tuple):
+            values.extend(
+                (f"{name}.{index}", item) for index, item in enumerate(value)
+            )
+        elif isinstance(value, Enum):
+            features[f"{key}.{value.name}"] = 1.0
+        elif isinstance(value, (bool, int, float)) and np.isfinite(value):
+            features[key] = float(value)
+    return features
+
+
+class CostModel:
+    """
+    predicts how long build jobs take from the durations of previous ones
+    -------
+    arguments:
+        - history: the recorded durations, as dictionaries of the part
+            class name, the job's features and the seconds it took
+    """
+
+    def __init__(self, history: Optional[list[dict]] = None):
+        self.history = list(history or [])
+        self._fits: dict[str, Optional[tuple]] = {}
+        self._features: dict[BuildJob, dict] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "CostModel":
+        """
+        loads the history recorded in a file, or an empty model if the
+        file doesn't exist
+        -------
+        arguments:
+            - path: the history file
+        """
+        path = Path(path)
+        return cls(loads(path.read_text()) if path.exists() else None)
+
+    def save(self, path: Path):
+        """
+        writes the history to a file, replacing it atomically so an
+        interrupted build never leaves it half written
+        -------
+        arguments:
+            - path: the history file
+        """
+        path = Path(path)
+        temporary = path.with_name(f"{path.name}.tmp")
+        temporary.write_text(dumps(self.history, indent=1))
+        replace(temporary, path)
+
+    def record(self, job: BuildJob, seconds: float):
+        """
+        adds a job's duration to the history
+        -------
+        arguments:
+            - job: the finished job
+            - seconds: how long it took
+        """
+        part = job.part_class.__name__
+        self.history.append(
+            {
+                "part": part,
+                "features": self.features(job),
+                "seconds": seconds,
+            }
+        )
+        records = [i for i, r in enumerate(self.history) if r["part"] == part]
+        for index in reversed(records[:-HISTORY_LIMIT]):
+            del self.history[index]
+        self._fits.pop(part, None)
+
+    def features(self, job: BuildJob) -> dict:
+        """
+        the features a job's duration is predicted from
+        -------
+        arguments:
+            - job: the job
+        """
+        if job not in self._features:
+            self._features[job] = config_features(job.config)
+        return self._features[job]
+
+    def _fit(self, part: str) -> Optional[tuple]:
+        records = [r for r in self.history if r["part"] == part]
+        if not records:
+            return None
+        names = sorted({name for r in records for name in r["features"]})
+        x = np.array(
+            [[r["features"].get(name, 0.0) for name in names] for r in records]
+        ).reshape(len(records), len(names))
+        y = np.log([max(r["seconds"], 1e-3) for r in records])
+        # only the values which change between builds say anything
+        # about the duration
+        varying = x.std(axis=0) > 0
+        names = [name for name, keep in zip(names, varying) if keep]
+        x = x[:, varying]
+        mean, scale = x.mean(axis=0), x.std(axis=0)
+        standardized = (x - mean) / scale
+        weights = np.linalg.solve(
+            standardized.T @ standardized + RIDGE * np.eye(len(names)),
+            standardized.T @ (y - y.mean()),
+        )
+        return (
+            names,
+            mean,
+            scale,
+            weights,
+            y.mean(),
+            y.min() - log(EXTRAPOLATION),
+            y.max() + log(EXTRAPOLATION),
+        )
+
+    def predict(self, job: BuildJob) -> float:
+        """
+        the predicted duration of a job in seconds
+        -------
+        arguments:
+            - job: the job to predict
+        """
+        part = job.part_class.__name__
+        if part not in self._fits:
+            self._fits[part] = self._fit(part)
+        fit = self._fits[part]
+        if fit is None:
+            return DEFAULT_SECONDS.get(part, FALLBACK_SECONDS)
+        names, mean, scale, weights, intercept, lowest, highest = fit
+        features = self.features(job)
+        x = np.array([features.get(name, 0.0) for name in names])
+        prediction = intercept + float(((x - mean) / scale) @ weights)
+        return exp(min(max(prediction, lowest), highest))
+
+
+def longest_first(
+    durations: list[float], workers: int
+) -> tuple[list[list[int]], float]:
+    """
+    assigns tasks to workers, each to whichever worker is free first,
+    longest task first; returns the indices of each worker's tasks and
+    the makespan, which is at most 4/3 of the shortest possible
+    -------
+    arguments:
+        - durations: the duration of each task
+        - workers: the number of workers
+    """
+    assignments = [[] for _ in range(workers)]
+    finish = np.zeros(workers)
+    for index in np.argsort(durations, kind="stable")[::-1]:
+        worker = int(np.argmin(finish))
+        assignments[worker].append(int(index))
+        finish[worker] += durations[index]
+    return assignments, float(finish.max(initial=0))
+
+
+def makespan_bound(durations: list[float], workers: int) -> float:
+    """
+    the shortest time any schedule can finish the tasks in: the longest
+    task, or the work shared perfectly between the workers
+    -------
+    arguments:
+        - durations: the duration of each task
+        - workers: the number of workers
+    """
+    return max(max(durations, default=0), sum(durations) / workers)
+
+
+def _memory() -> tuple[float, float]:
+    """the current and peak resident memory of this process in MiB"""
+    try:
+        status = Path("/proc/self/status").read_text().splitlines()
+        values = dict(line.split(":", 1) for line in status if ":" in line)
+        return (
+            int(values["VmRSS"].split()[0]) / 1024,
+            int(values["VmHWM"].split()[0]) / 1024,
+        )
+    except (OSError, KeyError):
+        # without /proc only the peak of the whole process is known;
+        # ru_maxrss is in bytes on macOS and KiB elsewhere
+        try:
+            from resource import RUSAGE_SELF, getrusage
+        except ImportError:
+            return 0.0, 0.0
+        peak = getrusage(RUSAGE_SELF).ru_maxrss
+        peak /= 1024**2 if platform == "darwin" else 1024
+        return peak, peak
+
+
+def _reset_peak_memory():
+    """restarts the peak resident memory from the current, where possible"""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+@dataclass
+class FinishedJob:
+    """
+    a job run by run_jobs
+    -------
+    arguments:
+        - job: the job
+        - result: the task's result, None if it failed
+        - seconds: how long the job took
+        - error: the traceback of the job's failure, None if it succeeded
+        - peak_memory: the peak resident memory (MiB) of the process
+            while it ran the job
+        - worker: the worker which ran the job, None for an isolated job
+    """
+
+    job: BuildJob
+    result: Any
+    seconds: float
+    error: Optional[str] = None
+    peak_memory: Optional[float] = None
+    worker: Optional[int] = None
+
+
+def _run(task: Callable[[BuildJob], Any], job: BuildJob) -> FinishedJob:
+    # exceptions from the geometry kernel don't always pickle, so a
+    # failure is returned as its traceback
+    _reset_peak_memory()
+    start_time = perf_counter()
+    try:
+        result, error = task(job), None
+    except Exception:
+        result, error = None, format_exc()
+    seconds = perf_counter() - start_time
+    return FinishedJob(job, result, seconds, error, _memory()[1])
+
+
+def _worker(connection: Connection, task: Callable[[BuildJob], Any]):
+    """runs jobs sent over a connection until it is sent None"""
+    while (job := connection.recv()) is not None:
+        connection.send((_run(task, job), _memory()[0]))
+
+
+class WorkerPool:
+    """
+    worker processes which are replaced whenever they have run too many
+    jobs or grown too large; the geometry kernel keeps allocations alive
+    from one part to the next, so a long lived process only ever grows
+    -------
+    arguments:
+        - task: a picklable function run with each job
+        - workers: the number of worker processes
+        - max_jobs_per_worker: replace a worker after it has run this
+            many jobs, never if None
+        - memory_limit: replace a worker once its resident memory (MiB)
+            exceeds this after a job, never if None
+    """
+
+    def __init__(
+        self,
+        task: Callable[[BuildJob], Any],
+        workers: int,
+        max_jobs_per_worker: Optional[int] = None,
+        memory_limit: Optional[float] = None,
+    ):
+        self.task = task
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.memory_limit = memory_limit
+        self.recycled = 0
+        # a replacement worker keeps the number of the worker it replaces
+        self._idle = [self._start(worker) for worker in range(workers)]
+        # connection -> (process, jobs run, running job, worker number)
+        self._busy: dict[
+            Connection, tuple[Process, int, BuildJob, int]
+        ] = {}
+
+    def _start(self, worker: int) -> tuple[Connection, Process, int, int]:
+        connection, worker_connection = Pipe()
+        process = Process(
+            target=_worker, args=(worker_connection, self.task), daemon=True
+        )
+        process.start()
+        worker_connection.close()
+        return connection, process, 0, worker
+
+    @staticmethod
+    def _stop(connection: Connection, process: Process):
+        try:
+            connection.send(None)
+        except OSError:
+            pass
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        connection.close()
+
+    @property
+    def idle(self) -> int:
+        """the number of workers waiting for a job"""
+        return len(self._idle)
+
+    @property
+    def running(self) -> int:
+        """the number of jobs running"""
+        return len(self._busy)
+
+    def submit(self, job: BuildJob) -> int:
+        """
+        starts a job on an idle worker, returning the worker's number
+        -------
+        arguments:
+            - job: the job to run
+        """
+        connection, process, count, worker = self._idle.pop()
+        connection.send(job)
+        self._busy[connection] = process, count, job, worker
+        return worker
+
+    def wait(self) -> list[FinishedJob]:
+        """waits for at least one running job to finish, and returns them"""
+        sentinels = {
+            process.sentinel: connection
+            for connection, (process, _, _, _) in self._busy.items()
+        }
+        finished = []
+        for ready in connection_wait([*self._busy, *sentinels]):
+            connection = sentinels.get(ready, ready)
+            if connection not in self._busy:
+                continue
+            process, count, job, worker = self._busy.pop(connection)
+            try:
+                outcome, memory = connection.recv()
+            except (EOFError, OSError):
+                # the worker was killed (out of memory, or a crash in the
+                # geometry kernel) partway through the job
+                process.join()
+                finished.append(
+                    FinishedJob(
+                        job,
+                        None,
+                        0.0,
+                        f"worker process died with exit code "
+                        f"{process.exitcode} building {job.description}",
+                        worker=worker,
+                    )
+                )
+                connection.close()
+                self._idle.append(self._start(worker))
+                continue
+            outcome.worker = worker
+            finished.append(outcome)
+            count += 1
+            exhausted = (
+                self.max_jobs_per_worker is not None
+                and count >= self.max_jobs_per_worker
+            )
+            oversized = (
+                self.memory_limit is not None and memory > self.memory_limit
+            )
+            if exhausted or oversized:
+                self._stop(connection, process)
+                self.recycled += 1
+                self._idle.append(self._start(worker))
+            else:
+                self._idle.append((connection, process, count, worker))
+        return finished
+
+    def close(self):
+        """stops every worker, killing any still running a job"""
+        for connection, process, _, _ in self._idle:
+            self._stop(connection, process)
+        for connection, (process, _, _, _) in self._busy.items():
+            process.kill()
+            process.join()
+            connection.close()
+        self._idle.clear()
+        self._busy.clear()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def run_jobs(
+    jobs: list[BuildJob],
+    task: Callable[[BuildJob], Any],
+    model: CostModel,
+    workers: int = 1,
+    max_jobs_per_worker: Optional[int] = None,
+    memory_limit: Optional[float] = None,
+    started: Optional[Callable[[BuildJob, int], None]] = None,
+) -> Iterator[FinishedJob]:
+    """
+    runs a task for every job, longest predicted job first, recording
+    each successful job's duration in the model as it finishes, and
+    yields each FinishedJob in the order they finish. A failed job, even
+    one whose worker process dies, doesn't stop the others.
+    -------
+    arguments:
+        - jobs: the jobs to run
+        - task: a picklable function run with each job
+        - model: the cost model to schedule with and refine
+        - workers: the number of jobs to run at once in separate
+            processes; with 1 worker and no limits every job runs in
+            the current process
+        - max_jobs_per_worker: replace a worker process after it has
+            run this many jobs
+        - memory_limit: replace a worker process once its resident
+            memory (MiB) exceeds this after a job
+        - started: called with each job and the number of the worker
+            running it as the job starts
+    """
+    pending = list(jobs)
+    started = started or (lambda job, worker: None)
+
+    def next_job() -> BuildJob:
+        # predictions change as jobs finish, so choose afresh each time
+        job = max(pending, key=model.predict)
+        pending.remove(job)
+        return job
+
+    if workers == 1 and max_jobs_per_worker is None and memory_limit is None:
+        while pending:
+            job = next_job()
+            started(job, 0)
+            finished = _run(task, job)
+            finished.worker = 0
+            if finished.error is None:
+                model.record(finished.job, finished.seconds)
+            yield finished
+        return
+
+    with WorkerPool(task, workers, max_jobs_per_worker, memory_limit) as pool:
+        while pending or pool.running:
+            while pending and pool.idle:
+                job = next_job()
+                started(job, pool.submit(job))
+            for finished in pool.wait():
+                if finished.error is None:
+                    model.record(finished.job, finished.seconds)
+                yield finished
+
+
+def run_isolated(
+    job: BuildJob, task: Callable[[BuildJob], Any]
+) -> FinishedJob:
+    """
+    runs a task for a single job in a fresh process of its own, so a
+    failure can't be caused (or hidden) by any other job
+    -------
+    arguments:
+        - job: the job to run
+        - task: a picklable function run with the job
+    """
+    with WorkerPool(task, 1) as pool:
+        pool.submit(job)
+        finished = pool.wait()[0]
+    finished.worker = None
+    return finished
+
+
+def build_task(
+    job: BuildJob, glb: bool = False, shapes: Optional[str] = None
+) -> list[Path]:
+    """
+    builds a job, exporting its stls (and glb models if requested), and
+    returns the stl paths
+    -------
+    arguments:
+        - job: the job to build
+        - glb: also export a glb model beside each stl
+        - shapes: the folder of a ShapeStore to share build stages with
+            the other workers through
+    """
+    if shapes is not None:
+        share_stages(ShapeStore(shapes))
+    part = job.build()
+    if glb:
+        export_part_glbs(part)
+    return job.output_files()
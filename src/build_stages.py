@@ -0,0 +1,235 @@
+"""
+named build stages whose intermediate solids are reused between variants
+
+many part variants differ only in their last operations: a reinforced
+sidewall is the plain wall plus its reinforcement, and a drybox bottom
+frame is the plain frame plus the drybox floor. Decorating the method
+that builds the shared solid with `build_stage` snapshots the solid it
+returns, keyed by the method's arguments and by the value of every
+configuration field the method (and any stage it calls) reads. A later
+call, from the same part or from another variant's part in the same
+process, whose arguments and consumed fields match resumes from that
+snapshot instead of rebuilding it from the first Box.
+
+the consumed fields are recorded while the stage runs, so adding a field
+to a stage can't leave a stale hand-written cache key behind. Worker
+processes given a ShapeStore with share_stages also publish their
+snapshots to it, and resume from the snapshots other workers published.
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import is_dataclass
+from functools import wraps
+from hashlib import sha256
+from typing import Any, Callable, Iterable, Optional
+
+from build123d import Part
+
+from config_snapshot import snapshot
+from shape_transport import ShapeStore
+
+# the number of stage calls (method and arguments) snapshots are kept for
+STAGE_CACHE_SIZE = 32
+# the snapshots kept for each stage call, one per distinct configuration
+SNAPSHOTS_PER_STAGE = 4
+
+# stage call -> [(consumed (field, value) pairs, solid)], least recently
+# used first
+_snapshots: OrderedDict = OrderedDict()
+_statistics = {"hits": 0, "misses": 0}
+# the store snapshots are shared between processes through, if any
+_shared: Optional[ShapeStore] = None
+
+
+def _frozen(value: Any) -> Any:
+    """a comparable, immutable copy of a configuration value"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return snapshot(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+class _ConsumedConfig:
+    """
+    forwards reads to a configuration, recording each field read
+    -------
+    arguments:
+        - config: the configuration
+        - consumed: the dictionary the fields read are recorded in
+    """
+
+    __slots__ = ("_config", "_consumed")
+
+    def __init__(self, config: Any, consumed: dict):
+        object.__setattr__(self, "_config", config)
+        object.__setattr__(self, "_consumed", consumed)
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._config, name)
+        if not callable(value):
+            self._consumed[name] = _frozen(value)
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("build stages can't change the configuration")
+
+
+def _reference(part: Part) -> Part:
+    """
+    a new shape sharing a snapshot's geometry, so callers moving or
+    relabelling it can't change the snapshot
+    """
+    reference = part.__class__(part.wrapped.Located(part.wrapped.Location()))
+    reference.label = part.label
+    reference.color = part.color
+    return reference
+
+
+def _keep(key: tuple, snapshots: list):
+    """keeps a stage call's latest snapshots, evicting the oldest calls"""
+    _snapshots[key] = snapshots[-SNAPSHOTS_PER_STAGE:]
+    _snapshots.move_to_end(key)
+    while len(_snapshots) > STAGE_CACHE_SIZE:
+        _snapshots.popitem(last=False)
+
+
+def _matches(config: Any, consumed: tuple) -> bool:
+    # reading through config records these fields in any stage this one
+    # was called from
+    return all(
+        _frozen(getattr(config, name)) == value for name, value in consumed
+    )
+
+
+def _shared_folder(key: tuple):
+    return _shared.path / "stages" / sha256(repr(key).encode()).hexdigest()
+
+
+def _shared_snapshots(key: tuple) -> Iterable[tuple]:
+    """the (consumed, handle) snapshots other processes published"""
+    folder = _shared_folder(key)
+    if not folder.is_dir():
+        return
+    for entry in sorted(folder.glob("*.snapshot")):
+        try:
+            yield pickle.loads(entry.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError):
+            continue
+
+
+def _publish(key: tuple, consumed: tuple, part: Part):
+    """writes a snapshot to the shared store for other processes"""
+    try:
+        entry = pickle.dumps((consumed, _shared.put(part)))
+    except (TypeError, AttributeError, pickle.PicklingError):
+        # a consumed value which doesn't pickle keeps the stage local
+        return
+    folder = _shared_folder(key)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{sha256(entry).hexdigest()}.snapshot"
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(entry)
+    os.replace(temporary, path)
+
+
+def share_stages(store: Optional[ShapeStore]):
+    """
+    shares snapshots with every other process using the same store:
+    each stage built is published to it, and a stage call missing from
+    this process's snapshots resumes from a matching published one
+    -------
+    arguments:
+        - store: the store, None to stop sharing
+    """
+    global _shared
+    _shared = store
+
+
+def build_stage(method: Callable[..., Part]) -> Callable[..., Part]:
+    """
+    decorates a Partomatic method returning a solid as a named build
+    stage, whose result is snapshotted and reused by later calls with the
+    same arguments and consumed configuration values. The method must
+    only read its configuration through self._config.
+    -------
+    arguments:
+        - method: the method building the stage's solid
+    """
+
+    @wraps(method)
+    def stage(self, *args, **kwargs) -> Part:
+        key = (
+            method.__module__,
+            method.__qualname__,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        config = self._config
+        snapshots = _snapshots.get(key, [])
+        for consumed, part in snapshots:
+            if _matches(config, consumed):
+                _snapshots.move_to_end(key)
+                _statistics["hits"] += 1
+                return _reference(part)
+        published = _shared_snapshots(key) if _shared else ()
+        for consumed, handle in published:
+            if _matches(config, consumed):
+                part = handle.attach()
+                _keep(key, [*snapshots, (consumed, part)])
+                _statistics["hits"] += 1
+                return _reference(part)
+
+        _statistics["misses"] += 1
+        consumed = {}
+        self._config = _ConsumedConfig(config, consumed)
+        try:
+            part = method(self, *args, **kwargs)
+        finally:
+            self._config = config
+        consumed = tuple(consumed.items())
+        _keep(key, [*snapshots, (consumed, part)])
+        if _shared:
+            _publish(key, consumed, part)
+        return _reference(part)
+
+    stage.build_stage = True
+    return stage
+
+
+def build_stages(part_class: type) -> list[str]:
+    """
+    the names of a part class's build stages
+    -------
+    arguments:
+        - part_class: the Partomatic descendant
+    """
+    return [
+        name
+        for name in dir(part_class)
+        if getattr(getattr(part_class, name), "build_stage", False)
+    ]
+
+
+def stage_statistics() -> dict[str, int]:
+    """the number of stage calls resumed from snapshots (hits) and built"""
+    return dict(_statistics)
+
+
+def clear_stage_cache(modules: Optional[Iterable[str]] = None):
+    """
+    discards the snapshots of stages, and the hit and miss counts
+    -------
+    arguments:
+        - modules: only discard the snapshots of the stages defined in
+            these modules (after they are reloaded), None for every stage
+    """
+    if modules is None:
+        _snapshots.clear()
+    else:
+        modules = set(modules)
+        for key in [key for key in _snapshots if key[0] in modules]:
+            del _snapshots[key]
+    _statistics.update(hits=0, misses=0)
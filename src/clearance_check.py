@@ -0,0 +1,539 @@
+"""
+measures the clearances between the parts of an assembly, and checks the
+fits the design depends on against the configuration's tolerances
+
+every leaf of an assembly is tessellated where the assembly places it and
+indexed by a MeshBvh. Pairs of hierarchies are walked together, level by
+level, vectorized over every pair of boxes at once, skipping pairs of boxes
+further apart than the closest triangles found so far; only the few
+triangles which are actually near each other are compared exactly.
+
+distances are exact for the tessellations, so they are within the
+tessellation tolerance of the distances between the parts themselves.
+Parts which interfere are also measured for how deep they penetrate each
+other, from the signed distances of points sampled from their surfaces.
+
+usage: python clearance_check.py [../build-configs/release.conf ...]
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Callable, Optional
+
+import numpy as np
+from build123d import Box, Compound, Location
+
+from assembly_documentation import BracketAssembly
+from bender_config import BenderConfig
+from frame_top import TopFrame
+from lock_pin import LockPin
+from mesh_bvh import (
+    BATCH_SIZE,
+    EPSILON,
+    MeshBvh,
+    box_distance,
+    box_reach,
+    triangle_distances,
+)
+from offscreen_renderer import assembly_leaves, assembly_meshes
+from tongue_groove import groove, tongue
+
+# the tessellation is within TESSELLATION_TOLERANCE of the surface, and
+# the angular tolerance keeps small click fit spheres from dominating
+TESSELLATION_TOLERANCE = 0.02
+ANGULAR_TOLERANCE = 0.3
+
+
+def _closest_triangles(
+    a: MeshBvh,
+    b: MeshBvh,
+    leaves_a: np.ndarray,
+    leaves_b: np.ndarray,
+    best: float,
+) -> tuple[float, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    the closest pair of triangles of pairs of leaves no further apart
+    than best, with their closest points; (best, None, None) if none are
+    """
+    triangles_a, leaves_b = a.leaf_pairs(leaves_a, leaves_b)
+    triangles_b, triangles_a = b.leaf_pairs(leaves_b, triangles_a)
+    closest = (None, None)
+    for start in range(0, len(triangles_a), BATCH_SIZE):
+        batch_a = triangles_a[start : start + BATCH_SIZE]
+        batch_b = triangles_b[start : start + BATCH_SIZE]
+        near = (
+            box_distance(
+                a.triangle_lower[batch_a],
+                a.triangle_upper[batch_a],
+                b.triangle_lower[batch_b],
+                b.triangle_upper[batch_b],
+            )
+            <= best
+        )
+        if not near.any():
+            continue
+        distances, points_a, points_b = triangle_distances(
+            a.corners[batch_a[near]], b.corners[batch_b[near]]
+        )
+        nearest = distances.argmin()
+        if distances[nearest] <= best:
+            best = float(distances[nearest])
+            closest = (points_a[nearest], points_b[nearest])
+            if best <= EPSILON:
+                break
+    return best, closest[0], closest[1]
+
+
+def mesh_distance(
+    a: MeshBvh, b: MeshBvh, max_distance: float = np.inf
+) -> tuple[float, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    the smallest distance between the surfaces of two meshes and the
+    closest point of each; (inf, None, None) if they're further apart
+    than max_distance
+    -------
+    arguments:
+        - a, b: the meshes' hierarchies
+        - max_distance: the largest distance worth measuring
+    """
+    best = max_distance
+    closest = (None, None)
+    # frontiers of node pairs still to visit; a frontier too large to
+    # process at once is split, nearest pairs last so they're visited first
+    frontiers = [(np.array([a.root]), np.array([b.root]))]
+    while frontiers and best > EPSILON:
+        nodes_a, nodes_b = frontiers.pop()
+        boxes = (
+            a.lower[nodes_a],
+            a.upper[nodes_a],
+            b.lower[nodes_b],
+            b.upper[nodes_b],
+        )
+        near = box_distance(*boxes) <= best
+        if not near.any():
+            continue
+        nodes_a, nodes_b = nodes_a[near], nodes_b[near]
+        # every box holds a triangle, so the furthest two boxes can be
+        # apart bounds the distance before reaching any triangles
+        best = min(
+            best, float(box_reach(*(box[near] for box in boxes)).min())
+        )
+
+        leaves = (a.level[nodes_a] == 0) & (b.level[nodes_b] == 0)
+        if leaves.any():
+            distance, point_a, point_b = _closest_triangles(
+                a, b, nodes_a[leaves], nodes_b[leaves], best
+            )
+            if point_a is not None:
+                best, closest = distance, (point_a, point_b)
+        nodes_a, nodes_b = nodes_a[~leaves], nodes_b[~leaves]
+
+        # split the larger node of each pair, or both on the same level
+        split_a = a.level[nodes_a] >= b.level[nodes_b]
+        split_b = b.level[nodes_b] >= a.level[nodes_a]
+        nodes_a, nodes_b, split_b = a.descend(
+            nodes_a, split_a, nodes_b, split_b
+        )
+        nodes_b, nodes_a = b.descend(nodes_b, split_b, nodes_a)
+        if len(nodes_a) > BATCH_SIZE:
+            order = np.argsort(
+                -box_distance(
+                    a.lower[nodes_a],
+                    a.upper[nodes_a],
+                    b.lower[nodes_b],
+                    b.upper[nodes_b],
+                )
+            )
+            for start in range(0, len(order), BATCH_SIZE):
+                batch = order[start : start + BATCH_SIZE]
+                frontiers.append((nodes_a[batch], nodes_b[batch]))
+        elif len(nodes_a):
+            frontiers.append((nodes_a, nodes_b))
+    if closest[0] is None:
+        return np.inf, None, None
+    return best, closest[0], closest[1]
+
+
+def penetration(a: MeshBvh, b: MeshBvh) -> float:
+    """
+    how deep the deepest point sampled from the surface of either mesh
+    lies inside the other
+    -------
+    arguments:
+        - a, b: the meshes' hierarchies
+    """
+    depth = 0.0
+    for inner, outer in ((a, b), (b, a)):
+        points = inner.surface_samples()
+        points = points[
+            np.all(
+                (points >= outer.lower[outer.root])
+                & (points <= outer.upper[outer.root]),
+                axis=1,
+            )
+        ]
+        if len(points):
+            depth = max(depth, -float(outer.signed_distances(points).min()))
+    return depth
+
+
+@dataclass(frozen=True)
+class Clearance:
+    """
+    the clearance between two parts of an assembly
+    -------
+    arguments:
+        - first, second: the labels of the parts
+        - distance: the smallest distance between the parts' surfaces, 0
+            if they touch or their surfaces cross
+        - penetration: how deep the deepest point sampled from the
+            surface of either part lies inside the other; more than the
+            tessellation tolerance means the parts interfere
+        - first_point, second_point: the closest point of each part
+    """
+
+    first: str
+    second: str
+    distance: float
+    penetration: float
+    first_point: tuple[float, float, float]
+    second_point: tuple[float, float, float]
+
+
+def part_clearance(
+    a: MeshBvh, b: MeshBvh, max_distance: float = np.inf
+) -> Optional[Clearance]:
+    """
+    the clearance between two parts, None if they're further apart than
+    max_distance
+    -------
+    arguments:
+        - a, b: the parts' hierarchies
+        - max_distance: the largest distance worth measuring
+    """
+    distance, point_a, point_b = mesh_distance(a, b, max_distance)
+    # a part entirely inside another doesn't touch its surface
+    contained = bool(
+        a.signed_distances(b.vertices[:1])[0] < 0
+        or b.signed_distances(a.vertices[:1])[0] < 0
+    )
+    if point_a is None:
+        if not contained:
+            return None
+        distance, point_a, point_b = mesh_distance(a, b)
+    depth = 0.0
+    if contained or distance <= EPSILON:
+        depth = penetration(a, b)
+    return Clearance(
+        a.label,
+        b.label,
+        distance,
+        depth,
+        tuple(float(x) for x in point_a),
+        tuple(float(x) for x in point_b),
+    )
+
+
+def assembly_clearances(
+    assembly: Compound,
+    max_distance: float = 1.0,
+    tolerance: float = TESSELLATION_TOLERANCE,
+    angular_tolerance: float = ANGULAR_TOLERANCE,
+) -> list[Clearance]:
+    """
+    the clearance between every pair of parts of an assembly within
+    max_distance of each other, or inside each other
+    -------
+    arguments:
+        - assembly: the Compound (with children) to check
+        - max_distance: the largest distance worth measuring
+        - tolerance: the linear tessellation tolerance
+        - angular_tolerance: the angular tessellation tolerance
+    """
+    hierarchies = [
+        MeshBvh(mesh)
+        for mesh in assembly_meshes(assembly, tolerance, angular_tolerance)
+        if len(mesh.triangles)
+    ]
+    clearances = []
+    for a, b in combinations(hierarchies, 2):
+        if (
+            box_distance(
+                a.lower[a.root],
+                a.upper[a.root],
+                b.lower[b.root],
+                b.upper[b.root],
+            )
+            > max_distance
+        ):
+            continue
+        clearance = part_clearance(a, b, max_distance)
+        if clearance is not None:
+            clearances.append(clearance)
+    return clearances
+
+
+@dataclass(frozen=True)
+class ClearanceRequirement:
+    """
+    the clearance a fit needs between two parts of an assembly
+    -------
+    arguments:
+        - first, second: the labels of the parts
+        - minimum: the smallest gap the fit needs; a negative minimum is
+            a press fit, and how deep the parts may interfere
+    """
+
+    first: str
+    second: str
+    minimum: float
+
+    def matches(self, clearance: Clearance) -> bool:
+        """whether the clearance is between this requirement's parts"""
+        return {clearance.first, clearance.second} == {
+            self.first,
+            self.second,
+        }
+
+    def failure(
+        self, clearance: Optional[Clearance], tolerance: float
+    ) -> Optional[str]:
+        """
+        describes how the clearance fails the requirement, None if it
+        doesn't
+        -------
+        arguments:
+            - clearance: the measured clearance, None if the parts were
+                too far apart to be measured; check_config only asks
+                once it has found both parts in the assembly
+            - tolerance: the measuring error allowed, from the
+                tessellation of both parts
+        """
+        if clearance is None:
+            return None
+        allowed = max(-self.minimum, 0) + tolerance
+        if clearance.penetration > allowed:
+            return (
+                f"{self.first} and {self.second} interfere by "
+                f"{clearance.penetration:.3f} mm "
+                f"(allowed {max(-self.minimum, 0):.3f} mm)"
+            )
+        if clearance.distance < self.minimum - tolerance:
+            return (
+                f"{self.first} and {self.second} are "
+                f"{clearance.distance:.3f} mm apart "
+                f"(needs {self.minimum:.3f} mm)"
+            )
+        return None
+
+
+def bracket_fit(
+    config: BenderConfig,
+) -> tuple[Compound, list[ClearanceRequirement]]:
+    """
+    the filament wheel turning freely between the filament brackets, on
+    its bearing, as BracketAssembly puts them together
+    -------
+    arguments:
+        - config: the configuration to check
+    """
+    assembly = BracketAssembly(config).complete_assembly()
+    # the wheel runs radial_tolerance inside the brackets' walls, and its
+    # supports leave half the lateral tolerance each side of it
+    wheel_gap = min(
+        config.wheel.radial_tolerance, config.wheel.lateral_tolerance / 2
+    )
+    return assembly, [
+        ClearanceRequirement("filament wheel", "bottom bracket", wheel_gap),
+        ClearanceRequirement("filament wheel", "top bracket", wheel_gap),
+        ClearanceRequirement("bearing", "filament wheel", 0),
+        ClearanceRequirement("bearing", "bottom bracket", 0),
+        ClearanceRequirement("bearing", "top bracket", 0),
+    ]
+
+
+def lock_pin_fit(
+    config: BenderConfig,
+) -> tuple[Compound, list[ClearanceRequirement]]:
+    """
+    the lock pin sliding through the top frame. Building the whole frame
+    is slow, so the pin is checked against a block around it with the
+    frame's own pin cuts taken out
+    -------
+    arguments:
+        - config: the configuration to check
+    """
+    frame_config = config.frame_config
+    pin = LockPin(config.lock_pin_config).lock_pin(
+        inset=config.frame_lock_pin_tolerance / 2, tie_loop=False
+    )
+    pin = pin.move(
+        Location(
+            (
+                frame_config.lock_pin_point.x,
+                0,
+                frame_config.lock_pin_point.y
+                + frame_config.base_depth
+                + config.frame_lock_pin_tolerance / 2,
+            )
+        )
+    )
+    pin.label = "lock pin"
+    bounds = pin.bounding_box()
+    margin = frame_config.minimum_structural_thickness
+    frame = Box(
+        bounds.size.X + margin * 2,
+        frame_config.exterior_width,
+        bounds.size.Z + margin * 2,
+    ).moved(Location(bounds.center())) - TopFrame(frame_config)._pin_cuts()
+    frame.label = "top frame"
+    return Compound(children=[frame, pin]), [
+        ClearanceRequirement("lock pin", "top frame", 0)
+    ]
+
+
+def tongue_groove_fit(
+    config: BenderConfig,
+) -> tuple[Compound, list[ClearanceRequirement]]:
+    """
+    a guidewall's tongue snapped into the top frame's groove. The groove
+    is cut from a block around it rather than from the whole frame, which
+    is slow to build
+    -------
+    arguments:
+        - config: the configuration to check
+    """
+    guidewall_config = config.guidewall_config
+    frame_config = config.frame_config
+    wall_tongue = tongue(
+        guidewall_config.wall_thickness,
+        guidewall_config.tongue_width,
+        guidewall_config.tongue_depth,
+        0,
+        guidewall_config.click_fit_distance,
+        guidewall_config.click_fit_radius,
+    )
+    wall_tongue.label = "tongue"
+    frame_groove = groove(
+        frame_config.wall_thickness,
+        frame_config.interior_width,
+        frame_config.groove_depth,
+        frame_config.tolerance,
+        frame_config.click_fit_distance,
+        frame_config.click_fit_radius,
+    ).mirror()
+    bounds = frame_groove.bounding_box()
+    margin = frame_config.minimum_structural_thickness
+    height = bounds.max.Z + margin
+    frame = (
+        Box(
+            bounds.size.X + margin * 2,
+            bounds.size.Y + margin * 2,
+            height,
+        ).moved(Location((bounds.center().X, bounds.center().Y, height / 2)))
+        - frame_groove
+    )
+    frame.label = "top frame"
+    # the guidewall's tongue is built without a tolerance, so the cut
+    # down its center grips the groove's alignment key by the tolerance
+    return Compound(children=[frame, wall_tongue]), [
+        ClearanceRequirement("tongue", "top frame", -config.tolerance)
+    ]
+
+
+CLEARANCE_CHECKS: dict[
+    str,
+    Callable[[BenderConfig], tuple[Compound, list[ClearanceRequirement]]],
+] = {
+    "bracket": bracket_fit,
+    "lock pin": lock_pin_fit,
+    "tongue and groove": tongue_groove_fit,
+}
+
+
+def check_config(
+    config: BenderConfig,
+    checks: Optional[list[str]] = None,
+    tolerance: float = TESSELLATION_TOLERANCE,
+) -> list[str]:
+    """
+    runs the clearance checks for a configuration, returning a
+    description of each failure; a requirement naming a part the
+    assembly doesn't have (renamed or left out) fails rather than
+    silently passing
+    -------
+    arguments:
+        - config: the configuration to check
+        - checks: the names of the CLEARANCE_CHECKS to run, all if None
+        - tolerance: the linear tessellation tolerance
+    """
+    failures = []
+    for name in checks or CLEARANCE_CHECKS:
+        assembly, requirements = CLEARANCE_CHECKS[name](config)
+        clearances = assembly_clearances(
+            assembly,
+            max_distance=max(max(r.minimum for r in requirements), 0) + 1,
+            tolerance=tolerance,
+        )
+        labels = {shape.label for shape, _, _ in assembly_leaves(assembly)}
+        for requirement in requirements:
+            missing = [
+                label
+                for label in (requirement.first, requirement.second)
+                if label not in labels
+            ]
+            if missing:
+                failures.append(
+                    f"{name}: no part labelled {' or '.join(missing)} to "
+                    f"check {requirement.first} and {requirement.second}"
+                )
+                continue
+            failure = requirement.failure(
+                next(
+                    (c for c in clearances if requirement.matches(c)), None
+                ),
+                tolerance * 2,
+            )
+            if failure is not None:
+                failures.append(f"{name}: {failure}")
+    return failures
+
+
+if __name__ == "__main__":
+    import sys
+    from argparse import ArgumentParser
+    from pathlib import Path
+    from time import perf_counter
+
+    parser = ArgumentParser(
+        description="Check the clearances of the parts which fit together"
+    )
+    parser.add_argument(
+        "configs",
+        nargs="*",
+        type=Path,
+        default=sorted(
+            (Path(__file__).parent / "../build-configs").glob("*.conf")
+        ),
+        help="the configurations to check, every build config by default",
+    )
+    parser.add_argument(
+        "--check",
+        action="append",
+        choices=list(CLEARANCE_CHECKS),
+        help="a check to run, repeatable; all checks by default",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for config_path in args.configs:
+        start_time = perf_counter()
+        config_failures = check_config(BenderConfig(config_path), args.check)
+        print(
+            f"{config_path.name}: {len(config_failures)} failures in "
+            f"{perf_counter() - start_time:.1f} seconds"
+        )
+        for config_failure in config_failures:
+            print(f"  {config_failure}")
+        failed = failed or bool(config_failures)
+    sys.exit(1 if failed else 0)
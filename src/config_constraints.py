@@ -0,0 +1,380 @@
+"""
+declarative pre-flight checks for a BenderConfig
+
+every geometric precondition the part generators rely on is expressed as a
+Constraint comparing two values derived from the configuration, so a
+broken configuration can be rejected (with every problem listed) before any
+geometry is generated.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from math import isfinite
+from operator import ge, gt, le, lt
+from typing import Any, Callable, Iterable, Optional
+
+from bender_config import BenderConfig
+
+
+class Comparison(Enum):
+    """the relationship required between the two sides of a Constraint"""
+
+    GREATER = (">", gt)
+    GREATER_OR_EQUAL = (">=", ge)
+    LESS = ("<", lt)
+    LESS_OR_EQUAL = ("<=", le)
+
+    @property
+    def symbol(self) -> str:
+        return self.value[0]
+
+    def holds(self, left: float, right: float) -> bool:
+        return self.value[1](left, right)
+
+
+@dataclass(frozen=True)
+class Constraint:
+    """
+    a single precondition on a BenderConfig
+    -------
+    arguments:
+        - name: a short identifier for the constraint
+        - left: the value under test, as a function of the configuration
+            (and of each item when `items` is set)
+        - comparison: the relationship that must hold
+        - right: the limit, as a function of the configuration (and item)
+        - description: why the constraint exists
+        - items: optional function returning (label, item) pairs, the
+            constraint is checked once for each item (e.g. each connector)
+    """
+
+    name: str
+    left: Callable[..., float]
+    comparison: Comparison
+    right: Callable[..., float]
+    description: str
+    items: Optional[Callable[[BenderConfig], Iterable[tuple[str, Any]]]] = (
+        None
+    )
+
+    def violations(
+        self, config: BenderConfig
+    ) -> list["ConstraintViolation"]:
+        """
+        evaluates the constraint and returns any violations
+        -------
+        arguments:
+            - config: the BenderConfig to check
+        """
+        if self.items is None:
+            subjects = [("", ())]
+        else:
+            subjects = [
+                (label, (item,)) for label, item in self.items(config)
+            ]
+        violations = []
+        for label, item in subjects:
+            try:
+                left = self.left(config, *item)
+                right = self.right(config, *item)
+            except (ArithmeticError, ValueError, TypeError, IndexError) as e:
+                violations.append(
+                    ConstraintViolation(
+                        self.name,
+                        label,
+                        f"could not be evaluated: {e}",
+                    )
+                )
+                continue
+            if not (
+                isfinite(left)
+                and isfinite(right)
+                and self.comparison.holds(left, right)
+            ):
+                violations.append(
+                    ConstraintViolation(
+                        self.name,
+                        label,
+                        f"{left:g} must be {self.comparison.symbol} "
+                        f"{right:g}: {self.description}",
+                    )
+                )
+        return violations
+
+
+@dataclass(frozen=True)
+class ConstraintViolation:
+    """a failed Constraint, as reported by validate_config"""
+
+    constraint: str
+    subject: str
+    message: str
+
+    def __str__(self) -> str:
+        subject = f" [{self.subject}]" if self.subject else ""
+        return f"{self.constraint}{subject}: {self.message}"
+
+
+class ConfigConstraintError(ValueError):
+    """raised by check_config when a configuration violates constraints"""
+
+    def __init__(self, violations: list[ConstraintViolation]):
+        self.violations = violations
+        super().__init__(
+            "invalid configuration:\n"
+            + "\n".join(f"\t{violation}" for violation in violations)
+        )
+
+
+def _connectors(config: BenderConfig) -> list[tuple[str, Any]]:
+    return [(connector.name, connector) for connector in config.connectors]
+
+
+def _alternate_connectors(config: BenderConfig) -> list[tuple[str, Any]]:
+    return [
+        (connector.name, connector) for connector in config.connectors[1:]
+    ]
+
+
+def _filament_counts(config: BenderConfig) -> list[tuple[str, int]]:
+    return [
+        (f"{count} filaments", count)
+        for count in [config.filament_count]
+        + list(config.alternate_filament_counts)
+    ]
+
+
+BENDER_CONSTRAINTS: list[Constraint] = [
+    Constraint(
+        "connectors",
+        lambda c: len(c.connectors),
+        Comparison.GREATER_OR_EQUAL,
+        lambda c: 1,
+        "at least one connector must be configured",
+    ),
+    Constraint(
+        "filament_count",
+        lambda c, count: count,
+        Comparison.GREATER_OR_EQUAL,
+        lambda c, count: 1,
+        "every frame needs at least one filament chamber",
+        items=_filament_counts,
+    ),
+    Constraint(
+        "minimum_structural_thickness",
+        lambda c: c.minimum_structural_thickness,
+        Comparison.GREATER,
+        lambda c: 0,
+        "structural elements must have a positive thickness",
+    ),
+    Constraint(
+        "minimum_thickness",
+        lambda c: c.minimum_thickness,
+        Comparison.GREATER,
+        lambda c: 0,
+        "non-structural elements must have a positive thickness",
+    ),
+    Constraint(
+        "wall_thickness",
+        lambda c: c.wall_thickness,
+        Comparison.GREATER,
+        lambda c: 0,
+        "the walls must have a positive thickness",
+    ),
+    Constraint(
+        "tolerance",
+        lambda c: c.tolerance,
+        Comparison.GREATER_OR_EQUAL,
+        lambda c: 0,
+        "part clearances cannot be negative",
+    ),
+    Constraint(
+        "fillet_ratio",
+        lambda c: c.fillet_ratio,
+        Comparison.GREATER,
+        lambda c: 2,
+        "the bracket fillets would consume the entire bracket depth",
+    ),
+    Constraint(
+        "wheel_spokes",
+        lambda c: c.wheel.radius - c.wheel.bearing.depth,
+        Comparison.GREATER,
+        lambda c: c.wheel.bearing.radius + c.wheel.bearing.depth,
+        "the wheel rim and bearing hub leave no room for the spokes",
+    ),
+    Constraint(
+        "wheel_spoke_count",
+        lambda c: c.wheel.spoke_count,
+        Comparison.GREATER_OR_EQUAL,
+        lambda c: 1,
+        "the wheel needs at least one spoke",
+    ),
+    Constraint(
+        "bearing_inner_diameter",
+        lambda c: c.wheel.bearing.inner_diameter,
+        Comparison.LESS,
+        lambda c: c.wheel.bearing.shelf_diameter,
+        "the bearing shelf must be wider than the axle",
+    ),
+    Constraint(
+        "bearing_shelf_diameter",
+        lambda c: c.wheel.bearing.shelf_diameter,
+        Comparison.LESS,
+        lambda c: c.wheel.bearing.diameter,
+        "the bearing shelf must fit inside the bearing",
+    ),
+    Constraint(
+        "print_in_place_bearing",
+        lambda c: c.wheel.bearing.diameter - c.wheel.bearing.inner_radius,
+        Comparison.GREATER_OR_EQUAL,
+        lambda c: c.wheel.bearing.depth / 2,
+        "the wheel is also built with a print-in-place bearing, "
+        "which needs outer_radius - inner_radius >= height / 2",
+    ),
+    Constraint(
+        "wheel_support_height",
+        lambda c: c.wheel_support_height,
+        Comparison.GREATER,
+        lambda c: 0,
+        "the bracket is too shallow to support the wheel",
+    ),
+    Constraint(
+        "connector_diameter",
+        lambda c, connector: connector.diameter + c.minimum_thickness * 2,
+        Comparison.LESS_OR_EQUAL,
+        lambda c, connector: c.bracket_depth,
+        "the connector is wider than the bracket; "
+        "raise minimum_bracket_depth",
+        items=_connectors,
+    ),
+    Constraint(
+        "tube_diameter",
+        lambda c, connector: connector.tube.outer_diameter
+        + c.minimum_thickness * 2,
+        Comparison.LESS_OR_EQUAL,
+        lambda c, connector: c.bracket_depth,
+        "the tube is wider than the bracket; raise minimum_bracket_depth",
+        items=_connectors,
+    ),
+    Constraint(
+        "tube_wall",
+        lambda c, connector: connector.tube.inner_diameter,
+        Comparison.LESS,
+        lambda c, connector: connector.tube.outer_diameter,
+        "the tube's inner diameter must be smaller than its outer diameter",
+        items=_connectors,
+    ),
+    Constraint(
+        "connector_file_suffix",
+        lambda c, connector: len(connector.file_suffix or ""),
+        Comparison.GREATER,
+        lambda c, connector: 0,
+        "alternate connectors need a file_suffix to name their brackets",
+        items=_alternate_connectors,
+    ),
+    Constraint(
+        "sidewall_straight_depth",
+        lambda c: c.sidewall_straight_depth,
+        Comparison.GREATER,
+        lambda c: c.wall_thickness / 2,
+        "frame_chamber_depth is too small for the wheel and frame; "
+        "the sidewall and guidewall have no straight section",
+    ),
+    Constraint(
+        "frame_base_depth",
+        lambda c: c.frame_base_depth,
+        Comparison.LESS,
+        lambda c: c.frame_bracket_exterior_radius,
+        "the frame base is deeper than the bracket curve",
+    ),
+    Constraint(
+        "frame_clip_point",
+        lambda c: c.frame_clip_point.x,
+        Comparison.GREATER,
+        lambda c: 0,
+        "the frame clip does not intersect the bracket curve",
+    ),
+    Constraint(
+        "lock_pin_point",
+        lambda c: c.lock_pin_point.x,
+        Comparison.GREATER,
+        lambda c: c.wheel.radius,
+        "the lock pin does not fit between the wheel and the bracket curve",
+    ),
+    Constraint(
+        "frame_lock_pin_tolerance",
+        lambda c: c.frame_lock_pin_tolerance,
+        Comparison.LESS,
+        lambda c: c.minimum_structural_thickness,
+        "the lock pin tolerance consumes the entire lock pin",
+    ),
+    Constraint(
+        "frame_click_sphere_radius",
+        lambda c: c.frame_click_sphere_radius,
+        Comparison.LESS,
+        lambda c: c.minimum_structural_thickness,
+        "the click fit spheres do not fit within the frame",
+    ),
+    Constraint(
+        "wall_window_bar_thickness",
+        lambda c: c.wall_window_bar_thickness,
+        Comparison.LESS,
+        lambda c: c.wall_window_apothem * 2,
+        "the hex bars leave no window in the walls",
+    ),
+    Constraint(
+        "chamber_cut_length",
+        lambda c: c.chamber_cut_length,
+        Comparison.GREATER,
+        lambda c: 0,
+        "the frame chambers have no interior length",
+    ),
+]
+
+
+def validate_config(
+    config: BenderConfig, constraints: Optional[list[Constraint]] = None
+) -> list[ConstraintViolation]:
+    """
+    evaluates every constraint against a configuration and returns
+    all violations found (an empty list for a valid configuration)
+    -------
+    arguments:
+        - config: the BenderConfig to check
+        - constraints: the constraints to check, BENDER_CONSTRAINTS
+            if not specified
+    """
+    if constraints is None:
+        constraints = BENDER_CONSTRAINTS
+    violations = []
+    for constraint in constraints:
+        violations.extend(constraint.violations(config))
+    return violations
+
+
+def check_config(
+    config: BenderConfig, constraints: Optional[list[Constraint]] = None
+):
+    """
+    raises a ConfigConstraintError listing every violation if the
+    configuration fails any constraint
+    -------
+    arguments:
+        - config: the BenderConfig to check
+        - constraints: the constraints to check, BENDER_CONSTRAINTS
+            if not specified
+    """
+    violations = validate_config(config, constraints)
+    if violations:
+        raise ConfigConstraintError(violations)
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    config_dir = Path(__file__).parent / "../build-configs"
+    for config_path in sorted(config_dir.glob("*.conf")):
+        violations = validate_config(BenderConfig(config_path))
+        print(f"{config_path.name}: {len(violations)} violation(s)")
+        for violation in violations:
+            print(f"\t{violation}")
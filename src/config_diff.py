@@ -0,0 +1,244 @@
+"""
+compares two configuration files and reports which derived part
+configurations and which output files a change would affect,
+without generating any geometry
+
+usage: python config_diff.py ../build-configs/release.conf my.conf
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from enum import Enum
+from math import isclose
+from pathlib import Path
+from typing import Any
+
+from bender_config import BenderConfig
+from build_plan import build_plan
+from config_snapshot import ConfigSnapshot, snapshot
+
+# fields which only control where and how a part is written, rather than
+# the geometry it produces; output paths are compared separately
+OUTPUT_FIELDS = frozenset(
+    (
+        "stl_folder",
+        "file_prefix",
+        "file_suffix",
+        "create_folders_if_missing",
+        "yaml_tree",
+    )
+)
+
+
+def flatten_config(config: Any, prefix: str = "") -> dict[str, Any]:
+    """
+    flattens a (nested) configuration into a dictionary of dotted
+    field names and plain values, omitting OUTPUT_FIELDS
+    -------
+    arguments:
+        - config: the configuration (or configuration snapshot) to flatten
+        - prefix: the name prepended to each field name
+    """
+    values = {}
+    for field_name, value in snapshot(config).items():
+        if field_name in OUTPUT_FIELDS:
+            continue
+        name = f"{prefix}{field_name}"
+        if isinstance(value, ConfigSnapshot):
+            values.update(flatten_config(value, f"{name}."))
+        elif isinstance(value, tuple):
+            values[f"{name}.count"] = len(value)
+            for index, item in enumerate(value):
+                if isinstance(item, ConfigSnapshot):
+                    values.update(flatten_config(item, f"{name}[{index}]."))
+                else:
+                    values[f"{name}[{index}]"] = item
+        else:
+            values[name] = value
+    return values
+
+
+def _same(a: Any, b: Any) -> bool:
+    if (
+        isinstance(a, (int, float))
+        and isinstance(b, (int, float))
+        and not isinstance(a, (bool, Enum))
+        and not isinstance(b, (bool, Enum))
+    ):
+        return isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def diff_values(
+    a: dict[str, Any], b: dict[str, Any]
+) -> dict[str, tuple[Any, Any]]:
+    """
+    returns the {name: (a value, b value)} pairs which differ between two
+    flattened configurations; missing values are reported as None
+    """
+    return {
+        name: (a.get(name), b.get(name))
+        for name in sorted(a.keys() | b.keys())
+        if name not in a or name not in b or not _same(a[name], b[name])
+    }
+
+
+def derived_part_configs(config: BenderConfig) -> dict[str, Any]:
+    """
+    every part configuration BenderConfig derives, keyed by the name
+    of the property or method that produces it
+    """
+    part_configs = {
+        "sidewall_config": config.sidewall_config,
+        "guidewall_config": config.guidewall_config,
+        "frame_config": config.frame_config,
+        "hanging_bracket_config": config.hanging_bracket_config,
+        "lock_pin_config": config.lock_pin_config,
+    }
+    for index in range(len(config.connectors)):
+        part_configs[f"filament_bracket_config({index})"] = (
+            config.filament_bracket_config(index)
+        )
+    return part_configs
+
+
+def output_fingerprints(config: BenderConfig) -> dict[str, tuple]:
+    """
+    maps every stl the configuration builds (relative to its stl_folder)
+    to the part class and flattened configuration that produces it
+    """
+    fingerprints = {}
+    for job in build_plan(config):
+        fingerprint = (job.part_class, flatten_config(job.config))
+        for output in job.relative_output_files(config.stl_folder):
+            fingerprints[output] = fingerprint
+    return fingerprints
+
+
+@dataclass
+class ConfigDiff:
+    """
+    the differences between two BenderConfigs
+    -------
+    arguments:
+        - config_changes: changed BenderConfig fields
+        - part_changes: changed fields of each derived part configuration
+        - changed_files: output files built by both configurations
+            whose geometry changes
+        - added_files: output files only built by the second configuration
+        - removed_files: output files only built by the first configuration
+        - unchanged_files: the number of output files that are unaffected
+    """
+
+    config_changes: dict[str, tuple[Any, Any]] = field(default_factory=dict)
+    part_changes: dict[str, dict[str, tuple[Any, Any]]] = field(
+        default_factory=dict
+    )
+    changed_files: list[str] = field(default_factory=list)
+    added_files: list[str] = field(default_factory=list)
+    removed_files: list[str] = field(default_factory=list)
+    unchanged_files: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (
+            self.config_changes
+            or self.part_changes
+            or self.changed_files
+            or self.added_files
+            or self.removed_files
+        )
+
+    def report(self) -> str:
+        """a human readable summary of the differences"""
+        if self.empty:
+            return "no differences"
+        lines = []
+        if self.config_changes:
+            lines.append("configuration changes:")
+            lines.extend(
+                f"\t{name}: {_plain(a)} -> {_plain(b)}"
+                for name, (a, b) in self.config_changes.items()
+            )
+        for part, changes in self.part_changes.items():
+            lines.append(f"{part} changes:")
+            lines.extend(
+                f"\t{name}: {_plain(a)} -> {_plain(b)}"
+                for name, (a, b) in changes.items()
+            )
+        for title, files in (
+            ("changed files", self.changed_files),
+            ("added files", self.added_files),
+            ("removed files", self.removed_files),
+        ):
+            if files:
+                lines.append(f"{title} ({len(files)}):")
+                lines.extend(f"\t{file}" for file in files)
+        lines.append(f"unchanged files: {self.unchanged_files}")
+        return "\n".join(lines)
+
+
+def _plain(value: Any) -> str:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def diff_configs(a: BenderConfig, b: BenderConfig) -> ConfigDiff:
+    """
+    compares two configurations
+    -------
+    arguments:
+        - a: the original configuration
+        - b: the changed configuration
+    """
+    diff = ConfigDiff(
+        config_changes=diff_values(flatten_config(a), flatten_config(b))
+    )
+
+    a_parts = derived_part_configs(a)
+    b_parts = derived_part_configs(b)
+    for name in list(a_parts) + [p for p in b_parts if p not in a_parts]:
+        changes = diff_values(
+            flatten_config(a_parts[name]) if name in a_parts else {},
+            flatten_config(b_parts[name]) if name in b_parts else {},
+        )
+        if changes:
+            diff.part_changes[name] = changes
+
+    a_outputs = output_fingerprints(a)
+    b_outputs = output_fingerprints(b)
+    for output, fingerprint in a_outputs.items():
+        if output not in b_outputs:
+            diff.removed_files.append(output)
+        elif fingerprint[0] != b_outputs[output][0] or diff_values(
+            fingerprint[1], b_outputs[output][1]
+        ):
+            diff.changed_files.append(output)
+        else:
+            diff.unchanged_files += 1
+    diff.added_files = [
+        output for output in b_outputs if output not in a_outputs
+    ]
+    return diff
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    parser = ArgumentParser(
+        description="List the parts and output files affected by "
+        "the differences between two configuration files"
+    )
+    parser.add_argument("original", type=Path)
+    parser.add_argument("changed", type=Path)
+    args = parser.parse_args()
+
+    start_time = perf_counter()
+    config_diff = diff_configs(
+        BenderConfig(args.original), BenderConfig(args.changed)
+    )
+    print(config_diff.report())
+    print(f"compared in {(perf_counter() - start_time) * 1000:.1f} ms")
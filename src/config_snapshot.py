@@ -0,0 +1,185 @@
+"""
+immutable, hashable snapshots of configuration dataclasses
+
+a snapshot captures every field of a PartomaticConfig, BenderConfig (or
+any other dataclass) at a point in time. Nested configurations become
+nested snapshots and lists become tuples, so a snapshot can be used
+directly as a dictionary or cache key. `evolve` returns a changed copy
+which shares every unchanged nested snapshot with the original, and
+`thaw` builds a fresh, independent mutable configuration when a part
+needs one.
+"""
+
+from dataclasses import FrozenInstanceError, fields, is_dataclass
+from typing import Any
+from weakref import WeakValueDictionary
+
+from derived_property import ObservableConfig
+
+# equal snapshots are interned, so repeated snapshots of unchanged
+# configurations share the same objects
+_interned: WeakValueDictionary = WeakValueDictionary()
+
+
+class ConfigSnapshot:
+    """
+    a frozen view of a configuration's fields; use `snapshot(config)`
+    rather than instantiating this directly
+    -------
+    arguments:
+        - config_class: the class of the captured configuration
+        - items: (field name, frozen value) pairs
+    """
+
+    __slots__ = ("_config_class", "_items", "_values", "_hash", "__weakref__")
+
+    def __init__(self, config_class: type, items: tuple[tuple[str, Any], ...]):
+        object.__setattr__(self, "_config_class", config_class)
+        object.__setattr__(self, "_items", items)
+        object.__setattr__(self, "_values", dict(items))
+        object.__setattr__(self, "_hash", hash((config_class, items)))
+
+    @property
+    def config_class(self) -> type:
+        return self._config_class
+
+    @property
+    def field_names(self) -> tuple[str, ...]:
+        return tuple(name for name, _ in self._items)
+
+    def items(self) -> tuple[tuple[str, Any], ...]:
+        """the (field name, frozen value) pairs of the snapshot"""
+        return self._items
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self._config_class.__name__} snapshot has no field '{name}'"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, ConfigSnapshot):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self._config_class is other._config_class
+            and self._items == other._items
+        )
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={value!r}" for name, value in self._items)
+        return f"{self._config_class.__name__}Snapshot({values})"
+
+    def __copy__(self) -> "ConfigSnapshot":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "ConfigSnapshot":
+        return self
+
+    def __reduce__(self):
+        return (_restore, (self._config_class, self._items))
+
+    def evolve(self, **changes) -> "ConfigSnapshot":
+        """
+        returns a snapshot with the given fields replaced; unchanged
+        fields (including nested snapshots) are shared with this one
+        -------
+        arguments:
+            - **changes: the new values, by field name
+        """
+        unknown = changes.keys() - self._values.keys()
+        if unknown:
+            raise TypeError(
+                f"{self._config_class.__name__} has no field(s) "
+                f"{', '.join(sorted(unknown))}"
+            )
+        return _intern(
+            ConfigSnapshot(
+                self._config_class,
+                tuple(
+                    (
+                        name,
+                        _freeze(changes[name]) if name in changes else value,
+                    )
+                    for name, value in self._items
+                ),
+            )
+        )
+
+    def thaw(self) -> Any:
+        """
+        builds a new mutable configuration from the snapshot; the result
+        (including every nested configuration) shares no state with any
+        other thawed configuration
+        """
+        # configurations are rebuilt the way copy and pickle rebuild them,
+        # without re-running their constructors' default handling
+        values = {name: _thaw(value) for name, value in self._items}
+        config = self._config_class.__new__(self._config_class)
+        if isinstance(config, ObservableConfig):
+            config.__setstate__(values)
+        else:
+            config.__dict__.update(values)
+        return config
+
+
+def _restore(
+    config_class: type, items: tuple[tuple[str, Any], ...]
+) -> ConfigSnapshot:
+    return _intern(ConfigSnapshot(config_class, items))
+
+
+def _intern(config_snapshot: ConfigSnapshot) -> ConfigSnapshot:
+    return _interned.setdefault(config_snapshot, config_snapshot)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, ConfigSnapshot):
+        return value
+    if is_dataclass(value) and not isinstance(value, type):
+        return _intern(
+            ConfigSnapshot(
+                type(value),
+                tuple(
+                    (field.name, _freeze(getattr(value, field.name)))
+                    for field in fields(value)
+                ),
+            )
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, ConfigSnapshot):
+        return value.thaw()
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def snapshot(config: Any) -> ConfigSnapshot:
+    """
+    captures the current state of a configuration dataclass
+    -------
+    arguments:
+        - config: the configuration (or an existing snapshot)
+    """
+    if not isinstance(config, ConfigSnapshot) and not is_dataclass(config):
+        raise TypeError(f"cannot snapshot {type(config).__name__}")
+    return _freeze(config)
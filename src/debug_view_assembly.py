@@ -3,6 +3,7 @@ displays aligned critical components of our filament bank design
 useful for documentation and debugging
 """
 
+from functools import cache
 from pathlib import Path
 
 from build123d import (
@@ -33,17 +34,32 @@ from guidewall import Guidewall
 from sidewall_config import WallStyle
 from tongue_groove import tongue_pair, groove_pair
 
-config_path = Path(__file__).parent / "../build-configs/debug.conf"
-if not config_path.exists() or not config_path.is_file():
-    config_path = Path(__file__).parent / "../build-configs/dev.conf"
-_config = BenderConfig(config_path)
-filamentbracket = FilamentBracket(_config.filament_bracket_config())
-topframe = TopFrame(_config.frame_config)
-bottomframe = BottomFrame(_config.frame_config)
-connectorframe = ConnectorFrame(_config.frame_config)
-sidewall = Sidewall(_config.sidewall_config)
-guidewall = Guidewall(_config.guidewall_config)
-lockpin = LockPin(_config.lock_pin_config)
+
+@cache
+def debug_config() -> BenderConfig:
+    """
+    the configuration being debugged: build-configs/debug.conf if it
+    exists, otherwise build-configs/dev.conf; loaded on first use
+    """
+    config_path = Path(__file__).parent / "../build-configs/debug.conf"
+    if not config_path.exists() or not config_path.is_file():
+        config_path = Path(__file__).parent / "../build-configs/dev.conf"
+    return BenderConfig(config_path)
+
+
+@cache
+def _filament_bracket() -> FilamentBracket:
+    return FilamentBracket(debug_config().filament_bracket_config())
+
+
+@cache
+def _top_frame() -> TopFrame:
+    return TopFrame(debug_config().frame_config)
+
+
+@cache
+def _lock_pin() -> LockPin:
+    return LockPin(debug_config().lock_pin_config)
 
 
 def bracket() -> Part:
@@ -51,21 +67,22 @@ def bracket() -> Part:
     returns enough of the filament bracket to help display the frame alignment
     useful in debugging
     """
+    config = debug_config()
     with BuildPart() as fil_bracket:
         add(
-            filamentbracket.bottom_bracket(draft=True)
+            _filament_bracket().bottom_bracket(draft=True)
             .rotate(axis=Axis.X, angle=90)
-            .move(Location((0, _config.bracket_depth / 2, 0)))
+            .move(Location((0, config.bracket_depth / 2, 0)))
         )
         add(
-            filamentbracket.spoke_assembly()
+            _filament_bracket().spoke_assembly()
             .rotate(axis=Axis.X, angle=90)
-            .move(Location((0, _config.bracket_depth / 2, 0)))
+            .move(Location((0, config.bracket_depth / 2, 0)))
         )
         add(
-            filamentbracket.wheel_guide()
+            _filament_bracket().wheel_guide()
             .rotate(axis=Axis.X, angle=90)
-            .move(Location((0, _config.bracket_depth / 2, 0)))
+            .move(Location((0, config.bracket_depth / 2, 0)))
         )
     part = fil_bracket.part
     part.label = "bracket"
@@ -77,7 +94,7 @@ def half_top() -> Part:
     returns half of the top frame
     """
     with BuildPart() as half:
-        add(topframe.top_frame())
+        add(_top_frame().top_frame())
         Box(
             1000,
             1000,
@@ -93,16 +110,17 @@ def clip_test():
     generates a useful part for testing the clip and pin mechanisms;
     the the egress side of the frame and bracket
     """
+    config = debug_config()
     with BuildPart() as testblock:
-        add(topframe.top_frame())
+        add(_top_frame().top_frame())
         with BuildPart(
-            Location((_config.frame_exterior_length / 4, 0, 0)),
+            Location((config.frame_exterior_length / 4, 0, 0)),
             mode=Mode.SUBTRACT,
         ):
             Box(
-                _config.frame_exterior_length,
-                _config.frame_exterior_width,
-                _config.wheel.diameter,
+                config.frame_exterior_length,
+                config.frame_exterior_width,
+                config.wheel.diameter,
                 align=(Align.MAX, Align.CENTER, Align.MIN),
             )
         with BuildPart(
@@ -110,50 +128,50 @@ def clip_test():
                 (
                     0,
                     0,
-                    _config.wheel.radius / 2
-                    + _config.frame_base_depth
-                    + _config.minimum_structural_thickness,
+                    config.wheel.radius / 2
+                    + config.frame_base_depth
+                    + config.minimum_structural_thickness,
                 )
             ),
             mode=Mode.SUBTRACT,
         ):
             Box(
-                _config.frame_exterior_length,
-                _config.frame_exterior_width,
-                _config.wheel.diameter,
+                config.frame_exterior_length,
+                config.frame_exterior_width,
+                config.wheel.diameter,
                 align=(Align.CENTER, Align.CENTER, Align.MIN),
             )
         with BuildPart(
-            Location((_config.frame_exterior_length / 4 + 3, 0, 0))
+            Location((config.frame_exterior_length / 4 + 3, 0, 0))
         ):
             Box(
-                _config.minimum_structural_thickness,
-                _config.frame_exterior_width,
-                _config.wheel.radius / 2
-                + _config.frame_base_depth
-                + _config.minimum_structural_thickness,
+                config.minimum_structural_thickness,
+                config.frame_exterior_width,
+                config.wheel.radius / 2
+                + config.frame_base_depth
+                + config.minimum_structural_thickness,
                 align=(Align.MAX, Align.CENTER, Align.MIN),
             )
             Box(
-                _config.minimum_structural_thickness,
-                _config.frame_exterior_width,
-                _config.frame_base_depth,
+                config.minimum_structural_thickness,
+                config.frame_exterior_width,
+                config.frame_base_depth,
                 align=(Align.MIN, Align.CENTER, Align.MIN),
             )
 
     with BuildPart() as testbracket:
-        add(filamentbracket.bottom_bracket())
+        add(_filament_bracket().bottom_bracket())
         with BuildPart(mode=Mode.SUBTRACT):
             Box(
-                _config.frame_exterior_length,
-                _config.frame_exterior_length,
-                _config.frame_exterior_length,
+                config.frame_exterior_length,
+                config.frame_exterior_length,
+                config.frame_exterior_length,
                 align=(Align.CENTER, Align.MAX, Align.CENTER),
             )
         with BuildPart(
             Location(
                 (
-                    _config.frame_exterior_length / 4 + 3 + _config.tolerance,
+                    config.frame_exterior_length / 4 + 3 + config.tolerance,
                     0,
                     0,
                 )
@@ -161,34 +179,34 @@ def clip_test():
             mode=Mode.SUBTRACT,
         ):
             Box(
-                _config.frame_exterior_length,
-                _config.frame_exterior_width,
-                _config.wheel.diameter,
+                config.frame_exterior_length,
+                config.frame_exterior_width,
+                config.wheel.diameter,
                 align=(Align.MAX, Align.MIN, Align.MIN),
             )
         with BuildPart(
             Location(
                 (
                     0,
-                    _config.wheel.radius / 2
-                    + _config.minimum_structural_thickness,
+                    config.wheel.radius / 2
+                    + config.minimum_structural_thickness,
                     0,
                 )
             ),
             mode=Mode.SUBTRACT,
         ):
             Box(
-                _config.frame_exterior_length,
-                _config.frame_exterior_width,
-                _config.wheel.diameter,
+                config.frame_exterior_length,
+                config.frame_exterior_width,
+                config.wheel.diameter,
                 align=(Align.CENTER, Align.MIN, Align.MIN),
             )
 
     show(
         testblock.part,
-        testbracket.part.move(Location((0, 0, -_config.bracket_depth / 2)))
+        testbracket.part.move(Location((0, 0, -config.bracket_depth / 2)))
         .rotate(Axis.X, 90)
-        .move(Location((0, 0, _config.frame_base_depth))),
+        .move(Location((0, 0, config.frame_base_depth))),
         reset_camera=Camera.KEEP,
     )
     export_stl(testblock.part, "../stl/test-frame.stl")
@@ -237,16 +255,17 @@ def cut_frame_test():
     """
     a view with the placement of the bracket easily visible
     """
+    config = debug_config()
     with BuildPart() as cutframetest:
-        add(topframe.top_frame())
+        add(_top_frame().top_frame())
         with BuildPart(
             Location(
                 (
                     0,
-                    -_config.frame_exterior_width / 2
-                    + _config.wall_thickness
-                    + _config.minimum_structural_thickness
-                    + _config.bracket_depth / 2,
+                    -config.frame_exterior_width / 2
+                    + config.wall_thickness
+                    + config.minimum_structural_thickness
+                    + config.bracket_depth / 2,
                     0,
                 )
             ),
@@ -257,14 +276,14 @@ def cut_frame_test():
             )
     show(
         cutframetest.part,
-        filamentbracket.bottom_bracket()
+        _filament_bracket().bottom_bracket()
         .rotate(Axis.X, 90)
         .move(
             Location(
                 (
-                    _config.frame_hanger_offset + _config.tolerance,
-                    _config.bracket_depth / 2,
-                    _config.frame_base_depth + _config.tolerance,
+                    config.frame_hanger_offset + config.tolerance,
+                    config.bracket_depth / 2,
+                    config.frame_base_depth + config.tolerance,
                 )
             )
         ),
@@ -274,17 +293,18 @@ def cut_frame_test():
 
 def tongue_groove_test():
     """testing the tongue and groove fitting"""
+    config = debug_config()
 
     with BuildPart() as tongue:
         add(
             tongue_pair(
-                tongue_distance=_config.sidewall_width,
-                width=_config.wall_thickness,
-                length=_config.top_frame_interior_width,
-                depth=_config.frame_tongue_depth,
-                tolerance=_config.tolerance,
-                click_fit_distance=_config.click_fit_distance,
-                click_fit_radius=_config.frame_click_sphere_radius,
+                tongue_distance=config.sidewall_width,
+                width=config.wall_thickness,
+                length=config.top_frame_interior_width,
+                depth=config.frame_tongue_depth,
+                tolerance=config.tolerance,
+                click_fit_distance=config.click_fit_distance,
+                click_fit_radius=config.frame_click_sphere_radius,
             ).move(
                 Location(
                     (
@@ -298,13 +318,13 @@ def tongue_groove_test():
     with BuildPart() as groove:
         add(
             groove_pair(
-                groove_distance=_config.sidewall_width,
-                width=_config.wall_thickness,
-                length=_config.top_frame_interior_width,
-                depth=_config.frame_tongue_depth,
-                tolerance=_config.tolerance,
-                click_fit_distance=_config.click_fit_distance,
-                click_fit_radius=_config.frame_click_sphere_radius,
+                groove_distance=config.sidewall_width,
+                width=config.wall_thickness,
+                length=config.top_frame_interior_width,
+                depth=config.frame_tongue_depth,
+                tolerance=config.tolerance,
+                click_fit_distance=config.click_fit_distance,
+                click_fit_radius=config.frame_click_sphere_radius,
             ).mirror()
         )
     show(tongue.part, groove.part, reset_camera=Camera.KEEP)
@@ -407,9 +427,10 @@ def test_tubes():
 
 
 if __name__ == "__main__":
-    gw = Guidewall(_config.guidewall_config)
-    sw = Sidewall(_config.sidewall_config)
-    rswconfig = _config.sidewall_config
+    config = debug_config()
+    gw = Guidewall(config.guidewall_config)
+    sw = Sidewall(config.sidewall_config)
+    rswconfig = config.sidewall_config
     rswconfig.reinforced = True
     rsw = Sidewall(rswconfig)
     gw.compile()
@@ -422,11 +443,11 @@ if __name__ == "__main__":
         .move(
             Location(
                 (
-                    -_config.sidewall_width / 2
-                    - _config.wall_thickness
-                    + _config.frame_hanger_offset,
+                    -config.sidewall_width / 2
+                    - config.wall_thickness
+                    + config.frame_hanger_offset,
                     0,
-                    -_config.sidewall_straight_depth / 2,
+                    -config.sidewall_straight_depth / 2,
                 )
             )
         )
@@ -438,11 +459,11 @@ if __name__ == "__main__":
         .move(
             Location(
                 (
-                    _config.sidewall_width / 2
-                    + _config.wall_thickness
-                    + _config.frame_hanger_offset,
+                    config.sidewall_width / 2
+                    + config.wall_thickness
+                    + config.frame_hanger_offset,
                     0,
-                    -_config.sidewall_straight_depth / 2,
+                    -config.sidewall_straight_depth / 2,
                 )
             )
         )
@@ -453,22 +474,22 @@ if __name__ == "__main__":
         .move(
             Location(
                 (
-                    _config.frame_hanger_offset,
-                    -_config.top_frame_interior_width / 2
-                    - _config.minimum_structural_thickness
-                    - _config.wall_thickness / 2,
+                    config.frame_hanger_offset,
+                    -config.top_frame_interior_width / 2
+                    - config.minimum_structural_thickness
+                    - config.wall_thickness / 2,
                     0,
                 )
             )
         )
     )
 
-    tf = TopFrame(_config.frame_config)
+    tf = TopFrame(config.frame_config)
     tf.compile()
 
     topframe = tf.parts[0].part
 
-    bf = BottomFrame(_config.frame_config)
+    bf = BottomFrame(config.frame_config)
     bf.compile()
     bframe = (
         bf.parts[0]
@@ -478,15 +499,15 @@ if __name__ == "__main__":
                 (
                     0,
                     0,
-                    -_config.sidewall_straight_depth
-                    - _config.frame_connector_depth
-                    - _config.sidewall_straight_depth,
+                    -config.sidewall_straight_depth
+                    - config.frame_connector_depth
+                    - config.sidewall_straight_depth,
                 )
             )
         )
     )
 
-    cf = ConnectorFrame(_config.frame_config)
+    cf = ConnectorFrame(config.frame_config)
     cf.compile()
     cframe = (
         cf.parts[0].part.move(
@@ -494,37 +515,37 @@ if __name__ == "__main__":
                 (
                     0,
                     0,
-                    -_config.sidewall_straight_depth
-                    - _config.frame_connector_depth,
+                    -config.sidewall_straight_depth
+                    - config.frame_connector_depth,
                 )
             )
         ),
     )
 
     bkt = (
-        filamentbracket.bottom_bracket()
+        _filament_bracket().bottom_bracket()
         .rotate(Axis.X, 90)
         .move(
             Location(
                 (
-                    _config.frame_hanger_offset,
-                    _config.bracket_depth / 2,
-                    _config.frame_base_depth,
+                    config.frame_hanger_offset,
+                    config.bracket_depth / 2,
+                    config.frame_base_depth,
                 )
             )
         )
     )
 
-    pin = lockpin.lock_pin(
-        inset=_config.frame_lock_pin_tolerance / 2, tie_loop=True
+    pin = _lock_pin().lock_pin(
+        inset=config.frame_lock_pin_tolerance / 2, tie_loop=True
     ).move(
         Location(
             (
-                _config.lock_pin_point.x + _config.frame_hanger_offset,
-                _config.frame_exterior_width / 2,
-                _config.lock_pin_point.y
-                + _config.frame_base_depth
-                + _config.frame_lock_pin_tolerance / 2,
+                config.lock_pin_point.x + config.frame_hanger_offset,
+                config.frame_exterior_width / 2,
+                config.lock_pin_point.y
+                + config.frame_base_depth
+                + config.frame_lock_pin_tolerance / 2,
             )
         )
     )
@@ -0,0 +1,191 @@
+"""
+dependency-aware memoization for configuration values derived from other
+configuration values
+
+derived values are cached on first access; assigning a field only discards
+the cached values whose getters (directly, or through other derived values
+and methods) read that field. Nested configuration objects notify their
+owners when they change, so `config.wheel.bearing.depth = 5` invalidates
+everything in `config` that reads `wheel`.
+"""
+
+from types import CodeType, FunctionType
+from typing import Any, Callable
+from weakref import ref
+
+_CACHE_ATTRIBUTE = "_derived_cache"
+_OWNERS_ATTRIBUTE = "_derived_owners"
+
+
+class derived_property:
+    """
+    a read only property whose value is memoized on the owning
+    MemoizedConfig instance until one of its inputs is assigned
+    """
+
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance.__dict__.get(_CACHE_ATTRIBUTE)
+        if cache is None:
+            cache = instance.__dict__[_CACHE_ATTRIBUTE] = {}
+        try:
+            return cache[self.name]
+        except KeyError:
+            value = cache[self.name] = self.func(instance)
+            return value
+
+    def __set__(self, instance, value):
+        raise AttributeError(f"derived value {self.name} is read only")
+
+
+def _code_names(code: CodeType) -> set[str]:
+    """
+    every attribute and global name loaded by a code object,
+    including nested comprehensions and generator expressions
+    """
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            names |= _code_names(constant)
+    return names
+
+
+def _referenced_names(member: Any) -> set[str]:
+    """
+    the names read by a class member that may depend on instance state
+    """
+    if isinstance(member, derived_property):
+        return _code_names(member.func.__code__)
+    if isinstance(member, property) and member.fget is not None:
+        return _code_names(member.fget.__code__)
+    if isinstance(member, FunctionType):
+        return _code_names(member.__code__)
+    return set()
+
+
+def _observables(value: Any) -> list["ObservableConfig"]:
+    """the observable configurations held directly by a field value"""
+    if isinstance(value, ObservableConfig):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, ObservableConfig)]
+    return []
+
+
+class ObservableConfig:
+    """
+    mixin for configuration objects that notifies the objects holding them
+    whenever one of their attributes is assigned
+    """
+
+    def _attach_owner(self, owner: "ObservableConfig", field_name: str):
+        owners = self.__dict__.setdefault(_OWNERS_ATTRIBUTE, [])
+        for owner_ref, owner_field in owners:
+            if owner_ref() is owner and owner_field == field_name:
+                return
+        owners.append((ref(owner), field_name))
+
+    def _detach_owner(self, owner: "ObservableConfig", field_name: str):
+        owners = self.__dict__.get(_OWNERS_ATTRIBUTE)
+        if owners:
+            owners[:] = [
+                (owner_ref, owner_field)
+                for owner_ref, owner_field in owners
+                if owner_ref() is not None
+                and not (owner_ref() is owner and owner_field == field_name)
+            ]
+
+    def _attribute_changed(self, name: str):
+        """
+        propagates a change of `name` to every object holding this one
+        -------
+        arguments:
+            - name: the name of the attribute that was assigned
+        """
+        for owner_ref, owner_field in list(
+            self.__dict__.get(_OWNERS_ATTRIBUTE, ())
+        ):
+            owner = owner_ref()
+            if owner is not None:
+                owner._attribute_changed(owner_field)
+
+    def __setattr__(self, name: str, value: Any):
+        if not name.startswith("_derived"):
+            for child in _observables(self.__dict__.get(name)):
+                child._detach_owner(self, name)
+            for child in _observables(value):
+                child._attach_owner(self, name)
+        object.__setattr__(self, name, value)
+        self._attribute_changed(name)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop(_OWNERS_ATTRIBUTE, None)
+        state.pop(_CACHE_ATTRIBUTE, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        for name, value in state.items():
+            for child in _observables(value):
+                child._attach_owner(self, name)
+
+
+class MemoizedConfig(ObservableConfig):
+    """
+    mixin for configuration objects exposing derived_property values;
+    assigning an attribute (or an attribute of a nested ObservableConfig)
+    discards exactly the cached values that depend on it
+    """
+
+    _derived_dependents: dict[str, frozenset[str]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        members = {}
+        for klass in reversed(cls.__mro__):
+            members.update(vars(klass))
+        references = {
+            name: _referenced_names(member)
+            for name, member in members.items()
+            if not name.startswith("__")
+        }
+        dependents = {}
+        for name, member in members.items():
+            if not isinstance(member, derived_property):
+                continue
+            reached = set()
+            pending = [name]
+            while pending:
+                for referenced in references.get(pending.pop(), ()):
+                    if referenced not in reached:
+                        reached.add(referenced)
+                        pending.append(referenced)
+            for referenced in reached:
+                dependents.setdefault(referenced, set()).add(name)
+        cls._derived_dependents = {
+            name: frozenset(derived) for name, derived in dependents.items()
+        }
+
+    def _attribute_changed(self, name: str):
+        cache = self.__dict__.get(_CACHE_ATTRIBUTE)
+        if cache:
+            for derived in self._derived_dependents.get(name, ()):
+                cache.pop(derived, None)
+        super()._attribute_changed(name)
+
+    def invalidate(self):
+        """
+        discards every cached derived value; only required after mutating
+        a container field in place (e.g. appending to a list)
+        """
+        self.__dict__.pop(_CACHE_ATTRIBUTE, None)
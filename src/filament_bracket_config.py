@@ -5,6 +5,7 @@ from typing import List, Optional
 
 import yaml
 
+from derived_property import ObservableConfig
 from fb_library import Point, circular_intersection
 from filament_wheel_config import WheelConfig
 from lock_pin_config import LockPinConfig
@@ -37,7 +38,11 @@ class ChannelPairDirection(Enum):
     STRAIGHT = auto()
 
 
-class TubeConfig(PartomaticConfig):
+# the angle (in degrees) a curved channel turns outwards along the wheel
+CURVED_CHANNEL_ANGLE = 45
+
+
+class TubeConfig(ObservableConfig, PartomaticConfig):
     inner_diameter: float = 3.55
     outer_diameter: float = 6.5
 
@@ -56,7 +61,7 @@ class TubeConfig(PartomaticConfig):
         return self.outer_diameter / 2
 
 
-class ConnectorConfig(PartomaticConfig):
+class ConnectorConfig(ObservableConfig, PartomaticConfig):
     name: str = "connector"
     file_prefix: Optional[str] = None
     file_suffix: Optional[str] = None
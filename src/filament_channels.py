@@ -33,7 +33,11 @@ from build123d import (
 from ocp_vscode import Camera, show
 
 from bender_config import BenderConfig
-from filament_bracket_config import FilamentBracketConfig, ChannelPairDirection
+from filament_bracket_config import (
+    CURVED_CHANNEL_ANGLE,
+    ChannelPairDirection,
+    FilamentBracketConfig,
+)
 from partomatic import AutomatablePart, Partomatic
 from fb_library import (
     twist_snap_connector,
@@ -287,7 +291,7 @@ class FilamentChannels(Partomatic):
                 center=(self._config.wheel.radius, (bridge @ 1).Y),
                 radius=self._config.wheel.radius,
                 start_angle=180,
-                arc_size=-45,
+                arc_size=-CURVED_CHANNEL_ANGLE,
             )
             with BuildLine(
                 Plane(
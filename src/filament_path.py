@@ -0,0 +1,268 @@
+"""
+an analytic model of the filament path through a filament bracket
+
+the path follows the same segments FilamentChannels._curved_filament_line
+builds: each channel runs from a point where the filament leaves the
+wheel tangentially, a curved channel adding a bridge, an arc around the
+wheel's radius and the connector. Between the channels the filament wraps
+half way around the wheel. Sliding bends add friction by the capstan
+equation (tension grows by e^(friction * angle)); the wheel rolls, so its
+wrap is only counted with a separate, usually much smaller, coefficient.
+
+every value may be a float or a NumPy array, so a whole parameter sweep
+is evaluated in a single call without building any geometry
+"""
+
+from dataclasses import dataclass, replace
+from math import pi, radians
+from typing import Union
+
+import numpy as np
+
+from bender_config import BenderConfig
+from filament_bracket_config import CURVED_CHANNEL_ANGLE, ChannelPairDirection
+
+ArrayLike = Union[float, np.ndarray]
+
+# sliding friction of filament in PTFE tube
+DEFAULT_FRICTION = 0.15
+# the wheel turns on a bearing, so wrapping it adds very little tension
+DEFAULT_WHEEL_FRICTION = 0.0
+DEFAULT_FILAMENT_DIAMETER = 1.75
+
+CURVED_CHANNEL_RADIANS = radians(CURVED_CHANNEL_ANGLE)
+
+
+@dataclass(frozen=True)
+class PathGeometry:
+    """
+    the dimensions which determine the filament path; any of them may be
+    arrays, which broadcast against each other
+    -------
+    arguments:
+        - wheel_radius: the radius of the filament wheel
+        - radial_tolerance: the gap around the wheel
+        - minimum_thickness: the minimum wall thickness
+        - minimum_structural_thickness: the minimum structural thickness
+        - minimum_bracket_height: the smallest allowed bracket height
+        - tube_outer_radius: the outer radius of the connector's tube
+        - connector_length: the length of the connector
+    """
+
+    wheel_radius: ArrayLike
+    radial_tolerance: ArrayLike
+    minimum_thickness: ArrayLike
+    minimum_structural_thickness: ArrayLike
+    minimum_bracket_height: ArrayLike
+    tube_outer_radius: ArrayLike
+    connector_length: ArrayLike
+
+    @classmethod
+    def from_bender_config(
+        cls, config: BenderConfig, connector_index: int = 0
+    ) -> "PathGeometry":
+        """
+        the path geometry of a configuration's filament bracket
+        -------
+        arguments:
+            - config: the configuration
+            - connector_index: the connector the bracket is built for
+        """
+        connector = config.connectors[connector_index]
+        return cls(
+            wheel_radius=config.wheel.radius,
+            radial_tolerance=config.wheel.radial_tolerance,
+            minimum_thickness=config.minimum_thickness,
+            minimum_structural_thickness=config.minimum_structural_thickness,
+            minimum_bracket_height=config.minimum_bracket_height,
+            tube_outer_radius=connector.tube.outer_radius,
+            connector_length=connector.length,
+        )
+
+    @property
+    def bracket_height(self) -> ArrayLike:
+        """the bracket height, derived as BenderConfig.bracket_height"""
+        return np.maximum(
+            self.minimum_bracket_height,
+            self.wheel_radius
+            + self.radial_tolerance
+            + self.minimum_structural_thickness * 2,
+        )
+
+    @property
+    def funnel_height(self) -> ArrayLike:
+        """
+        the height of the funnel clearing the wheel, derived as
+        FilamentBracketConfig.filament_funnel_height
+        """
+        return np.sqrt(
+            (
+                self.wheel_radius
+                + self.radial_tolerance
+                + self.minimum_thickness
+            )
+            ** 2
+            - (self.wheel_radius - self.tube_outer_radius) ** 2
+        )
+
+    @property
+    def straight_channel_length(self) -> ArrayLike:
+        """a straight channel runs the full height of the bracket"""
+        return self.bracket_height
+
+    @property
+    def curved_channel_length(self) -> ArrayLike:
+        """the funnel, bridge, arc and connector of a curved channel"""
+        return (
+            self.funnel_height
+            + self.minimum_structural_thickness
+            + self.wheel_radius * CURVED_CHANNEL_RADIANS
+            + self.connector_length
+        )
+
+
+@dataclass(frozen=True)
+class FilamentPath:
+    """
+    the filament path through a bracket
+    -------
+    arguments:
+        - left_length: the length of the left channel
+        - right_length: the length of the right channel
+        - wheel_length: the length of filament wrapped around the wheel
+        - sliding_wrap: the total angle (radians) the filament bends while
+            sliding through the channels
+        - wheel_wrap: the angle (radians) the filament wraps the wheel
+        - friction_multiplier: the ratio of the tension pulling filament
+            out of the bracket to the tension feeding it
+        - bend_strain: the strain of the filament's surface at the
+            tightest bend
+    """
+
+    left_length: ArrayLike
+    right_length: ArrayLike
+    wheel_length: ArrayLike
+    sliding_wrap: ArrayLike
+    wheel_wrap: ArrayLike
+    friction_multiplier: ArrayLike
+    bend_strain: ArrayLike
+
+    @property
+    def length(self) -> ArrayLike:
+        """the total length of the path"""
+        return self.left_length + self.wheel_length + self.right_length
+
+
+def filament_path(
+    geometry: PathGeometry,
+    direction: ChannelPairDirection,
+    friction: ArrayLike = DEFAULT_FRICTION,
+    wheel_friction: ArrayLike = DEFAULT_WHEEL_FRICTION,
+    filament_diameter: ArrayLike = DEFAULT_FILAMENT_DIAMETER,
+) -> FilamentPath:
+    """
+    evaluates the filament path for a channel pair direction
+    -------
+    arguments:
+        - geometry: the path dimensions
+        - direction: the direction of the bracket's channels
+        - friction: the sliding friction coefficient of the channels
+        - wheel_friction: the effective friction coefficient of the wheel
+        - filament_diameter: the diameter of the filament
+    """
+    straight = geometry.straight_channel_length
+    curved = geometry.curved_channel_length
+    left, right = {
+        ChannelPairDirection.LEAN_FORWARD: (straight, curved),
+        ChannelPairDirection.LEAN_REVERSE: (curved, straight),
+        ChannelPairDirection.STRAIGHT: (straight, straight),
+    }[direction]
+    sliding_wrap = (
+        0
+        if direction == ChannelPairDirection.STRAIGHT
+        else CURVED_CHANNEL_RADIANS
+    )
+    wheel_wrap = pi
+    # the arc of a curved channel follows the wheel's radius, so the
+    # tightest bend is always the wheel's
+    bend_strain = filament_diameter / (2 * np.asarray(geometry.wheel_radius))
+    shape = np.broadcast(
+        left, right, friction, wheel_friction, bend_strain
+    ).shape
+    return FilamentPath(
+        left_length=np.broadcast_to(left, shape),
+        right_length=np.broadcast_to(right, shape),
+        wheel_length=np.broadcast_to(
+            geometry.wheel_radius * wheel_wrap, shape
+        ),
+        sliding_wrap=np.broadcast_to(sliding_wrap, shape),
+        wheel_wrap=np.broadcast_to(wheel_wrap, shape),
+        friction_multiplier=np.broadcast_to(
+            np.exp(
+                np.multiply(friction, sliding_wrap)
+                + np.multiply(wheel_friction, wheel_wrap)
+            ),
+            shape,
+        ),
+        bend_strain=np.broadcast_to(bend_strain, shape),
+    )
+
+
+def bracket_paths(
+    config: BenderConfig,
+    friction: float = DEFAULT_FRICTION,
+    wheel_friction: float = DEFAULT_WHEEL_FRICTION,
+    filament_diameter: float = DEFAULT_FILAMENT_DIAMETER,
+) -> dict[tuple[str, ChannelPairDirection], FilamentPath]:
+    """
+    the filament path of every bracket a configuration builds, keyed by
+    connector name and channel pair direction
+    -------
+    arguments:
+        - config: the configuration
+        - friction: the sliding friction coefficient of the channels
+        - wheel_friction: the effective friction coefficient of the wheel
+        - filament_diameter: the diameter of the filament
+    """
+    paths = {}
+    for index, connector in enumerate(config.connectors):
+        geometry = PathGeometry.from_bender_config(config, index)
+        for direction in ChannelPairDirection:
+            paths[(connector.name, direction)] = filament_path(
+                geometry,
+                direction,
+                friction,
+                wheel_friction,
+                filament_diameter,
+            )
+    return paths
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+    from time import perf_counter
+
+    bender_config = BenderConfig(
+        Path(__file__).parent / "../build-configs/release.conf"
+    )
+    print("connector, direction: length, sliding wrap, friction multiplier")
+    for (name, direction), path in bracket_paths(bender_config).items():
+        print(
+            f"{name}, {direction.name}: {float(path.length):.1f} mm, "
+            f"{np.degrees(float(path.sliding_wrap)):.0f} degrees, "
+            f"{float(path.friction_multiplier):.3f}"
+        )
+
+    start_time = perf_counter()
+    sweep = filament_path(
+        replace(
+            PathGeometry.from_bender_config(bender_config),
+            wheel_radius=np.linspace(20, 60, 1000)[:, None],
+        ),
+        ChannelPairDirection.LEAN_FORWARD,
+        friction=np.linspace(0.05, 0.3, 100)[None, :],
+    )
+    print(
+        f"evaluated {sweep.length.size} wheel radius and friction "
+        f"combinations in {(perf_counter() - start_time) * 1000:.1f} ms"
+    )
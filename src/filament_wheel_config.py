@@ -4,8 +4,10 @@ from pathlib import Path
 
 from partomatic import PartomaticConfig
 
+from derived_property import ObservableConfig
 
-class BearingConfig(PartomaticConfig):
+
+class BearingConfig(ObservableConfig, PartomaticConfig):
     diameter: float = 12.1
     inner_diameter: float = 6.1
     shelf_diameter: float = 8.5
@@ -34,7 +36,7 @@ class BearingConfig(PartomaticConfig):
         return self.shelf_diameter / 2
 
 
-class WheelConfig(PartomaticConfig):
+class WheelConfig(ObservableConfig, PartomaticConfig):
     yaml_tree = "wheel"
     diameter: float = 70
     spoke_count: int = 5
@@ -4,6 +4,7 @@ from tongue_groove import groove_pair
 from frame_config import FrameConfig, FrameStyle
 from partomatic import AutomatablePart, Partomatic
 from bender_config import BenderConfig
+from build_stages import build_stage
 
 from dataclasses import asdict
 from pathlib import Path
@@ -308,20 +309,17 @@ class BottomFrame(Partomatic):
                 )
         return dry.part
 
-    def bottom_frame(self) -> Part:
+    @build_stage
+    def _bottom_frame_body(self, offset, extra_length) -> Part:
         """
-        creates the bottom frame
+        the frame block with its chambers, wall slots and grooves cut, which
+        the drybox and screw fittings are added to
         -------
         arguments:
-            - standing: whether the frame is standing or hanging
+            - offset: the interior offset for hanging frames
+            - extra_length: the extra length of a hanging frame's block
         """
-        offset = (
-            self._config.interior_offset
-            if FrameStyle.HANGING in self._config.frame_style
-            else 0
-        )
-        extra_length = offset * 2
-        with BuildPart() as bframe:
+        with BuildPart() as body:
             add(self._bottom_base_block(offset, extra_length))
             if FrameStyle.STANDING in self._config.frame_style:
                 add(
@@ -370,6 +368,23 @@ class BottomFrame(Partomatic):
                         self._config.click_fit_radius,
                     ).mirror()
                 )
+        return body.part
+
+    def bottom_frame(self) -> Part:
+        """
+        creates the bottom frame
+        -------
+        arguments:
+            - standing: whether the frame is standing or hanging
+        """
+        offset = (
+            self._config.interior_offset
+            if FrameStyle.HANGING in self._config.frame_style
+            else 0
+        )
+        extra_length = offset * 2
+        with BuildPart() as bframe:
+            add(self._bottom_frame_body(offset, extra_length))
             if self._config.drybox:
                 add(
                     self._dry_box(
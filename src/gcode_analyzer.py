@@ -0,0 +1,372 @@
+"""
+estimates the filament slack each buffer chamber must absorb while
+printing a multi-material G-code file, and recommends the BenderConfig
+values needed to hold it
+
+when a multi-material unit changes tools it unloads the current filament
+back past its selector, and retractions pull filament back from the
+extruder; the spool doesn't rewind, so that filament is pushed back into
+the filament's buffer chamber until it is loaded (or extruded) again.
+The analyzer tracks the slack held in each chamber through the file and
+reports its peak.
+
+files are read in fixed size blocks, so memory use is constant
+regardless of the size of the file
+
+usage: python gcode_analyzer.py ../tests/gcode/torture-test.gcode
+"""
+
+import re
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from math import ceil, pi
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from bender_config import BenderConfig
+
+# the distance the Prusa MMU3 moves filament between the nozzle and its
+# selector when unloading or loading a tool
+DEFAULT_UNLOAD_LENGTH = 430
+DEFAULT_LOAD_LENGTH = 430
+
+# lines which change the analyzer's state; they are rare, so the moves
+# between them are processed in bulk. Both patterns start with the
+# newline before the line, which the regex engine searches for quickly
+_CONTROL = re.compile(
+    rb"\n[ \t]*(T\d+|M70[12]|M8[23]|G9[0-2])(?!\d)([^;\n]*)"
+)
+_MOVE_E = re.compile(rb"\n[ \t]*G[0-3](?!\d)[^;\nE]*E(-?\d*\.?\d+)")
+_E_VALUE = re.compile(rb"E(-?\d*\.?\d+)")
+
+
+@dataclass
+class ToolUsage:
+    """
+    the filament movements of a single tool
+    -------
+    arguments:
+        - extruded: the total length extruded
+        - retracted: the total length retracted while printing
+        - loads: the number of times the tool was loaded
+        - unloads: the number of times the tool was unloaded
+        - slack: the length currently held in the tool's buffer chamber
+        - peak_slack: the largest length held in the tool's buffer chamber
+    """
+
+    extruded: float = 0
+    retracted: float = 0
+    loads: int = 0
+    unloads: int = 0
+    slack: float = 0
+    peak_slack: float = 0
+
+    def push_back(self, length: float):
+        """filament pushed back towards the buffer"""
+        self.slack += length
+        self.peak_slack = max(self.peak_slack, self.slack)
+
+    def pull(self, length: float):
+        """filament drawn from the buffer (then from the spool)"""
+        self.slack = max(self.slack - length, 0)
+
+    def move(self, lengths: np.ndarray):
+        """
+        a series of extrusions (positive) and retractions (negative)
+        -------
+        arguments:
+            - lengths: the length of each move, in order
+        """
+        self.extruded += float(lengths[lengths > 0].sum())
+        self.retracted -= float(lengths[lengths < 0].sum())
+        # the slack after each move is max(previous slack - length, 0);
+        # unrolled, it's the total pushed back less its lowest point so far
+        pushed = np.cumsum(-lengths)
+        slack = pushed - np.minimum(
+            np.minimum.accumulate(pushed), -self.slack
+        )
+        self.peak_slack = max(self.peak_slack, float(slack.max()))
+        self.slack = float(slack[-1])
+
+
+@dataclass
+class GcodeAnalysis:
+    """
+    the result of analyzing a G-code file
+    -------
+    arguments:
+        - tools: the usage of each tool, by tool number
+        - tool_changes: the number of changes between different tools
+        - lines: the number of lines read
+    """
+
+    tools: dict[int, ToolUsage] = field(default_factory=dict)
+    tool_changes: int = 0
+    lines: int = 0
+
+    @property
+    def peak_slack(self) -> float:
+        """the largest slack any single chamber must hold"""
+        return max(
+            (usage.peak_slack for usage in self.tools.values()), default=0
+        )
+
+    @property
+    def filament_count(self) -> int:
+        """the number of filament channels the file addresses"""
+        return max(self.tools, default=-1) + 1
+
+    def report(self) -> str:
+        """a human readable summary of the analysis"""
+        lines = [
+            f"{self.lines} lines, {self.tool_changes} tool changes",
+            "tool  extruded  retracted  loads  unloads  peak slack",
+        ]
+        lines.extend(
+            f"T{tool:<4}{usage.extruded:>9.1f}{usage.retracted:>11.1f}"
+            f"{usage.loads:>7}{usage.unloads:>9}{usage.peak_slack:>12.1f}"
+            for tool, usage in sorted(self.tools.items())
+        )
+        return "\n".join(lines)
+
+
+class GcodeAnalyzer:
+    """
+    tracks extrusion, retraction and tool changes through a G-code stream
+    -------
+    arguments:
+        - unload_length: the length pushed back when a tool is unloaded
+        - load_length: the length drawn when a tool is loaded
+    """
+
+    def __init__(
+        self,
+        unload_length: float = DEFAULT_UNLOAD_LENGTH,
+        load_length: float = DEFAULT_LOAD_LENGTH,
+    ):
+        self.unload_length = unload_length
+        self.load_length = load_length
+        self.analysis = GcodeAnalysis()
+        self.tool = 0
+        self.loaded = False
+        self.relative_extrusion = False
+        self.extruder_position = 0.0
+
+    def _usage(self, tool: int) -> ToolUsage:
+        if tool not in self.analysis.tools:
+            self.analysis.tools[tool] = ToolUsage()
+        return self.analysis.tools[tool]
+
+    def unload(self):
+        if self.loaded:
+            usage = self._usage(self.tool)
+            usage.unloads += 1
+            usage.push_back(self.unload_length)
+            self.loaded = False
+
+    def load(self):
+        if not self.loaded:
+            usage = self._usage(self.tool)
+            usage.loads += 1
+            usage.pull(self.load_length)
+            self.loaded = True
+
+    def select_tool(self, tool: int):
+        if self.loaded and tool != self.tool:
+            self.unload()
+            self.analysis.tool_changes += 1
+        self.tool = tool
+        self.load()
+
+    def _moves(self, data: bytes, start: int, end: int):
+        values = _MOVE_E.findall(data, start, end)
+        if not values:
+            return
+        positions = np.array(list(map(float, values)))
+        if self.relative_extrusion:
+            lengths = positions
+            self.extruder_position += float(positions.sum())
+        else:
+            lengths = np.diff(positions, prepend=self.extruder_position)
+            self.extruder_position = float(positions[-1])
+        lengths = lengths[lengths != 0]
+        if len(lengths):
+            # filament extruded without a tool change was loaded by hand
+            self.loaded = True
+            self._usage(self.tool).move(lengths)
+
+    def _control(self, command: bytes, arguments: bytes):
+        if command[:1] == b"T":
+            self.select_tool(int(command[1:]))
+        elif command == b"G92":
+            e_value = _E_VALUE.search(arguments)
+            if e_value:
+                self.extruder_position = float(e_value.group(1))
+        elif command in (b"M83", b"G91"):
+            self.relative_extrusion = True
+        elif command in (b"M82", b"G90"):
+            self.relative_extrusion = False
+        elif command == b"M702":
+            self.unload()
+        elif command == b"M701":
+            self.load()
+
+    def feed(self, data: bytes):
+        """
+        processes a block of complete lines of G-code
+        -------
+        arguments:
+            - data: the lines, including any comments
+        """
+        self.analysis.lines += data.count(b"\n") + (
+            1 if data and not data.endswith(b"\n") else 0
+        )
+        data = b"\n" + data
+        position = 0
+        for control in _CONTROL.finditer(data):
+            self._moves(data, position, control.start())
+            self._control(control.group(1), control.group(2))
+            position = control.end()
+        self._moves(data, position, len(data))
+
+    def analyze(
+        self, gcode: BinaryIO, block_size: int = 1 << 23
+    ) -> GcodeAnalysis:
+        """
+        processes a G-code file opened in binary mode, a block at a time
+        -------
+        arguments:
+            - gcode: the file to read
+            - block_size: the number of bytes read at a time
+        """
+        remainder = b""
+        while block := gcode.read(block_size):
+            block = remainder + block
+            end = block.rfind(b"\n") + 1
+            remainder = block[end:]
+            self.feed(block[:end])
+        self.feed(remainder)
+        return self.analysis
+
+
+def analyze_file(
+    path: Path,
+    unload_length: float = DEFAULT_UNLOAD_LENGTH,
+    load_length: float = DEFAULT_LOAD_LENGTH,
+) -> GcodeAnalysis:
+    """
+    analyzes a G-code file
+    -------
+    arguments:
+        - path: the G-code file
+        - unload_length: the length pushed back when a tool is unloaded
+        - load_length: the length drawn when a tool is loaded
+    """
+    with open(path, "rb") as gcode:
+        return GcodeAnalyzer(unload_length, load_length).analyze(gcode)
+
+
+def chamber_capacity(config: BenderConfig) -> float:
+    """
+    the slack a buffer chamber holds: a loop of filament hanging from
+    the wheel down one side of the chamber, across its width in a half
+    turn, and back up the other side
+    -------
+    arguments:
+        - config: the buffer configuration
+    """
+    loop_depth = (
+        config.frame_chamber_depth
+        - config.wheel.radius
+        - config.sidewall_width / 2
+    )
+    return 2 * max(loop_depth, 0) + pi * config.sidewall_width / 2
+
+
+def recommend_config(
+    analysis: GcodeAnalysis,
+    config: BenderConfig,
+    margin: float = 1.2,
+    step: float = 10,
+) -> dict[str, tuple]:
+    """
+    the (current, recommended) value of each BenderConfig field the
+    analysis sizes; fields which are already large enough keep their
+    current value
+    -------
+    arguments:
+        - analysis: the G-code analysis
+        - config: the current buffer configuration
+        - margin: the factor applied to the peak slack
+        - step: frame_chamber_depth is rounded up to a multiple of step
+    """
+    required = analysis.peak_slack * margin
+    chamber_depth = config.frame_chamber_depth
+    if chamber_capacity(config) < required:
+        chamber_depth = (
+            (required - pi * config.sidewall_width / 2) / 2
+            + config.wheel.radius
+            + config.sidewall_width / 2
+        )
+        chamber_depth = ceil(chamber_depth / step) * step
+    return {
+        "filament_count": (
+            config.filament_count,
+            max(config.filament_count, analysis.filament_count),
+        ),
+        "frame_chamber_depth": (config.frame_chamber_depth, chamber_depth),
+    }
+
+
+if __name__ == "__main__":
+    from time import perf_counter
+
+    parser = ArgumentParser(
+        description="Estimate the filament slack each buffer chamber must "
+        "absorb while printing a G-code file"
+    )
+    parser.add_argument("gcode", type=Path)
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=Path(__file__).parent / "../build-configs/release.conf",
+        help="the configuration to check",
+    )
+    parser.add_argument(
+        "--unload-length",
+        type=float,
+        default=DEFAULT_UNLOAD_LENGTH,
+        help="the length of filament pushed back by each unload",
+    )
+    parser.add_argument(
+        "--load-length",
+        type=float,
+        default=DEFAULT_LOAD_LENGTH,
+        help="the length of filament drawn by each load",
+    )
+    args = parser.parse_args()
+
+    start_time = perf_counter()
+    gcode_analysis = analyze_file(
+        args.gcode, args.unload_length, args.load_length
+    )
+    elapsed = perf_counter() - start_time
+    print(gcode_analysis.report())
+    size = args.gcode.stat().st_size
+    print(
+        f"analyzed {size / 1e6:.1f} MB in {elapsed:.2f} seconds "
+        f"({size / 1e6 / max(elapsed, 1e-9):.0f} MB/s)"
+    )
+
+    bender_config = BenderConfig(args.config)
+    print(
+        f"peak slack {gcode_analysis.peak_slack:.0f} mm, chamber capacity "
+        f"{chamber_capacity(bender_config):.0f} mm"
+    )
+    for name, (current, recommended) in recommend_config(
+        gcode_analysis, bender_config
+    ).items():
+        change = "" if current == recommended else " (change)"
+        print(f"{name}: {current} -> {recommended}{change}")
@@ -0,0 +1,358 @@
+"""
+exports build123d shapes and assemblies as binary glTF (glb) models for
+viewing in a browser
+
+every leaf of an assembly becomes a named node with the leaf's label and
+(inherited) color. Each leaf is tessellated at several tolerances to
+provide levels of detail (MSFT_lod), and positions and normals are stored
+as 16 and 8 bit integers (KHR_mesh_quantization), so a complete assembly
+is a small fraction of the size of the equivalent stls.
+"""
+
+import struct
+from dataclasses import dataclass
+from json import dumps
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from build123d import Shape
+from OCP.BRepTools import BRepTools
+from partomatic import Partomatic
+
+from offscreen_renderer import (
+    Mesh,
+    assembly_leaves,
+    tessellate,
+    transform_points,
+)
+
+GLB_MAGIC = 0x46546C67
+JSON_CHUNK = 0x4E4F534A
+BINARY_CHUNK = 0x004E4942
+
+# glTF accessor component types and buffer view targets
+BYTE = 5120
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+POSITION_STEPS = 65535
+NORMAL_STEPS = 127
+
+
+@dataclass(frozen=True)
+class GlbSettings:
+    """
+    the levels of detail written for every shape
+    -------
+    arguments:
+        - lods: the (tolerance, angular tolerance) of each level of detail,
+            from the most to the least detailed
+        - screen_coverage: the fraction of the screen height below which
+            a viewer switches to the next level of detail, one per level
+    """
+
+    lods: tuple[tuple[float, float], ...] = (
+        (0.05, 0.1),
+        (0.25, 0.3),
+        (1.0, 0.6),
+    )
+    screen_coverage: tuple[float, ...] = (0.25, 0.08, 0.0)
+
+
+def _linear(color: tuple[float, float, float]) -> list[float]:
+    """converts an sRGB color to the linear color glTF materials use"""
+    return [
+        round(c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4, 6)
+        for c in color
+    ]
+
+
+def vertex_normals(mesh: Mesh) -> np.ndarray:
+    """
+    area weighted vertex normals; every face of a tessellation has its
+    own vertices, so normals are smooth within faces and sharp at edges
+    """
+    corners = mesh.vertices[mesh.triangles]
+    face_normals = np.cross(
+        corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+    )
+    normals = np.zeros_like(mesh.vertices)
+    for i in range(3):
+        np.add.at(normals, mesh.triangles[:, i], face_normals)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.where(length > 1e-12, normals / np.maximum(length, 1e-12), 0)
+
+
+def shape_lods(
+    shape: Shape,
+    transform: np.ndarray,
+    color: tuple[float, float, float],
+    settings: GlbSettings,
+) -> list[Mesh]:
+    """
+    tessellates a shape at each level of detail, dropping levels which
+    are no coarser than the previous one
+    -------
+    arguments:
+        - shape: the (leaf) shape to tessellate
+        - transform: the 4x4 location of the shape's parents
+        - color: the color of the meshes
+        - settings: the levels of detail
+    """
+    meshes = []
+    # existing triangulations finer than requested are kept by OCCT, so
+    # each level is meshed from scratch
+    for tolerance, angular_tolerance in reversed(settings.lods):
+        BRepTools.Clean_s(shape.wrapped)
+        mesh = tessellate(shape, tolerance, angular_tolerance, color)
+        mesh.vertices = transform_points(mesh.vertices, transform)
+        if not meshes or len(mesh.triangles) > len(meshes[0].triangles):
+            meshes.insert(0, mesh)
+    return meshes
+
+
+class _GlbBuilder:
+    """accumulates the json document and binary buffer of a glb"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.document = {
+            "asset": {"version": "2.0", "generator": "fender-bender"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+            "extensionsUsed": ["KHR_mesh_quantization", "MSFT_lod"],
+            "extensionsRequired": ["KHR_mesh_quantization"],
+        }
+        self.materials: dict[tuple, int] = {}
+
+    def _buffer_view(
+        self, data: bytes, target: int, stride: Optional[int] = None
+    ) -> int:
+        self.buffer.extend(b"\0" * (-len(self.buffer) % 4))
+        view = {
+            "buffer": 0,
+            "byteOffset": len(self.buffer),
+            "byteLength": len(data),
+            "target": target,
+        }
+        if stride:
+            view["byteStride"] = stride
+        self.buffer.extend(data)
+        self.document["bufferViews"].append(view)
+        return len(self.document["bufferViews"]) - 1
+
+    def _accessor(self, view: int, **accessor) -> int:
+        self.document["accessors"].append({"bufferView": view, **accessor})
+        return len(self.document["accessors"]) - 1
+
+    def material(self, color: tuple[float, float, float]) -> int:
+        """the index of the material for a color, added if new"""
+        key = tuple(round(c, 6) for c in color)
+        if key not in self.materials:
+            self.materials[key] = len(self.document["materials"])
+            self.document["materials"].append(
+                {
+                    "name": "#"
+                    + "".join(f"{round(c * 255):02x}" for c in key),
+                    "pbrMetallicRoughness": {
+                        "baseColorFactor": _linear(key) + [1.0],
+                        "metallicFactor": 0.0,
+                        "roughnessFactor": 0.7,
+                    },
+                }
+            )
+        return self.materials[key]
+
+    def mesh_node(self, mesh: Mesh, name: str) -> int:
+        """
+        adds a quantized mesh and the node dequantizing it, returning the
+        index of the node
+        """
+        vertex_count = len(mesh.vertices)
+        low = mesh.vertices.min(axis=0)
+        # a uniform scale keeps the normals' directions unchanged
+        step = max(float(np.ptp(mesh.vertices, axis=0).max()), 1e-9) / (
+            POSITION_STEPS
+        )
+        positions = np.zeros((vertex_count, 4), dtype=np.uint16)
+        positions[:, :3] = np.round((mesh.vertices - low) / step)
+        normals = np.zeros((vertex_count, 4), dtype=np.int8)
+        normals[:, :3] = np.round(vertex_normals(mesh) * NORMAL_STEPS)
+        # the largest index of each type is reserved for primitive restart
+        index_type = (
+            (np.uint16, UNSIGNED_SHORT)
+            if vertex_count < 0xFFFF
+            else (np.uint32, UNSIGNED_INT)
+        )
+
+        position = self._accessor(
+            self._buffer_view(positions.tobytes(), ARRAY_BUFFER, 8),
+            componentType=UNSIGNED_SHORT,
+            count=vertex_count,
+            type="VEC3",
+            min=positions[:, :3].min(axis=0).tolist(),
+            max=positions[:, :3].max(axis=0).tolist(),
+        )
+        normal = self._accessor(
+            self._buffer_view(normals.tobytes(), ARRAY_BUFFER, 4),
+            componentType=BYTE,
+            normalized=True,
+            count=vertex_count,
+            type="VEC3",
+        )
+        indices = self._accessor(
+            self._buffer_view(
+                mesh.triangles.astype(index_type[0]).tobytes(),
+                ELEMENT_ARRAY_BUFFER,
+            ),
+            componentType=index_type[1],
+            count=mesh.triangles.size,
+            type="SCALAR",
+        )
+        self.document["meshes"].append(
+            {
+                "name": name,
+                "primitives": [
+                    {
+                        "attributes": {"POSITION": position, "NORMAL": normal},
+                        "indices": indices,
+                        "material": self.material(mesh.color),
+                    }
+                ],
+            }
+        )
+        self.document["nodes"].append(
+            {
+                "name": name,
+                "mesh": len(self.document["meshes"]) - 1,
+                "translation": low.tolist(),
+                "scale": [step] * 3,
+            }
+        )
+        return len(self.document["nodes"]) - 1
+
+    def add_node(self, node: dict) -> int:
+        self.document["nodes"].append(node)
+        return len(self.document["nodes"]) - 1
+
+    def glb(self) -> bytes:
+        """the complete glb file"""
+        self.buffer.extend(b"\0" * (-len(self.buffer) % 4))
+        self.document["buffers"].append({"byteLength": len(self.buffer)})
+        # glTF doesn't allow empty arrays
+        document = {
+            key: value for key, value in self.document.items() if value != []
+        }
+        json_chunk = dumps(document, separators=(",", ":")).encode()
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        return b"".join(
+            (
+                struct.pack(
+                    "<III",
+                    GLB_MAGIC,
+                    2,
+                    28 + len(json_chunk) + len(self.buffer),
+                ),
+                struct.pack("<II", len(json_chunk), JSON_CHUNK),
+                json_chunk,
+                struct.pack("<II", len(self.buffer), BINARY_CHUNK),
+                bytes(self.buffer),
+            )
+        )
+
+
+def glb_bytes(
+    shape: Shape, settings: GlbSettings = GlbSettings(), name: str = ""
+) -> bytes:
+    """
+    converts a shape or assembly to a glb
+    -------
+    arguments:
+        - shape: the shape or Compound (with children) to convert
+        - settings: the levels of detail
+        - name: the name of the root node, the shape's label if not set
+    """
+    builder = _GlbBuilder()
+    children = []
+    for index, (leaf, transform, color) in enumerate(assembly_leaves(shape)):
+        lods = shape_lods(leaf, transform, color, settings)
+        if not len(lods[0].triangles):
+            continue
+        label = leaf.label or f"shape {index + 1}"
+        nodes = [
+            builder.mesh_node(
+                mesh, label if lod == 0 else f"{label} lod {lod}"
+            )
+            for lod, mesh in enumerate(lods)
+        ]
+        if len(nodes) > 1:
+            builder.document["nodes"][nodes[0]].update(
+                extensions={"MSFT_lod": {"ids": nodes[1:]}},
+                extras={
+                    "MSFT_screencoverage": list(
+                        settings.screen_coverage[: len(nodes)]
+                    )
+                },
+            )
+        children.append(nodes[0])
+    root = builder.add_node(
+        {"name": name or shape.label or "model", "children": children}
+    )
+    builder.document["scenes"][0]["nodes"].append(root)
+    return builder.glb()
+
+
+def export_glb(
+    shape: Shape,
+    path: Path,
+    settings: GlbSettings = GlbSettings(),
+    name: str = "",
+):
+    """
+    writes a shape or assembly as a glb file
+    -------
+    arguments:
+        - shape: the shape or Compound (with children) to write
+        - path: the destination file
+        - settings: the levels of detail
+        - name: the name of the root node, the shape's label if not set
+    """
+    Path(path).write_bytes(glb_bytes(shape, settings, name))
+
+
+def export_part_glbs(
+    part: Partomatic, settings: GlbSettings = GlbSettings()
+) -> list[Path]:
+    """
+    writes a glb beside each stl of a compiled Partomatic part, returning
+    the paths written
+    -------
+    arguments:
+        - part: the compiled part
+        - settings: the levels of detail
+    """
+    if part._config.stl_folder == "NONE":
+        return []
+    paths = []
+    for automatable_part in part.parts:
+        path = Path(part.complete_stl_file_path(automatable_part)).with_suffix(
+            ".glb"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        export_glb(
+            automatable_part.part,
+            path,
+            settings,
+            automatable_part.part.label or path.stem,
+        )
+        paths.append(path)
+    return paths
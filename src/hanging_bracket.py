@@ -36,6 +36,7 @@ from build123d.build_enums import FontStyle
 from ocp_vscode import Camera, show
 
 from bender_config import BenderConfig
+from build_stages import build_stage
 from partomatic import AutomatablePart, Partomatic
 from fb_library import screw_cut, heatsink_cut, nut_cut
 from frame_config import FrameConfig
@@ -164,8 +165,13 @@ class HangingBracket(Partomatic):
                 )
         return tool.part
 
-    def _desk_bracket(self, heatsink_nut=False) -> Part:
-        with BuildPart() as bracket:
+    @build_stage
+    def _desk_bracket_body(self) -> Part:
+        """
+        the desk bracket with its hanger posts, which either nut pocket
+        is cut from
+        """
+        with BuildPart() as body:
             add(self._desk_bracket_base())
             add(
                 wall_hanger_cut_template(
@@ -177,6 +183,11 @@ class HangingBracket(Partomatic):
                     tolerance=-self._config.tolerance,
                 )
             )
+        return body.part
+
+    def _desk_bracket(self, heatsink_nut=False) -> Part:
+        with BuildPart() as bracket:
+            add(self._desk_bracket_body())
             with BuildPart(
                 Location(
                     (
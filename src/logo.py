@@ -1,10 +1,13 @@
+from functools import cache
 from pathlib import Path
+
 from build123d import (
     Align,
     BuildLine,
     BuildSketch,
     CenterArc,
     Circle,
+    Color,
     ExportSVG,
     FontStyle,
     Location,
@@ -23,51 +26,63 @@ from bender_config import BenderConfig, FrameStyle
 
 ##Note: Flamente Round Bold must be installed with the context menu: "Install For all Users" to show up!!!
 
-_config = BenderConfig()
+# the logo's blue, (23, 63, 112) as 8 bit rgb
+LOGO_COLOR = Color(0x173F70)
+
+
+@cache
+def _bender_config() -> BenderConfig:
+    """
+    the default configuration the logo proportions are taken from,
+    loaded the first time a logo is drawn
+    """
+    return BenderConfig()
 
 
 def ring() -> Sketch:
     """
     a frame for the logo
     """
+    config = _bender_config()
     with BuildSketch() as frame:
         Rectangle(
-            _config.frame_exterior_length + 20,
-            _config.wheel.diameter + _config.frame_base_depth * 2 + 38,
+            config.frame_exterior_length + 20,
+            config.wheel.diameter + config.frame_base_depth * 2 + 38,
             align=(Align.CENTER, Align.CENTER),
         )
-        fillet(frame.vertices(), _config.fillet_radius)
+        fillet(frame.vertices(), config.fillet_radius)
         with BuildSketch(mode=Mode.SUBTRACT) as cut:
             Rectangle(
-                _config.frame_exterior_length + 10,
-                _config.wheel.diameter + _config.frame_base_depth * 2 + 28,
+                config.frame_exterior_length + 10,
+                config.wheel.diameter + config.frame_base_depth * 2 + 28,
                 align=(Align.CENTER, Align.CENTER),
             )
-        fillet(cut.vertices(), _config.fillet_radius)
+        fillet(cut.vertices(), config.fillet_radius)
     return frame
 
 
 def logo(border=False, simplified=False) -> Sketch:
     """generate the fenderbender logo!"""
-    offset = 0 if simplified else -_config.frame_hanger_offset
+    config = _bender_config()
+    offset = 0 if simplified else -config.frame_hanger_offset
     with BuildSketch() as sketch:
         with Locations(
             Location(
                 (
                     offset,
-                    _config.minimum_structural_thickness / 2,
+                    config.minimum_structural_thickness / 2,
                 )
             ),
             Location(
                 (
                     offset,
-                    -_config.minimum_structural_thickness * 2.5,
+                    -config.minimum_structural_thickness * 2.5,
                 )
             ),
         ) as hangers:
             Rectangle(
-                _config.frame_exterior_length,
-                _config.frame_base_depth,
+                config.frame_exterior_length,
+                config.frame_base_depth,
                 align=(Align.CENTER, Align.MIN),
             )
         if not simplified:
@@ -75,21 +90,21 @@ def logo(border=False, simplified=False) -> Sketch:
                 Location(
                     (
                         offset,
-                        _config.minimum_structural_thickness / 2,
+                        config.minimum_structural_thickness / 2,
                     )
                 )
             ) as frame:
                 Rectangle(
-                    _config.frame_exterior_length / 2,
-                    _config.bracket_height,
+                    config.frame_exterior_length / 2,
+                    config.bracket_height,
                     align=(Align.MAX, Align.MIN),
                 )
-        fillet(sketch.vertices(), _config.fillet_radius)
-        Circle(_config.frame_bracket_exterior_radius)
-        Circle(_config.wheel.radius, mode=Mode.SUBTRACT)
+        fillet(sketch.vertices(), config.fillet_radius)
+        Circle(config.frame_bracket_exterior_radius)
+        Circle(config.wheel.radius, mode=Mode.SUBTRACT)
         Rectangle(
-            _config.frame_bracket_exterior_diameter,
-            _config.minimum_structural_thickness,
+            config.frame_bracket_exterior_diameter,
+            config.minimum_structural_thickness,
             align=(Align.CENTER, Align.CENTER),
             mode=Mode.SUBTRACT,
         )
@@ -97,10 +112,10 @@ def logo(border=False, simplified=False) -> Sketch:
             with BuildLine() as toparc:
                 CenterArc(
                     (0, 0),
-                    _config.frame_bracket_exterior_radius
+                    config.frame_bracket_exterior_radius
                     - (
-                        _config.frame_bracket_exterior_radius
-                        - _config.wheel.radius
+                        config.frame_bracket_exterior_radius
+                        - config.wheel.radius
                     )
                     / 2,
                     180,
@@ -118,10 +133,10 @@ def logo(border=False, simplified=False) -> Sketch:
             with BuildLine() as bottomarc:
                 CenterArc(
                     (0, 0),
-                    _config.frame_bracket_exterior_radius
+                    config.frame_bracket_exterior_radius
                     - (
-                        _config.frame_bracket_exterior_radius
-                        - _config.wheel.radius
+                        config.frame_bracket_exterior_radius
+                        - config.wheel.radius
                     )
                     / 2,
                     360,
@@ -166,37 +181,36 @@ def text() -> Sketch:
     return fb2.sketch
 
 
-output_directory = Path(__file__).parent / "../docs/assets"
-output_directory.mkdir(parents=True, exist_ok=True)
-
-fb2_logo = logo(border=False).sketch
-fb2_logo.color = (23, 63, 112)
-show(fb2_logo, reset_camera=Camera.KEEP)
-
-exporter = ExportSVG(scale=1.0)
-exporter.add_layer(
-    "Layer 1", fill_color=(23, 63, 112), line_color=(255, 255, 255)
-)
-exporter.add_shape(fb2_logo, "Layer 1")
-exporter.write(str(Path(output_directory / "logo.svg")))
-
-fb2_simple_logo = logo(border=False, simplified=True).sketch
-fb2_simple_logo.color = (23, 63, 112)
-show(fb2_simple_logo, reset_camera=Camera.KEEP)
-
-exporter = ExportSVG(scale=1.0)
-exporter.add_layer(
-    "Layer 1", fill_color=(23, 63, 112), line_color=(255, 255, 255)
-)
-exporter.add_shape(fb2_simple_logo, "Layer 1")
-exporter.write(str(Path(output_directory / "logo-simplified.svg")))
+def export_logos(output_directory: Path):
+    """
+    writes the full and simplified logos as svg files
+    -------
+    arguments:
+        - output_directory: the directory to write logo.svg and
+            logo-simplified.svg to
+    """
+    output_directory.mkdir(parents=True, exist_ok=True)
+    for file_name, simplified in (
+        ("logo.svg", False),
+        ("logo-simplified.svg", True),
+    ):
+        fb2_logo = logo(border=False, simplified=simplified).sketch
+        fb2_logo.color = LOGO_COLOR
+        show(fb2_logo, reset_camera=Camera.KEEP)
+
+        exporter = ExportSVG(scale=1.0)
+        exporter.add_layer(
+            "Layer 1", fill_color=LOGO_COLOR, line_color=(1.0, 1.0, 1.0)
+        )
+        exporter.add_shape(fb2_logo, "Layer 1")
+        exporter.write(str(output_directory / file_name))
 
 
 # with BuildPart() as logo_blue:
 #     extrude(fb2_logo.mirror(Plane.YZ),2)
 
 # with BuildPart() as logo_white:
-#     Box(_config.frame_exterior_length+20,_config.wheel_diameter+_config.frame_base_depth*2+40,3,
+#     Box(config.frame_exterior_length+20,config.wheel_diameter+config.frame_base_depth*2+40,3,
 #     align=(Align.CENTER,Align.CENTER,Align.MIN))
 #     add(logo_blue, mode=Mode.SUBTRACT)
 # blue = logo_blue.part
@@ -206,3 +220,7 @@ exporter.write(str(Path(output_directory / "logo-simplified.svg")))
 # show(white, blue, reset_camera=Camera.KEEP)
 # export_stl(logo_blue.part, "../logo-blue.stl")
 # export_stl(logo_white.part, "../logo-white.stl")
+
+
+if __name__ == "__main__":
+    export_logos(Path(__file__).parent / "../docs/assets")
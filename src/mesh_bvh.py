@@ -0,0 +1,551 @@
+"""
+a bounding volume hierarchy (BVH) over the triangles of a mesh, for fast
+vectorized distance and ray queries
+
+triangles are sorted along a Morton (Z-order) curve, grouped into small
+leaf boxes, and the boxes are paired level by level up to a single root.
+Queries walk a hierarchy (or two) vectorized over every pair of box and
+query at once, and skip boxes further away than the nearest triangle found
+so far; only the few triangles which are actually near a query are
+compared exactly.
+"""
+
+from math import ceil
+
+import numpy as np
+
+from offscreen_renderer import Mesh
+
+LEAF_SIZE = 8
+MORTON_BITS = 10
+# the most node pairs, triangle pairs or points processed at once, which
+# bounds the memory used by the vectorized steps
+BATCH_SIZE = 1 << 15
+
+# the triangles next to a point's Morton code checked before walking the
+# hierarchy for its signed distance
+SEED_COUNT = 8
+
+EPSILON = 1e-12
+# triangles the same distance from a point are told apart by how closely
+# their normals point at it, so the sign of the distance comes from the
+# face the point is actually in front of or behind
+ALIGNMENT_WEIGHT = 1e-9
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum("...i,...i->...", a, b)
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, or 0 where the denominator is 0"""
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros(numerator.shape),
+        where=np.abs(denominator) > EPSILON,
+    )
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """spaces the bits of 10 bit integers two bits apart"""
+    values = values.astype(np.uint64)
+    for shift, mask in (
+        (16, 0x030000FF),
+        (8, 0x0300F00F),
+        (4, 0x030C30C3),
+        (2, 0x09249249),
+    ):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def box_distance(lower_a, upper_a, lower_b, upper_b) -> np.ndarray:
+    """the smallest distance between points of two boxes"""
+    gap = np.maximum(np.maximum(lower_a - upper_b, lower_b - upper_a), 0)
+    return np.linalg.norm(gap, axis=-1)
+
+
+def box_reach(lower_a, upper_a, lower_b, upper_b) -> np.ndarray:
+    """the largest distance between points of two boxes"""
+    span = np.maximum(upper_a - lower_b, upper_b - lower_a)
+    return np.linalg.norm(span, axis=-1)
+
+
+def closest_points_on_segments(
+    start_a: np.ndarray,
+    end_a: np.ndarray,
+    start_b: np.ndarray,
+    end_b: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    the closest points of pairs of line segments
+    -------
+    arguments:
+        - start_a, end_a: (n, 3) the ends of the first segments
+        - start_b, end_b: (n, 3) the ends of the second segments
+    """
+    direction_a = end_a - start_a
+    direction_b = end_b - start_b
+    offset = start_a - start_b
+    length_a = _dot(direction_a, direction_a)
+    length_b = _dot(direction_b, direction_b)
+    along_a = _dot(direction_a, offset)
+    along_b = _dot(direction_b, offset)
+    alignment = _dot(direction_a, direction_b)
+    denominator = length_a * length_b - alignment**2
+    # the closest point of the infinite lines, clamped to the first segment
+    s = np.clip(
+        _divide(alignment * along_b - along_a * length_b, denominator), 0, 1
+    )
+    t = _divide(alignment * s + along_b, length_b)
+    # clamping t to the second segment moves the closest point on the first
+    s = np.where(
+        t < 0,
+        np.clip(_divide(-along_a, length_a), 0, 1),
+        np.where(
+            t > 1, np.clip(_divide(alignment - along_a, length_a), 0, 1), s
+        ),
+    )
+    t = np.clip(t, 0, 1)
+    return (
+        start_a + s[:, None] * direction_a,
+        start_b + t[:, None] * direction_b,
+    )
+
+
+def closest_points_on_triangles(
+    points: np.ndarray, triangles: np.ndarray
+) -> np.ndarray:
+    """
+    the closest point of each triangle to a point, found from the region
+    of the triangle's plane (corner, edge or face) the point lies over
+    -------
+    arguments:
+        - points: (n, 3) the points
+        - triangles: (n, 3, 3) the corners of the triangles
+    """
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    ab, ac, bc = b - a, c - a, c - b
+    d1, d2 = _dot(ab, points - a), _dot(ac, points - a)
+    d3, d4 = _dot(ab, points - b), _dot(ac, points - b)
+    d5, d6 = _dot(ab, points - c), _dot(ac, points - c)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+    total = va + vb + vc
+    closest = (
+        a
+        + ab * _divide(vb, total)[:, None]
+        + ac * _divide(vc, total)[:, None]
+    )
+    # later regions take precedence, as the corners must over their edges
+    for region, point in (
+        (
+            (va <= 0) & (d4 >= d3) & (d5 >= d6),
+            b + bc * _divide(d4 - d3, d4 - d3 + d5 - d6)[:, None],
+        ),
+        (
+            (vb <= 0) & (d2 >= 0) & (d6 <= 0),
+            a + ac * _divide(d2, d2 - d6)[:, None],
+        ),
+        ((d6 >= 0) & (d5 <= d6), c),
+        (
+            (vc <= 0) & (d1 >= 0) & (d3 <= 0),
+            a + ab * _divide(d1, d1 - d3)[:, None],
+        ),
+        ((d3 >= 0) & (d4 <= d3), b),
+        ((d1 <= 0) & (d2 <= 0), a),
+    ):
+        closest = np.where(region[:, None], point, closest)
+    return closest
+
+
+def ray_triangle_intersections(
+    origins: np.ndarray, directions: np.ndarray, triangles: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    whether each ray crosses its triangle, and how many directions along
+    the ray it does
+    -------
+    arguments:
+        - origins: (n, 3) the start of each ray
+        - directions: (n, 3) the direction of each ray
+        - triangles: (n, 3, 3) the corners of the triangles
+    """
+    edge_1 = triangles[:, 1] - triangles[:, 0]
+    edge_2 = triangles[:, 2] - triangles[:, 0]
+    h = np.cross(directions, edge_2)
+    determinant = _dot(edge_1, h)
+    scale = (
+        np.linalg.norm(edge_1, axis=1)
+        * np.linalg.norm(edge_2, axis=1)
+        * np.linalg.norm(directions, axis=1)
+    )
+    # rays parallel to the triangle's plane never cross it
+    crossing = np.abs(determinant) > 1e-9 * scale
+    s = origins - triangles[:, 0]
+    u = _divide(_dot(s, h), determinant)
+    q = np.cross(s, edge_1)
+    v = _divide(_dot(directions, q), determinant)
+    t = _divide(_dot(edge_2, q), determinant)
+    hits = crossing & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+    return hits, t
+
+
+def segment_triangle_intersections(
+    starts: np.ndarray, ends: np.ndarray, triangles: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    whether each segment crosses its triangle, and where
+    -------
+    arguments:
+        - starts, ends: (n, 3) the ends of the segments
+        - triangles: (n, 3, 3) the corners of the triangles
+    """
+    directions = ends - starts
+    hits, t = ray_triangle_intersections(starts, directions, triangles)
+    return hits & (t <= 1), starts + t[:, None] * directions
+
+
+def triangle_distances(
+    triangles_a: np.ndarray, triangles_b: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    the distance and closest points of pairs of triangles; crossing
+    triangles are 0 apart, with both points where an edge crosses
+    -------
+    arguments:
+        - triangles_a, triangles_b: (n, 3, 3) the corners of the triangles
+    """
+    candidates = []
+    for i in range(3):
+        corner = triangles_a[:, i]
+        candidates.append(
+            (corner, closest_points_on_triangles(corner, triangles_b))
+        )
+        corner = triangles_b[:, i]
+        candidates.append(
+            (closest_points_on_triangles(corner, triangles_a), corner)
+        )
+        for j in range(3):
+            candidates.append(
+                closest_points_on_segments(
+                    triangles_a[:, i],
+                    triangles_a[:, (i + 1) % 3],
+                    triangles_b[:, j],
+                    triangles_b[:, (j + 1) % 3],
+                )
+            )
+    points_a = np.stack([a for a, _ in candidates])
+    points_b = np.stack([b for _, b in candidates])
+    distances = np.linalg.norm(points_a - points_b, axis=2)
+    nearest = distances.argmin(axis=0)
+    pairs = np.arange(len(triangles_a))
+    distances = distances[nearest, pairs]
+    points_a = points_a[nearest, pairs]
+    points_b = points_b[nearest, pairs]
+
+    for edges, triangles in (
+        (triangles_a, triangles_b),
+        (triangles_b, triangles_a),
+    ):
+        for i in range(3):
+            hits, crossings = segment_triangle_intersections(
+                edges[:, i], edges[:, (i + 1) % 3], triangles
+            )
+            distances = np.where(hits, 0, distances)
+            points_a = np.where(hits[:, None], crossings, points_a)
+            points_b = np.where(hits[:, None], crossings, points_b)
+    return distances, points_a, points_b
+
+
+class MeshBvh:
+    """
+    a bounding volume hierarchy over the triangles of a closed mesh; the
+    nodes of every level are stored together, leaves first, and the
+    children of node i of a level are nodes 2i and 2i + 1 of the level
+    below
+    -------
+    arguments:
+        - mesh: the mesh to index, with outward facing triangles
+        - leaf_size: the number of triangles in each leaf
+    """
+
+    def __init__(self, mesh: Mesh, leaf_size: int = LEAF_SIZE):
+        if not len(mesh.triangles):
+            raise ValueError(f"{mesh.label or 'the mesh'} has no triangles")
+        self.label = mesh.label
+        self.vertices = np.unique(mesh.vertices, axis=0)
+        corners = mesh.vertices[mesh.triangles]
+        centroids = corners.mean(axis=1)
+        self._low = centroids.min(axis=0)
+        self._extent = np.maximum(
+            centroids.max(axis=0) - self._low, EPSILON
+        )
+        codes = self.morton_codes(centroids)
+        order = np.argsort(codes, kind="stable")
+        self.codes = codes[order]
+        self.corners = corners[order]
+        self.centroids = self.corners.mean(axis=1)
+        normals = np.cross(
+            self.corners[:, 1] - self.corners[:, 0],
+            self.corners[:, 2] - self.corners[:, 0],
+        )
+        self.normals = normals / np.maximum(
+            np.linalg.norm(normals, axis=1, keepdims=True), EPSILON
+        )
+        self.triangle_lower = self.corners.min(axis=1)
+        self.triangle_upper = self.corners.max(axis=1)
+
+        triangle_count = len(self.corners)
+        leaf_count = ceil(triangle_count / leaf_size)
+        leaf_triangles = np.full(leaf_count * leaf_size, -1)
+        leaf_triangles[:triangle_count] = np.arange(triangle_count)
+        self.leaf_triangles = leaf_triangles.reshape(leaf_count, leaf_size)
+        valid = (self.leaf_triangles >= 0)[:, :, None]
+        lower = [
+            np.where(
+                valid, self.triangle_lower[self.leaf_triangles], np.inf
+            ).min(axis=1)
+        ]
+        upper = [
+            np.where(
+                valid, self.triangle_upper[self.leaf_triangles], -np.inf
+            ).max(axis=1)
+        ]
+        while len(lower[-1]) > 1:
+            level_lower, level_upper = lower[-1], upper[-1]
+            if len(level_lower) % 2:
+                level_lower = np.vstack((level_lower, level_lower[-1:]))
+                level_upper = np.vstack((level_upper, level_upper[-1:]))
+            lower.append(np.minimum(level_lower[0::2], level_lower[1::2]))
+            upper.append(np.maximum(level_upper[0::2], level_upper[1::2]))
+
+        counts = [len(level) for level in lower]
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.lower = np.vstack(lower)
+        self.upper = np.vstack(upper)
+        self.level = np.repeat(np.arange(len(counts)), counts)
+        self.first_child = np.full(len(self.level), -1)
+        self.second_child = np.full(len(self.level), -1)
+        # a triangle inside each node, whose distance bounds the node's
+        self.sample = np.empty(len(self.level), dtype=int)
+        self.sample[:leaf_count] = self.leaf_triangles[:, 0]
+        for level in range(1, len(counts)):
+            nodes = slice(offsets[level], offsets[level + 1])
+            first = offsets[level - 1] + 2 * np.arange(counts[level])
+            self.first_child[nodes] = first
+            self.second_child[nodes] = np.where(
+                first + 1 < offsets[level], first + 1, -1
+            )
+            self.sample[nodes] = self.sample[first]
+        self.root = len(self.level) - 1
+
+    def morton_codes(self, points: np.ndarray) -> np.ndarray:
+        """
+        the position of each point along the mesh's Morton curve
+        -------
+        arguments:
+            - points: (n, 3) the points, clamped to the mesh's extent
+        """
+        cells = np.clip((points - self._low) / self._extent, 0, 1)
+        cells = (cells * (2**MORTON_BITS - 1)).astype(np.uint64)
+        return (
+            _spread_bits(cells[:, 0])
+            | (_spread_bits(cells[:, 1]) << np.uint64(1))
+            | (_spread_bits(cells[:, 2]) << np.uint64(2))
+        )
+
+    def descend(
+        self, nodes: np.ndarray, split: np.ndarray, *others: np.ndarray
+    ) -> tuple[np.ndarray, ...]:
+        """
+        replaces the nodes being split with their children, repeating
+        the matching entries of any other arrays for each child
+        -------
+        arguments:
+            - nodes: the node indices
+            - split: which nodes to split
+            - others: arrays paired with the nodes
+        """
+        first = self.first_child[nodes[split]]
+        second = self.second_child[nodes[split]]
+        has_second = second >= 0
+        return (
+            np.concatenate((nodes[~split], first, second[has_second])),
+        ) + tuple(
+            np.concatenate(
+                (other[~split], other[split], other[split][has_second])
+            )
+            for other in others
+        )
+
+    def leaf_pairs(
+        self, leaves: np.ndarray, *others: np.ndarray
+    ) -> tuple[np.ndarray, ...]:
+        """
+        the triangles of the leaves, repeating the matching entries of any
+        other arrays for each triangle
+        -------
+        arguments:
+            - leaves: the leaf node indices
+            - others: arrays paired with the leaves
+        """
+        triangles = self.leaf_triangles[leaves]
+        valid = triangles >= 0
+        return (triangles[valid],) + tuple(
+            np.broadcast_to(other[:, None], triangles.shape)[valid]
+            for other in others
+        )
+
+    def signed_distances(self, points: np.ndarray) -> np.ndarray:
+        """
+        the distance from each point to the mesh's surface, negative for
+        points inside the mesh
+        -------
+        arguments:
+            - points: (n, 3) the points to measure
+        """
+        step = BATCH_SIZE // 8
+        return np.concatenate(
+            [np.zeros(0)]
+            + [
+                self._signed_distances(points[start : start + step])
+                for start in range(0, len(points), step)
+            ]
+        )
+
+    def _signed_distances(self, points: np.ndarray) -> np.ndarray:
+        keys = np.full(len(points), np.inf)
+        distances = np.full(len(points), np.inf)
+        signs = np.ones(len(points))
+
+        def nearest(indices: np.ndarray, triangles: np.ndarray):
+            offsets = points[indices] - closest_points_on_triangles(
+                points[indices], self.corners[triangles]
+            )
+            lengths = np.linalg.norm(offsets, axis=1)
+            facing = _divide(_dot(offsets, self.normals[triangles]), lengths)
+            candidate_keys = lengths - np.abs(facing) * ALIGNMENT_WEIGHT
+            np.minimum.at(keys, indices, candidate_keys)
+            best = np.flatnonzero(candidate_keys == keys[indices])
+            distances[indices[best]] = lengths[best]
+            signs[indices[best]] = np.where(facing[best] < 0, -1, 1)
+
+        # the triangles next to each point along the Morton curve are
+        # usually near it, which bounds the walk from the start
+        indices = np.arange(len(points))
+        position = np.searchsorted(self.codes, self.morton_codes(points))
+        for offset in range(-SEED_COUNT // 2, SEED_COUNT // 2):
+            nearest(
+                indices,
+                np.clip(position + offset, 0, len(self.codes) - 1),
+            )
+
+        nodes = np.full(len(points), self.root)
+        while len(nodes):
+            origins = points[indices]
+            near = (
+                box_distance(
+                    origins, origins, self.lower[nodes], self.upper[nodes]
+                )
+                <= distances[indices]
+            )
+            indices, nodes = indices[near], nodes[near]
+            if not len(nodes):
+                break
+            # any triangle inside a box bounds how near its nearest is
+            nearest(indices, self.sample[nodes])
+            leaves = self.level[nodes] == 0
+            triangles, leaf_indices = self.leaf_pairs(
+                nodes[leaves], indices[leaves]
+            )
+            origins = points[leaf_indices]
+            near = (
+                box_distance(
+                    origins,
+                    origins,
+                    self.triangle_lower[triangles],
+                    self.triangle_upper[triangles],
+                )
+                <= distances[leaf_indices]
+            )
+            triangles, leaf_indices = triangles[near], leaf_indices[near]
+            if len(triangles):
+                nearest(leaf_indices, triangles)
+            nodes, indices = self.descend(
+                nodes[~leaves],
+                np.ones((~leaves).sum(), dtype=bool),
+                indices[~leaves],
+            )
+        return signs * distances
+
+    def ray_distances(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        max_distance: float = np.inf,
+    ) -> np.ndarray:
+        """
+        the distance along each ray to the first triangle it crosses, inf
+        if it crosses none within max_distance
+        -------
+        arguments:
+            - origins: (n, 3) the start of each ray
+            - directions: (n, 3) the unit direction of each ray
+            - max_distance: the furthest distance worth searching
+        """
+        step = BATCH_SIZE // 8
+        return np.concatenate(
+            [np.zeros(0)]
+            + [
+                self._ray_distances(
+                    origins[start : start + step],
+                    directions[start : start + step],
+                    max_distance,
+                )
+                for start in range(0, len(origins), step)
+            ]
+        )
+
+    def _ray_distances(
+        self, origins: np.ndarray, directions: np.ndarray, max_distance: float
+    ) -> np.ndarray:
+        distances = np.full(len(origins), float(max_distance))
+        with np.errstate(divide="ignore"):
+            inverse = 1 / directions
+        indices = np.arange(len(origins))
+        nodes = np.full(len(origins), self.root)
+        while len(nodes):
+            # where each ray enters and leaves each box; the slabs of axes
+            # a ray runs parallel to are NaN, which fmin and fmax ignore
+            start = origins[indices]
+            with np.errstate(invalid="ignore"):
+                low = (self.lower[nodes] - start) * inverse[indices]
+                high = (self.upper[nodes] - start) * inverse[indices]
+            entry = np.fmax.reduce(np.fmin(low, high), axis=1)
+            entry = np.maximum(entry, 0)
+            leave = np.fmin.reduce(np.fmax(low, high), axis=1)
+            near = (entry <= leave) & (entry <= distances[indices])
+            indices, nodes = indices[near], nodes[near]
+            leaves = self.level[nodes] == 0
+            triangles, leaf_indices = self.leaf_pairs(
+                nodes[leaves], indices[leaves]
+            )
+            if len(triangles):
+                hits, lengths = ray_triangle_intersections(
+                    origins[leaf_indices],
+                    directions[leaf_indices],
+                    self.corners[triangles],
+                )
+                np.minimum.at(distances, leaf_indices[hits], lengths[hits])
+            nodes, indices = self.descend(
+                nodes[~leaves],
+                np.ones((~leaves).sum(), dtype=bool),
+                indices[~leaves],
+            )
+        return np.where(distances < max_distance, distances, np.inf)
+
+    def surface_samples(self) -> np.ndarray:
+        """the vertices and triangle centroids of the mesh"""
+        return np.vstack((self.vertices, self.centroids))
@@ -0,0 +1,439 @@
+"""
+a headless software renderer for build123d shapes and assemblies
+
+shapes are tessellated face by face, projected with an orthographic camera
+matching the ocp_vscode default isometric view, and rasterized with a
+z-buffer in NumPy. Face boundaries are outlined by comparing the face
+rendered in neighbouring pixels, so the images resemble the viewer's
+screenshots without requiring a running viewer.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+from build123d import Shape
+from OCP.BRep import BRep_Tool
+from OCP.TopAbs import TopAbs_Orientation
+from OCP.TopLoc import TopLoc_Location
+
+DEFAULT_COLOR = (0.7, 0.7, 0.7)
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """
+    the camera and image settings for a render
+    -------
+    arguments:
+        - width, height: the size of the image in pixels
+        - supersample: the number of samples per pixel along each axis
+        - tolerance: the linear tessellation tolerance
+        - angular_tolerance: the angular tessellation tolerance
+        - view_direction: the direction from the model to the camera
+        - up: the world direction drawn upwards
+        - margin: the fraction of the image left empty on each side
+        - background: the background RGB color
+        - edge_color: the RGB color of face outlines
+    """
+
+    width: int = 1600
+    height: int = 1200
+    supersample: int = 2
+    tolerance: float = 0.1
+    angular_tolerance: float = 0.2
+    view_direction: tuple[float, float, float] = (1, -1, 1)
+    up: tuple[float, float, float] = (0, 0, 1)
+    margin: float = 0.08
+    background: tuple[int, int, int] = (255, 255, 255)
+    edge_color: tuple[int, int, int] = (110, 110, 110)
+
+
+@dataclass
+class Mesh:
+    """
+    the tessellation of a single shape
+    -------
+    arguments:
+        - vertices: (n, 3) vertex coordinates
+        - triangles: (m, 3) vertex indices
+        - faces: (m,) the index of the face each triangle belongs to
+        - color: the RGB color (0-1) of the shape
+        - label: the label of the shape
+    """
+
+    vertices: np.ndarray
+    triangles: np.ndarray
+    faces: np.ndarray
+    color: tuple[float, float, float]
+    label: str = ""
+
+
+def _location_matrix(shape: Shape) -> np.ndarray:
+    transformation = shape.location.wrapped.Transformation()
+    matrix = np.identity(4)
+    for row in range(3):
+        for column in range(4):
+            matrix[row, column] = transformation.Value(row + 1, column + 1)
+    return matrix
+
+
+def tessellate(
+    shape: Shape,
+    tolerance: float,
+    angular_tolerance: float,
+    color: Optional[tuple[float, float, float]] = None,
+) -> Mesh:
+    """
+    tessellates a shape, keeping track of the face of every triangle
+    -------
+    arguments:
+        - shape: the shape to tessellate
+        - tolerance: the linear tessellation tolerance
+        - angular_tolerance: the angular tessellation tolerance
+        - color: the RGB color of the mesh, the shape's color if not set
+    """
+    if color is None:
+        color = (
+            tuple(shape.color)[:3]
+            if shape.color is not None
+            else DEFAULT_COLOR
+        )
+    shape.mesh(tolerance, angular_tolerance)
+    vertices, triangles, faces = [], [], []
+    offset = 0
+    for face_index, face in enumerate(shape.faces()):
+        location = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(face.wrapped, location)
+        if poly is None:
+            continue
+        transformation = location.Transformation()
+        nodes = [
+            poly.Node(i).Transformed(transformation)
+            for i in range(1, poly.NbNodes() + 1)
+        ]
+        vertices.extend((node.X(), node.Y(), node.Z()) for node in nodes)
+        face_triangles = np.array(
+            [
+                (t.Value(1), t.Value(2), t.Value(3))
+                for t in poly.Triangles()
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        if (
+            face.wrapped.Orientation()
+            == TopAbs_Orientation.TopAbs_REVERSED
+        ):
+            face_triangles = face_triangles[:, [0, 2, 1]]
+        triangles.append(face_triangles + offset - 1)
+        faces.append(np.full(len(face_triangles), face_index))
+        offset += len(nodes)
+    return Mesh(
+        np.array(vertices, dtype=float).reshape(-1, 3),
+        (
+            np.concatenate(triangles)
+            if triangles
+            else np.zeros((0, 3), dtype=np.int64)
+        ),
+        np.concatenate(faces) if faces else np.zeros(0, dtype=np.int64),
+        color,
+        shape.label,
+    )
+
+
+def assembly_leaves(
+    assembly: Shape,
+) -> list[tuple[Shape, np.ndarray, tuple[float, float, float]]]:
+    """
+    the leaf shapes of an assembly, each with the combined location of
+    its parents (as a 4x4 matrix) and the color it inherits from them,
+    the way ocp_vscode displays them
+    -------
+    arguments:
+        - assembly: the shape or Compound (with children) to visit
+    """
+    leaves = []
+
+    def visit(shape: Shape, transform: np.ndarray, color):
+        if shape.color is not None:
+            color = tuple(shape.color)[:3]
+        children = list(getattr(shape, "children", ()))
+        if not children:
+            leaves.append((shape, transform, color or DEFAULT_COLOR))
+            return
+        transform = transform @ _location_matrix(shape)
+        for child in children:
+            visit(child, transform, color)
+
+    visit(assembly, np.identity(4), None)
+    return leaves
+
+
+def transform_points(points: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    """applies a 4x4 transformation matrix to (n, 3) points"""
+    return points @ transform[:3, :3].T + transform[:3, 3]
+
+
+def assembly_meshes(
+    assembly: Shape, tolerance: float, angular_tolerance: float
+) -> list[Mesh]:
+    """
+    tessellates every leaf of an assembly, applying the locations and
+    inheriting the colors of its parents the way ocp_vscode does
+    -------
+    arguments:
+        - assembly: the shape or Compound (with children) to tessellate
+        - tolerance: the linear tessellation tolerance
+        - angular_tolerance: the angular tessellation tolerance
+    """
+    meshes = []
+    for shape, transform, color in assembly_leaves(assembly):
+        mesh = tessellate(shape, tolerance, angular_tolerance, color)
+        mesh.vertices = transform_points(mesh.vertices, transform)
+        meshes.append(mesh)
+    return meshes
+
+
+def _camera(settings: RenderSettings) -> np.ndarray:
+    """the rows of the camera basis: right, up and into the screen"""
+    forward = -np.array(settings.view_direction, dtype=float)
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, settings.up)
+    right /= np.linalg.norm(right)
+    up = np.cross(right, forward)
+    return np.array([right, up, forward])
+
+
+def _fragments(
+    screen: np.ndarray,
+    triangles: np.ndarray,
+    width: int,
+    height: int,
+    chunk_size: int = 1 << 21,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    yields (pixel index, depth, triangle index) for every pixel center
+    covered by a triangle. Each triangle is split into the pixel rows it
+    covers and each row into its covered span, so the work done is
+    proportional to the pixels drawn rather than the triangles' bounding
+    boxes (tessellated fillets produce many long, thin triangles).
+    """
+    a, b, c = (screen[triangles[:, i]] for i in range(3))
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (
+        c[:, 0] - a[:, 0]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        depth_dx = (
+            (b[:, 2] - a[:, 2]) * (c[:, 1] - a[:, 1])
+            - (c[:, 2] - a[:, 2]) * (b[:, 1] - a[:, 1])
+        ) / area
+        depth_dy = (
+            (c[:, 2] - a[:, 2]) * (b[:, 0] - a[:, 0])
+            - (b[:, 2] - a[:, 2]) * (c[:, 0] - a[:, 0])
+        ) / area
+    corners = np.stack([a, b, c])
+    first_row = np.maximum(np.ceil(corners[..., 1].min(0) - 0.5), 0)
+    last_row = np.minimum(np.floor(corners[..., 1].max(0) - 0.5), height - 1)
+    row_counts = np.where(
+        np.abs(area) > 1e-12, np.maximum(last_row - first_row + 1, 0), 0
+    ).astype(np.int64)
+    estimate = row_counts * (
+        np.ceil(corners[..., 0].max(0)) - np.floor(corners[..., 0].min(0)) + 1
+    )
+    boundaries = np.searchsorted(
+        np.cumsum(estimate),
+        np.arange(chunk_size, estimate.sum(), chunk_size),
+    )
+
+    for index in np.split(np.arange(len(triangles)), boundaries):
+        index = index[row_counts[index] > 0]
+        if not len(index):
+            continue
+        # one entry per (triangle, pixel row)
+        rows_triangle = np.repeat(index, row_counts[index])
+        row_offsets = np.arange(len(rows_triangle)) - np.repeat(
+            np.cumsum(row_counts[index]) - row_counts[index],
+            row_counts[index],
+        )
+        row = first_row[rows_triangle] + row_offsets
+        center_y = row + 0.5
+        left = np.full(len(row), np.inf)
+        right = np.full(len(row), -np.inf)
+        for p, q in ((a, b), (b, c), (c, a)):
+            p, q = p[rows_triangle], q[rows_triangle]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (center_y - p[:, 1]) / (q[:, 1] - p[:, 1])
+            crossing = (t >= 0) & (t <= 1)
+            x = p[:, 0] + t * (q[:, 0] - p[:, 0])
+            left = np.where(crossing, np.minimum(left, x), left)
+            right = np.where(crossing, np.maximum(right, x), right)
+        first_column = np.maximum(np.ceil(left - 0.5), 0)
+        last_column = np.minimum(np.floor(right - 0.5), width - 1)
+        column_counts = np.maximum(last_column - first_column + 1, 0)
+        column_counts = np.nan_to_num(column_counts).astype(np.int64)
+
+        # one entry per covered pixel
+        pixel_row = np.repeat(np.arange(len(row)), column_counts)
+        column = first_column[pixel_row] + (
+            np.arange(len(pixel_row))
+            - np.repeat(
+                np.cumsum(column_counts) - column_counts, column_counts
+            )
+        )
+        pixel_triangle = rows_triangle[pixel_row]
+        y = row[pixel_row]
+        origin = a[pixel_triangle]
+        depth = (
+            origin[:, 2]
+            + depth_dx[pixel_triangle] * (column + 0.5 - origin[:, 0])
+            + depth_dy[pixel_triangle] * (y + 0.5 - origin[:, 1])
+        )
+        yield (
+            (y * width + column).astype(np.int64),
+            depth,
+            pixel_triangle,
+        )
+
+
+def render(
+    shape: Shape, settings: RenderSettings = RenderSettings()
+) -> np.ndarray:
+    """
+    renders a shape or assembly to an (height, width, 3) uint8 RGB array
+    -------
+    arguments:
+        - shape: the shape or assembly to render
+        - settings: the camera and image settings
+    """
+    meshes = assembly_meshes(
+        shape, settings.tolerance, settings.angular_tolerance
+    )
+    return render_meshes(meshes, settings)
+
+
+def render_meshes(
+    meshes: list[Mesh], settings: RenderSettings = RenderSettings()
+) -> np.ndarray:
+    """
+    renders tessellated meshes to an (height, width, 3) uint8 RGB array
+    -------
+    arguments:
+        - meshes: the meshes to render
+        - settings: the camera and image settings
+    """
+    width = settings.width * settings.supersample
+    height = settings.height * settings.supersample
+    background = np.array(settings.background, dtype=float)
+    meshes = [mesh for mesh in meshes if len(mesh.triangles)]
+    if not meshes:
+        image = np.empty((settings.height, settings.width, 3), dtype=np.uint8)
+        image[:] = settings.background
+        return image
+
+    offsets = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+    face_offsets = np.cumsum(
+        [0] + [int(mesh.faces.max(initial=-1)) + 1 for mesh in meshes]
+    )
+    vertices = np.concatenate([mesh.vertices for mesh in meshes])
+    triangles = np.concatenate(
+        [mesh.triangles + offset for mesh, offset in zip(meshes, offsets)]
+    )
+    faces = np.concatenate(
+        [mesh.faces + offset for mesh, offset in zip(meshes, face_offsets)]
+    )
+    colors = np.concatenate(
+        [np.tile(mesh.color, (len(mesh.triangles), 1)) for mesh in meshes]
+    )
+
+    camera = _camera(settings)
+    projected = vertices @ camera.T
+    low, high = projected[:, :2].min(0), projected[:, :2].max(0)
+    extent = np.maximum(high - low, 1e-9)
+    scale = min(
+        width * (1 - 2 * settings.margin) / extent[0],
+        height * (1 - 2 * settings.margin) / extent[1],
+    )
+    center = (low + high) / 2
+    screen = np.empty_like(projected)
+    screen[:, 0] = (projected[:, 0] - center[0]) * scale + width / 2
+    screen[:, 1] = height / 2 - (projected[:, 1] - center[1]) * scale
+    screen[:, 2] = projected[:, 2]
+
+    # flat, two sided shading with a headlight and a little ambient light
+    corners = vertices[triangles]
+    normals = np.cross(
+        corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+    )
+    normals /= np.maximum(
+        np.linalg.norm(normals, axis=1, keepdims=True), 1e-12
+    )
+    light = -camera[2] + 0.35 * camera[1] - 0.2 * camera[0]
+    light /= np.linalg.norm(light)
+    shade = 0.6 + 0.4 * np.abs(normals @ light)
+    triangle_colors = colors * 255 * shade[:, None]
+
+    depth_buffer = np.full(width * height, np.inf)
+    for pixels, depth, _ in _fragments(screen, triangles, width, height):
+        np.minimum.at(depth_buffer, pixels, depth)
+    triangle_buffer = np.full(width * height, -1, dtype=np.int64)
+    for pixels, depth, index in _fragments(screen, triangles, width, height):
+        nearest = depth <= depth_buffer[pixels]
+        triangle_buffer[pixels[nearest]] = index[nearest]
+
+    covered = triangle_buffer >= 0
+    image = np.tile(background, (width * height, 1))
+    image[covered] = triangle_colors[triangle_buffer[covered]]
+    image = image.reshape(height, width, 3)
+
+    face_buffer = np.where(covered, faces[triangle_buffer], -1).reshape(
+        height, width
+    )
+    edges = np.zeros((height, width), dtype=bool)
+    edges[:, 1:] |= face_buffer[:, 1:] != face_buffer[:, :-1]
+    edges[1:, :] |= face_buffer[1:, :] != face_buffer[:-1, :]
+    if settings.supersample > 1:
+        edges[:, :-1] |= edges[:, 1:]
+        edges[:-1, :] |= edges[1:, :]
+    image[edges] = settings.edge_color
+
+    image = image.reshape(
+        settings.height,
+        settings.supersample,
+        settings.width,
+        settings.supersample,
+        3,
+    ).mean(axis=(1, 3))
+    return np.round(image).astype(np.uint8)
+
+
+def write_png(image: np.ndarray, path: Path):
+    """
+    writes an (height, width, 3) uint8 RGB array as a png
+    -------
+    arguments:
+        - image: the image to write
+        - path: the destination file
+    """
+    height, width, _ = image.shape
+    rows = np.concatenate(
+        [np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)],
+        axis=1,
+    )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    Path(path).write_bytes(
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
@@ -0,0 +1,472 @@
+"""
+design-space exploration over BenderConfig values
+
+a sweep varies one or more configuration fields over a grid. every point of
+the grid is first evaluated analytically (derived dimensions and constraint
+violations, no geometry), then geometry is built on a worker pool only for
+the points selected, and the results are collected in a columnar table.
+
+example:
+    python parameter_sweep.py --config dev --vary wheel.diameter=50:90:10 \\
+        --vary filament_count=3,5 --build-where "bracket_depth<13" \\
+        --parts filament-wheel --output ../sweeps/wheel.csv
+"""
+
+import csv
+import json
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum, Flag
+from itertools import product
+from operator import eq, ge, gt, le, lt, ne
+from pathlib import Path
+from time import time
+from typing import Any, Callable, Iterable, Optional
+
+from bender_config import BenderConfig
+from config_constraints import validate_config
+from config_snapshot import snapshot
+from filament_bracket import FilamentBracket
+from filament_wheel import FilamentWheel
+from frame_bottom import BottomFrame
+from frame_connector import ConnectorFrame
+from frame_top import TopFrame
+from guidewall import Guidewall
+from hanging_bracket import HangingBracket
+from lock_pin import LockPin
+from sidewall import Sidewall
+
+DEFAULT_COLUMNS = [
+    "bracket_depth",
+    "bracket_width",
+    "bracket_height",
+    "frame_bracket_exterior_radius",
+    "frame_exterior_width",
+    "frame_exterior_length",
+    "sidewall_width",
+    "sidewall_section_depth",
+    "sidewall_straight_depth",
+]
+
+SWEEP_PARTS: dict[str, Callable[[BenderConfig], Any]] = {
+    "filament-bracket": lambda c: FilamentBracket(
+        c.filament_bracket_config()
+    ),
+    "filament-wheel": lambda c: FilamentWheel(c.wheel),
+    "sidewall": lambda c: Sidewall(c.sidewall_config),
+    "guidewall": lambda c: Guidewall(c.guidewall_config),
+    "frame-top": lambda c: TopFrame(c.frame_config),
+    "frame-bottom": lambda c: BottomFrame(c.frame_config),
+    "frame-connector": lambda c: ConnectorFrame(c.frame_config),
+    "lock-pin": lambda c: LockPin(c.lock_pin_config),
+    "hanging-bracket": lambda c: HangingBracket(c.hanging_bracket_config),
+}
+
+_COMPARISONS = {
+    "<=": le,
+    ">=": ge,
+    "==": eq,
+    "!=": ne,
+    "<": lt,
+    ">": gt,
+}
+
+
+def get_config_value(config: BenderConfig, path: str) -> Any:
+    """
+    reads a (possibly nested) configuration value
+    -------
+    arguments:
+        - config: the BenderConfig to read
+        - path: the value name, nested values separated by "."
+            (e.g. "wheel.bearing.depth")
+    """
+    value = config
+    for name in path.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def set_config_value(config: BenderConfig, path: str, value: Any):
+    """
+    assigns a (possibly nested) configuration value
+    -------
+    arguments:
+        - config: the BenderConfig to modify
+        - path: the field name, nested fields separated by "."
+        - value: the value to assign
+    """
+    *parents, name = path.split(".")
+    target = config
+    for parent in parents:
+        target = getattr(target, parent)
+    if not hasattr(target, name):
+        raise ValueError(f"{path} is not a configuration value")
+    setattr(target, name, value)
+
+
+def _typed_value(current: Any, text: str) -> Any:
+    """converts text to the type of an existing configuration value"""
+    text = text.strip()
+    if isinstance(current, (Enum, Flag)):
+        return type(current)[text.upper()]
+    if isinstance(current, bool):
+        return text.lower() in ("1", "true", "yes")
+    if isinstance(current, int):
+        value = float(text)
+        return int(value) if value.is_integer() else value
+    if isinstance(current, float):
+        return float(text)
+    return text
+
+
+def parse_values(config: BenderConfig, path: str, text: str) -> list:
+    """
+    parses the values to sweep for a configuration field
+    -------
+    arguments:
+        - config: the base configuration, used to type the values
+        - path: the field being swept
+        - text: either a comma separated list ("3,5,8") or an inclusive
+            range as start:stop:step ("50:90:10")
+    """
+    current = get_config_value(config, path)
+    if ":" in text:
+        texts = [part.strip() for part in text.split(":")]
+        parts = [float(part) for part in texts]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(
+                f"invalid range {text}, expected start:stop:step"
+            )
+        start, stop, step = parts
+        # values are rounded to the bounds' and step's decimal places, so
+        # 0.1:0.3:0.1 sweeps 0.3 rather than 0.30000000000000004
+        places = max(len(part.partition(".")[2]) for part in texts)
+        count = int(round((stop - start) / step)) + 1
+        return [
+            _typed_value(current, str(round(start + step * index, places)))
+            for index in range(count)
+            if start + step * index <= stop + step * 1e-9
+        ]
+    return [_typed_value(current, value) for value in text.split(",")]
+
+
+@dataclass
+class SweepTable:
+    """
+    a columnar result table, one list of values per column
+    """
+
+    columns: dict[str, list] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def add_column(self, name: str, values: Optional[list] = None):
+        """
+        adds a column, filled with None unless values are given
+        """
+        self.columns[name] = (
+            list(values) if values is not None else [None] * len(self)
+        )
+
+    def append(self, row: dict):
+        """
+        appends a row, adding any new columns
+        """
+        length = len(self)
+        for name in row:
+            if name not in self.columns:
+                self.columns[name] = [None] * length
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+
+    def row(self, index: int) -> dict:
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def rows(self) -> list[dict]:
+        return [self.row(index) for index in range(len(self))]
+
+    def write(self, path: Path):
+        """
+        writes the table as csv, or as columnar json if the path
+        ends in .json
+        -------
+        arguments:
+            - path: the file to write
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() == ".json":
+            path.write_text(
+                json.dumps(
+                    {
+                        name: [_plain(value) for value in values]
+                        for name, values in self.columns.items()
+                    },
+                    indent=2,
+                )
+            )
+            return
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(self.columns.keys())
+            for index in range(len(self)):
+                writer.writerow(
+                    _plain(values[index]) for values in self.columns.values()
+                )
+
+
+def _plain(value: Any) -> Any:
+    """converts a table value to something csv and json can write"""
+    if isinstance(value, (Enum, Flag)):
+        return value.name
+    return value
+
+
+def parse_condition(condition: str) -> Callable[[dict], bool]:
+    """
+    parses a simple row filter such as "bracket_depth<13"
+    -------
+    arguments:
+        - condition: a column name, a comparison
+            (<, <=, >, >=, ==, !=) and a value
+    """
+    for symbol, comparison in _COMPARISONS.items():
+        if symbol in condition:
+            column, value = (part.strip() for part in condition.split(symbol))
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+
+            def matches(row: dict) -> bool:
+                row_value = row[column]
+                if isinstance(row_value, (Enum, Flag)):
+                    row_value = row_value.name
+                return comparison(row_value, value)
+
+            return matches
+    raise ValueError(f"invalid condition {condition}")
+
+
+class ParameterSweep:
+    """
+    evaluates a grid of BenderConfig variations
+    -------
+    arguments:
+        - base_config: the configuration every point is derived from
+        - axes: a mapping of configuration field path to the values
+            to sweep for that field
+        - columns: the derived BenderConfig values to record for each point
+    """
+
+    def __init__(
+        self,
+        base_config: BenderConfig,
+        axes: dict[str, list],
+        columns: Optional[list[str]] = None,
+    ):
+        self.base_config = base_config
+        self.axes = axes
+        self.columns = DEFAULT_COLUMNS if columns is None else columns
+
+    def points(self) -> list[dict]:
+        """every combination of the swept values"""
+        names = list(self.axes.keys())
+        return [
+            dict(zip(names, values))
+            for values in product(*(self.axes[name] for name in names))
+        ]
+
+    def config_for(self, point: dict) -> BenderConfig:
+        """an independent BenderConfig for a single point"""
+        config = snapshot(self.base_config).thaw()
+        for path, value in point.items():
+            set_config_value(config, path, value)
+        return config
+
+    def evaluate(self) -> SweepTable:
+        """
+        evaluates the derived dimensions and constraint violations for
+        every point without generating any geometry. A single working
+        configuration is reused, so only the derived values that depend on
+        the swept fields are recomputed between points.
+        """
+        table = SweepTable()
+        config = snapshot(self.base_config).thaw()
+        for point in self.points():
+            for path, value in point.items():
+                set_config_value(config, path, value)
+            row = dict(point)
+            violations = validate_config(config)
+            for column in self.columns:
+                try:
+                    row[column] = get_config_value(config, column)
+                except (ArithmeticError, ValueError):
+                    row[column] = None
+            row["violations"] = "; ".join(str(v) for v in violations)
+            table.append(row)
+        return table
+
+    def build(
+        self,
+        table: SweepTable,
+        parts: list[str],
+        selected: Optional[Callable[[dict], bool]] = None,
+        jobs: Optional[int] = None,
+    ) -> SweepTable:
+        """
+        builds geometry for the selected (valid) points and records the
+        volume of each part in a `<part>-volume` column; a point whose
+        part fails to build is recorded in a `<part>-error` column and the
+        sweep carries on
+        -------
+        arguments:
+            - table: the result of evaluate()
+            - parts: the SWEEP_PARTS to build
+            - selected: a row filter, every valid row if not specified
+            - jobs: the number of worker processes, 1 builds in process
+        """
+        for part in parts:
+            if part not in SWEEP_PARTS:
+                raise ValueError(f"unknown part {part}")
+        rows = table.rows()
+        indices = [
+            index
+            for index, row in enumerate(rows)
+            if not row["violations"] and (selected is None or selected(row))
+        ]
+        tasks = [
+            (self.config_for(self._point(rows[index])), part)
+            for index in indices
+            for part in parts
+        ]
+        for part in parts:
+            for suffix in ("volume", "seconds", "error"):
+                if f"{part}-{suffix}" not in table.columns:
+                    table.add_column(f"{part}-{suffix}")
+        if jobs == 1:
+            self._record(table, indices, parts, map(_build_part, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                self._record(
+                    table, indices, parts, executor.map(_build_part, tasks)
+                )
+        return table
+
+    def _record(
+        self,
+        table: SweepTable,
+        indices: list[int],
+        parts: list[str],
+        results: Iterable[tuple],
+    ):
+        """writes each built part's results to its point's row"""
+        for task_index, (volume, seconds, error) in enumerate(results):
+            index = indices[task_index // len(parts)]
+            part = parts[task_index % len(parts)]
+            table.columns[f"{part}-volume"][index] = volume
+            table.columns[f"{part}-seconds"][index] = seconds
+            table.columns[f"{part}-error"][index] = error
+
+    def _point(self, row: dict) -> dict:
+        return {path: row[path] for path in self.axes}
+
+
+def _build_part(
+    task: tuple[BenderConfig, str],
+) -> tuple[Optional[float], float, Optional[str]]:
+    """
+    compiles a single part for a sweep point and
+    returns its total volume, the build time and the error it
+    failed with, if it did
+    """
+    config, part = task
+    start_time = time()
+    try:
+        partomatic = SWEEP_PARTS[part](config)
+        partomatic.compile()
+        volume = sum(
+            automatable_part.part.volume
+            for automatable_part in partomatic.parts
+        )
+    except Exception as error:
+        # one point the kernel can't build doesn't lose the whole sweep
+        return None, time() - start_time, f"{type(error).__name__}: {error}"
+    return volume, time() - start_time, None
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Sweep BenderConfig values")
+    parser.add_argument(
+        "--config",
+        type=str,
+        default="dev",
+        help="the base configuration file (name in build-configs or path)",
+    )
+    parser.add_argument(
+        "--vary",
+        action="append",
+        default=[],
+        help="field=values, values as 3,5,8 or start:stop:step",
+    )
+    parser.add_argument(
+        "--columns",
+        type=str,
+        default=",".join(DEFAULT_COLUMNS),
+        help="comma separated derived values to record",
+    )
+    parser.add_argument(
+        "--parts",
+        type=str,
+        default="",
+        help=f"comma separated parts to build ({', '.join(SWEEP_PARTS)})",
+    )
+    parser.add_argument(
+        "--build-where",
+        type=str,
+        default=None,
+        help='only build points matching a condition, e.g. "bracket_depth<13"',
+    )
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument(
+        "--output", type=str, default="../sweeps/sweep.csv"
+    )
+    args = parser.parse_args()
+
+    config_path = Path(args.config)
+    if not config_path.exists():
+        config_path = (
+            Path(__file__).parent / f"../build-configs/{args.config}.conf"
+        )
+    base_config = BenderConfig(config_path)
+    axes = {}
+    for vary in args.vary:
+        path, values = vary.split("=", 1)
+        axes[path.strip()] = parse_values(base_config, path.strip(), values)
+
+    sweep = ParameterSweep(
+        base_config,
+        axes,
+        columns=[column for column in args.columns.split(",") if column],
+    )
+    start_time = time()
+    table = sweep.evaluate()
+    milliseconds = (time() - start_time) * 1000
+    print(f"evaluated {len(table)} points in {milliseconds:.1f} ms")
+    parts = [part for part in args.parts.split(",") if part]
+    if parts:
+        start_time = time()
+        sweep.build(
+            table,
+            parts,
+            selected=(
+                parse_condition(args.build_where) if args.build_where else None
+            ),
+            jobs=args.jobs,
+        )
+        print(f"built geometry in {time() - start_time:.2f} seconds")
+    table.write(Path(args.output))
+    print(f"results written to {args.output}")
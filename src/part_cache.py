@@ -0,0 +1,455 @@
+"""
+a content-addressed cache of built parts, shared through a remote tier
+
+a part's files are stored under the sha256 of their contents, and a
+manifest listing those digests is stored under a key derived from
+everything the part's geometry depends on: its part class, every
+configuration value other than where the files are written, the source
+of the part's module, of the modules exporting its files and of every
+module they import, and the build123d and OCP versions. Before a job
+is built, its manifest is read from the local cache directory, then from
+the remote cache, and the files it lists are written to the job's output
+paths; only when neither holds it is the part built, and the files it
+exported are written back to both tiers. Any machine building
+`release.conf` after another has pushed it to a shared remote only
+downloads its stls.
+
+the remote tier speaks a minimal protocol: `GET /<name>` returns the
+object or 404, and `PUT /<name>` stores the request body. Running
+
+    python part_cache.py --directory /srv/part-cache --port 8765
+
+serves a directory over that protocol, evicting the least recently used
+objects once it holds more than `--max-size` MiB, and
+`build.py --remote-cache http://host:8765` builds against it.
+"""
+
+import re
+import tempfile
+from collections import OrderedDict
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from os import fdopen, replace
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+import build123d
+import OCP
+
+from build_plan import BuildJob
+from shared_jobs import geometry_key
+from source_graph import module_imports, source_digest
+
+# the local cache, beside the build history
+PART_CACHE = ".part-cache"
+
+# the modules writing a built part's stls, and its glb models, whatever
+# the part's own module imports
+STL_MODULES = ("build_plan", "reproducible_stl")
+GLB_MODULES = ("gltf_export",)
+
+# the kernel and its bindings, whose versions can change the geometry
+LIBRARY_VERSIONS = (build123d.__version__, OCP.__version__)
+
+# object names are sha256 digests
+_OBJECT_NAME = re.compile("^[0-9a-f]{64}$")
+
+
+class DirectoryStore:
+    """
+    objects stored as files in a directory, evicting the least recently
+    used objects once their total size exceeds a limit
+    -------
+    arguments:
+        - path: the directory
+        - max_bytes: the total size of the objects kept, None for no limit
+    """
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        # object name -> size, least recently used first; the files'
+        # modification times carry the order between processes
+        files = sorted(
+            (path.stat().st_mtime, path.name, path.stat().st_size)
+            for path in self.path.iterdir()
+            if _OBJECT_NAME.match(path.name)
+        )
+        self._sizes = OrderedDict((name, size) for _, name, size in files)
+        self.size = sum(self._sizes.values())
+
+    def get(self, name: str) -> Optional[bytes]:
+        """
+        an object's contents, None if it isn't stored
+        -------
+        arguments:
+            - name: the object's name
+        """
+        path = self.path / name
+        with self._lock:
+            try:
+                data = path.read_bytes()
+                path.touch()
+            except FileNotFoundError:
+                return None
+            if name in self._sizes:
+                self._sizes.move_to_end(name)
+        return data
+
+    def put(self, name: str, data: bytes):
+        """
+        stores an object, then evicts the least recently used objects
+        until the store is within its size limit
+        -------
+        arguments:
+            - name: the object's name
+            - data: the object's contents
+        """
+        if not _OBJECT_NAME.match(name):
+            raise ValueError(f"invalid object name {name!r}")
+        # each writer has a temporary file of its own, so concurrent puts
+        # of an object never publish each other's partial writes
+        handle, temporary = tempfile.mkstemp(
+            prefix=f"{name}.", suffix=".tmp", dir=self.path
+        )
+        with fdopen(handle, "wb") as file:
+            file.write(data)
+        replace(temporary, self.path / name)
+        with self._lock:
+            self.size += len(data) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            while (
+                self.max_bytes is not None
+                and self.size > self.max_bytes
+                and len(self._sizes) > 1
+            ):
+                evicted, size = self._sizes.popitem(last=False)
+                (self.path / evicted).unlink(missing_ok=True)
+                self.size -= size
+
+
+class HttpStore:
+    """
+    objects stored on a remote cache server; an unreachable server is
+    treated as empty for the rest of the build rather than failing it
+    -------
+    arguments:
+        - url: the server's url
+        - timeout: the seconds to wait for each request
+        - log: called with each error; None ignores them
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.log = log or (lambda text: None)
+        self.available = True
+
+    def _request(self, name: str, data: Optional[bytes] = None):
+        request = Request(
+            f"{self.url}/{name}",
+            data=data,
+            method="GET" if data is None else "PUT",
+        )
+        return urlopen(request, timeout=self.timeout)
+
+    def get(self, name: str) -> Optional[bytes]:
+        """
+        an object's contents, None if the server doesn't hold it
+        -------
+        arguments:
+            - name: the object's name
+        """
+        if not self.available:
+            return None
+        try:
+            with self._request(name) as response:
+                return response.read()
+        except HTTPError as error:
+            if error.code != 404:
+                self.log(f"remote cache: {error}")
+        except (URLError, OSError) as error:
+            self.log(f"remote cache unavailable: {error}")
+            self.available = False
+        return None
+
+    def put(self, name: str, data: bytes):
+        """
+        stores an object on the server
+        -------
+        arguments:
+            - name: the object's name
+            - data: the object's contents
+        """
+        if not self.available:
+            return
+        try:
+            self._request(name, data).close()
+        except HTTPError as error:
+            self.log(f"remote cache: {error}")
+        except (URLError, OSError) as error:
+            self.log(f"remote cache unavailable: {error}")
+            self.available = False
+
+
+class PartCache:
+    """
+    reads built parts through a local and an optional remote store
+    -------
+    arguments:
+        - local: the local store
+        - remote: the shared store, None to only cache locally
+        - source: the digest of the source, used for every part; by
+            default each part uses the digest of its own module, the
+            modules exporting its files and the modules they import
+    """
+
+    def __init__(
+        self,
+        local: DirectoryStore,
+        remote: Optional[HttpStore] = None,
+        source: Optional[str] = None,
+    ):
+        self.local = local
+        self.remote = remote
+        self.source = source
+        # the source digest of each part module (with and without the glb
+        # export), and the import graph
+        self._sources = {}
+        self._imports = None
+        self.statistics = {"local": 0, "remote": 0, "misses": 0}
+
+    def key(self, job: BuildJob, glb: bool = False) -> str:
+        """
+        the name of a job's manifest, which is equal for every job
+        building the same geometry from the same source
+        -------
+        arguments:
+            - job: the build job
+            - glb: the manifest lists the glb model beside each stl too
+        """
+        part_class, values = geometry_key(job)
+        return sha256(
+            repr(
+                (
+                    part_class.__module__,
+                    part_class.__name__,
+                    values,
+                    self.source or self._source(part_class.__module__, glb),
+                    LIBRARY_VERSIONS,
+                )
+            ).encode()
+        ).hexdigest()
+
+    def _source(self, module: str, glb: bool) -> str:
+        """
+        the digest of a part module and the modules exporting its files,
+        and every module they import
+        """
+        if (module, glb) not in self._sources:
+            if self._imports is None:
+                self._imports = module_imports()
+            modules = [module, *STL_MODULES, *(GLB_MODULES if glb else ())]
+            self._sources[module, glb] = source_digest(
+                modules, imports=self._imports
+            )
+        return self._sources[module, glb]
+
+    def _get(self, name: str) -> tuple[Optional[bytes], str]:
+        """an object and the tier it was found in, written back locally"""
+        data = self.local.get(name)
+        if data is not None:
+            return data, "local"
+        if self.remote is not None:
+            data = self.remote.get(name)
+            if data is not None:
+                self.local.put(name, data)
+                return data, "remote"
+        return None, "misses"
+
+    def _files(
+        self, job: BuildJob, manifest: bytes, glb: bool
+    ) -> Optional[list[tuple[Path, bytes]]]:
+        """
+        the path and contents of every file a manifest lists, None if the
+        manifest or any file is missing or corrupt
+        """
+        outputs = job.output_files()
+        try:
+            entry = loads(manifest)
+            if len(entry["stl"]) != len(outputs):
+                return None
+            digests = list(zip(entry["stl"], outputs))
+            if glb:
+                if "glb" not in entry:
+                    return None
+                glbs = [path.with_suffix(".glb") for path in outputs]
+                digests.extend(zip(entry["glb"], glbs))
+        except (ValueError, KeyError, TypeError):
+            # a truncated or foreign manifest is a miss, like a bad file
+            return None
+        files = []
+        for digest, path in digests:
+            data, _ = self._get(digest)
+            if data is None or sha256(data).hexdigest() != digest:
+                return None
+            files.append((path, data))
+        return files
+
+    def fetch(self, job: BuildJob, glb: bool = False) -> Optional[list[Path]]:
+        """
+        writes a cached job's files to its output paths, returning its
+        stl paths, or None if the job has to be built
+        -------
+        arguments:
+            - job: the build job
+            - glb: the glb model beside each stl is needed too
+        """
+        manifest, tier = self._get(self.key(job, glb))
+        files = None
+        if manifest is not None:
+            files = self._files(job, manifest, glb)
+        if files is None:
+            self.statistics["misses"] += 1
+            return None
+        for path, data in files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        self.statistics[tier] += 1
+        return job.output_files()
+
+    def store(self, job: BuildJob, glb: bool = False):
+        """
+        writes the files a job exported to both tiers
+        -------
+        arguments:
+            - job: the built job
+            - glb: store the glb model beside each stl too
+        """
+        entry = {"stl": []}
+        if glb:
+            entry["glb"] = []
+        for path in job.output_files():
+            for suffix in entry:
+                data = path.with_suffix(f".{suffix}").read_bytes()
+                digest = sha256(data).hexdigest()
+                entry[suffix].append(digest)
+                self.local.put(digest, data)
+                if self.remote is not None:
+                    self.remote.put(digest, data)
+        # the manifest is written last, so it only lists stored files
+        manifest = dumps(entry).encode()
+        # a manifest listing glb models serves builds without them too
+        for key in {self.key(job), self.key(job, glb)}:
+            self.local.put(key, manifest)
+            if self.remote is not None:
+                self.remote.put(key, manifest)
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    """serves a DirectoryStore over the GET/PUT protocol"""
+
+    store: DirectoryStore
+
+    def _name(self) -> Optional[str]:
+        name = self.path.strip("/")
+        if _OBJECT_NAME.match(name):
+            return name
+        self.send_error(400, "object names are sha256 digests")
+        return None
+
+    def do_GET(self):
+        name = self._name()
+        if name is None:
+            return
+        data = self.store.get(name)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        name = self._name()
+        if name is None:
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        self.store.put(name, self.rfile.read(length))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+def cache_server(
+    store: DirectoryStore, host: str = "127.0.0.1", port: int = 8765
+) -> ThreadingHTTPServer:
+    """
+    an http server sharing a store; call serve_forever() to run it
+    -------
+    arguments:
+        - store: the store served
+        - host: the address to listen on
+        - port: the port to listen on, 0 for any free port
+    """
+    handler = type(
+        "StoreRequestHandler", (CacheRequestHandler,), {"store": store}
+    )
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(
+        description="Serve a directory as a shared part cache"
+    )
+    parser.add_argument(
+        "--directory",
+        type=Path,
+        default=Path(__file__).parent / PART_CACHE,
+        help="the directory the cached parts are kept in",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="the address to listen on"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="the port to listen on"
+    )
+    parser.add_argument(
+        "--max-size",
+        type=float,
+        default=4096,
+        help="evict the least recently used parts beyond this many MiB",
+    )
+    args = parser.parse_args()
+
+    server = cache_server(
+        DirectoryStore(args.directory, int(args.max_size * 2**20)),
+        args.host,
+        args.port,
+    )
+    print(
+        f"serving {args.directory} on "
+        f"http://{args.host}:{server.server_address[1]}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
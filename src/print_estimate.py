@@ -0,0 +1,364 @@
+"""
+estimates print time and material for every part a BenderConfig exports,
+and for a complete kit, without invoking a slicer
+
+each part is reduced to its volume, its wall and skin areas and its layer
+count, all summed with NumPy over the exported stl's triangles. A machine
+profile turns those into the plastic a slicer would lay down: perimeters
+around the walls, solid skins over the top and bottom surfaces and a
+fraction of the remaining volume as infill. Print time is that volume at
+the profile's flow rate plus a fixed cost for every layer change, which
+is close enough to price and schedule a kit but no replacement for a
+slicer's estimate of a single plate.
+
+usage: python print_estimate.py ../build-configs/release.conf
+"""
+
+from dataclasses import asdict, dataclass
+from json import dumps
+from math import ceil, cos, pi, radians
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from bender_config import BenderConfig
+from build_plan import STL_FILE_NAMES, BuildJob, build_plan
+from printability import read_stl
+
+# faces closer to horizontal than this are printed as top or bottom skins
+SKIN_ANGLE = 45
+
+# the copies of each default part in a complete kit: a bracket, clip and
+# wheel per filament, and two wall assemblies of two guide walls, two
+# reinforced sidewalls and a sidewall between each pair of chambers
+KIT_QUANTITIES: dict[str, Callable[[BenderConfig], int]] = {
+    "filament-bracket-bottom": lambda config: config.filament_count,
+    "filament-bracket-top": lambda config: config.filament_count,
+    "filament-bracket-clip": lambda config: config.filament_count,
+    "filament-bracket-wheel": lambda config: config.filament_count,
+    "wall-guide": lambda config: 4,
+    "wall-side-reinforced": lambda config: 4,
+    "wall-side": lambda config: 2 * (config.filament_count - 1),
+    "frame-top": lambda config: 1,
+    "frame-connector": lambda config: 1,
+    "frame-bottom": lambda config: 1,
+    "lock-pin": lambda config: 1,
+    "frame-wall-bracket": lambda config: 1,
+    "frame-surface-mount-bracket": lambda config: 1,
+}
+
+
+@dataclass(frozen=True)
+class MachineProfile:
+    """
+    the printer and slicer settings a part is estimated with
+    -------
+    arguments:
+        - speed: the average extrusion speed (mm/s)
+        - layer_height: the height of each layer (mm)
+        - line_width: the width of each extruded line (mm)
+        - perimeters: the number of perimeters around each wall
+        - skin_layers: the number of solid layers on top and bottom
+            surfaces
+        - infill: the fraction of the interior filled (0 to 1)
+        - layer_time: the time spent changing layers, travelling and
+            retracting on each layer (s)
+        - density: the density of the filament (g/cm³), 1.24 for PLA
+        - filament_diameter: the diameter of the filament (mm)
+    """
+
+    speed: float = 60
+    layer_height: float = 0.2
+    line_width: float = 0.45
+    perimeters: int = 2
+    skin_layers: int = 4
+    infill: float = 0.15
+    layer_time: float = 3
+    density: float = 1.24
+    filament_diameter: float = 1.75
+
+    @property
+    def flow_rate(self) -> float:
+        """the volume extruded each second (mm³/s)"""
+        return self.speed * self.line_width * self.layer_height
+
+
+@dataclass
+class PartEstimate:
+    """
+    the estimated print of a single stl
+    -------
+    arguments:
+        - name: the stl's file name
+        - path: the stl's path relative to the configuration's stl_folder
+        - quantity: the number of copies in a complete kit, 0 for
+            alternate parts and tools
+        - layers: the number of layers
+        - volume: the volume of plastic extruded (mm³)
+        - filament_length: the filament needed (mm)
+        - weight: the weight of the printed part (g)
+        - print_time: the time to print the part (s)
+    """
+
+    name: str
+    path: str
+    quantity: int
+    layers: int
+    volume: float
+    filament_length: float
+    weight: float
+    print_time: float
+
+
+@dataclass
+class KitEstimate:
+    """
+    the estimated print of a complete kit
+    -------
+    arguments:
+        - parts: the number of parts printed
+        - filament_length: the filament needed (mm)
+        - weight: the weight of the printed parts (g)
+        - print_time: the time to print every part (s)
+    """
+
+    parts: int
+    filament_length: float
+    weight: float
+    print_time: float
+
+
+def estimate_triangles(
+    triangles: np.ndarray,
+    profile: MachineProfile = MachineProfile(),
+    name: str = "",
+    path: str = "",
+    quantity: int = 0,
+) -> PartEstimate:
+    """
+    estimates the print of a closed mesh in its export orientation
+    -------
+    arguments:
+        - triangles: (n, 3, 3) the corners of the triangles
+        - profile: the machine profile to print with
+        - name: the name of the mesh
+        - path: the path of the mesh's stl
+        - quantity: the number of copies in a kit
+    """
+    if not len(triangles):
+        return PartEstimate(name, path, quantity, 0, 0, 0, 0, 0)
+    normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    lengths = np.linalg.norm(normals, axis=1)
+    areas = lengths / 2
+    skin = np.abs(normals[:, 2]) > lengths * cos(radians(SKIN_ANGLE))
+    solid = abs(
+        float(
+            np.einsum(
+                "ij,ij->",
+                triangles[:, 0],
+                np.cross(triangles[:, 1], triangles[:, 2]),
+            )
+        )
+        / 6
+    )
+    # every surface is printed solid to the depth of its perimeters or
+    # skin layers; thin parts have no room left for infill
+    shell = min(
+        solid,
+        float(areas[~skin].sum())
+        * profile.perimeters
+        * profile.line_width
+        + float(areas[skin].sum())
+        * profile.skin_layers
+        * profile.layer_height,
+    )
+    volume = shell + (solid - shell) * profile.infill
+    # stls store single precision corners, so round off their error
+    layers = ceil(
+        round(float(np.ptp(triangles[:, :, 2])) / profile.layer_height, 4)
+    )
+    return PartEstimate(
+        name=name,
+        path=path,
+        quantity=quantity,
+        layers=layers,
+        volume=volume,
+        filament_length=volume / (pi * (profile.filament_diameter / 2) ** 2),
+        weight=volume / 1000 * profile.density,
+        print_time=volume / profile.flow_rate + layers * profile.layer_time,
+    )
+
+
+def kit_quantity(bender_config: BenderConfig, job: BuildJob, name: str) -> int:
+    """
+    the number of copies of one of a job's stls in a complete kit
+    -------
+    arguments:
+        - bender_config: the configuration the job belongs to
+        - job: the build job exporting the stl
+        - name: the stl's base name, as listed in STL_FILE_NAMES
+    """
+    if job.config.file_prefix or name not in KIT_QUANTITIES:
+        return 0
+    return KIT_QUANTITIES[name](bender_config)
+
+
+def estimate_plan(
+    bender_config: BenderConfig,
+    profile: MachineProfile = MachineProfile(),
+) -> tuple[list[PartEstimate], list[Path]]:
+    """
+    estimates every stl in a configuration's build plan, returning the
+    estimates and the paths of any stls which haven't been exported
+    -------
+    arguments:
+        - bender_config: the configuration
+        - profile: the machine profile to print with
+    """
+    estimates, missing = [], []
+    for job in build_plan(bender_config):
+        for name, path, relative_path in zip(
+            STL_FILE_NAMES[job.part_class](job.config),
+            job.output_files(),
+            job.relative_output_files(bender_config.stl_folder),
+        ):
+            if not path.exists():
+                missing.append(path)
+                continue
+            estimates.append(
+                estimate_triangles(
+                    read_stl(path),
+                    profile,
+                    path.name,
+                    relative_path,
+                    kit_quantity(bender_config, job, name),
+                )
+            )
+    return estimates, missing
+
+
+def kit_estimate(estimates: list[PartEstimate]) -> KitEstimate:
+    """
+    totals the estimates of every part in a kit
+    -------
+    arguments:
+        - estimates: the part estimates, with their kit quantities
+    """
+    return KitEstimate(
+        parts=sum(estimate.quantity for estimate in estimates),
+        filament_length=sum(
+            estimate.filament_length * estimate.quantity
+            for estimate in estimates
+        ),
+        weight=sum(
+            estimate.weight * estimate.quantity for estimate in estimates
+        ),
+        print_time=sum(
+            estimate.print_time * estimate.quantity for estimate in estimates
+        ),
+    )
+
+
+def write_estimates(
+    estimates: list[PartEstimate], kit: KitEstimate, path: Path
+):
+    """
+    writes the part and kit estimates as json
+    -------
+    arguments:
+        - estimates: the part estimates
+        - kit: the kit estimate
+        - path: the json file
+    """
+    Path(path).write_text(
+        dumps(
+            {
+                "parts": [asdict(estimate) for estimate in estimates],
+                "kit": asdict(kit),
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def hours(seconds: float) -> str:
+    """a duration as hours and minutes"""
+    minutes = round(seconds / 60)
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from time import perf_counter
+
+    parser = ArgumentParser(
+        description="Estimate print time and material for exported parts"
+    )
+    parser.add_argument(
+        "config", type=Path, help="the configuration whose stls to estimate"
+    )
+    for setting, help_text in (
+        ("speed", "the average extrusion speed (mm/s)"),
+        ("layer-height", "the height of each layer (mm)"),
+        ("line-width", "the width of each extruded line (mm)"),
+        ("perimeters", "the number of perimeters around each wall"),
+        ("skin-layers", "the number of solid top and bottom layers"),
+        ("infill", "the fraction of the interior filled (0 to 1)"),
+        ("layer-time", "the time spent on each layer change (s)"),
+        ("density", "the density of the filament (g/cm³)"),
+    ):
+        default = getattr(MachineProfile, setting.replace("-", "_"))
+        parser.add_argument(
+            f"--{setting}", type=type(default), default=default, help=help_text
+        )
+    parser.add_argument(
+        "--json", type=Path, help="also write the estimates to a json file"
+    )
+    args = parser.parse_args()
+
+    start_time = perf_counter()
+    machine_profile = MachineProfile(
+        speed=args.speed,
+        layer_height=args.layer_height,
+        line_width=args.line_width,
+        perimeters=args.perimeters,
+        skin_layers=args.skin_layers,
+        infill=args.infill,
+        layer_time=args.layer_time,
+        density=args.density,
+    )
+    part_estimates, missing_stls = estimate_plan(
+        BenderConfig(args.config), machine_profile
+    )
+    kit_totals = kit_estimate(part_estimates)
+    for part_estimate in part_estimates:
+        quantity = (
+            f" ({part_estimate.quantity}x)" if part_estimate.quantity else ""
+        )
+        print(
+            f"{part_estimate.path}{quantity}: "
+            f"{part_estimate.weight:.1f} g, "
+            f"{part_estimate.filament_length / 1000:.2f} m, "
+            f"{part_estimate.layers} layers, "
+            f"{hours(part_estimate.print_time)}"
+        )
+    print(
+        f"kit of {kit_totals.parts} parts: {kit_totals.weight:.0f} g, "
+        f"{kit_totals.filament_length / 1000:.1f} m, "
+        f"{hours(kit_totals.print_time)}"
+    )
+    if missing_stls:
+        print(
+            f"{len(missing_stls)} stls haven't been exported, "
+            "build the configuration to estimate them"
+        )
+    print(
+        f"estimated {len(part_estimates)} stls in "
+        f"{perf_counter() - start_time:.2f} seconds"
+    )
+    if args.json:
+        write_estimates(part_estimates, kit_totals, args.json)
@@ -0,0 +1,417 @@
+"""
+analyzes how well exported stl meshes will print in their export
+orientation: overhangs steeper than a configurable angle, bridges printed
+across open air, walls thinner than a printer reliably lays down, and the
+filament each part needs
+
+every measure is computed with NumPy over a mesh's whole triangle array at
+once. Wall thickness is measured by casting a ray inward from every
+triangle to the opposite surface, and bridges by casting rays sideways
+from under them to the walls holding them up, both through a MeshBvh, so
+a complete kit is analyzed in seconds.
+
+usage: python printability.py ../stl/release
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from json import dumps, loads
+from math import cos, pi, radians, sin
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from mesh_bvh import MeshBvh
+from offscreen_renderer import DEFAULT_COLOR, Mesh
+
+STL_HEADER_SIZE = 80
+STL_TRIANGLE = np.dtype(
+    [
+        ("normal", "<f4", (3,)),
+        ("corners", "<f4", (3, 3)),
+        ("attribute", "<u2"),
+    ]
+)
+
+# downward faces within this many degrees of horizontal print as bridges
+BRIDGE_ANGLE = 1
+# bridges are measured this far below them, about half a layer
+BRIDGE_DEPTH = 0.1
+# rays start this far inside the surface so they don't hit their own face
+RAY_OFFSET = 1e-6
+# the horizontal directions bridges are measured in, in opposite pairs
+SPAN_DIRECTIONS = np.array(
+    [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0]], dtype=float
+)
+
+
+@dataclass(frozen=True)
+class PrintabilitySettings:
+    """
+    the limits a part is checked against
+    -------
+    arguments:
+        - overhang_angle: the steepest angle (degrees from vertical) a
+            downward facing surface prints without support
+        - minimum_wall: the thinnest wall (mm) which prints reliably
+        - maximum_bridge: the longest span (mm) which bridges reliably
+        - overhang_allowance: the overhang area (mm²) ignored, so the
+            small facets of rounded bottom edges aren't reported
+        - wall_search: walls thicker than this (mm) aren't measured
+        - bed_distance: faces within this distance (mm) of the lowest
+            point rest on the bed
+        - density: the density of the filament (g/cm³), 1.24 for PLA
+        - filament_diameter: the diameter of the filament (mm)
+    """
+
+    overhang_angle: float = 45
+    minimum_wall: float = 0.8
+    maximum_bridge: float = 20
+    overhang_allowance: float = 5
+    wall_search: float = 10
+    bed_distance: float = 0.01
+    density: float = 1.24
+    filament_diameter: float = 1.75
+
+
+@dataclass
+class PrintabilityReport:
+    """
+    the printability of a single mesh
+    -------
+    arguments:
+        - name: the name of the mesh (its file name)
+        - triangles: the number of triangles
+        - height: the height of the part as exported (mm)
+        - volume: the volume of the part (mm³)
+        - surface_area: the area of the part's surface (mm²)
+        - overhang_area: the area steeper than the overhang angle, other
+            than bridges (mm²)
+        - bridge_area: the area of horizontal downward faces (mm²)
+        - longest_bridge: the longest span across a bridge (mm)
+        - unsupported_area: the area of horizontal downward faces with
+            no wall on one side to bridge to (mm²)
+        - minimum_wall: the thinnest wall measured (mm), None if every
+            wall is thicker than the wall search distance
+        - thin_wall_area: the surface area of walls thinner than
+            the minimum wall (mm²)
+        - filament_length: the filament needed to print the part solid (mm)
+        - weight: the weight of the part printed solid (g)
+        - problems: a description of each limit the part exceeds
+    """
+
+    name: str
+    triangles: int
+    height: float
+    volume: float
+    surface_area: float
+    overhang_area: float
+    bridge_area: float
+    longest_bridge: float
+    unsupported_area: float
+    minimum_wall: Optional[float]
+    thin_wall_area: float
+    filament_length: float
+    weight: float
+    problems: list[str] = field(default_factory=list)
+
+
+def read_stl(path: Path) -> np.ndarray:
+    """
+    reads the triangles of a binary or ascii stl file as an (n, 3, 3)
+    array of corners
+    -------
+    arguments:
+        - path: the stl file
+    """
+    data = Path(path).read_bytes()
+    if len(data) >= STL_HEADER_SIZE + 4:
+        count = int(np.frombuffer(data, "<u4", 1, STL_HEADER_SIZE)[0])
+        if len(data) == STL_HEADER_SIZE + 4 + count * STL_TRIANGLE.itemsize:
+            triangles = np.frombuffer(
+                data, STL_TRIANGLE, count, STL_HEADER_SIZE + 4
+            )
+            return triangles["corners"].astype(float)
+    # ascii stls list every corner on a "vertex x y z" line
+    corners = [
+        line.split()[1:4]
+        for line in data.decode("ascii", "replace").splitlines()
+        if line.lstrip().startswith("vertex")
+    ]
+    return np.array(corners, dtype=float).reshape(-1, 3, 3)
+
+
+def bridge_spans(bvh: MeshBvh, points: np.ndarray) -> np.ndarray:
+    """
+    the distance between the walls either side of each point, along
+    whichever of the x and y axes is shorter; inf if no axis has walls
+    on both sides
+    -------
+    arguments:
+        - bvh: the part's hierarchy
+        - points: (n, 3) the points, just below bridges
+    """
+    distances = bvh.ray_distances(
+        np.tile(points, (len(SPAN_DIRECTIONS), 1)),
+        np.repeat(SPAN_DIRECTIONS, len(points), axis=0),
+    ).reshape(len(SPAN_DIRECTIONS), len(points))
+    return np.minimum(
+        distances[0] + distances[1], distances[2] + distances[3]
+    )
+
+
+def analyze_triangles(
+    triangles: np.ndarray,
+    name: str = "",
+    settings: PrintabilitySettings = PrintabilitySettings(),
+) -> PrintabilityReport:
+    """
+    analyzes a closed mesh in the orientation it will be printed in
+    -------
+    arguments:
+        - triangles: (n, 3, 3) the corners of the triangles, wound
+            counterclockwise seen from outside
+        - name: the name of the mesh
+        - settings: the limits to check against
+    """
+    normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    areas = np.linalg.norm(normals, axis=1) / 2
+    triangles, normals, areas = (
+        triangles[areas > 0],
+        normals[areas > 0],
+        areas[areas > 0],
+    )
+    normals /= 2 * areas[:, None]
+    if not len(triangles):
+        return PrintabilityReport(
+            name, 0, 0, 0, 0, 0, 0, 0, 0, None, 0, 0, 0
+        )
+
+    # the divergence theorem over tetrahedra from the origin
+    volume = abs(
+        float(
+            np.einsum(
+                "ij,ij->",
+                triangles[:, 0],
+                np.cross(triangles[:, 1], triangles[:, 2]),
+            )
+        )
+        / 6
+    )
+    heights = triangles[:, :, 2]
+    on_bed = heights.max(axis=1) <= heights.min() + settings.bed_distance
+    bridge = (normals[:, 2] < -cos(radians(BRIDGE_ANGLE))) & ~on_bed
+    overhang = (
+        (normals[:, 2] < -sin(radians(settings.overhang_angle)))
+        & ~on_bed
+        & ~bridge
+    )
+
+    bvh = MeshBvh(
+        Mesh(
+            triangles.reshape(-1, 3),
+            np.arange(len(triangles) * 3).reshape(-1, 3),
+            np.arange(len(triangles)),
+            DEFAULT_COLOR,
+            name,
+        )
+    )
+    spans = bridge_spans(
+        bvh, triangles[bridge].mean(axis=1) - [0, 0, BRIDGE_DEPTH]
+    )
+    supported = np.isfinite(spans)
+    # a ray from each face straight into the part crosses the wall behind
+    walls = bvh.ray_distances(
+        triangles.mean(axis=1) - normals * RAY_OFFSET,
+        -normals,
+        settings.wall_search,
+    )
+    walls = walls + RAY_OFFSET
+    thin = walls < settings.minimum_wall
+
+    filament_area = pi * (settings.filament_diameter / 2) ** 2
+    report = PrintabilityReport(
+        name=name,
+        triangles=len(triangles),
+        height=float(np.ptp(heights)),
+        volume=volume,
+        surface_area=float(areas.sum()),
+        overhang_area=float(areas[overhang].sum()),
+        bridge_area=float(areas[bridge].sum()),
+        longest_bridge=float(spans[supported].max(initial=0)),
+        unsupported_area=float(areas[bridge][~supported].sum()),
+        minimum_wall=(
+            float(walls.min()) if np.isfinite(walls).any() else None
+        ),
+        thin_wall_area=float(areas[thin].sum()),
+        filament_length=volume / filament_area,
+        weight=volume / 1000 * settings.density,
+    )
+    if report.overhang_area > settings.overhang_allowance:
+        report.problems.append(
+            f"{report.overhang_area:.0f} mm² overhangs more than "
+            f"{settings.overhang_angle:g}°"
+        )
+    if report.unsupported_area > settings.overhang_allowance:
+        report.problems.append(
+            f"{report.unsupported_area:.0f} mm² of horizontal overhangs "
+            "with no wall to bridge to"
+        )
+    if report.longest_bridge > settings.maximum_bridge:
+        report.problems.append(
+            f"{report.longest_bridge:.1f} mm bridge "
+            f"(longer than {settings.maximum_bridge:g} mm)"
+        )
+    if report.thin_wall_area > 0:
+        report.problems.append(
+            f"{report.thin_wall_area:.1f} mm² of walls thinner than "
+            f"{settings.minimum_wall:g} mm (thinnest "
+            f"{report.minimum_wall:.2f} mm)"
+        )
+    return report
+
+
+def analyze_stl(
+    path: Path, settings: PrintabilitySettings = PrintabilitySettings()
+) -> PrintabilityReport:
+    """
+    analyzes an stl file in its export orientation
+    -------
+    arguments:
+        - path: the stl file
+        - settings: the limits to check against
+    """
+    return analyze_triangles(read_stl(path), Path(path).name, settings)
+
+
+def _analyze_task(task: tuple[Path, PrintabilitySettings]):
+    return analyze_stl(*task)
+
+
+def analyze_files(
+    paths: Iterable[Path],
+    settings: PrintabilitySettings = PrintabilitySettings(),
+    jobs: Optional[int] = None,
+) -> list[PrintabilityReport]:
+    """
+    analyzes stl files, and every stl file inside any directories
+    -------
+    arguments:
+        - paths: the stl files and directories
+        - settings: the limits to check against
+        - jobs: the number of files to analyze in parallel, one process
+            per cpu if not set, 1 analyzes in the current process
+    """
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.stl")) if path.is_dir() else [path])
+    tasks = [(path, settings) for path in files]
+    if jobs == 1 or len(tasks) <= 1:
+        return list(map(_analyze_task, tasks))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_analyze_task, tasks))
+
+
+def read_report(path: Path) -> list[PrintabilityReport]:
+    """
+    reads the reports written by write_report, none if there is no file
+    -------
+    arguments:
+        - path: the json file
+    """
+    if not Path(path).exists():
+        return []
+    return [
+        PrintabilityReport(**report)
+        for report in loads(Path(path).read_text())
+    ]
+
+
+def write_report(reports: list[PrintabilityReport], path: Path):
+    """
+    writes the reports as json
+    -------
+    arguments:
+        - reports: the reports to write
+        - path: the json file
+    """
+    Path(path).write_text(
+        dumps([asdict(report) for report in reports], indent=2) + "\n"
+    )
+
+
+def summary(report: PrintabilityReport) -> str:
+    """a single line summary of a report"""
+    wall = (
+        "none measured"
+        if report.minimum_wall is None
+        else f"{report.minimum_wall:.2f} mm"
+    )
+    return (
+        f"{report.name}: {report.weight:.1f} g, "
+        f"{report.filament_length / 1000:.2f} m, "
+        f"overhangs {report.overhang_area:.0f} mm², "
+        f"longest bridge {report.longest_bridge:.1f} mm, "
+        f"thinnest wall {wall}"
+    )
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from time import perf_counter
+
+    parser = ArgumentParser(
+        description="Check exported stls for printing problems"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        help="stl files, or directories to search for stl files",
+    )
+    parser.add_argument(
+        "--overhang-angle",
+        type=float,
+        default=PrintabilitySettings.overhang_angle,
+        help="the steepest overhang (degrees from vertical) without support",
+    )
+    parser.add_argument(
+        "--minimum-wall",
+        type=float,
+        default=PrintabilitySettings.minimum_wall,
+        help="the thinnest wall (mm) which prints reliably",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="the number of files to analyze in parallel",
+    )
+    parser.add_argument(
+        "--json", type=Path, help="also write the reports to a json file"
+    )
+    args = parser.parse_args()
+
+    start_time = perf_counter()
+    printability = analyze_files(
+        args.paths,
+        PrintabilitySettings(
+            overhang_angle=args.overhang_angle,
+            minimum_wall=args.minimum_wall,
+        ),
+        args.jobs,
+    )
+    for printability_report in printability:
+        print(summary(printability_report))
+        for problem in printability_report.problems:
+            print(f"\t{problem}")
+    print(
+        f"analyzed {len(printability)} stls "
+        f"({sum(r.weight for r in printability):.0f} g) in "
+        f"{perf_counter() - start_time:.2f} seconds"
+    )
+    if args.json:
+        write_report(printability, args.json)
@@ -0,0 +1,119 @@
+"""
+rewrites stls so identical geometry always produces identical bytes
+
+the stl writer's header names the library version, and the order of the
+triangles (and of the corners within each) depends on the order faces are
+meshed in, which can change with the meshing threads or the version of
+the kernel. A reproducible stl has a fixed header, every corner snapped to
+a fixed grid and stored as single precision with no negative zeros, each
+triangle's corners rotated (keeping their winding) to start from its
+smallest corner, the triangles sorted, and normals recomputed from the
+corners. Rebuilding an unchanged part then rewrites exactly the same file,
+so rsync, the part cache and any artifact store see no change.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from printability import STL_HEADER_SIZE, STL_TRIANGLE, read_stl
+
+# the header of every reproducible stl
+REPRODUCIBLE_HEADER = b"fender-bender reproducible binary stl"
+# corners are snapped to this grid (mm), well inside the mesh tolerance
+VERTEX_RESOLUTION = 1e-4
+
+
+def canonical_triangles(
+    triangles: np.ndarray, resolution: float = VERTEX_RESOLUTION
+) -> np.ndarray:
+    """
+    the triangles of a mesh in canonical order, with snapped single
+    precision corners; triangles which snapping collapses are dropped
+    -------
+    arguments:
+        - triangles: (n, 3, 3) the corners of the triangles
+        - resolution: the grid the corners are snapped to (mm)
+    """
+    corners = np.round(np.asarray(triangles, float) / resolution)
+    # adding zero turns negative zeros into zeros
+    corners = (corners * resolution).astype("<f4") + np.float32(0)
+    corners = corners.reshape(-1, 3, 3)
+    distinct = (
+        np.any(corners[:, 0] != corners[:, 1], axis=1)
+        & np.any(corners[:, 1] != corners[:, 2], axis=1)
+        & np.any(corners[:, 2] != corners[:, 0], axis=1)
+    )
+    corners = corners[distinct]
+    # rank every corner by x, then y, then z and rotate each triangle to
+    # start from its lowest ranked corner
+    flat = corners.reshape(-1, 3)
+    ranks = np.empty(len(flat), int)
+    ranks[np.lexsort((flat[:, 2], flat[:, 1], flat[:, 0]))] = np.arange(
+        len(flat)
+    )
+    first = np.argmin(ranks.reshape(-1, 3), axis=1)
+    rotation = (first[:, None] + np.arange(3)) % 3
+    corners = np.take_along_axis(corners, rotation[:, :, None], axis=1)
+    keys = corners.reshape(-1, 9)
+    return corners[np.lexsort(keys.T[::-1])]
+
+
+def stl_bytes(
+    triangles: np.ndarray, resolution: float = VERTEX_RESOLUTION
+) -> bytes:
+    """
+    a reproducible binary stl of a mesh
+    -------
+    arguments:
+        - triangles: (n, 3, 3) the corners of the triangles
+        - resolution: the grid the corners are snapped to (mm)
+    """
+    corners = canonical_triangles(triangles, resolution)
+    edges = corners.astype(float)
+    normals = np.cross(edges[:, 1] - edges[:, 0], edges[:, 2] - edges[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(
+        normals, lengths, out=np.zeros_like(normals), where=lengths > 0
+    )
+    records = np.zeros(len(corners), STL_TRIANGLE)
+    records["normal"] = normals.astype("<f4") + np.float32(0)
+    records["corners"] = corners
+    return (
+        REPRODUCIBLE_HEADER.ljust(STL_HEADER_SIZE)
+        + np.uint32(len(records)).astype("<u4").tobytes()
+        + records.tobytes()
+    )
+
+
+def make_reproducible(path: Path, resolution: float = VERTEX_RESOLUTION):
+    """
+    rewrites an exported stl (binary or ascii) as a reproducible binary stl
+    -------
+    arguments:
+        - path: the stl file
+        - resolution: the grid the corners are snapped to (mm)
+    """
+    data = stl_bytes(read_stl(path), resolution)
+    if Path(path).read_bytes() != data:
+        Path(path).write_bytes(data)
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Rewrite stls reproducibly")
+    parser.add_argument(
+        "paths", type=Path, nargs="+", help="the stls (or folders) to rewrite"
+    )
+    args = parser.parse_args()
+
+    stl_paths = []
+    for path in args.paths:
+        if path.is_dir():
+            stl_paths.extend(sorted(path.rglob("*.stl")))
+        else:
+            stl_paths.append(path)
+    for stl_path in stl_paths:
+        make_reproducible(stl_path)
+    print(f"rewrote {len(stl_paths)} stls")
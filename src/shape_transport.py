@@ -0,0 +1,259 @@
+"""
+moves solids between build processes as binary BRep files
+
+pickling a solid (or exporting and re-reading a STEP file) pushes every
+byte of its geometry through the pipe to the other process, copying it
+several times on each side, and STEP is slow to write and to parse. A
+ShapeStore instead writes the solid once, in OCCT's binary BRep format,
+to a file named by the sha256 of its contents, in shared memory (/dev/shm)
+where there is any, and hands out a ShapeHandle: a path, a size and the
+solid's class, which is all that crosses the pipe. The receiving process
+reads the solid from the file, and a solid shared with several workers
+is written once however many attach to it. OCCT still parses the whole
+BRep in each receiver, so receiving costs about what unpickling does.
+
+`python shape_transport.py` compares pickling, STEP round trips and the
+ShapeStore on a FilamentBracket and a Guidewall solid.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional, Union
+
+import build123d
+from build123d import Part, Shape
+from OCP.BinTools import BinTools
+from OCP.TopoDS import TopoDS_Shape
+
+# where stores are made: shared memory if the system has it
+SHAPE_FOLDER = Path("/dev/shm") if Path("/dev/shm").is_dir() else None
+
+
+def brep_bytes(shape: Shape) -> memoryview:
+    """
+    a solid in OCCT's binary BRep format
+    -------
+    arguments:
+        - shape: the build123d shape
+    """
+    stream = io.BytesIO()
+    BinTools.Write_s(shape.wrapped, stream)
+    return stream.getbuffer()
+
+
+def read_brep(data, shape_class: type = Part) -> Shape:
+    """
+    reads a solid written by brep_bytes
+    -------
+    arguments:
+        - data: a readable, seekable binary stream
+        - shape_class: the build123d class to wrap the solid in
+    """
+    wrapped = TopoDS_Shape()
+    BinTools.Read_s(wrapped, data)
+    return shape_class(build123d.topology.downcast(wrapped))
+
+
+@dataclass(frozen=True)
+class ShapeHandle:
+    """
+    a solid in a ShapeStore, small enough to send to another process
+    -------
+    arguments:
+        - path: the solid's BRep file
+        - size: the size of the file in bytes
+        - shape_class: the name of the solid's build123d class
+        - label: the solid's label
+    """
+
+    path: str
+    size: int
+    shape_class: str = "Part"
+    label: str = ""
+
+    def attach(self) -> Shape:
+        """reads the solid from its file"""
+        with open(self.path, "rb") as brep:
+            shape = read_brep(brep, getattr(build123d, self.shape_class, Part))
+        shape.label = self.label
+        return shape
+
+
+class ShapeStore:
+    """
+    a folder of solids, each in a binary BRep file named by its digest,
+    which any process on the machine can attach to
+    -------
+    arguments:
+        - path: the folder
+    """
+
+    def __init__(self, path: Union[Path, str]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def temporary(
+        cls, folder: Optional[Path] = SHAPE_FOLDER
+    ) -> "ShapeStore":
+        """
+        a store in a new folder, in shared memory where there is any,
+        removed when the store is closed
+        -------
+        arguments:
+            - folder: where to make the store's folder
+        """
+        store = cls(tempfile.mkdtemp(prefix="fender-bender-", dir=folder))
+        store._temporary = True
+        return store
+
+    def put(self, shape: Shape) -> ShapeHandle:
+        """
+        writes a solid to the store, unless it is already there, and
+        returns its handle
+        -------
+        arguments:
+            - shape: the build123d shape
+        """
+        data = brep_bytes(shape)
+        path = self.path / f"{sha256(data).hexdigest()}.brep"
+        if not path.exists():
+            # written beside the file and renamed, so a process attaching
+            # to the file never sees it half written
+            temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        return ShapeHandle(
+            str(path), len(data), type(shape).__name__, shape.label or ""
+        )
+
+    def close(self):
+        """removes a temporary store's folder"""
+        if getattr(self, "_temporary", False):
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> "ShapeStore":
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def benchmark(shapes: dict[str, Shape], repeat: int = 3) -> list[dict]:
+    """
+    times sending solids to another process by pickling them, by writing
+    and reading STEP files and through a ShapeStore; returns, for each
+    solid and method, the best seconds taken to send (make what crosses
+    the pipe) and receive (rebuild the solid), the bytes crossing the
+    pipe, and the volume of the solid received
+    -------
+    arguments:
+        - shapes: the solids, by name
+        - repeat: the number of times each transfer is timed
+    """
+    import pickle
+    from time import perf_counter
+
+    from build123d import export_step, import_step
+
+    def best(function) -> tuple[float, object]:
+        times = []
+        for _ in range(repeat):
+            start_time = perf_counter()
+            result = function()
+            times.append(perf_counter() - start_time)
+        return min(times), result
+
+    rows = []
+    with (
+        tempfile.TemporaryDirectory() as folder,
+        ShapeStore.temporary() as store,
+    ):
+        step_path = Path(folder) / "shape.step"
+        for name, shape in shapes.items():
+            # a compiled part keeps the kernel's operation history, which
+            # doesn't pickle, so every method is given the bare solid
+            shape = type(shape)(shape.wrapped)
+
+            def send_step():
+                export_step(shape, step_path)
+                return pickle.dumps(str(step_path))
+
+            methods = {
+                "pickle": (
+                    lambda: pickle.dumps(shape),
+                    lambda sent: pickle.loads(sent),
+                ),
+                "step": (
+                    send_step,
+                    lambda sent: import_step(pickle.loads(sent)),
+                ),
+                "brep store": (
+                    lambda: pickle.dumps(store.put(shape)),
+                    lambda sent: pickle.loads(sent).attach(),
+                ),
+            }
+            for method, (send, receive) in methods.items():
+                send_seconds, sent = best(send)
+                receive_seconds, received = best(lambda: receive(sent))
+                rows.append(
+                    {
+                        "shape": name,
+                        "method": method,
+                        "send": send_seconds,
+                        "receive": receive_seconds,
+                        "pipe_bytes": len(sent),
+                        "volume": received.volume,
+                    }
+                )
+    return rows
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    from bender_config import BenderConfig
+    from build_plan import build_plan
+
+    parser = ArgumentParser(
+        description="Compare ways of sending solids between processes"
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=Path("../build-configs/release.conf"),
+        help="the configuration whose parts are sent",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="the times each is timed"
+    )
+    args = parser.parse_args()
+
+    solids = {}
+    for job in build_plan(BenderConfig(args.config)):
+        name = job.part_class.__name__
+        if name in ("FilamentBracket", "Guidewall") and name not in solids:
+            part = job.part_class(job.config.thaw())
+            try:
+                part.compile()
+            except ValueError as error:
+                # a variant the kernel can't fillet; try the next one
+                print(f"skipping {job.description}: {error}")
+                continue
+            solids[name] = part.parts[0].part
+
+    print(
+        f"{'solid':<16}{'method':<12}{'send ms':>10}{'receive ms':>12}"
+        f"{'pipe bytes':>12}"
+    )
+    for row in benchmark(solids, args.repeat):
+        print(
+            f"{row['shape']:<16}{row['method']:<12}"
+            f"{row['send'] * 1000:>10.1f}{row['receive'] * 1000:>12.1f}"
+            f"{row['pipe_bytes']:>12}"
+        )
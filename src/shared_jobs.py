@@ -0,0 +1,72 @@
+"""
+pools the build plans of several configurations so parts shared between
+them are only compiled once
+
+the wheel, the frames, the lock pin and the hangers of the dev and release
+configurations are resolved to exactly the same part configurations; only
+the folder (and sometimes the file names) they are written to differ.
+`pool_jobs` groups every job by its geometry, the part class and every
+configuration value other than the OUTPUT_FIELDS, so a multi-configuration
+build compiles one job of each group and `share_outputs` copies the files
+it exported to every other job in the group.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Hashable, Iterable
+
+from build_plan import BuildJob
+from config_diff import flatten_config
+
+
+def geometry_key(job: BuildJob) -> Hashable:
+    """
+    a key which is equal for jobs which build identical geometry,
+    wherever their files are written
+    -------
+    arguments:
+        - job: the build job
+    """
+    return (job.part_class, tuple(flatten_config(job.config).items()))
+
+
+def pool_jobs(jobs: Iterable[BuildJob]) -> dict[BuildJob, list[BuildJob]]:
+    """
+    groups jobs building identical geometry, returning the job to build
+    for each group mapped to every job in the group (itself included),
+    in the order the jobs were given
+    -------
+    arguments:
+        - jobs: the jobs of every configuration being built
+    """
+    groups: dict[Hashable, list[BuildJob]] = {}
+    for job in jobs:
+        group = groups.setdefault(geometry_key(job), [])
+        if job not in group:
+            group.append(job)
+    return {group[0]: group for group in groups.values()}
+
+
+def share_outputs(
+    built: BuildJob, job: BuildJob, glb: bool = False
+) -> list[Path]:
+    """
+    copies the files a built job exported to the paths another job in its
+    group exports them to, returning that job's stl paths
+    -------
+    arguments:
+        - built: the job which was built
+        - job: a job building the same geometry
+        - glb: also copy the glb model beside each stl
+    """
+    outputs = job.output_files()
+    for source, target in zip(built.output_files(), outputs):
+        if source == target:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        if glb:
+            shutil.copyfile(
+                source.with_suffix(".glb"), target.with_suffix(".glb")
+            )
+    return outputs
@@ -27,6 +27,7 @@ from build123d import (
 from ocp_vscode import Camera, show, save_screenshot
 
 from bender_config import BenderConfig
+from build_stages import build_stage
 from fb_library import HexWall
 from partomatic import AutomatablePart, Partomatic
 from sidewall_config import SidewallConfig, WallStyle
@@ -223,13 +224,14 @@ class Sidewall(Partomatic):
                 Sphere(radius=self._config.click_fit_radius)
         return divots.part
 
-    def _sidewall(self, reinforced=False, solid=False, dry=False) -> Part:
+    @build_stage
+    def _plain_sidewall(self, solid=False) -> Part:
         """
-        creates a sidewall part, optionally reinforced
+        the wall with its divots and windows, which every sidewall
+        variant is built on
         -------
         arguments:
-            - reinforced: whether to add a thicker structural outline to the wall
-            to result in a stiffer part
+            - solid: whether to leave out the hex windows
         """
         with BuildPart() as sw:
             with BuildSketch():
@@ -243,6 +245,18 @@ class Sidewall(Partomatic):
                 add(self._side_wall_divots())
                 if not solid:
                     add(self._core_hexwall_cut())
+        return sw.part
+
+    def _sidewall(self, reinforced=False, solid=False, dry=False) -> Part:
+        """
+        creates a sidewall part, optionally reinforced
+        -------
+        arguments:
+            - reinforced: whether to add a thicker structural outline to the wall
+            to result in a stiffer part
+        """
+        with BuildPart() as sw:
+            add(self._plain_sidewall(solid))
             if dry and not solid:
                 with BuildSketch():
                     add(self._central_core_sidewall_shape())
@@ -0,0 +1,85 @@
+"""
+the modules of the source folder and what each imports
+
+anything derived from the source (a cached part, a rendered image) only
+depends on the modules it imports, directly or through other modules.
+`source_digest` hashes exactly those, so editing a module no part
+imports, such as the build scripts, invalidates nothing.
+"""
+
+import ast
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterable
+
+SOURCE_FOLDER = Path(__file__).parent
+
+
+def module_imports(source_folder: Path = SOURCE_FOLDER) -> dict[str, set]:
+    """
+    the modules of a source folder mapped to the modules of the same
+    folder they import
+    -------
+    arguments:
+        - source_folder: the folder holding the modules
+    """
+    modules = {path.stem: path for path in Path(source_folder).glob("*.py")}
+    imports = {}
+    for module, path in modules.items():
+        try:
+            tree = ast.parse(path.read_bytes(), str(path))
+        except SyntaxError:
+            # its digest still changes with every edit
+            imports[module] = set()
+            continue
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                names.add(node.module)
+        imports[module] = {name for name in names if name in modules}
+    return imports
+
+
+def import_closure(
+    modules: Iterable[str], imports: dict[str, set]
+) -> set[str]:
+    """
+    the modules and every module they import, directly or through other
+    modules
+    -------
+    arguments:
+        - modules: the modules
+        - imports: the modules each module imports, from module_imports
+    """
+    closure = set()
+    pending = [module for module in modules if module in imports]
+    while pending:
+        module = pending.pop()
+        if module not in closure:
+            closure.add(module)
+            pending.extend(imports[module])
+    return closure
+
+
+def source_digest(
+    modules: Iterable[str],
+    source_folder: Path = SOURCE_FOLDER,
+    imports: dict[str, set] = None,
+) -> str:
+    """
+    a digest of the source of modules and every module they import
+    -------
+    arguments:
+        - modules: the modules
+        - source_folder: the folder holding the modules
+        - imports: the import graph of the folder, parsed if not set
+    """
+    if imports is None:
+        imports = module_imports(source_folder)
+    digest = sha256()
+    for module in sorted(import_closure(modules, imports)):
+        digest.update(module.encode())
+        digest.update((Path(source_folder) / f"{module}.py").read_bytes())
+    return digest.hexdigest()
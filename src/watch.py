@@ -0,0 +1,299 @@
+"""
+rebuilds parts as their source and configuration change
+
+`python watch.py --config release --target frame-top --show` builds the
+selected parts, then polls `src/*.py` and the configuration file. When a
+module changes, it and every module importing it (directly or through
+other modules) are reloaded in dependency order, the build stages defined
+in them are discarded, and only the jobs whose part class or
+configuration changed are rebuilt; the build stages of unchanged modules
+stay snapshotted, so a part whose late operations were edited resumes
+from its unchanged early geometry. The stls are written to the
+configuration's stl_folder (or --out), and --show pushes the rebuilt
+parts to the OCP viewer.
+
+a change which fails to import or build is reported and the watch goes
+on; the modules it affected are reloaded again with the next change.
+"""
+
+import importlib
+import sys
+import traceback
+from pathlib import Path
+from time import sleep, time
+from typing import Callable, Iterable, Optional
+
+from source_graph import SOURCE_FOLDER, module_imports
+
+# modules never reloaded: the watcher itself and the scripts running it
+UNRELOADABLE_MODULES = frozenset(("__main__", "watch", "build"))
+
+
+def affected_modules(
+    changed: Iterable[str], imports: dict[str, set]
+) -> list[str]:
+    """
+    the changed modules and every module importing them, directly or
+    through other modules, with each module after the modules it imports
+    -------
+    arguments:
+        - changed: the modules which changed
+        - imports: the modules each module imports, from module_imports
+    """
+    affected = set(changed)
+    growing = True
+    while growing:
+        importers = {
+            module
+            for module, imported in imports.items()
+            if imported & affected
+        }
+        growing = not importers <= affected
+        affected |= importers
+
+    ordered = []
+
+    def visit(module: str, visiting: set):
+        if module in ordered or module in visiting:
+            return
+        visiting.add(module)
+        for imported in sorted(imports.get(module, ())):
+            if imported in affected:
+                visit(imported, visiting)
+        ordered.append(module)
+
+    for module in sorted(affected):
+        visit(module, set())
+    return ordered
+
+
+def job_identity(job) -> tuple:
+    """
+    what makes a job: a reloaded build_plan makes new BuildJob classes,
+    which never compare equal to the jobs of the classes they replaced
+    """
+    return (job.group, job.description, job.part_class, job.config)
+
+
+def modification_times(paths: Iterable[Path]) -> dict[Path, int]:
+    """the modification time of each file which exists, in nanoseconds"""
+    times = {}
+    for path in paths:
+        try:
+            times[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return times
+
+
+class Watcher:
+    """
+    builds a configuration's parts and rebuilds those affected by each
+    change to the source or configuration
+    -------
+    arguments:
+        - conf_file: the configuration file
+        - targets: only build the parts matching these patterns (see
+            build_plan.select_jobs), None for every part
+        - out: the folder to write the stls to instead of the
+            configuration's stl_folder
+        - show: push each rebuilt part to the OCP viewer
+        - source_folder: the folder holding the part generators
+        - log: called with each line of progress
+    """
+
+    def __init__(
+        self,
+        conf_file: Path,
+        targets: Optional[list[str]] = None,
+        out: Optional[Path] = None,
+        show: bool = False,
+        source_folder: Path = SOURCE_FOLDER,
+        log: Callable[[str], None] = print,
+    ):
+        self.conf_file = Path(conf_file).resolve()
+        self.targets = targets
+        self.out = out
+        self.show = show
+        self.source_folder = Path(source_folder)
+        self.log = log
+        self.times = modification_times(self._watched())
+        # the jobs built since their source and configuration last changed
+        self.built = set()
+        # modules changed since they were last reloaded successfully
+        self.pending = set()
+
+    def _watched(self) -> list[Path]:
+        return [*sorted(self.source_folder.glob("*.py")), self.conf_file]
+
+    def changes(self) -> tuple[set[str], bool]:
+        """
+        the modules, and whether the configuration, changed since the
+        last call
+        """
+        times = modification_times(self._watched())
+        changed = {
+            path
+            for path in times.keys() | self.times.keys()
+            if times.get(path) != self.times.get(path)
+        }
+        self.times = times
+        modules = {
+            path.stem
+            for path in changed
+            if path.suffix == ".py" and path.stem not in UNRELOADABLE_MODULES
+        }
+        return modules, self.conf_file in changed
+
+    def reload(self, changed: Iterable[str]) -> list[str]:
+        """
+        reloads changed modules and every loaded module importing them,
+        and discards the build stages they define; returns the modules
+        reloaded
+        -------
+        arguments:
+            - changed: the modules which changed
+        """
+        self.pending |= set(changed)
+        reloaded = [
+            module
+            for module in affected_modules(
+                self.pending, module_imports(self.source_folder)
+            )
+            if module in sys.modules and module not in UNRELOADABLE_MODULES
+        ]
+        for module in reloaded:
+            importlib.reload(sys.modules[module])
+        self.pending.clear()
+        importlib.import_module("build_stages").clear_stage_cache(reloaded)
+        return reloaded
+
+    def jobs(self) -> list:
+        """the selected jobs of the configuration as it is now"""
+        bender_config = importlib.import_module("bender_config")
+        build_plan = importlib.import_module("build_plan")
+        config = bender_config.BenderConfig(self.conf_file)
+        if self.out is not None:
+            config.stl_folder = str(Path(self.out).resolve())
+        jobs = build_plan.build_plan(config)
+        if self.targets:
+            jobs, unmatched = build_plan.select_jobs(
+                jobs, self.targets, config.stl_folder
+            )
+            for target in unmatched:
+                self.log(f"no part matches target {target}")
+        return jobs
+
+    def rebuild(self) -> list:
+        """
+        builds every selected job whose part class or configuration
+        changed since it was last built, returning the jobs built
+        """
+        selected = self.jobs()
+        # jobs built with replaced classes or configurations never recur
+        identities = {job_identity(job) for job in selected}
+        self.built.intersection_update(identities)
+        # reloaded part classes and changed configurations make new jobs
+        jobs = [job for job in selected if job_identity(job) not in self.built]
+        for job in jobs:
+            start_time = time()
+            part = job.build()
+            self.built.add(job_identity(job))
+            self.log(
+                f"\t rebuilt {job.group} {job.description} "
+                f"in {time() - start_time:.2f} seconds"
+            )
+            if self.show:
+                show_part(part)
+        return jobs
+
+    def step(self, first: bool = False) -> list:
+        """
+        reloads and rebuilds whatever changed since the last step,
+        reporting rather than raising any error; returns the jobs built
+        -------
+        arguments:
+            - first: build the selected jobs without waiting for a change
+        """
+        modules, config_changed = self.changes()
+        if not (first or modules or config_changed or self.pending):
+            return []
+        try:
+            if modules or self.pending:
+                reloaded = self.reload(modules)
+                self.log(f"reloaded {', '.join(reloaded) or 'nothing'}")
+            return self.rebuild()
+        except Exception:
+            self.log(traceback.format_exc())
+            return []
+
+    def run(self, interval: float = 0.5):
+        """
+        watches until interrupted
+        -------
+        arguments:
+            - interval: the seconds between checks for changes
+        """
+        self.step(first=True)
+        self.log(f"watching {self.source_folder} and {self.conf_file.name}")
+        while True:
+            sleep(interval)
+            self.step()
+
+
+def show_part(part):
+    """pushes the solids of a compiled Partomatic part to the OCP viewer"""
+    from ocp_vscode import Camera, show
+
+    show(
+        *[automatable.part for automatable in part.parts],
+        names=[automatable.file_name_base for automatable in part.parts],
+        reset_camera=Camera.KEEP,
+    )
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(
+        description="Rebuild parts as their source and configuration change"
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default="release",
+        help="The configuration file to build.",
+    )
+    parser.add_argument(
+        "--target",
+        type=str,
+        action="append",
+        help="Only build the parts matching this pattern; repeat it to "
+        "build several.",
+    )
+    parser.add_argument(
+        "--out", type=Path, help="The folder to write the stls to."
+    )
+    parser.add_argument(
+        "--show",
+        action="store_true",
+        help="Push each rebuilt part to the OCP viewer.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="The seconds between checks for changes.",
+    )
+    args = parser.parse_args()
+
+    conf_path = Path(args.config)
+    if not conf_path.exists():
+        conf_path = SOURCE_FOLDER / f"../build-configs/{args.config}"
+        if conf_path.suffix != ".conf":
+            conf_path = conf_path.with_name(f"{conf_path.name}.conf")
+    watcher = Watcher(conf_path, args.target, args.out, args.show)
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
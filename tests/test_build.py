@@ -0,0 +1,105 @@
+import pytest
+
+import build
+from bender_config import BenderConfig
+from build import Builder
+from printability import PrintabilityReport, read_report, write_report
+
+
+def builder(tmp_path, events=None):
+    return Builder(
+        history_path=tmp_path / "history.json",
+        cache_folder=tmp_path / "cache",
+        events=events,
+    )
+
+
+class TestBuild:
+    def test_targeted_build(self, default_bender_config, tmp_path):
+        stl_folder = default_bender_config.stl_folder
+        # the report of a part built before, which this build skips
+        other = PrintabilityReport(
+            "other.stl", 12, 10, 1000, 600, 0, 100, 10, 0, None, 0, 400, 1.2
+        )
+        (tmp_path / "stl").mkdir()
+        write_report([other], tmp_path / "stl" / "printability.json")
+        events = []
+        result = builder(tmp_path, events.append).build(
+            default_bender_config, ["lock-pin"], tmp_path / "stl"
+        )
+        assert default_bender_config.stl_folder == stl_folder
+        (config_result,) = result.configs.values()
+        assert config_result.stl_files == [tmp_path / "stl" / "lock-pin.stl"]
+        assert not result.failures
+        assert [finished.job.description for finished in result.finished] == [
+            "frame lock pin"
+        ]
+        (mesh,) = result.meshes().values()
+        assert mesh.shape[1:] == (3, 3)
+        assert (tmp_path / "stl" / "print-estimate.json").exists()
+        reports = read_report(tmp_path / "stl" / "printability.json")
+        assert [report.name for report in reports] == [
+            "lock-pin.stl",
+            "other.stl",
+        ]
+        assert reports[1] == other
+        assert [event.event for event in events] == [
+            "queued",
+            "started",
+            "finished",
+            "complete",
+        ]
+        assert events[2].outputs == {
+            str(tmp_path / "stl" / "lock-pin.stl"): mesh.shape[0] * 50 + 84
+        }
+
+        # a second builder reads the part from the cache
+        events.clear()
+        cached = builder(tmp_path, events.append).build(
+            default_bender_config, ["lock-pin"], tmp_path / "stl"
+        )
+        assert cached.cached == 1
+        assert cached.finished == []
+        assert [event.event for event in events] == ["cached", "complete"]
+
+    def test_nothing_written_by_default(
+        self, default_bender_config, tmp_path
+    ):
+        builder = Builder()
+        assert builder.part_cache is None
+        result = builder.build(
+            default_bender_config, ["lock-pin"], tmp_path / "stl"
+        )
+        assert len(result.finished) == 1
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["stl"]
+        # the durations are still used to schedule the next build
+        assert len(builder.cost_model.history) == 1
+
+    def test_documentation_once(self, tmp_path, monkeypatch):
+        rendered = []
+        monkeypatch.setattr(
+            build,
+            "render_documentation",
+            lambda config, folder: rendered.append(config) or [],
+        )
+        configs = []
+        for name in ("dev", "release", "mini"):
+            config = BenderConfig()
+            config.stl_folder = str(tmp_path / name)
+            configs.append(config)
+        builder(tmp_path).build(configs, ["lock-pin"], documentation=True)
+        # every configuration renders to docs/assets, so only release does
+        assert rendered == [configs[1]]
+
+    def test_unmatched_target(self, default_bender_config, tmp_path):
+        with pytest.raises(ValueError, match="missing-part"):
+            builder(tmp_path).build(
+                default_bender_config, ["missing-part"], tmp_path / "stl"
+            )
+
+    def test_out_needs_one_config(self, default_bender_config, tmp_path):
+        with pytest.raises(ValueError):
+            builder(tmp_path).build(
+                [default_bender_config, default_bender_config],
+                out=tmp_path,
+            )
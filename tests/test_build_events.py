@@ -0,0 +1,148 @@
+import io
+import socket
+from threading import Thread
+
+import pytest
+
+from build_events import (
+    CACHED,
+    COMPLETE,
+    FAILED,
+    FINISHED,
+    QUEUED,
+    STARTED,
+    BuildEvent,
+    BuildProgress,
+    EventWriter,
+    ProgressView,
+    duration,
+    follow,
+)
+from build_plan import build_plan
+from build_scheduler import FinishedJob
+
+
+def event(kind, **values):
+    return BuildEvent(kind, 1000.0, 0.0, **values)
+
+
+class TestBuildProgress:
+    def test_events(self, default_bender_config, tmp_path):
+        first, second, cached = build_plan(default_bender_config)[:3]
+        stl = tmp_path / "part.stl"
+        stl.write_bytes(b"solid" * 10)
+        events = []
+        progress = BuildProgress(events.append, 1)
+        progress.cached(cached, [stl])
+        progress.queued(first, 30)
+        progress.queued(second, 10)
+        assert events[-1].eta == pytest.approx(40)
+        progress.started(first, 0)
+        progress.finished(FinishedJob(first, [stl], 25.0, worker=0))
+        progress.started(second, 0)
+        progress.finished(FinishedJob(second, None, 1.0, "Traceback", None, 0))
+        assert events[-1].eta == pytest.approx(10)
+        progress.started(second, None, attempt=2)
+        progress.finished(FinishedJob(second, None, 1.0, "Traceback"), 2)
+        progress.complete()
+
+        assert [e.event for e in events] == [
+            CACHED,
+            QUEUED,
+            QUEUED,
+            STARTED,
+            FINISHED,
+            STARTED,
+            FAILED,
+            STARTED,
+            FAILED,
+            COMPLETE,
+        ]
+        assert events[0].outputs == {str(stl): 50}
+        assert events[3].seconds == 30
+        assert events[4].seconds == 25
+        assert events[4].outputs == {str(stl): 50}
+        assert events[4].eta == pytest.approx(10)
+        assert events[4].description == first.description
+        assert events[7].worker is None and events[7].attempt == 2
+        assert events[8].error == "Traceback"
+        assert events[-1].eta == 0
+
+    def test_eta_workers(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:3]
+        events = []
+        progress = BuildProgress(events.append, 2)
+        for job, seconds in zip(jobs, (30, 20, 10)):
+            progress.queued(job, seconds)
+        assert events[-1].eta == pytest.approx(30)
+
+
+class TestEventWriter:
+    def test_file(self, tmp_path):
+        path = tmp_path / "events.jsonl"
+        path.write_text("an earlier build\n")
+        with EventWriter(path) as writer:
+            writer(event(QUEUED, group="frames", outputs={"a.stl": 3}))
+            writer(event(COMPLETE))
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert BuildEvent.from_json(lines[0]).outputs == {"a.stl": 3}
+
+        view = ProgressView(io.StringIO())
+        follow(path, view)
+        assert view.last.event == COMPLETE
+
+    def test_socket(self):
+        received = []
+        with socket.create_server(("127.0.0.1", 0)) as server:
+
+            def receive():
+                connection, _ = server.accept()
+                with connection, connection.makefile() as lines:
+                    received.extend(lines)
+
+            thread = Thread(target=receive)
+            thread.start()
+            port = server.getsockname()[1]
+            with EventWriter(f"tcp://127.0.0.1:{port}") as writer:
+                writer(event(STARTED, worker=1))
+            thread.join(10)
+        assert BuildEvent.from_json(received[0]).worker == 1
+
+
+class TestProgressView:
+    def test_workers(self):
+        view = ProgressView(io.StringIO())
+        for update in (
+            event(QUEUED, group="frames", description="top"),
+            event(QUEUED, group="walls", description="guidewall"),
+            event(QUEUED, group="walls", description="sidewall"),
+            event(CACHED, group="frames", description="lock pin"),
+            event(STARTED, group="frames", description="top", worker=0),
+            event(STARTED, group="walls", description="guidewall", worker=1),
+            event(FINISHED, group="walls", description="guidewall", worker=1),
+            event(STARTED, group="walls", description="sidewall", worker=1),
+        ):
+            view.update(update)
+        lines = view.lines()
+        assert lines[0].startswith("2/4 parts, 1 cached, 0 failed")
+        assert "worker 0" in lines[1] and "frames top" in lines[1]
+        assert "walls sidewall" in lines[2]
+        assert len(lines) == 3
+
+    def test_not_a_terminal(self):
+        stream = io.StringIO()
+        view = ProgressView(stream)
+        view(event(QUEUED, group="walls", description="sidewall", eta=60))
+        view(event(STARTED, group="walls", description="sidewall", worker=0))
+        assert stream.getvalue() == ""
+        view(event(FINISHED, group="walls", description="sidewall", eta=0))
+        view.write("a log line")
+        assert stream.getvalue().splitlines()[0].startswith("1/1 parts")
+        assert "finished walls sidewall" in stream.getvalue()
+        assert stream.getvalue().endswith("a log line\n")
+
+    def test_duration(self):
+        assert duration(45.2) == "45s"
+        assert duration(320) == "5m20s"
+        assert duration(3720) == "1h02m"
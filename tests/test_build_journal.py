@@ -0,0 +1,67 @@
+from build_journal import BuildJournal, job_fingerprint
+from build_plan import build_plan, wheel_jobs
+
+
+def export(job, contents="solid"):
+    outputs = job.output_files()
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+    return outputs
+
+
+class TestBuildJournal:
+    def test_fingerprint(self, default_bender_config):
+        first, second = wheel_jobs(default_bender_config)
+        assert job_fingerprint(first) == job_fingerprint(
+            wheel_jobs(default_bender_config)[0]
+        )
+        assert job_fingerprint(first) != job_fingerprint(second)
+
+    def test_resume(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        journal = BuildJournal(tmp_path / "journal.jsonl")
+        assert not journal.completed(job)
+        journal.record(job, export(job))
+        assert BuildJournal(tmp_path / "journal.jsonl", True).completed(job)
+        assert not BuildJournal(tmp_path / "journal.jsonl").completed(job)
+
+    def test_changed_output(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        BuildJournal(tmp_path / "journal.jsonl").record(job, export(job))
+        export(job, "changed")
+        assert not BuildJournal(tmp_path / "journal.jsonl", True).completed(
+            job
+        )
+
+    def test_changed_config(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        BuildJournal(tmp_path / "journal.jsonl").record(job, export(job))
+        default_bender_config.wheel.diameter += 1
+        changed = wheel_jobs(default_bender_config)[0]
+        assert not BuildJournal(tmp_path / "journal.jsonl", True).completed(
+            changed
+        )
+
+    def test_torn_line(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        first, second = build_plan(default_bender_config)[:2]
+        journal = BuildJournal(tmp_path / "journal.jsonl")
+        journal.record(first, export(first))
+        journal.record(second, export(second))
+        text = (tmp_path / "journal.jsonl").read_text()
+        (tmp_path / "journal.jsonl").write_text(text[:-20])
+        resumed = BuildJournal(tmp_path / "journal.jsonl", True)
+        assert resumed.completed(first)
+        assert not resumed.completed(second)
+
+    def test_failures(self, default_bender_config, tmp_path):
+        job = wheel_jobs(default_bender_config)[0]
+        journal = BuildJournal(tmp_path / "journal.jsonl")
+        journal.record(job, [], "Traceback: failed")
+        resumed = BuildJournal(tmp_path / "journal.jsonl", True)
+        assert not resumed.completed(job)
+        assert resumed.failures() == {"wheel": "Traceback: failed"}
@@ -0,0 +1,162 @@
+import ast
+import inspect
+from functools import cache
+from pathlib import Path
+
+import pytest
+
+from bender_config import BenderConfig
+from build_plan import STL_FILE_NAMES, build_plan, select_jobs, target_names
+from lock_pin import LockPin
+from sidewall_config import WallStyle
+
+CONFIG_DIRECTORY = Path(__file__).parent / "../build-configs"
+
+
+def compiled_names(part_class: type) -> set[str]:
+    """the names of the AutomatablePart objects a compile() method makes"""
+    tree = ast.parse(inspect.getsource(part_class.compile).lstrip())
+    names = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and getattr(node.func, "id", None) == "AutomatablePart"
+        ):
+            name = node.args[1]
+            if isinstance(name, ast.JoinedStr):
+                # an f-string without any placeholders
+                name = ast.Constant("".join(v.value for v in name.values))
+            names.add(name.value)
+    return names
+
+
+@cache
+def planned_names() -> dict[type, set[str]]:
+    """every file name each part class exports in the shipped configs"""
+    names = {part_class: set() for part_class in STL_FILE_NAMES}
+    for path in sorted(CONFIG_DIRECTORY.glob("*.conf")):
+        for job in build_plan(BenderConfig(path)):
+            names[job.part_class].update(
+                STL_FILE_NAMES[job.part_class](job.config)
+            )
+    return names
+
+
+class TestBuildPlan:
+    def test_release_plan(self):
+        config = BenderConfig(
+            Path(__file__).parent / "../build-configs/release.conf"
+        )
+        outputs = [
+            output
+            for job in build_plan(config)
+            for output in job.relative_output_files(config.stl_folder)
+        ]
+        assert len(outputs) == len(set(outputs))
+        assert "frame-top.stl" in outputs
+        assert (
+            "alt-8-filament-parts/alt-frame-styles/"
+            "alt-frame-bottom-8-filament-hybrid-drybox.stl" in outputs
+        )
+        assert (
+            "alt-wheel-print-in-place-bearing/"
+            "alt-filament-bracket-wheel-print-in-place-bearing.stl" in outputs
+        )
+
+    def test_skip_alt_files(self, default_bender_config):
+        default_bender_config.skip_alt_file_generation = True
+        default_bender_config.alternate_filament_counts = []
+        groups = [job.group for job in build_plan(default_bender_config)]
+        assert groups == [
+            "brackets",
+            "wheel",
+            "wheel",
+            "walls",
+            "walls",
+            "frames",
+            "frames",
+            "frames",
+            "frames",
+            "hangers",
+        ]
+
+    def test_jobs_are_independent(self, default_bender_config):
+        default_bender_config.skip_alt_file_generation = False
+        default_bender_config.wall_style = WallStyle.DRYBOX
+        styles = [
+            (job.config.wall_style, job.config.file_suffix)
+            for job in build_plan(default_bender_config)
+            if job.part_class.__name__ == "Sidewall"
+        ]
+        assert styles == [
+            (WallStyle.DRYBOX, ""),
+            (WallStyle.HEX, "-open-hex"),
+            (WallStyle.DRYBOX, "-drybox"),
+        ]
+
+    @pytest.mark.parametrize(
+        "part_class", STL_FILE_NAMES, ids=lambda cls: cls.__name__
+    )
+    def test_file_names_cover_compile(self, part_class):
+        # every part a class can export is named by some configuration's
+        # job, and no job names a part the class doesn't make
+        assert planned_names()[part_class] == compiled_names(part_class)
+
+    def test_file_names_match_compile(self, default_bender_config):
+        job = next(
+            job
+            for job in build_plan(default_bender_config)
+            if job.part_class is LockPin
+        )
+        lock_pin = LockPin(job.config.thaw())
+        lock_pin.compile()
+        assert [
+            part.file_name_base for part in lock_pin.parts
+        ] == STL_FILE_NAMES[LockPin](job.config)
+        assert [str(path) for path in job.output_files()] == [
+            lock_pin.complete_stl_file_path(part) for part in lock_pin.parts
+        ]
+
+
+class TestTargets:
+    def release_plan(self):
+        config = BenderConfig(
+            Path(__file__).parent / "../build-configs/release.conf"
+        )
+        return build_plan(config), config.stl_folder
+
+    def test_target_names(self):
+        jobs, stl_folder = self.release_plan()
+        names = target_names(jobs[0], stl_folder)
+        assert "bracket-for-lean-forward-with-3mmx6mm-tube-connector" in names
+        assert "filament-bracket-top" in names
+        assert "brackets/filament-bracket-top" in names
+
+    def test_select_jobs(self):
+        jobs, stl_folder = self.release_plan()
+        selected, unmatched = select_jobs(
+            jobs, ["brackets/*lean-forward*", "Frame-Top"], stl_folder
+        )
+        assert unmatched == []
+        assert [job.description for job in selected][-1] == "frame top"
+        assert len(selected) == 1 + sum(
+            "LEAN_FORWARD" in job.description for job in jobs
+        )
+
+    def test_variant_glob(self):
+        jobs, stl_folder = self.release_plan()
+        selected, _ = select_jobs(
+            jobs, ["frames/alt-12-filament-parts/*top*"], stl_folder
+        )
+        assert len(selected) == 2
+        assert select_jobs(jobs, ["wall-side-reinforced"], stl_folder)[0] == [
+            job for job in jobs if job.description == "sidewalls"
+        ]
+
+    def test_unmatched(self):
+        jobs, stl_folder = self.release_plan()
+        selected, unmatched = select_jobs(
+            jobs, ["lock-pin", "missing-part"], stl_folder
+        )
+        assert len(selected) == 1
+        assert unmatched == ["missing-part"]
@@ -0,0 +1,178 @@
+import os
+
+import pytest
+
+from build_plan import build_plan, guidewall_set_jobs
+from build_scheduler import (
+    DEFAULT_SECONDS,
+    CostModel,
+    config_features,
+    longest_first,
+    makespan_bound,
+    run_isolated,
+    run_jobs,
+)
+from config_snapshot import snapshot
+
+
+def describe(job):
+    return job.description
+
+
+def fail_guidewalls(job):
+    if job.part_class.__name__ == "Guidewall":
+        raise ValueError(f"{job.description} failed")
+    return job.description
+
+
+def crash(job):
+    os._exit(1)
+
+
+def process_id(job):
+    return os.getpid()
+
+
+def guidewalls(bender_config, counts):
+    return {
+        count: guidewall_set_jobs(bender_config, count)[0] for count in counts
+    }
+
+
+class TestConfigFeatures:
+    def test_nested(self, default_bender_config):
+        features = config_features(snapshot(default_bender_config.wheel))
+        assert features["diameter"] == default_bender_config.wheel.diameter
+        assert "bearing.diameter" in features
+
+    def test_connectors(self, default_bender_config):
+        features = config_features(snapshot(default_bender_config))
+        assert "connectors.0.diameter" in features
+        assert not any("name" in feature for feature in features)
+
+
+class TestCostModel:
+    def test_default(self, default_bender_config):
+        job = guidewall_set_jobs(default_bender_config)[0]
+        assert CostModel().predict(job) == DEFAULT_SECONDS["Guidewall"]
+
+    def test_learns(self, default_bender_config):
+        jobs = guidewalls(default_bender_config, (4, 6, 8, 10, 12))
+        model = CostModel()
+        for count in (4, 8, 12):
+            model.record(jobs[count], count * 10.0)
+        predictions = [model.predict(jobs[count]) for count in sorted(jobs)]
+        assert predictions == sorted(predictions)
+        assert predictions[0] == pytest.approx(40, rel=0.2)
+        assert predictions[-1] == pytest.approx(120, rel=0.2)
+
+    def test_single_record(self, default_bender_config):
+        jobs = guidewalls(default_bender_config, (4, 8))
+        model = CostModel()
+        model.record(jobs[4], 30.0)
+        assert model.predict(jobs[8]) == pytest.approx(30)
+
+    def test_save_load(self, default_bender_config, tmp_path):
+        jobs = guidewalls(default_bender_config, (4, 8))
+        model = CostModel()
+        model.record(jobs[4], 30.0)
+        model.record(jobs[8], 60.0)
+        model.save(tmp_path / "history.json")
+        loaded = CostModel.load(tmp_path / "history.json")
+        assert loaded.predict(jobs[8]) == pytest.approx(model.predict(jobs[8]))
+        assert CostModel.load(tmp_path / "missing.json").history == []
+
+
+class TestScheduling:
+    def test_longest_first(self):
+        durations = [3, 5, 3, 4, 3]
+        assignments, makespan = longest_first(durations, 2)
+        assert sorted(sum(assignments, [])) == list(range(5))
+        assert assignments[0][0] == 1
+        assert makespan == 10
+        assert makespan <= makespan_bound(durations, 2) * 4 / 3
+
+    def test_bound(self):
+        assert makespan_bound([10, 1, 1], 2) == 10
+        assert makespan_bound([4, 4, 4], 2) == 6
+
+    def test_run_in_process(self, default_bender_config):
+        jobs = build_plan(default_bender_config)
+        model = CostModel()
+        finished = list(run_jobs(jobs, describe, model, 1))
+        assert [done.result for done in finished] == [
+            done.job.description for done in finished
+        ]
+        assert sorted(done.job.description for done in finished) == sorted(
+            job.description for job in jobs
+        )
+        # nothing had been recorded, so the default costs ordered the jobs
+        assert finished[0].job.part_class.__name__ == "TopFrame"
+        assert len(model.history) == len(jobs)
+        assert finished[0].peak_memory > 0
+
+    def test_run_in_workers(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:6]
+        finished = list(run_jobs(jobs, describe, CostModel(), 3))
+        assert sorted(done.result for done in finished) == sorted(
+            job.description for job in jobs
+        )
+        assert all(done.peak_memory > 0 for done in finished)
+
+    def test_failures_continue(self, default_bender_config):
+        jobs = build_plan(default_bender_config)
+        model = CostModel()
+        finished = list(run_jobs(jobs, fail_guidewalls, model, 2))
+        assert len(finished) == len(jobs)
+        errors = [done.error for done in finished if done.error]
+        assert errors
+        assert all("ValueError" in error for error in errors)
+        assert len(model.history) == len(jobs) - len(errors)
+
+    def test_crashed_worker(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:3]
+        finished = list(run_jobs(jobs, crash, CostModel(), 2))
+        assert len(finished) == 3
+        assert all("worker process died" in done.error for done in finished)
+
+    def test_worker_numbers(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:6]
+        started = []
+        finished = list(
+            run_jobs(
+                jobs,
+                describe,
+                CostModel(),
+                2,
+                max_jobs_per_worker=1,
+                started=lambda job, worker: started.append((job, worker)),
+            )
+        )
+        assert sorted(worker for _, worker in started) == [0, 0, 0, 1, 1, 1]
+        # replacement workers keep the number of the worker they replace
+        assert set(started) == {(done.job, done.worker) for done in finished}
+
+    def test_isolated(self, default_bender_config):
+        job = build_plan(default_bender_config)[0]
+        assert run_isolated(job, describe).result == job.description
+        assert "worker process died" in run_isolated(job, crash).error
+
+
+class TestWorkerRecycling:
+    def test_max_jobs_per_worker(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:6]
+        finished = list(run_jobs(jobs, process_id, CostModel(), 1, 2))
+        assert len({done.result for done in finished}) == 3
+        assert os.getpid() not in {done.result for done in finished}
+
+    def test_memory_limit(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:4]
+        finished = list(
+            run_jobs(jobs, process_id, CostModel(), 2, memory_limit=1)
+        )
+        assert len({done.result for done in finished}) == 4
+
+    def test_workers_kept(self, default_bender_config):
+        jobs = build_plan(default_bender_config)[:4]
+        finished = list(run_jobs(jobs, process_id, CostModel(), 2))
+        assert len({done.result for done in finished}) <= 2
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+
+import pytest
+from build123d import Box, Location, Part
+
+from build_stages import (
+    build_stage,
+    build_stages,
+    clear_stage_cache,
+    share_stages,
+    stage_statistics,
+)
+from hanging_bracket import HangingBracket
+from hanging_bracket_config import HangingBracketStyle
+from shape_transport import ShapeStore
+from sidewall import Sidewall
+
+
+@dataclass
+class BlockConfig:
+    width: float = 10
+    height: float = 5
+    label: str = "block"
+
+
+class Block:
+    def __init__(self, **kwargs):
+        self._config = BlockConfig(**kwargs)
+
+    @build_stage
+    def _base(self, depth=1) -> Part:
+        return Part(Box(self._config.width, depth, 1).wrapped)
+
+    @build_stage
+    def _raised(self) -> Part:
+        return Part(
+            (self._base(2) + Box(1, 1, self._config.height)).wrapped
+        )
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_stage_cache()
+    yield
+    clear_stage_cache()
+
+
+class TestBuildStage:
+    def test_reuse(self):
+        first = Block()._base()
+        second = Block(label="other")._base()
+        assert stage_statistics() == {"hits": 1, "misses": 1}
+        assert second.volume == pytest.approx(first.volume)
+
+    def test_consumed_field_changed(self):
+        Block()._base()
+        assert Block(width=20)._base().volume == pytest.approx(20)
+        assert stage_statistics()["misses"] == 2
+
+    def test_arguments(self):
+        Block()._base(1)
+        assert Block()._base(3).volume == pytest.approx(30)
+        assert stage_statistics()["misses"] == 2
+
+    def test_nested_stage(self):
+        Block()._raised()
+        Block(height=10)._raised()
+        # the base is shared, but the raised block read the height
+        assert stage_statistics() == {"hits": 1, "misses": 3}
+        Block(width=20)._raised()
+        # the width read by the base is recorded in the raised block too
+        assert stage_statistics()["misses"] == 5
+
+    def test_reference(self):
+        block = Block()
+        moved = block._base().move(Location((100, 0, 0)))
+        assert moved.center().X == pytest.approx(100)
+        assert block._base().center().X == pytest.approx(0)
+
+    def test_config_restored(self):
+        block = Block()
+        config = block._config
+        block._base()
+        assert block._config is config
+
+    def test_clear_modules(self):
+        Block()._base()
+        clear_stage_cache(["sidewall"])
+        Block()._base()
+        assert stage_statistics() == {"hits": 1, "misses": 0}
+        clear_stage_cache([Block.__module__])
+        Block()._base()
+        assert stage_statistics() == {"hits": 0, "misses": 1}
+
+    def test_shared_between_processes(self, tmp_path):
+        share_stages(ShapeStore(tmp_path))
+        try:
+            Block()._base()
+            # another process, with none of this one's snapshots
+            clear_stage_cache()
+            assert Block(label="other")._base().volume == pytest.approx(10)
+            assert stage_statistics() == {"hits": 1, "misses": 0}
+            Block(width=20)._base()
+            assert stage_statistics() == {"hits": 1, "misses": 1}
+        finally:
+            share_stages(None)
+
+    def test_stage_names(self):
+        assert build_stages(Block) == ["_base", "_raised"]
+        assert build_stages(Sidewall) == ["_plain_sidewall"]
+
+
+class TestPartStages:
+    def test_desk_bracket_variants(self, default_bender_config):
+        config = default_bender_config.hanging_bracket_config
+        config.bracket_style = HangingBracketStyle.SURFACE_MOUNT
+        nut = HangingBracket(config)._desk_bracket(False)
+        config.heatsink_desk_nut = True
+        heatsink = HangingBracket(config)._desk_bracket(True)
+        assert stage_statistics() == {"hits": 1, "misses": 1}
+        assert heatsink.volume != pytest.approx(nut.volume)
@@ -0,0 +1,121 @@
+import pytest
+from build123d import Box, Compound, Cylinder, Location
+
+from clearance_check import (
+    CLEARANCE_CHECKS,
+    Clearance,
+    ClearanceRequirement,
+    assembly_clearances,
+    check_config,
+)
+
+
+def clearances(first, second, **kwargs):
+    first.label, second.label = "first", "second"
+    return assembly_clearances(
+        Compound(children=[first, second]), **kwargs
+    )
+
+
+def clearance(distance=0.0, penetration=0.0):
+    return Clearance("a", "b", distance, penetration, (0, 0, 0), (0, 0, 0))
+
+
+class TestAssemblyClearances:
+    def test_gap(self):
+        found = clearances(
+            Box(10, 10, 10), Box(10, 10, 10).moved(Location((10.5, 0, 0)))
+        )
+        assert len(found) == 1
+        assert found[0].distance == pytest.approx(0.5)
+        assert found[0].penetration == 0
+        assert found[0].first_point[0] == pytest.approx(5)
+        assert found[0].second_point[0] == pytest.approx(5.5)
+
+    def test_out_of_range(self):
+        assert not clearances(
+            Box(10, 10, 10),
+            Box(10, 10, 10).moved(Location((12, 0, 0))),
+            max_distance=1,
+        )
+
+    def test_touching(self):
+        found = clearances(
+            Box(10, 10, 10), Box(10, 10, 10).moved(Location((10, 0, 0)))
+        )
+        assert found[0].distance == pytest.approx(0)
+        assert found[0].penetration == pytest.approx(0)
+
+    def test_interference(self):
+        found = clearances(
+            Box(10, 10, 10), Box(10, 10, 10).moved(Location((8, 0, 0)))
+        )
+        assert found[0].distance == 0
+        assert found[0].penetration == pytest.approx(2)
+
+    def test_contained(self):
+        found = clearances(Box(10, 10, 10), Box(2, 2, 2))
+        assert found[0].distance == pytest.approx(4)
+        assert found[0].penetration == pytest.approx(4)
+
+    def test_rod_in_hole(self):
+        found = clearances(
+            Box(20, 20, 10) - Cylinder(5.3, 10), Cylinder(5, 20)
+        )
+        assert found[0].distance == pytest.approx(0.3, abs=0.02)
+        assert found[0].penetration == 0
+
+
+class TestClearanceRequirement:
+    def test_gap(self):
+        requirement = ClearanceRequirement("a", "b", 0.5)
+        assert requirement.failure(clearance(0.6), 0.02) is None
+        assert requirement.failure(clearance(0.49), 0.02) is None
+        assert "0.400 mm apart" in requirement.failure(clearance(0.4), 0.02)
+        assert requirement.failure(None, 0.02) is None
+
+    def test_interference(self):
+        requirement = ClearanceRequirement("a", "b", 0)
+        assert requirement.failure(clearance(0, 0.01), 0.02) is None
+        assert "interfere" in requirement.failure(clearance(0, 0.1), 0.02)
+
+    def test_press_fit(self):
+        requirement = ClearanceRequirement("a", "b", -0.2)
+        assert requirement.failure(clearance(0, 0.2), 0.02) is None
+        assert "interfere" in requirement.failure(clearance(0, 0.3), 0.02)
+
+    def test_matches(self):
+        requirement = ClearanceRequirement("b", "a", 0)
+        assert requirement.matches(clearance())
+        assert not ClearanceRequirement("a", "c", 0).matches(clearance())
+
+
+class TestClearanceChecks:
+    def test_frame_fits(self, default_bender_config):
+        assert (
+            check_config(
+                default_bender_config, ["lock pin", "tongue and groove"]
+            )
+            == []
+        )
+
+    def test_missing_part(self, default_bender_config, monkeypatch):
+        def far_apart(config):
+            near, far = Box(1, 1, 1), Box(1, 1, 1).moved(Location((50, 0, 0)))
+            near.label, far.label = "near", "far"
+            return Compound(children=[near, far]), [
+                ClearanceRequirement("near", "far", 0.5),
+                ClearanceRequirement("near", "renamed", 0.5),
+            ]
+
+        monkeypatch.setitem(CLEARANCE_CHECKS, "far apart", far_apart)
+        # parts too far apart to measure pass, a missing part doesn't
+        assert check_config(default_bender_config, ["far apart"]) == [
+            "far apart: no part labelled renamed to check near and renamed"
+        ]
+
+    def test_oversized_lock_pin(self, default_bender_config):
+        default_bender_config.frame_lock_pin_tolerance = -0.4
+        failures = check_config(default_bender_config, ["lock pin"])
+        assert len(failures) == 1
+        assert "lock pin and top frame interfere" in failures[0]
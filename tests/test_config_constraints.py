@@ -0,0 +1,112 @@
+import pytest
+from importlib.machinery import SourceFileLoader
+from importlib.util import spec_from_loader, module_from_spec
+from pathlib import Path
+
+from bender_config import BenderConfig, ConnectorConfig
+from config_constraints import (
+    BENDER_CONSTRAINTS,
+    Comparison,
+    ConfigConstraintError,
+    Constraint,
+    check_config,
+    validate_config,
+)
+
+
+def _violated(config: BenderConfig) -> set[str]:
+    return {violation.constraint for violation in validate_config(config)}
+
+
+class TestConfigConstraints:
+    def test_default_config_is_valid(self, default_bender_config):
+        assert validate_config(default_bender_config) == []
+        check_config(default_bender_config)
+
+    @pytest.mark.parametrize("name", ["dev", "mini", "release"])
+    def test_build_configs_are_valid(self, name):
+        config_path = (
+            Path(__file__).parent / f"../build-configs/{name}.conf"
+        )
+        assert validate_config(BenderConfig(config_path)) == []
+
+    def test_short_chamber(self, default_bender_config):
+        default_bender_config.frame_chamber_depth = 50
+        assert "sidewall_straight_depth" in _violated(default_bender_config)
+
+    def test_print_in_place_bearing(self, default_bender_config):
+        default_bender_config.wheel.bearing.depth = 30
+        assert "print_in_place_bearing" in _violated(default_bender_config)
+
+    def test_wide_alternate_connector(self, default_bender_config):
+        wide_connector = ConnectorConfig()
+        wide_connector.name = "wide"
+        wide_connector.file_suffix = "-wide"
+        wide_connector.diameter = 40
+        default_bender_config.connectors = [
+            default_bender_config.connectors[0],
+            wide_connector,
+        ]
+        violations = validate_config(default_bender_config)
+        assert [v.subject for v in violations] == ["wide"]
+        assert violations[0].constraint == "connector_diameter"
+
+    def test_missing_alternate_suffix(self, default_bender_config):
+        default_bender_config.connectors = [
+            default_bender_config.connectors[0],
+            ConnectorConfig(),
+        ]
+        assert _violated(default_bender_config) == {"connector_file_suffix"}
+
+    def test_alternate_filament_counts(self, default_bender_config):
+        default_bender_config.alternate_filament_counts = [3, 0]
+        violations = validate_config(default_bender_config)
+        assert [str(v) for v in violations] == [
+            "filament_count [0 filaments]: 0 must be >= 1: "
+            "every frame needs at least one filament chamber"
+        ]
+
+    def test_unevaluable_constraint(self, default_bender_config):
+        default_bender_config.fillet_ratio = 0
+        violations = {
+            violation.constraint: violation.message
+            for violation in validate_config(default_bender_config)
+        }
+        assert violations["chamber_cut_length"].startswith(
+            "could not be evaluated"
+        )
+
+    def test_all_violations_reported(self, default_bender_config):
+        default_bender_config.frame_chamber_depth = 50
+        default_bender_config.wall_thickness = -1
+        default_bender_config.fillet_ratio = 1
+        with pytest.raises(ConfigConstraintError) as error:
+            check_config(default_bender_config)
+        assert {
+            "sidewall_straight_depth",
+            "wall_thickness",
+            "fillet_ratio",
+        } <= {violation.constraint for violation in error.value.violations}
+        assert isinstance(error.value, ValueError)
+
+    def test_custom_constraints(self, default_bender_config):
+        constraint = Constraint(
+            "narrow_frame",
+            lambda c: c.frame_exterior_width,
+            Comparison.LESS,
+            lambda c: 50,
+            "testing",
+        )
+        assert validate_config(default_bender_config, [constraint])[
+            0
+        ].message == ("91 must be < 50: testing")
+
+    def test_constraint_names_unique(self):
+        names = [constraint.name for constraint in BENDER_CONSTRAINTS]
+        assert len(names) == len(set(names))
+
+    def test_bare_execution(self):
+        loader = SourceFileLoader("__main__", "src/config_constraints.py")
+        loader.exec_module(
+            module_from_spec(spec_from_loader(loader.name, loader))
+        )
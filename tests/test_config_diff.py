@@ -0,0 +1,62 @@
+from copy import deepcopy
+from importlib.machinery import SourceFileLoader
+from importlib.util import spec_from_loader, module_from_spec
+from pathlib import Path
+from unittest.mock import patch
+
+from config_diff import diff_configs, flatten_config
+from frame_config import FrameStyle
+
+
+class TestConfigDiff:
+    def test_identical(self, default_bender_config):
+        diff = diff_configs(
+            default_bender_config, deepcopy(default_bender_config)
+        )
+        assert diff.empty
+        assert diff.report() == "no differences"
+
+    def test_flatten(self, default_bender_config):
+        values = flatten_config(default_bender_config)
+        assert values["wheel.bearing.depth"] == 4
+        assert "connectors[0].tube.inner_diameter" in values
+        assert "stl_folder" not in values
+
+    def test_stl_folder_ignored(self, default_bender_config):
+        moved = deepcopy(default_bender_config)
+        moved.stl_folder = "../stl/elsewhere"
+        assert diff_configs(default_bender_config, moved).empty
+
+    def test_filament_count(self, default_bender_config):
+        changed = deepcopy(default_bender_config)
+        changed.filament_count = 6
+        diff = diff_configs(default_bender_config, changed)
+        assert diff.config_changes == {"filament_count": (5, 6)}
+        assert "frame_config" in diff.part_changes
+        assert "sidewall_config" not in diff.part_changes
+        assert "frame-top.stl" in diff.changed_files
+        assert "wall-side.stl" not in diff.changed_files
+        assert "filament-bracket-wheel.stl" not in diff.changed_files
+        assert not diff.added_files and not diff.removed_files
+
+    def test_frame_style(self, default_bender_config):
+        default_bender_config.skip_alt_file_generation = False
+        changed = deepcopy(default_bender_config)
+        changed.frame_style = FrameStyle.STANDING
+        diff = diff_configs(default_bender_config, changed)
+        assert "alt-frame-styles/alt-frame-top-standing.stl" in (
+            diff.removed_files
+        )
+        assert "alt-frame-styles/alt-frame-top-hanging.stl" in (
+            diff.added_files
+        )
+
+    def test_bare_execution(self):
+        config_path = str(
+            Path(__file__).parent / "../build-configs/release.conf"
+        )
+        with patch("sys.argv", ["config_diff.py", config_path, config_path]):
+            loader = SourceFileLoader("__main__", "src/config_diff.py")
+            loader.exec_module(
+                module_from_spec(spec_from_loader(loader.name, loader))
+            )
@@ -0,0 +1,86 @@
+import pickle
+from copy import deepcopy
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from bender_config import BenderConfig
+from config_snapshot import ConfigSnapshot, snapshot
+from sidewall_config import WallStyle
+
+
+class TestConfigSnapshot:
+    def test_snapshot_is_frozen(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        with pytest.raises(FrozenInstanceError):
+            config.filament_count = 3
+        assert config.filament_count == 5
+        assert isinstance(config.wheel, ConfigSnapshot)
+        assert isinstance(config.connectors, tuple)
+
+    def test_snapshot_is_detached(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        default_bender_config.wheel.bearing.depth = 20
+        assert config.wheel.bearing.depth == 4
+
+    def test_hashable(self, default_bender_config):
+        cache = {snapshot(default_bender_config): "built"}
+        assert cache[snapshot(deepcopy(default_bender_config))] == "built"
+        default_bender_config.wall_style = WallStyle.SOLID
+        assert snapshot(default_bender_config) not in cache
+
+    def test_interned(self, default_bender_config):
+        assert snapshot(default_bender_config) is snapshot(
+            deepcopy(default_bender_config)
+        )
+
+    def test_evolve_shares_unchanged(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        evolved = config.evolve(filament_count=3)
+        assert evolved.filament_count == 3
+        assert config.filament_count == 5
+        assert evolved.wheel is config.wheel
+        assert evolved.connectors is config.connectors
+        assert config.evolve(filament_count=5) is config
+
+    def test_evolve_nested(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        evolved = config.evolve(
+            wheel=config.wheel.evolve(
+                bearing=config.wheel.bearing.evolve(print_in_place=True)
+            )
+        )
+        assert evolved.wheel.bearing.print_in_place
+        assert not config.wheel.bearing.print_in_place
+        assert evolved.connectors is config.connectors
+
+    def test_evolve_unknown_field(self, default_bender_config):
+        with pytest.raises(TypeError):
+            snapshot(default_bender_config).evolve(not_a_field=1)
+
+    def test_thaw(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        first = config.thaw()
+        second = config.thaw()
+        assert isinstance(first, BenderConfig)
+        assert first.bracket_depth == default_bender_config.bracket_depth
+        first.wheel.bearing.depth = 20
+        assert first.bracket_depth == 28.6
+        assert second.wheel.bearing.depth == 4
+        assert second.bracket_depth == 12.6
+        assert snapshot(second) is config
+
+    def test_thaw_part_config(self, default_bender_config):
+        frame_config = default_bender_config.frame_config
+        thawed = snapshot(frame_config).thaw()
+        assert type(thawed) is type(frame_config)
+        assert thawed == frame_config
+        assert thawed.clip_point is not frame_config.clip_point
+
+    def test_pickle(self, default_bender_config):
+        config = snapshot(default_bender_config)
+        assert pickle.loads(pickle.dumps(config)) is config
+
+    def test_snapshot_invalid(self):
+        with pytest.raises(TypeError):
+            snapshot("not a config")
@@ -0,0 +1,97 @@
+from copy import deepcopy
+import pickle
+
+import pytest
+
+from bender_config import BenderConfig
+from derived_property import MemoizedConfig, derived_property
+from filament_wheel_config import BearingConfig
+
+
+class TestDerivedProperty:
+    def test_value_is_memoized(self, default_bender_config):
+        assert (
+            default_bender_config.frame_clip_point
+            is default_bender_config.frame_clip_point
+        )
+
+    def test_read_only(self, default_bender_config):
+        with pytest.raises(AttributeError):
+            default_bender_config.bracket_depth = 1
+
+    def test_field_assignment_invalidates(self, default_bender_config):
+        assert default_bender_config.frame_exterior_width == 91.0
+        default_bender_config.filament_count = 3
+        assert default_bender_config.frame_exterior_width == 59.0
+        assert default_bender_config.frame_config.exterior_width == 59.0
+
+    def test_unrelated_values_survive(self, default_bender_config):
+        radius = default_bender_config.frame_bracket_exterior_radius
+        default_bender_config.filament_count = 3
+        assert "frame_bracket_exterior_radius" in (
+            default_bender_config._derived_cache
+        )
+        assert default_bender_config.frame_bracket_exterior_radius == radius
+
+    def test_nested_assignment_invalidates(self, default_bender_config):
+        assert default_bender_config.bracket_depth == 12.6
+        default_bender_config.wheel.bearing.depth = 20
+        assert default_bender_config.bracket_depth == 28.6
+
+    def test_replaced_nested_config(self, default_bender_config):
+        old_bearing = default_bender_config.wheel.bearing
+        default_bender_config.wheel.bearing = BearingConfig(depth=20)
+        assert default_bender_config.bracket_depth == 28.6
+        old_bearing.depth = 100
+        assert default_bender_config.bracket_depth == 28.6
+
+    def test_connector_assignment_invalidates(self, default_bender_config):
+        assert default_bender_config.bracket_depth == 12.6
+        default_bender_config.default_connector.tube.outer_diameter = 30
+        assert default_bender_config.bracket_depth == 32
+
+    def test_deepcopy_is_independent(self, default_bender_config):
+        assert default_bender_config.bracket_depth == 12.6
+        copied = deepcopy(default_bender_config)
+        copied.wheel.bearing.depth = 20
+        assert copied.bracket_depth == 28.6
+        assert default_bender_config.bracket_depth == 12.6
+
+    def test_pickle_is_independent(self, default_bender_config):
+        assert default_bender_config.bracket_depth == 12.6
+        copied = pickle.loads(pickle.dumps(default_bender_config))
+        copied.default_connector.diameter = 30
+        assert copied.bracket_depth == 32
+        assert default_bender_config.bracket_depth == 12.6
+
+    def test_invalidate(self, default_bender_config):
+        assert default_bender_config.bracket_depth == 12.6
+        default_bender_config.connectors[0].__dict__["diameter"] = 30
+        assert default_bender_config.bracket_depth == 12.6
+        default_bender_config.invalidate()
+        assert default_bender_config.bracket_depth == 32
+
+    def test_transitive_dependencies(self):
+        class Sample(MemoizedConfig):
+            def __init__(self):
+                self.length = 2
+
+            def _doubled(self):
+                return self.length * 2
+
+            @derived_property
+            def doubled(self):
+                return self._doubled()
+
+            @derived_property
+            def quadrupled(self):
+                return self.doubled * 2
+
+        sample = Sample()
+        assert sample.quadrupled == 8
+        sample.length = 3
+        assert sample.quadrupled == 12
+        assert Sample._derived_dependents["length"] == {
+            "doubled",
+            "quadrupled",
+        }
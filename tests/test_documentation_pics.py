@@ -2,7 +2,19 @@ from importlib.machinery import SourceFileLoader
 from importlib.util import module_from_spec, spec_from_loader
 from unittest.mock import patch
 
-from assembly_documentation import wall_assembly
+from build123d import Box
+
+from assembly_documentation import (
+    ASSEMBLIES,
+    DOCUMENTATION_VIEWS,
+    DocumentationView,
+    export_models,
+    render_documentation,
+    view_cache_key,
+    wall_assembly,
+)
+from offscreen_renderer import RenderSettings
+from source_graph import import_closure, module_imports, source_digest
 
 
 # class TestDocPics:
@@ -28,3 +40,65 @@ from assembly_documentation import wall_assembly
 #             patch("assembly_documentation.save_screenshot"),
 #         ):
 #             wall_assembly()
+
+
+class BoxAssembly:
+    def __init__(self, config):
+        self._config = config
+
+    def box(self):
+        return Box(self._config.wall_thickness, 10, 10)
+
+    complete_assembly = box
+
+
+class TestDocumentationRendering:
+    def test_render_documentation_cache(self, default_bender_config, tmp_path):
+        views = [DocumentationView("box.png", "box", "box")]
+        settings = RenderSettings(width=40, height=30)
+        with patch.dict(ASSEMBLIES, {"box": BoxAssembly}):
+            assert render_documentation(
+                default_bender_config, tmp_path, views, settings, jobs=1
+            ) == ["box.png"]
+            assert (tmp_path / "box.png").exists()
+            assert (
+                render_documentation(
+                    default_bender_config, tmp_path, views, settings, jobs=1
+                )
+                == []
+            )
+            default_bender_config.wall_thickness = 5
+            assert render_documentation(
+                default_bender_config, tmp_path, views, settings, jobs=1
+            ) == ["box.png"]
+            (tmp_path / "box.png").unlink()
+            assert render_documentation(
+                default_bender_config, tmp_path, views, settings, jobs=1
+            ) == ["box.png"]
+
+    def test_cache_key_source(self, default_bender_config):
+        closure = import_closure(["assembly_documentation"], module_imports())
+        assert "offscreen_renderer" in closure
+        assert "build" not in closure
+        view = DOCUMENTATION_VIEWS[0]
+        digest = source_digest(["assembly_documentation"])
+        assert view_cache_key(
+            default_bender_config, view, RenderSettings()
+        ) == view_cache_key(
+            default_bender_config, view, RenderSettings(), digest
+        )
+
+    def test_views_are_unique(self):
+        names = [view.file_name for view in DOCUMENTATION_VIEWS]
+        assert len(names) == len(set(names))
+        for view in DOCUMENTATION_VIEWS:
+            assert hasattr(ASSEMBLIES[view.assembly], view.step)
+
+    def test_export_models(self, default_bender_config, tmp_path):
+        with patch.dict(
+            ASSEMBLIES, {"walls": BoxAssembly, "brackets": BoxAssembly}
+        ):
+            models = export_models(default_bender_config, tmp_path)
+        assert models
+        for model in models:
+            assert (tmp_path / model).read_bytes()[:4] == b"glTF"
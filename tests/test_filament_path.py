@@ -0,0 +1,88 @@
+from dataclasses import replace
+from math import exp, pi
+
+import numpy as np
+import pytest
+
+from filament_bracket_config import ChannelPairDirection
+from filament_channels import FilamentChannels
+from filament_path import (
+    PathGeometry,
+    bracket_paths,
+    filament_path,
+)
+
+
+class TestFilamentPath:
+    def test_geometry_matches_config(self, default_bender_config):
+        geometry = PathGeometry.from_bender_config(default_bender_config)
+        bracket_config = default_bender_config.filament_bracket_config(0)
+        assert geometry.bracket_height == pytest.approx(
+            default_bender_config.bracket_height
+        )
+        assert geometry.funnel_height == pytest.approx(
+            bracket_config.filament_funnel_height
+        )
+
+    def test_curved_length_matches_channel_line(self, default_bender_config):
+        geometry = PathGeometry.from_bender_config(default_bender_config)
+        channels = FilamentChannels(
+            default_bender_config.filament_bracket_config(0)
+        )
+        segments = channels._curved_filament_line().children
+        assert geometry.curved_channel_length == pytest.approx(
+            sum(segment.length for segment in segments)
+        )
+
+    def test_directions(self, default_bender_config):
+        geometry = PathGeometry.from_bender_config(default_bender_config)
+        forward = filament_path(geometry, ChannelPairDirection.LEAN_FORWARD)
+        reverse = filament_path(geometry, ChannelPairDirection.LEAN_REVERSE)
+        straight = filament_path(geometry, ChannelPairDirection.STRAIGHT)
+        assert forward.left_length == reverse.right_length
+        assert forward.length == pytest.approx(reverse.length)
+        assert straight.length < forward.length
+        assert straight.friction_multiplier == 1
+        assert forward.sliding_wrap == pytest.approx(pi / 4)
+        assert forward.friction_multiplier == pytest.approx(exp(0.15 * pi / 4))
+        assert forward.wheel_length == pytest.approx(
+            default_bender_config.wheel.radius * pi
+        )
+
+    def test_wheel_friction(self, default_bender_config):
+        geometry = PathGeometry.from_bender_config(default_bender_config)
+        path = filament_path(
+            geometry,
+            ChannelPairDirection.STRAIGHT,
+            friction=0.2,
+            wheel_friction=0.01,
+        )
+        assert path.friction_multiplier == pytest.approx(exp(0.01 * pi))
+
+    def test_vectorized_sweep(self, default_bender_config):
+        geometry = replace(
+            PathGeometry.from_bender_config(default_bender_config),
+            wheel_radius=np.linspace(20, 50, 31)[:, None],
+        )
+        path = filament_path(
+            geometry,
+            ChannelPairDirection.LEAN_FORWARD,
+            friction=np.array([0.1, 0.2])[None, :],
+        )
+        assert path.length.shape == (31, 2)
+        assert np.all(np.diff(path.length[:, 0]) > 0)
+        multiplier = path.friction_multiplier
+        assert np.all(multiplier[:, 1] > multiplier[:, 0])
+        default_bender_config.wheel.diameter = 60
+        single = filament_path(
+            PathGeometry.from_bender_config(default_bender_config),
+            ChannelPairDirection.LEAN_FORWARD,
+            friction=0.2,
+        )
+        assert path.length[10, 1] == pytest.approx(single.length)
+
+    def test_bracket_paths(self, default_bender_config):
+        paths = bracket_paths(default_bender_config)
+        assert len(paths) == len(default_bender_config.connectors) * len(
+            ChannelPairDirection
+        )
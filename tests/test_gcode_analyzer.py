@@ -0,0 +1,97 @@
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gcode_analyzer import (
+    GcodeAnalyzer,
+    ToolUsage,
+    analyze_file,
+    chamber_capacity,
+    recommend_config,
+)
+
+TORTURE_TEST = Path(__file__).parent / "gcode/torture-test.gcode"
+
+
+def analyze(gcode: str, **kwargs):
+    return GcodeAnalyzer(**kwargs).analyze(BytesIO(gcode.encode()))
+
+
+class TestGcodeAnalyzer:
+    def test_torture_test(self):
+        analysis = analyze_file(TORTURE_TEST, unload_length=400)
+        assert sorted(analysis.tools) == [0, 1, 2, 3, 4]
+        assert analysis.filament_count == 5
+        assert analysis.tool_changes == 39
+        assert analysis.peak_slack == 400
+        assert analysis.tools[4].loads == analysis.tools[4].unloads == 5
+        assert analysis.lines == 215
+
+    def test_retraction_slack(self):
+        analysis = analyze(
+            "M83\nT1\nG1 E5\nG1 E-2 ; retract\nG1 X1 E-1\nG1 E2\nG1 E-0.5\n",
+            unload_length=100,
+        )
+        usage = analysis.tools[1]
+        assert usage.extruded == 7
+        assert usage.retracted == 3.5
+        assert usage.peak_slack == 3
+        assert usage.slack == 1.5
+
+    def test_absolute_extrusion(self):
+        analysis = analyze("G1 E5\nG1 E3\nG92 E0\nG1 E1\nG1 X1 Y2\n")
+        usage = analysis.tools[0]
+        assert usage.extruded == 6
+        assert usage.retracted == 2
+
+    def test_unload_and_reload(self):
+        analysis = analyze(
+            "T0\nG1 E1\nT1\nG1 E1\nT0\nM702\n",
+            unload_length=300,
+            load_length=250,
+        )
+        assert analysis.tool_changes == 2
+        # 300 unloaded, 250 of it reloaded, then unloaded again
+        assert analysis.tools[0].slack == 350
+        assert analysis.tools[0].unloads == 2
+        assert analysis.tools[1].slack == 300
+
+    def test_comments_ignored(self):
+        analysis = analyze("M83\n; G1 E100\nG1 X10 ; E100\nT3 ; T4\n")
+        assert 0 not in analysis.tools
+        assert sorted(analysis.tools) == [3]
+
+    def test_blocks_match_whole_file(self):
+        whole = analyze_file(TORTURE_TEST)
+        with open(TORTURE_TEST, "rb") as gcode:
+            blocks = GcodeAnalyzer().analyze(gcode, block_size=17)
+        assert blocks == whole
+
+    def test_bulk_moves_match_sequential(self):
+        lengths = np.random.default_rng(1).uniform(-2, 1.5, 500)
+        bulk = ToolUsage(slack=4)
+        bulk.move(lengths)
+        sequential = ToolUsage(slack=4)
+        for length in lengths:
+            if length > 0:
+                sequential.pull(length)
+            else:
+                sequential.push_back(-length)
+        assert bulk.slack == pytest.approx(sequential.slack)
+        assert bulk.peak_slack == pytest.approx(sequential.peak_slack)
+
+    def test_recommend_config(self, default_bender_config):
+        analysis = analyze("T7\nG1 E1\nT0\n", unload_length=2000)
+        recommended = recommend_config(analysis, default_bender_config)
+        assert recommended["filament_count"] == (5, 8)
+        current, depth = recommended["frame_chamber_depth"]
+        assert current == 340 and depth > current and depth % 10 == 0
+        default_bender_config.frame_chamber_depth = depth
+        assert chamber_capacity(default_bender_config) >= 2000 * 1.2
+
+    def test_recommend_unchanged(self, default_bender_config):
+        analysis = analyze_file(TORTURE_TEST, unload_length=100)
+        recommended = recommend_config(analysis, default_bender_config)
+        assert all(a == b for a, b in recommended.values())
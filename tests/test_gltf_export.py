@@ -0,0 +1,126 @@
+import json
+import struct
+
+import numpy as np
+from build123d import Box, Compound, Cylinder, Location
+
+from gltf_export import (
+    GLB_MAGIC,
+    GlbSettings,
+    export_glb,
+    export_part_glbs,
+    glb_bytes,
+)
+from lock_pin import LockPin
+
+
+def read_glb(data: bytes) -> tuple[dict, bytes]:
+    magic, version, length = struct.unpack_from("<III", data)
+    assert (magic, version, length) == (GLB_MAGIC, 2, len(data))
+    json_length, _ = struct.unpack_from("<II", data, 12)
+    document = json.loads(data[20 : 20 + json_length])
+    binary_length, _ = struct.unpack_from("<II", data, 20 + json_length)
+    binary = data[28 + json_length : 28 + json_length + binary_length]
+    return document, binary
+
+
+def node_positions(document: dict, binary: bytes, node: dict) -> np.ndarray:
+    """the dequantized, world space positions of a node's mesh"""
+    primitive = document["meshes"][node["mesh"]]["primitives"][0]
+    accessor = document["accessors"][primitive["attributes"]["POSITION"]]
+    view = document["bufferViews"][accessor["bufferView"]]
+    quantized = np.frombuffer(
+        binary,
+        dtype=np.uint16,
+        count=accessor["count"] * 4,
+        offset=view["byteOffset"],
+    ).reshape(-1, 4)[:, :3]
+    return quantized * np.array(node["scale"]) + np.array(node["translation"])
+
+
+class TestGltfExport:
+    def test_glb_structure(self):
+        box = Box(10, 20, 30)
+        box.label = "box"
+        box.color = "#ff0000"
+        document, binary = read_glb(glb_bytes(box))
+        assert document["extensionsRequired"] == ["KHR_mesh_quantization"]
+        root = document["nodes"][document["scenes"][0]["nodes"][0]]
+        assert root["name"] == "box"
+        node = document["nodes"][root["children"][0]]
+        assert node["name"] == "box"
+        material = document["materials"][0]
+        assert material["pbrMetallicRoughness"]["baseColorFactor"] == [
+            1,
+            0,
+            0,
+            1,
+        ]
+        positions = node_positions(document, binary, node)
+        assert np.allclose(positions.min(0), (-5, -10, -15), atol=1e-3)
+        assert np.allclose(positions.max(0), (5, 10, 15), atol=1e-3)
+
+    def test_levels_of_detail(self):
+        cylinder = Cylinder(20, 10)
+        document, _ = read_glb(glb_bytes(cylinder))
+        root = document["nodes"][document["scenes"][0]["nodes"][0]]
+        node = document["nodes"][root["children"][0]]
+        lods = [root["children"][0]] + node["extensions"]["MSFT_lod"]["ids"]
+        assert len(lods) == 3
+        triangles = [
+            document["accessors"][
+                document["meshes"][document["nodes"][lod]["mesh"]][
+                    "primitives"
+                ][0]["indices"]
+            ]["count"]
+            for lod in lods
+        ]
+        assert triangles == sorted(triangles, reverse=True)
+        assert triangles[0] > triangles[-1]
+        assert node["extras"]["MSFT_screencoverage"] == [0.25, 0.08, 0.0]
+
+    def test_identical_lods_are_dropped(self):
+        document, _ = read_glb(glb_bytes(Box(1, 1, 1)))
+        assert len(document["meshes"]) == 1
+        assert "extensions" not in document["nodes"][0]
+
+    def test_assembly(self, tmp_path):
+        left = Box(1, 1, 1)
+        left.label = "left"
+        left.color = "#0000ff"
+        right = Box(1, 1, 1).moved(Location((10, 0, 0)))
+        right.label = "right"
+        assembly = Compound(label="pair", children=[left, right])
+        assembly.color = "#00ff00"
+        export_glb(
+            assembly, tmp_path / "pair.glb", GlbSettings(lods=((0.1, 0.2),))
+        )
+        document, binary = read_glb((tmp_path / "pair.glb").read_bytes())
+        nodes = [
+            document["nodes"][child]
+            for child in document["nodes"][-1]["children"]
+        ]
+        assert [node["name"] for node in nodes] == ["left", "right"]
+        assert len(document["materials"]) == 2
+        assert np.isclose(
+            node_positions(document, binary, nodes[1])[:, 0].min(),
+            9.5,
+            atol=1e-3,
+        )
+
+    def test_export_part_glbs(self, default_bender_config, tmp_path):
+        lock_pin_config = default_bender_config.lock_pin_config
+        lock_pin_config.stl_folder = str(tmp_path)
+        lock_pin = LockPin(lock_pin_config)
+        lock_pin.compile()
+        paths = export_part_glbs(lock_pin, GlbSettings(lods=((0.5, 0.5),)))
+        assert paths and all(path.parent == tmp_path for path in paths)
+        for path in paths:
+            read_glb(path.read_bytes())
+
+    def test_export_without_stl_folder(self, default_bender_config):
+        lock_pin_config = default_bender_config.lock_pin_config
+        lock_pin_config.stl_folder = "NONE"
+        lock_pin = LockPin(lock_pin_config)
+        lock_pin.compile()
+        assert export_part_glbs(lock_pin) == []
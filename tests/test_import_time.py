@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SOURCE_DIRECTORY = (Path(__file__).parent / "../src").resolve()
+
+# the third party libraries every part imports; their cost is paid once
+# per process and isn't counted against any module's budget
+SHARED_IMPORTS = ("build123d", "ocp_vscode", "partomatic")
+
+# seconds a module may take to import on top of SHARED_IMPORTS
+IMPORT_BUDGET = 1.0
+
+UNIMPORTABLE_MODULES = {
+    "mmu3_alternate_back": "depends on the unpublished twist_snap module",
+}
+
+MODULES = sorted(path.stem for path in SOURCE_DIRECTORY.glob("*.py"))
+
+# imports SHARED_IMPORTS, then imports each module in a forked child of
+# that interpreter, so every module is timed with none of the other
+# modules already imported; reports the time (or the error) for each as
+# json on the last line of output
+TIMING_SCRIPT = """
+import importlib, json, os, sys, time
+for shared in sys.argv[1].split(","):
+    importlib.import_module(shared)
+timings = {}
+for module in sys.argv[2:]:
+    read, write = os.pipe()
+    if os.fork() == 0:
+        os.close(read)
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module)
+            timing = time.perf_counter() - start
+        except Exception as error:
+            timing = repr(error)
+        os.write(write, json.dumps(timing).encode())
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        timings[module] = json.loads(pipe.read())
+    os.wait()
+print(json.dumps(timings))
+"""
+
+
+@pytest.fixture(scope="module")
+def import_times() -> dict:
+    if not hasattr(os, "fork"):
+        pytest.skip("timing each module alone needs os.fork")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            TIMING_SCRIPT,
+            ",".join(SHARED_IMPORTS),
+            *[m for m in MODULES if m not in UNIMPORTABLE_MODULES],
+        ],
+        cwd=SOURCE_DIRECTORY,
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    @pytest.mark.parametrize("module", MODULES)
+    def test_import_budget(self, import_times, module):
+        if module in UNIMPORTABLE_MODULES:
+            pytest.skip(UNIMPORTABLE_MODULES[module])
+        elapsed = import_times[module]
+        assert not isinstance(elapsed, str), f"{module}: {elapsed}"
+        assert elapsed < IMPORT_BUDGET, f"{module} took {elapsed:.2f}s"
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from build123d import Box, Compound, Cylinder
+
+from mesh_bvh import MeshBvh
+from offscreen_renderer import tessellate
+
+
+def bvh(shape) -> MeshBvh:
+    return MeshBvh(tessellate(shape, 0.01, 0.1))
+
+
+class TestMeshBvh:
+    def test_signed_distances(self):
+        box = bvh(Box(10, 10, 10))
+        points = np.array([[0, 0, 0], [4, 0, 0], [7, 0, 0], [8, 9, 5]])
+        assert box.signed_distances(points) == pytest.approx(
+            [-5, -1, 2, np.sqrt(3**2 + 4**2)]
+        )
+
+    def test_ray_distances(self):
+        holed = bvh(Box(10, 10, 10) - Cylinder(3, 10))
+        origins = np.array(
+            [[0, -20, 0], [0, -20, 0], [0, 0, 0], [4.9, 0, 0.5]]
+        )
+        directions = np.array([[0, 1, 0], [0, -1, 0], [1, 0, 0], [-1, 0, 0]])
+        assert holed.ray_distances(origins, directions) == pytest.approx(
+            [15, np.inf, 3, 1.9], abs=0.01
+        )
+
+    def test_ray_max_distance(self):
+        box = bvh(Box(10, 10, 10))
+        origins = np.array([[0, -20, 0], [0, -8, 0]])
+        directions = np.array([[0, 1, 0], [0, 1, 0]])
+        assert box.ray_distances(origins, directions, 10) == pytest.approx(
+            [np.inf, 3]
+        )
+
+    def test_diagonal_ray(self):
+        box = bvh(Box(10, 10, 10))
+        distance = box.ray_distances(
+            np.array([[-20.0, -20, -20]]), np.array([[1, 1, 1]]) / np.sqrt(3)
+        )
+        assert distance == pytest.approx([15 * np.sqrt(3)])
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            MeshBvh(tessellate(Compound(), 0.01, 0.1))
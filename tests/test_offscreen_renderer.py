@@ -0,0 +1,71 @@
+import struct
+import zlib
+
+import numpy as np
+from build123d import Box, Compound, Location
+
+from offscreen_renderer import (
+    RenderSettings,
+    assembly_meshes,
+    render,
+    tessellate,
+    write_png,
+)
+
+SMALL = RenderSettings(width=80, height=60)
+
+
+class TestOffscreenRenderer:
+    def test_tessellate_faces(self):
+        mesh = tessellate(Box(1, 2, 3), 0.1, 0.2)
+        assert mesh.triangles.shape == (12, 3)
+        assert set(mesh.faces) == set(range(6))
+        assert np.allclose(mesh.vertices.min(0), (-0.5, -1, -1.5))
+
+    def test_assembly_colors_and_locations(self):
+        box = Box(1, 1, 1).moved(Location((10, 0, 0)))
+        box.color = "#ff0000"
+        inherited = Box(1, 1, 1)
+        assembly = Compound(label="assembly", children=[box])
+        group = Compound(label="group", children=[inherited])
+        group.color = "#0000ff"
+        group.parent = assembly
+        meshes = assembly_meshes(assembly, 0.1, 0.2)
+        assert [mesh.color for mesh in meshes] == [(1, 0, 0), (0, 0, 1)]
+        assert np.isclose(meshes[0].vertices[:, 0].min(), 9.5)
+
+    def test_render(self):
+        box = Box(10, 10, 10)
+        box.color = "#ff0000"
+        image = render(box, SMALL)
+        assert image.shape == (60, 80, 3)
+        assert tuple(image[0, 0]) == (255, 255, 255)
+        red = (image[..., 0] > 100) & (image[..., 1] < 80)
+        assert red.sum() > 1000
+
+    def test_render_occlusion(self):
+        back = Box(10, 10, 10)
+        back.color = "#0000ff"
+        front = Box(4, 4, 4).moved(Location((6, -6, 6)))
+        front.color = "#ff0000"
+        image = render(Compound(children=[back, front]), SMALL)
+        red = (image[..., 0] > 100) & (image[..., 2] < 80)
+        blue = (image[..., 2] > 100) & (image[..., 0] < 80)
+        assert red.sum() > 0 and blue.sum() > 0
+        # depth, not drawing order, decides which box is visible
+        assert np.array_equal(
+            image, render(Compound(children=[front, back]), SMALL)
+        )
+
+    def test_write_png(self, tmp_path):
+        image = np.zeros((2, 3, 3), dtype=np.uint8)
+        image[1, 2] = (1, 2, 3)
+        write_png(image, tmp_path / "image.png")
+        data = (tmp_path / "image.png").read_bytes()
+        assert data.startswith(b"\x89PNG\r\n\x1a\n")
+        width, height = struct.unpack(">II", data[16:24])
+        assert (width, height) == (3, 2)
+        idat = data.index(b"IDAT")
+        length = struct.unpack(">I", data[idat - 4 : idat])[0]
+        rows = zlib.decompress(data[idat + 4 : idat + 4 + length])
+        assert rows[-3:] == bytes((1, 2, 3))
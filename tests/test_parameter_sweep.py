@@ -0,0 +1,142 @@
+import csv
+import json
+
+import pytest
+
+from bender_config import BenderConfig
+from parameter_sweep import (
+    SWEEP_PARTS,
+    ParameterSweep,
+    SweepTable,
+    get_config_value,
+    parse_condition,
+    parse_values,
+    set_config_value,
+)
+from sidewall_config import WallStyle
+
+
+class TestParameterSweep:
+    def test_parse_range(self, default_bender_config):
+        assert parse_values(
+            default_bender_config, "wheel.diameter", "50:90:10"
+        ) == [50, 60, 70, 80, 90]
+
+    def test_parse_fractional_range(self, default_bender_config):
+        assert parse_values(
+            default_bender_config, "wall_thickness", "2:3:0.5"
+        ) == [2.0, 2.5, 3.0]
+        assert parse_values(
+            default_bender_config, "wall_thickness", "0.1:0.3:0.1"
+        ) == [0.1, 0.2, 0.3]
+
+    def test_parse_list(self, default_bender_config):
+        assert parse_values(
+            default_bender_config, "filament_count", "3,5,8"
+        ) == [3, 5, 8]
+
+    def test_parse_enum(self, default_bender_config):
+        assert parse_values(
+            default_bender_config, "wall_style", "hex,solid"
+        ) == [WallStyle.HEX, WallStyle.SOLID]
+
+    def test_parse_invalid_range(self, default_bender_config):
+        with pytest.raises(ValueError):
+            parse_values(default_bender_config, "wall_thickness", "1:2")
+
+    def test_set_nested_value(self, default_bender_config):
+        set_config_value(default_bender_config, "wheel.bearing.depth", 20)
+        assert (
+            get_config_value(default_bender_config, "wheel.bearing.depth")
+            == 20
+        )
+        assert default_bender_config.bracket_depth == 28.6
+
+    def test_set_invalid_value(self, default_bender_config):
+        with pytest.raises(ValueError):
+            set_config_value(default_bender_config, "wheel.nothing", 20)
+
+    def test_evaluate(self, default_bender_config):
+        sweep = ParameterSweep(
+            default_bender_config,
+            {"filament_count": [3, 5], "frame_chamber_depth": [50, 340]},
+            columns=["frame_exterior_width"],
+        )
+        table = sweep.evaluate()
+        assert len(table) == 4
+        assert table.columns["frame_exterior_width"] == [59, 59, 91, 91]
+        assert [bool(v) for v in table.columns["violations"]] == [
+            True,
+            False,
+            True,
+            False,
+        ]
+        assert default_bender_config.filament_count == 5
+        assert default_bender_config.frame_chamber_depth == 340
+
+    def test_config_for_is_independent(self, default_bender_config):
+        sweep = ParameterSweep(default_bender_config, {"wheel.diameter": [50]})
+        config = sweep.config_for({"wheel.diameter": 50})
+        assert config.wheel.diameter == 50
+        assert default_bender_config.wheel.diameter == 70
+
+    def test_build_selected(self, default_bender_config):
+        sweep = ParameterSweep(
+            default_bender_config,
+            {"filament_count": [3, 5], "frame_chamber_depth": [50, 340]},
+        )
+        table = sweep.evaluate()
+        sweep.build(
+            table,
+            ["lock-pin"],
+            selected=parse_condition("filament_count==3"),
+            jobs=1,
+        )
+        volumes = table.columns["lock-pin-volume"]
+        assert volumes[0] is None
+        assert volumes[1] > 0
+        assert volumes[2] is None and volumes[3] is None
+        assert table.columns["lock-pin-error"] == [None] * 4
+
+    def test_build_failure(self, default_bender_config, monkeypatch):
+        def broken(config):
+            raise ValueError("no solid")
+
+        monkeypatch.setitem(SWEEP_PARTS, "broken", broken)
+        sweep = ParameterSweep(default_bender_config, {"filament_count": [3]})
+        table = sweep.build(sweep.evaluate(), ["broken", "lock-pin"], jobs=1)
+        assert table.columns["broken-volume"] == [None]
+        assert table.columns["broken-error"] == ["ValueError: no solid"]
+        assert table.columns["lock-pin-volume"][0] > 0
+
+    def test_build_unknown_part(self, default_bender_config):
+        sweep = ParameterSweep(default_bender_config, {"filament_count": [3]})
+        with pytest.raises(ValueError):
+            sweep.build(sweep.evaluate(), ["not-a-part"], jobs=1)
+
+    def test_parse_condition(self):
+        assert parse_condition("bracket_depth<=13")({"bracket_depth": 13})
+        assert not parse_condition("bracket_depth>13")({"bracket_depth": 13})
+        assert parse_condition("wall_style==HEX")(
+            {"wall_style": WallStyle.HEX}
+        )
+        with pytest.raises(ValueError):
+            parse_condition("bracket_depth")
+
+    def test_write_csv(self, tmp_path):
+        table = SweepTable()
+        table.append({"a": 1, "b": WallStyle.HEX})
+        table.append({"a": 2, "c": 3.5})
+        table.write(tmp_path / "sweep.csv")
+        with open(tmp_path / "sweep.csv") as csv_file:
+            rows = list(csv.reader(csv_file))
+        assert rows == [["a", "b", "c"], ["1", "HEX", ""], ["2", "", "3.5"]]
+
+    def test_write_json(self, tmp_path):
+        table = SweepTable()
+        table.append({"a": 1})
+        table.append({"a": 2})
+        table.write(tmp_path / "sweep.json")
+        assert json.loads((tmp_path / "sweep.json").read_text()) == {
+            "a": [1, 2]
+        }
@@ -0,0 +1,174 @@
+from hashlib import sha256
+from threading import Thread
+
+import pytest
+
+import part_cache
+from build_plan import wheel_jobs
+from part_cache import (
+    DirectoryStore,
+    HttpStore,
+    PartCache,
+    cache_server,
+)
+from source_graph import import_closure, module_imports, source_digest
+
+
+def name(data):
+    return sha256(data).hexdigest()
+
+
+def export(job, contents="solid"):
+    outputs = job.output_files()
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+    return outputs
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = DirectoryStore(tmp_path / "server", max_bytes=1000)
+    server = cache_server(store, port=0)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", store
+    server.shutdown()
+    server.server_close()
+
+
+class TestDirectoryStore:
+    def test_round_trip(self, tmp_path):
+        store = DirectoryStore(tmp_path)
+        assert store.get(name(b"part")) is None
+        store.put(name(b"part"), b"part")
+        assert store.get(name(b"part")) == b"part"
+        assert DirectoryStore(tmp_path).get(name(b"part")) == b"part"
+        with pytest.raises(ValueError):
+            store.put("../part", b"part")
+
+    def test_lru_eviction(self, tmp_path):
+        store = DirectoryStore(tmp_path, max_bytes=25)
+        for data in (b"first" * 2, b"second" * 2):
+            store.put(name(data), data)
+        # reading the first object makes the second the least recently used
+        store.get(name(b"first" * 2))
+        store.put(name(b"third" * 2), b"third" * 2)
+        assert store.get(name(b"second" * 2)) is None
+        assert store.get(name(b"first" * 2)) == b"first" * 2
+        assert store.size == 20
+        assert DirectoryStore(tmp_path).size == 20
+
+
+class TestHttpStore:
+    def test_round_trip(self, server):
+        url, store = server
+        remote = HttpStore(url)
+        assert remote.get(name(b"part")) is None
+        remote.put(name(b"part"), b"part")
+        assert store.get(name(b"part")) == b"part"
+        assert remote.get(name(b"part")) == b"part"
+        assert remote.available
+
+    def test_unavailable(self):
+        messages = []
+        remote = HttpStore("http://127.0.0.1:9", 1, messages.append)
+        assert remote.get(name(b"part")) is None
+        assert not remote.available
+        assert messages[0].startswith("remote cache unavailable")
+
+
+class TestPartCache:
+    def test_read_through(self, default_bender_config, tmp_path, server):
+        url, _ = server
+        default_bender_config.stl_folder = str(tmp_path / "first")
+        built = wheel_jobs(default_bender_config)[0]
+        default_bender_config.stl_folder = str(tmp_path / "second")
+        job = wheel_jobs(default_bender_config)[0]
+
+        first = PartCache(
+            DirectoryStore(tmp_path / "first-cache"), HttpStore(url), "source"
+        )
+        assert first.fetch(built) is None
+        export(built)
+        first.store(built)
+
+        # another machine, with an empty local cache, reads the remote
+        # and writes it back locally
+        second = PartCache(
+            DirectoryStore(tmp_path / "second-cache"), HttpStore(url), "source"
+        )
+        assert second.key(job) == first.key(built)
+        assert second.fetch(job) == job.output_files()
+        assert job.output_files()[0].read_text() == "solid"
+        assert second.fetch(job) == job.output_files()
+        assert second.statistics == {"local": 1, "remote": 1, "misses": 0}
+        # glb models weren't stored
+        assert second.fetch(job, glb=True) is None
+
+    def test_source_changes(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        store = DirectoryStore(tmp_path / "cache")
+        export(job)
+        PartCache(store, source="source").store(job)
+        assert PartCache(store, source="changed").fetch(job) is None
+
+    def test_import_closure(self, default_bender_config, tmp_path):
+        job = wheel_jobs(default_bender_config)[0]
+        imports = module_imports()
+        closure = import_closure([job.part_class.__module__], imports)
+        assert "filament_wheel" in closure
+        assert "build" not in closure
+        key = PartCache(DirectoryStore(tmp_path)).key(job)
+        assert PartCache(DirectoryStore(tmp_path)).key(job) == key
+
+    def test_export_source(
+        self, default_bender_config, tmp_path, monkeypatch
+    ):
+        job = wheel_jobs(default_bender_config)[0]
+        digested = []
+
+        def digest(modules, imports):
+            digested.append(set(modules))
+            return str(len(digested))
+
+        monkeypatch.setattr(part_cache, "source_digest", digest)
+        cache = PartCache(DirectoryStore(tmp_path))
+        assert cache.key(job) != cache.key(job, glb=True)
+        # the modules writing the files count, whatever the part imports
+        stl_modules = {"filament_wheel", "build_plan", "reproducible_stl"}
+        assert digested == [stl_modules, stl_modules | {"gltf_export"}]
+        key = cache.key(job)
+        monkeypatch.setattr(part_cache, "LIBRARY_VERSIONS", ("0.0", "0.0"))
+        assert cache.key(job) != key
+
+    def test_source_digest(self, tmp_path):
+        (tmp_path / "part.py").write_text("import shape")
+        (tmp_path / "shape.py").write_text("SIDES = 4")
+        (tmp_path / "script.py").write_text("import part")
+        digest = source_digest(["part"], tmp_path)
+        (tmp_path / "script.py").write_text("import part  # changed")
+        assert source_digest(["part"], tmp_path) == digest
+        (tmp_path / "shape.py").write_text("SIDES = 5")
+        assert source_digest(["part"], tmp_path) != digest
+
+    def test_corrupt_manifest(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        store = DirectoryStore(tmp_path / "cache")
+        cache = PartCache(store, source="source")
+        export(job)
+        cache.store(job)
+        for manifest in (b'{"stl": ["trunc', b'{"glb": []}', b"[1]"):
+            store.put(cache.key(job), manifest)
+            assert cache.fetch(job) is None
+
+    def test_corrupt_file(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        job = wheel_jobs(default_bender_config)[0]
+        store = DirectoryStore(tmp_path / "cache")
+        cache = PartCache(store, source="source")
+        export(job)
+        cache.store(job)
+        (store.path / name(b"solid")).write_bytes(b"changed")
+        assert cache.fetch(job) is None
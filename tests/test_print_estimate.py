@@ -0,0 +1,109 @@
+import json
+
+import numpy as np
+import pytest
+from build123d import Box, export_stl
+
+from build_plan import build_plan
+from print_estimate import (
+    MachineProfile,
+    PartEstimate,
+    estimate_plan,
+    estimate_triangles,
+    kit_estimate,
+    write_estimates,
+)
+from printability import read_stl
+
+
+def box_triangles(tmp_path, *size):
+    path = tmp_path / "box.stl"
+    export_stl(Box(*size), str(path))
+    return read_stl(path)
+
+
+def estimate(quantity, weight=1.0, print_time=60.0):
+    return PartEstimate(
+        "a.stl", "a.stl", quantity, 1, 1, 1, weight, print_time
+    )
+
+
+class TestEstimateTriangles:
+    def test_box(self, tmp_path):
+        profile = MachineProfile()
+        part = estimate_triangles(box_triangles(tmp_path, 20, 20, 10))
+        # 800 mm² of walls two perimeters deep, 800 mm² of skins
+        # four layers deep, and 15% of the rest
+        shell = 800 * 2 * 0.45 + 800 * 4 * 0.2
+        assert part.volume == pytest.approx(shell + (4000 - shell) * 0.15)
+        assert part.layers == 50
+        assert part.weight == pytest.approx(part.volume / 1000 * 1.24)
+        assert part.print_time == pytest.approx(
+            part.volume / profile.flow_rate + 50 * profile.layer_time
+        )
+
+    def test_thin_part_is_solid(self, tmp_path):
+        part = estimate_triangles(box_triangles(tmp_path, 20, 20, 0.4))
+        assert part.volume == pytest.approx(160)
+        assert part.layers == 2
+
+    def test_infill(self, tmp_path):
+        triangles = box_triangles(tmp_path, 20, 20, 10)
+        sparse = estimate_triangles(triangles, MachineProfile(infill=0.1))
+        dense = estimate_triangles(triangles, MachineProfile(infill=0.5))
+        assert dense.weight > sparse.weight
+        assert dense.print_time > sparse.print_time
+
+    def test_empty(self):
+        part = estimate_triangles(np.zeros((0, 3, 3)))
+        assert part.volume == 0
+        assert part.print_time == 0
+
+
+class TestEstimatePlan:
+    def test_unexported(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        estimates, missing = estimate_plan(default_bender_config)
+        assert estimates == []
+        jobs = build_plan(default_bender_config)
+        assert len(missing) == sum(len(job.output_files()) for job in jobs)
+
+    def test_kit_quantities(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path)
+        for job in build_plan(default_bender_config):
+            for path in job.output_files():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                export_stl(Box(10, 10, 10), str(path))
+        estimates, missing = estimate_plan(default_bender_config)
+        assert missing == []
+        quantities = {
+            estimate.path: estimate.quantity for estimate in estimates
+        }
+        count = default_bender_config.filament_count
+        assert quantities["filament-bracket-top.stl"] == count
+        assert quantities["filament-bracket-wheel.stl"] == count
+        assert quantities["wall-side.stl"] == 2 * (count - 1)
+        assert quantities["wall-guide.stl"] == 4
+        assert quantities["frame-top.stl"] == 1
+        assert all(
+            quantity == 0
+            for path, quantity in quantities.items()
+            if "alt-" in path
+        )
+
+
+class TestKitEstimate:
+    def test_totals(self):
+        kit = kit_estimate([estimate(2), estimate(0), estimate(3, 2, 30)])
+        assert kit.parts == 5
+        assert kit.weight == pytest.approx(8)
+        assert kit.print_time == pytest.approx(210)
+
+    def test_json(self, tmp_path):
+        estimates = [estimate(2)]
+        write_estimates(
+            estimates, kit_estimate(estimates), tmp_path / "estimate.json"
+        )
+        written = json.loads((tmp_path / "estimate.json").read_text())
+        assert written["parts"][0]["quantity"] == 2
+        assert written["kit"]["weight"] == pytest.approx(2)
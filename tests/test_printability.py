@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from build123d import Box, Location, export_stl
+
+from printability import (
+    PrintabilitySettings,
+    analyze_files,
+    analyze_stl,
+    read_stl,
+    write_report,
+)
+
+
+@pytest.fixture
+def export(tmp_path):
+    def exporter(shape, name="part.stl", ascii_format=False):
+        path = tmp_path / name
+        export_stl(shape, str(path), ascii_format=ascii_format)
+        return path
+
+    return exporter
+
+
+class TestPrintability:
+    def test_box(self, export):
+        report = analyze_stl(export(Box(20, 20, 10)))
+        assert report.volume == pytest.approx(4000)
+        assert report.surface_area == pytest.approx(1600)
+        assert report.height == pytest.approx(10)
+        assert report.weight == pytest.approx(4000 / 1000 * 1.24)
+        assert report.minimum_wall == pytest.approx(10)
+        assert report.overhang_area == 0
+        assert report.problems == []
+
+    def test_ascii(self, export):
+        binary = read_stl(export(Box(20, 20, 10)))
+        ascii = read_stl(export(Box(20, 20, 10), "ascii.stl", True))
+        assert ascii.shape == binary.shape
+        assert ascii == pytest.approx(binary)
+
+    def test_bridge(self, export):
+        tunnel = Box(40, 20, 10).moved(Location((0, 0, 5))) - Box(
+            30, 30, 5
+        ).moved(Location((0, 0, 2.5)))
+        report = analyze_stl(export(tunnel))
+        assert report.bridge_area == pytest.approx(600)
+        assert report.longest_bridge == pytest.approx(30)
+        assert report.unsupported_area == 0
+        assert report.overhang_area == 0
+        assert len(report.problems) == 1
+        assert "30.0 mm bridge" in report.problems[0]
+        wider = PrintabilitySettings(maximum_bridge=40)
+        assert analyze_stl(export(tunnel), wider).problems == []
+
+    def test_unsupported(self, export):
+        tee = Box(4, 20, 10).moved(Location((0, 0, 5))) + Box(
+            30, 20, 2
+        ).moved(Location((0, 0, 11)))
+        report = analyze_stl(export(tee))
+        assert report.unsupported_area == pytest.approx(520)
+        assert "no wall to bridge to" in report.problems[0]
+
+    def test_overhang(self, export):
+        slope = Box(20, 20, 20).moved(Location((0, 0, 0), (0, 30, 0)))
+        report = analyze_stl(export(slope))
+        # a box tilted 30 degrees has one face 60 degrees from vertical
+        assert report.overhang_area == pytest.approx(400)
+        steep = PrintabilitySettings(overhang_angle=70)
+        assert analyze_stl(export(slope), steep).overhang_area == 0
+
+    def test_thin_wall(self, export):
+        report = analyze_stl(export(Box(0.5, 20, 10)))
+        assert report.minimum_wall == pytest.approx(0.5)
+        assert report.thin_wall_area == pytest.approx(400)
+        assert "thinner than 0.8 mm" in report.problems[0]
+
+    def test_wall_search(self, export):
+        report = analyze_stl(export(Box(20, 20, 20)))
+        assert report.minimum_wall is None
+
+    def test_report(self, export, tmp_path):
+        export(Box(10, 10, 10), "a.stl")
+        export(Box(5, 5, 5), "b.stl")
+        reports = analyze_files([tmp_path], jobs=1)
+        assert [report.name for report in reports] == ["a.stl", "b.stl"]
+        assert analyze_files([tmp_path], jobs=2) == reports
+        write_report(reports, tmp_path / "printability.json")
+        written = json.loads((tmp_path / "printability.json").read_text())
+        assert written[1]["volume"] == pytest.approx(125)
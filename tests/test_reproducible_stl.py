@@ -0,0 +1,83 @@
+import subprocess
+import sys
+from hashlib import sha256
+from pathlib import Path
+
+import numpy as np
+
+from printability import read_stl
+from reproducible_stl import (
+    REPRODUCIBLE_HEADER,
+    canonical_triangles,
+    make_reproducible,
+    stl_bytes,
+)
+
+SOURCE_DIRECTORY = (Path(__file__).parent / "../src").resolve()
+
+# builds the default wheel into the folder given as the first argument
+BUILD_SCRIPT = """
+import sys
+from bender_config import BenderConfig
+from build_plan import wheel_jobs
+config = BenderConfig("../build-configs/release.conf")
+config.stl_folder = sys.argv[1]
+wheel_jobs(config)[0].build()
+"""
+
+
+def tetrahedron():
+    corners = np.array(
+        [[0, 0, 0], [10, 0, 0], [0, 10, 0], [0, 0, 10]], dtype=float
+    )
+    faces = [[0, 2, 1], [0, 1, 3], [1, 2, 3], [0, 3, 2]]
+    return corners[faces]
+
+
+class TestCanonicalTriangles:
+    def test_order(self):
+        triangles = tetrahedron()
+        shuffled = np.roll(triangles[::-1], 1, axis=1)
+        assert stl_bytes(shuffled) == stl_bytes(triangles)
+
+    def test_winding(self):
+        triangles = canonical_triangles(tetrahedron())
+        edges = triangles - triangles[:, :1]
+        normals = np.cross(edges[:, 1], edges[:, 2])
+        centers = triangles.mean(axis=1) - tetrahedron().mean(axis=(0, 1))
+        assert np.all(np.einsum("ij,ij->i", normals, centers) > 0)
+
+    def test_snapping(self):
+        triangles = tetrahedron()
+        jittered = triangles + 1e-6
+        jittered[triangles == 0] = -0.0
+        assert stl_bytes(jittered) == stl_bytes(triangles)
+
+    def test_collapsed(self):
+        sliver = np.array([[[0, 0, 0], [1, 0, 0], [1, 1e-6, 0]]])
+        assert len(canonical_triangles(sliver)) == 0
+
+
+class TestReproducibleStl:
+    def test_rewrite(self, tmp_path):
+        path = tmp_path / "part.stl"
+        path.write_bytes(stl_bytes(tetrahedron()[::-1]))
+        make_reproducible(path)
+        data = path.read_bytes()
+        assert data.startswith(REPRODUCIBLE_HEADER)
+        assert data == stl_bytes(tetrahedron())
+        assert read_stl(path).shape == (4, 3, 3)
+
+    def test_separate_processes(self, tmp_path):
+        digests = []
+        for folder in ("first", "second"):
+            subprocess.run(
+                [sys.executable, "-c", BUILD_SCRIPT, str(tmp_path / folder)],
+                cwd=SOURCE_DIRECTORY,
+                check=True,
+                capture_output=True,
+                timeout=300,
+            )
+            stl = tmp_path / folder / "filament-bracket-wheel.stl"
+            digests.append(sha256(stl.read_bytes()).hexdigest())
+        assert digests[0] == digests[1]
@@ -0,0 +1,67 @@
+import pickle
+from functools import partial
+from pathlib import Path
+
+import pytest
+from build123d import Box, Cylinder, Part
+
+from build_plan import build_plan
+from build_scheduler import CostModel, run_jobs
+from shape_transport import ShapeStore, benchmark, brep_bytes
+
+
+def drilled_box(size=10) -> Part:
+    part = Part((Box(size, size, size) - Cylinder(size / 4, size * 2)).wrapped)
+    part.label = "drilled box"
+    return part
+
+
+def share_box(folder, job):
+    # the size of the box differs with each job
+    return ShapeStore(folder).put(drilled_box(len(job.description)))
+
+
+class TestShapeStore:
+    def test_round_trip(self, tmp_path):
+        store = ShapeStore(tmp_path)
+        part = drilled_box()
+        handle = store.put(part)
+        assert handle.size == len(brep_bytes(part))
+        assert len(pickle.dumps(handle)) < 400
+        attached = pickle.loads(pickle.dumps(handle)).attach()
+        assert isinstance(attached, Part)
+        assert attached.volume == pytest.approx(part.volume)
+        assert attached.label == "drilled box"
+        # identical solids are written once
+        assert store.put(drilled_box()) == handle
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_temporary(self):
+        with ShapeStore.temporary() as store:
+            path = Path(store.put(drilled_box()).path)
+            assert path.exists()
+        assert not store.path.exists()
+
+    def test_worker_processes(self, default_bender_config, tmp_path):
+        jobs = build_plan(default_bender_config)[:4]
+        finished = list(
+            run_jobs(jobs, partial(share_box, tmp_path), CostModel(), 2)
+        )
+        for done in finished:
+            size = len(done.job.description)
+            assert done.result.attach().volume == pytest.approx(
+                drilled_box(size).volume
+            )
+
+
+class TestBenchmark:
+    def test_methods(self):
+        rows = benchmark({"box": drilled_box()}, repeat=1)
+        assert [row["method"] for row in rows] == [
+            "pickle",
+            "step",
+            "brep store",
+        ]
+        for row in rows:
+            assert row["volume"] == pytest.approx(drilled_box().volume)
+        assert rows[2]["pipe_bytes"] < rows[0]["pipe_bytes"]
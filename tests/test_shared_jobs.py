@@ -0,0 +1,50 @@
+from build_plan import build_plan, wheel_jobs
+from shared_jobs import geometry_key, pool_jobs, share_outputs
+
+
+def export(job, contents="solid"):
+    outputs = job.output_files()
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+    return outputs
+
+
+class TestSharedJobs:
+    def test_geometry_key(self, default_bender_config):
+        first, second = wheel_jobs(default_bender_config)
+        default_bender_config.stl_folder = "../stl/elsewhere"
+        moved, _ = wheel_jobs(default_bender_config)
+        assert first != moved
+        assert geometry_key(first) == geometry_key(moved)
+        assert geometry_key(first) != geometry_key(second)
+
+    def test_pool_jobs(self, default_bender_config):
+        jobs = build_plan(default_bender_config)
+        default_bender_config.stl_folder = "../stl/elsewhere"
+        default_bender_config.wheel.diameter += 1
+        other_jobs = build_plan(default_bender_config)
+        pooled = pool_jobs(jobs + other_jobs + jobs)
+        assert list(pooled)[: len(jobs)] == jobs
+        shared = [group for group in pooled.values() if len(group) > 1]
+        assert shared
+        assert len(pooled) + sum(len(group) - 1 for group in shared) == len(
+            jobs
+        ) + len(other_jobs)
+        # only the wheels' geometry changed
+        assert not any(
+            job.part_class.__name__ == "FilamentWheel"
+            for group in shared
+            for job in group
+        )
+
+    def test_share_outputs(self, default_bender_config, tmp_path):
+        default_bender_config.stl_folder = str(tmp_path / "first")
+        built = wheel_jobs(default_bender_config)[0]
+        default_bender_config.stl_folder = str(tmp_path / "second")
+        shared = wheel_jobs(default_bender_config)[0]
+        export(built)
+        outputs = share_outputs(built, shared)
+        assert outputs == shared.output_files()
+        assert all(path.read_text() == "solid" for path in outputs)
+        assert share_outputs(built, built) == built.output_files()
@@ -0,0 +1,200 @@
+import importlib
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from build_plan import BuildJob
+from build_stages import clear_stage_cache, stage_statistics
+from config_snapshot import snapshot
+from watch import Watcher, affected_modules, module_imports
+
+CONFIG_DIRECTORY = Path(__file__).parent / "../build-configs"
+
+
+def touch(path: Path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+# a part whose size is defined in another module, and one independent of
+# it, each with a build stage
+WATCHED_MODULES = {
+    "watched_size": "SIZE = 10\n",
+    "watched_block": """
+from build123d import Box, Part
+
+from build_stages import build_stage
+from watched_size import SIZE
+
+
+class WatchedPart:
+    def __init__(self, config):
+        self._config = config
+
+    @build_stage
+    def _solid(self) -> Part:
+        return Part(Box(SIZE, SIZE, self._config.height).wrapped)
+
+    def partomate(self):
+        self._solid()
+""",
+    "watched_pin": """
+from build123d import Cylinder, Part
+
+from build_stages import build_stage
+
+
+class WatchedPart:
+    def __init__(self, config):
+        self._config = config
+
+    @build_stage
+    def _solid(self) -> Part:
+        return Part(Cylinder(1, self._config.height).wrapped)
+
+    def partomate(self):
+        self._solid()
+""",
+}
+
+
+@dataclass
+class WatchedConfig:
+    height: float = 1
+    stl_folder: str = "NONE"
+
+
+class PartWatcher(Watcher):
+    def jobs(self):
+        # the classes of the modules as they are now, as build_plan would
+        return [
+            BuildJob(
+                "parts",
+                name,
+                sys.modules[name].WatchedPart,
+                snapshot(WatchedConfig()),
+            )
+            for name in ("watched_block", "watched_pin")
+        ]
+
+
+@pytest.fixture
+def watched_source(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    source.mkdir()
+    for name, text in WATCHED_MODULES.items():
+        (source / f"{name}.py").write_text(text)
+    monkeypatch.syspath_prepend(str(source))
+    clear_stage_cache()
+    for name in ("watched_block", "watched_pin"):
+        importlib.import_module(name)
+    yield source
+    for name in WATCHED_MODULES:
+        sys.modules.pop(name, None)
+    clear_stage_cache()
+
+
+class TestImportGraph:
+    def test_module_imports(self, tmp_path):
+        (tmp_path / "config.py").write_text("import yaml\n")
+        (tmp_path / "part.py").write_text("from config import Config\n")
+        (tmp_path / "broken.py").write_text("import (\n")
+        assert module_imports(tmp_path) == {
+            "config": set(),
+            "part": {"config"},
+            "broken": set(),
+        }
+
+    def test_affected_modules(self):
+        imports = {
+            "config": set(),
+            "part": {"config"},
+            "assembly": {"part", "config"},
+            "other": set(),
+        }
+        assert affected_modules(["config"], imports) == [
+            "config",
+            "part",
+            "assembly",
+        ]
+        assert affected_modules(["part"], imports) == ["part", "assembly"]
+        assert affected_modules(["other"], imports) == ["other"]
+
+
+class TestWatcher:
+    def test_changes(self, tmp_path):
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "part.py").write_text("")
+        conf = tmp_path / "part.conf"
+        conf.write_text("")
+        watcher = Watcher(conf, source_folder=source, log=lambda line: None)
+        assert watcher.changes() == (set(), False)
+        touch(source / "part.py")
+        (source / "watch.py").write_text("")
+        assert watcher.changes() == ({"part"}, False)
+        touch(conf)
+        assert watcher.changes() == (set(), True)
+
+    def test_rebuild_on_config_change(self, tmp_path):
+        conf = tmp_path / "release.conf"
+        shutil.copyfile(CONFIG_DIRECTORY / "release.conf", conf)
+        lines = []
+        watcher = Watcher(
+            conf, ["lock-pin"], tmp_path / "out", log=lines.append
+        )
+        built = watcher.step(first=True)
+        assert [job.description for job in built] == ["frame lock pin"]
+        stl = built[0].output_files()[0]
+        assert stl.parent == (tmp_path / "out").resolve()
+        assert watcher.step() == []
+
+        conf.write_text(
+            conf.read_text().replace(
+                "frame_lock_pin_tolerance: 0.6",
+                "frame_lock_pin_tolerance: 0.5",
+            )
+        )
+        touch(conf)
+        assert len(watcher.step()) == 1
+        assert watcher.step() == []
+
+        conf.write_text("BenderConfig:\n  filament_count: [\n")
+        touch(conf)
+        assert watcher.step() == []
+        assert "Traceback" in lines[-1]
+
+    def test_reload_dependents(self, watched_source, tmp_path):
+        conf = tmp_path / "part.conf"
+        conf.write_text("")
+        lines = []
+        watcher = PartWatcher(
+            conf, source_folder=watched_source, log=lines.append
+        )
+        built = watcher.step(first=True)
+        assert [job.description for job in built] == [
+            "watched_block",
+            "watched_pin",
+        ]
+        assert stage_statistics() == {"hits": 0, "misses": 2}
+
+        (watched_source / "watched_size.py").write_text("SIZE = 20\n")
+        touch(watched_source / "watched_size.py")
+        built = watcher.step()
+        # the changed module and the module importing it are reloaded
+        assert lines[-2] == "reloaded watched_size, watched_block"
+        # and only the part built from them is rebuilt
+        assert [job.description for job in built] == ["watched_block"]
+        assert stage_statistics() == {"hits": 0, "misses": 1}
+
+        config = WatchedConfig()
+        block = sys.modules["watched_block"].WatchedPart(config)._solid()
+        assert block.volume == pytest.approx(400)
+        # the stage of the unaffected module was kept
+        sys.modules["watched_pin"].WatchedPart(config)._solid()
+        assert stage_statistics() == {"hits": 2, "misses": 1}
+        assert watcher.step() == []